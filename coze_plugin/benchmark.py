@@ -0,0 +1,283 @@
+"""
+Coze 插件工具延迟基准测试
+
+基于 local_runtime 在本地按真实工作流顺序调用工具：
+    create_draft → N × add_*（视频/图片/音频/字幕/特效）→ export_drafts
+统计每个工具的 p50/p99 延迟，以及每次调用在 /tmp 草稿存储上读写的字节数。
+
+用法:
+    python -m coze_plugin.benchmark --drafts 20 --add-calls 5 --segments 10
+    python -m coze_plugin.benchmark --json > result.json
+
+导出时使用 remove_temp_files，测试结束后不会在存储中留下草稿。
+"""
+
+import os
+import sys
+import json
+import time
+import builtins
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from coze_plugin.local_runtime import get_tool_logger, result_to_dict, run_tool
+
+
+# 工具使用的草稿存储根目录（各 handler 中硬编码的路径）
+STORE_ROOT = os.path.join("/tmp", "jianying_assistant")
+
+# add_* 工具的调用顺序，与常规工作流一致
+ADD_TOOLS = ("add_videos", "add_images", "add_audios", "add_captions", "add_effects")
+
+
+class ToolStats(NamedTuple):
+    """单个工具的统计结果"""
+    tool: str
+    calls: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+    avg_bytes_read: int
+    avg_bytes_written: int
+
+
+class _Sample(NamedTuple):
+    elapsed: float
+    bytes_read: int
+    bytes_written: int
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """最近秩法计算百分位数，values 为空时返回 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(-(-percent * len(ordered) // 100)))  # ceil(percent/100 * n)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class IoCounter:
+    """
+    统计 STORE_ROOT 下文件的读写字节数
+
+    在 count() 期间替换 builtins.open，按文件关闭时底层文件位置的变化计数，
+    因此统计的是实际从磁盘读取（含预读缓冲）和写入的字节，不增加每次读写的开销。
+    export_drafts 会在线程池中加载草稿，计数使用锁保护。
+    """
+
+    def __init__(self, root: str = STORE_ROOT):
+        self.root = os.path.abspath(root) + os.sep
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def _add(self, mode: str, count: int) -> None:
+        with self._lock:
+            if any(flag in mode for flag in "wax+"):
+                self.bytes_written += count
+            else:
+                self.bytes_read += count
+
+    @contextmanager
+    def count(self) -> Iterator["IoCounter"]:
+        original_open = builtins.open
+        counter = self
+
+        def counting_open(file, mode='r', *args, **kwargs):
+            f = original_open(file, mode, *args, **kwargs)
+            if not isinstance(file, (str, bytes, os.PathLike)):
+                return f
+            path = os.path.abspath(os.fsdecode(file))
+            if not path.startswith(counter.root):
+                return f
+            raw = _raw_file(f)
+            if raw is None:
+                return f
+            start = raw.tell()
+            original_close = f.close
+
+            def close():
+                if not f.closed:
+                    try:
+                        f.flush()
+                        counter._add(mode, raw.tell() - start)
+                    except (OSError, ValueError):
+                        pass
+                original_close()
+
+            f.close = close
+            return f
+
+        builtins.open = counting_open
+        try:
+            yield self
+        finally:
+            builtins.open = original_open
+
+
+def _raw_file(f: Any) -> Optional[Any]:
+    """返回文本或缓冲文件对象底层的原始文件对象，无法获取时返回 None"""
+    raw = getattr(getattr(f, 'buffer', f), 'raw', f)
+    return raw if hasattr(raw, 'tell') else None
+
+
+def _is_success(result: Any) -> bool:
+    if isinstance(result, dict):
+        return bool(result.get('success'))
+    return bool(getattr(result, 'success', False))
+
+
+def _result_message(result: Any) -> str:
+    result = result_to_dict(result)
+    return str(result.get('message', '')) if isinstance(result, dict) else str(result)
+
+
+def make_segment_infos(tool: str, call_index: int, segments: int) -> List[str]:
+    """
+    生成 add_* 工具的 *_infos 参数（与 make_*_info 输出相同的 JSON 字符串）
+
+    每次调用的片段在时间线上依次排列，与实际工作流中逐段追加的情况一致。
+    """
+    infos = []
+    for i in range(segments):
+        index = call_index * segments + i
+        start, end = index * 3000, (index + 1) * 3000
+        if tool == "add_videos":
+            info = {"video_url": f"https://example.com/video_{index}.mp4", "start": start, "end": end}
+        elif tool == "add_images":
+            info = {"image_url": f"https://example.com/image_{index}.png", "start": start, "end": end,
+                    "in_animation": "轻微放大"}
+        elif tool == "add_audios":
+            info = {"audio_url": f"https://example.com/audio_{index}.mp3", "start": start, "end": end,
+                    "volume": 0.8}
+        elif tool == "add_captions":
+            info = {"content": f"第 {index} 句字幕", "start": start, "end": end, "font_size": 48,
+                    "color": "#FFFFFF"}
+        elif tool == "add_effects":
+            info = {"effect_type": "模糊", "start": start, "end": end, "intensity": 0.5}
+        else:
+            raise ValueError(f"不支持的工具: {tool}")
+        infos.append(json.dumps(info, ensure_ascii=False, separators=(',', ':')))
+    return infos
+
+
+def run_benchmark(drafts: int = 10, add_calls: int = 5, segments: int = 10,
+                  tools: tuple = ADD_TOOLS, compact_output: bool = True,
+                  logger_level: Optional[int] = logging.WARNING,
+                  progress: Optional[Callable[[int, int], None]] = None) -> List[ToolStats]:
+    """
+    运行基准测试工作流
+
+    Args:
+        drafts: 完整工作流（创建到导出）的执行次数
+        add_calls: 每个草稿中每个 add_* 工具的调用次数
+        segments: 每次 add_* 调用包含的片段数
+        tools: 参与测试的 add_* 工具
+        compact_output: export_drafts 是否使用紧凑 JSON
+        logger_level: 传给 handler 的 logger 级别，None 表示不提供 logger
+        progress: 每完成一个草稿调用一次 progress(done, total)
+
+    Returns:
+        按调用顺序排列的各工具统计结果
+
+    Raises:
+        RuntimeError: 任一工具调用失败
+    """
+    samples: Dict[str, List[_Sample]] = {}
+
+    def call(tool: str, data: Dict[str, Any]) -> Any:
+        logger = get_tool_logger(tool, logger_level) if logger_level is not None else None
+        counter = IoCounter()
+        with counter.count():
+            started = time.perf_counter()
+            result = run_tool(tool, data, logger=logger)
+            elapsed = time.perf_counter() - started
+        if not _is_success(result):
+            raise RuntimeError(f"{tool} 调用失败: {_result_message(result)}")
+        samples.setdefault(tool, []).append(_Sample(elapsed, counter.bytes_read, counter.bytes_written))
+        return result
+
+    for done in range(drafts):
+        created = call("create_draft", {"draft_name": f"基准测试 {done + 1}"})
+        draft_id = created["draft_id"]
+
+        for call_index in range(add_calls):
+            for tool in tools:
+                info_param = tool[len("add_"):-1] + "_infos"
+                call(tool, {"draft_id": draft_id, info_param: make_segment_infos(tool, call_index, segments)})
+
+        call("export_drafts", {"draft_ids": draft_id, "remove_temp_files": True,
+                               "compact_output": compact_output})
+        if progress:
+            progress(done + 1, drafts)
+
+    return [summarize(tool, tool_samples) for tool, tool_samples in samples.items()]
+
+
+def summarize(tool: str, samples: List[_Sample]) -> ToolStats:
+    """汇总单个工具的采样数据"""
+    elapsed_ms = [sample.elapsed * 1000 for sample in samples]
+    return ToolStats(
+        tool=tool,
+        calls=len(samples),
+        p50_ms=round(percentile(elapsed_ms, 50), 3),
+        p99_ms=round(percentile(elapsed_ms, 99), 3),
+        max_ms=round(max(elapsed_ms), 3),
+        avg_bytes_read=sum(sample.bytes_read for sample in samples) // len(samples),
+        avg_bytes_written=sum(sample.bytes_written for sample in samples) // len(samples),
+    )
+
+
+def format_report(stats: List[ToolStats]) -> str:
+    """将统计结果格式化为文本表格"""
+    header = f"{'tool':<16}{'calls':>7}{'p50 ms':>11}{'p99 ms':>11}{'max ms':>11}{'read B':>12}{'written B':>12}"
+    lines = [header, "-" * len(header)]
+    for s in stats:
+        lines.append(f"{s.tool:<16}{s.calls:>7}{s.p50_ms:>11.2f}{s.p99_ms:>11.2f}{s.max_ms:>11.2f}"
+                     f"{s.avg_bytes_read:>12}{s.avg_bytes_written:>12}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="Coze 插件工具延迟基准测试")
+    parser.add_argument("--drafts", type=int, default=10, help="工作流执行次数（默认 10）")
+    parser.add_argument("--add-calls", type=int, default=5, help="每个草稿中每个 add_* 的调用次数（默认 5）")
+    parser.add_argument("--segments", type=int, default=10, help="每次 add_* 调用的片段数（默认 10）")
+    parser.add_argument("--tools", default=",".join(ADD_TOOLS), help="参与测试的 add_* 工具，逗号分隔")
+    parser.add_argument("--pretty-export", action="store_true", help="export_drafts 输出带缩进的 JSON")
+    parser.add_argument("--no-logger", action="store_true", help="不向 handler 传入 logger")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    options = parser.parse_args(argv)
+
+    tools = tuple(tool.strip() for tool in options.tools.split(",") if tool.strip())
+    unknown = [tool for tool in tools if tool not in ADD_TOOLS]
+    if unknown:
+        parser.error(f"不支持的工具: {', '.join(unknown)}")
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r完成 {done}/{total} 个草稿", end="", file=sys.stderr, flush=True)
+
+    stats = run_benchmark(
+        drafts=options.drafts,
+        add_calls=options.add_calls,
+        segments=options.segments,
+        tools=tools,
+        compact_output=not options.pretty_export,
+        logger_level=None if options.no_logger else logging.WARNING,
+        progress=progress,
+    )
+    print(file=sys.stderr)
+
+    if options.json:
+        print(json.dumps([s._asdict() for s in stats], ensure_ascii=False, indent=2))
+    else:
+        print(format_report(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
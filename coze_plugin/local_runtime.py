@@ -0,0 +1,186 @@
+"""
+本地 Coze 运行时替身
+
+Coze 平台运行工具时会提供 runtime 模块（各 handler 中的 from runtime import Args），
+本地环境中不存在该模块。本模块提供同名的 Args、日志记录器以及从 JSON 构造 Input
+的工具函数，用于在本地直接运行、调试和压测 coze_plugin/tools 下的工具。
+
+用法:
+    from coze_plugin.local_runtime import run_tool
+
+    result = run_tool("create_draft", {"draft_name": "本地测试"})
+
+命令行:
+    python -m coze_plugin.local_runtime create_draft '{"draft_name": "本地测试"}'
+"""
+
+import os
+import sys
+import json
+import types
+import logging
+import argparse
+import importlib.util
+from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
+
+
+# 工具目录，每个子目录包含一个 handler.py
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools")
+
+T = TypeVar('T')
+
+
+class Args(Generic[T]):
+    """与 Coze runtime.Args 相同的调用参数：handler 只使用 input 和 logger"""
+
+    def __init__(self, input: T, logger: Optional[logging.Logger] = None):
+        self.input = input
+        self.logger = logger
+
+
+_loaded_tools: Dict[str, types.ModuleType] = {}
+
+
+def install_runtime() -> types.ModuleType:
+    """
+    注册 runtime 模块，使 handler 中的 from runtime import Args 可以导入
+
+    已经存在 runtime 模块时（Coze 平台或测试中的替身）保持不变。
+
+    Returns:
+        当前生效的 runtime 模块
+    """
+    runtime = sys.modules.get('runtime')
+    if runtime is None:
+        runtime = types.ModuleType('runtime')
+        runtime.Args = Args
+        sys.modules['runtime'] = runtime
+    return runtime
+
+
+def get_tool_logger(tool_name: str, level: Optional[int] = None) -> logging.Logger:
+    """获取工具的日志记录器，对应 Coze 传入的 args.logger"""
+    logger = logging.getLogger(f"coze_plugin.tools.{tool_name}")
+    if level is not None:
+        logger.setLevel(level)
+    return logger
+
+
+def list_tools() -> List[str]:
+    """列出所有包含 handler.py 的工具名称"""
+    if not os.path.isdir(TOOLS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(TOOLS_DIR)
+        if os.path.isfile(os.path.join(TOOLS_DIR, name, "handler.py"))
+    )
+
+
+def load_tool(tool_name: str) -> types.ModuleType:
+    """
+    加载工具的 handler 模块（每个工具只加载一次）
+
+    Args:
+        tool_name: 工具名称，如 create_draft、add_videos
+
+    Raises:
+        ValueError: 工具不存在
+    """
+    module = _loaded_tools.get(tool_name)
+    if module is not None:
+        return module
+
+    handler_file = os.path.join(TOOLS_DIR, tool_name, "handler.py")
+    if not os.path.isfile(handler_file):
+        raise ValueError(f"未知工具: {tool_name}（可用工具: {', '.join(list_tools())}）")
+
+    install_runtime()
+    spec = importlib.util.spec_from_file_location(f"coze_plugin_tool_{tool_name}", handler_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    _loaded_tools[tool_name] = module
+    return module
+
+
+def build_input(tool_module: types.ModuleType, data: Union[Dict[str, Any], str, None] = None) -> Any:
+    """
+    从字典或 JSON 字符串构造工具的 Input
+
+    Args:
+        tool_module: load_tool 返回的 handler 模块
+        data: 参数对象或其 JSON 字符串，None 表示全部使用默认值
+
+    Raises:
+        ValueError: JSON 无效、不是对象或包含 Input 中不存在的字段
+    """
+    if data is None:
+        data = {}
+    elif isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"输入不是有效的 JSON: {str(e)}")
+
+    if not isinstance(data, dict):
+        raise ValueError(f"输入必须是 JSON 对象，得到 {type(data).__name__}")
+
+    input_class = tool_module.Input
+    unknown = [name for name in data if name not in input_class._fields]
+    if unknown:
+        raise ValueError(f"不支持的参数: {', '.join(unknown)}")
+
+    try:
+        return input_class(**data)
+    except TypeError as e:
+        raise ValueError(f"输入参数无效: {str(e)}")
+
+
+def run_tool(tool_name: str, data: Union[Dict[str, Any], str, None] = None,
+             logger: Optional[logging.Logger] = None) -> Any:
+    """
+    以 Coze 的调用方式运行一个工具
+
+    Args:
+        tool_name: 工具名称
+        data: 输入参数（字典或 JSON 字符串）
+        logger: 传给 handler 的日志记录器，None 时与 Coze 未提供 logger 的情况相同
+
+    Returns:
+        handler 的原始返回值（NamedTuple 或字典）
+    """
+    tool_module = load_tool(tool_name)
+    return tool_module.handler(Args(build_input(tool_module, data), logger))
+
+
+def result_to_dict(result: Any) -> Any:
+    """将 handler 的返回值转换为可 JSON 序列化的对象"""
+    if hasattr(result, '_asdict'):
+        return result._asdict()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口：运行一个工具并输出 JSON 结果"""
+    parser = argparse.ArgumentParser(description="在本地运行 Coze 插件工具")
+    parser.add_argument("tool", choices=list_tools(), help="工具名称")
+    parser.add_argument("input", nargs="?", default=None,
+                        help="输入参数 JSON；为 - 时从标准输入读取，省略时使用默认值")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出工具日志")
+    options = parser.parse_args(argv)
+
+    level = logging.DEBUG if options.verbose else logging.WARNING
+    logging.basicConfig(level=level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    data = sys.stdin.read() if options.input == "-" else options.input
+    try:
+        result = run_tool(options.tool, data, logger=get_tool_logger(options.tool, level))
+    except ValueError as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
+        return 2
+
+    print(json.dumps(result_to_dict(result), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test for add_tracks tool
+
+Tests the batch track addition functionality:
+1. Several typed track payloads are committed in a single write
+2. Segment format matches the individual add_* tools
+3. Validation failures leave the draft untouched
+"""
+
+import os
+import sys
+import json
+import uuid
+import shutil
+import types
+import importlib.util
+from typing import Generic, TypeVar
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def load_module(name, relative_path):
+    """Load a tool handler with a mocked runtime module"""
+    T = TypeVar('T')
+
+    class MockArgsType(Generic[T]):
+        pass
+
+    runtime_mock = types.ModuleType('runtime')
+    runtime_mock.Args = MockArgsType
+    sys.modules['runtime'] = runtime_mock
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MockArgs:
+    def __init__(self, input_data):
+        self.input = input_data
+        self.logger = None
+
+
+def setup_test_draft():
+    """Create an empty draft config in /tmp"""
+    draft_id = str(uuid.uuid4())
+    draft_folder = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id)
+    os.makedirs(draft_folder, exist_ok=True)
+
+    draft_config = {
+        "draft_id": draft_id,
+        "project": {"name": "Test Tracks Project", "width": 1920, "height": 1080, "fps": 30},
+        "media_resources": [],
+        "tracks": [],
+        "created_timestamp": 1234567890.0,
+        "last_modified": 1234567890.0
+    }
+    with open(os.path.join(draft_folder, "draft_config.json"), 'w', encoding='utf-8') as f:
+        json.dump(draft_config, f, ensure_ascii=False, indent=2)
+
+    return draft_id
+
+
+def read_draft_config(draft_id):
+    config_file = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id, "draft_config.json")
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cleanup_test_draft(draft_id):
+    draft_folder = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id)
+    if os.path.exists(draft_folder):
+        shutil.rmtree(draft_folder)
+
+
+def test_add_tracks_single_write():
+    """All track types are added in one call"""
+    print("=== Testing add_tracks with several track types ===")
+
+    module = load_module("add_tracks_handler", "coze_plugin/tools/add_tracks/handler.py")
+    draft_id = setup_test_draft()
+
+    try:
+        result = module.handler(MockArgs(module.Input(
+            draft_id=draft_id,
+            image_infos=[
+                '{"image_url":"https://example.com/1.jpg","start":0,"end":3000,"in_animation":"轻微放大"}',
+                '{"image_url":"https://example.com/2.jpg","start":3000,"end":6000}'
+            ],
+            audio_infos=['{"audio_url":"https://example.com/bgm.mp3","start":0,"end":6000,"volume":0.6}'],
+            caption_infos=[
+                {"content": "第一句", "start": 0, "end": 3000, "font_size": 40},
+                {"content": "第二句", "start": 3000, "end": 6000}
+            ],
+            effect_infos='[{"effect_type":"模糊","start":0,"end":1000}]'
+        )))
+
+        assert result.success, f"Should succeed: {result.message}"
+        assert result.track_count == 4
+        assert len(result.segment_ids) == 6
+        assert len(result.track_segment_ids["image"]) == 2
+        assert len(result.track_segment_ids["caption"]) == 2
+
+        config = read_draft_config(draft_id)
+        track_types = [track["track_type"] for track in config["tracks"]]
+        assert track_types == ["video", "audio", "text", "effect"], track_types
+
+        image_segment = config["tracks"][0]["segments"][0]
+        assert image_segment["type"] == "image"
+        assert image_segment["material_url"] == "https://example.com/1.jpg"
+        assert image_segment["animations"]["intro"] == "轻微放大"
+
+        audio_segment = config["tracks"][1]["segments"][0]
+        assert audio_segment["audio"]["volume"] == 0.6
+
+        text_segment = config["tracks"][2]["segments"][0]
+        assert text_segment["content"] == "第一句"
+        assert text_segment["style"]["font_size"] == 40
+
+        assert config["last_modified"] > 1234567890.0
+        print("✅ All tracks written in a single call")
+    finally:
+        cleanup_test_draft(draft_id)
+
+
+def test_add_tracks_validation_is_atomic():
+    """A bad payload in any track rejects the whole call"""
+    print("=== Testing add_tracks validation ===")
+
+    module = load_module("add_tracks_handler", "coze_plugin/tools/add_tracks/handler.py")
+    draft_id = setup_test_draft()
+
+    try:
+        result = module.handler(MockArgs(module.Input(
+            draft_id=draft_id,
+            audio_infos=['{"audio_url":"https://example.com/bgm.mp3","start":0,"end":6000}'],
+            caption_infos=['{"content":"缺少结束时间","start":0}']
+        )))
+        assert not result.success
+        assert "caption_infos[0] 中缺少必需字段 'end'" in result.message, result.message
+        assert read_draft_config(draft_id)["tracks"] == [], "Draft must not be modified"
+
+        result = module.handler(MockArgs(module.Input(draft_id=draft_id)))
+        assert not result.success
+
+        result = module.handler(MockArgs(module.Input(draft_id="invalid-uuid", audio_infos=[])))
+        assert not result.success
+        assert "无效的 draft_id" in result.message
+        print("✅ Validation errors handled without writing")
+    finally:
+        cleanup_test_draft(draft_id)
+
+
+if __name__ == "__main__":
+    test_add_tracks_single_write()
+    test_add_tracks_validation_is_atomic()
+    print("\n✅ All add_tracks tests passed!")
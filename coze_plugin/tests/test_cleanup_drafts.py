@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test for cleanup_drafts tool
+
+Tests the draft janitor:
+1. Drafts past the TTL are removed and reclaimed bytes are reported
+2. Quota eviction removes the oldest drafts first and skips protected ones
+3. create_draft runs the janitor at most once per interval
+4. create_draft only removes expired drafts and reads them from the draft index
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import types
+import importlib.util
+from typing import Generic, TypeVar
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+DRAFTS_DIR = os.path.join("/tmp", "jianying_assistant", "drafts")
+
+# 远早于任何 TTL 的修改时间，保证测试草稿一定过期
+ANCIENT_TIMESTAMP = 1000000000.0
+
+
+def load_module(name, relative_path):
+    """Load a tool handler with a mocked runtime module"""
+    T = TypeVar('T')
+
+    class MockArgsType(Generic[T]):
+        pass
+
+    runtime_mock = types.ModuleType('runtime')
+    runtime_mock.Args = MockArgsType
+    sys.modules['runtime'] = runtime_mock
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MockArgs:
+    def __init__(self, input_data):
+        self.input = input_data
+        self.logger = None
+
+
+def create_old_draft(timestamp=ANCIENT_TIMESTAMP):
+    """Create a draft whose config was last modified at the given time"""
+    draft_id = str(uuid.uuid4())
+    draft_folder = os.path.join(DRAFTS_DIR, draft_id)
+    os.makedirs(draft_folder, exist_ok=True)
+    config_file = os.path.join(draft_folder, "draft_config.json")
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump({"draft_id": draft_id, "tracks": [], "last_modified": timestamp}, f)
+    os.utime(config_file, (timestamp, timestamp))
+    return draft_id
+
+
+def cleanup_test_drafts(draft_ids):
+    for draft_id in draft_ids:
+        draft_folder = os.path.join(DRAFTS_DIR, draft_id)
+        if os.path.exists(draft_folder):
+            shutil.rmtree(draft_folder)
+
+
+def test_ttl_cleanup_reports_reclaimed_bytes():
+    """Expired drafts are removed; dry_run only reports them"""
+    print("=== Testing TTL cleanup ===")
+
+    module = load_module("cleanup_drafts_handler", "coze_plugin/tools/cleanup_drafts/handler.py")
+    draft_ids = [create_old_draft(), create_old_draft()]
+    fresh_id = create_old_draft(timestamp=time.time())
+    draft_ids.append(fresh_id)
+
+    try:
+        expected_bytes = sum(
+            os.path.getsize(os.path.join(DRAFTS_DIR, draft_id, "draft_config.json"))
+            for draft_id in draft_ids[:2]
+        )
+
+        preview = module.handler(MockArgs(module.Input(ttl_hours=1, max_total_mb=0, dry_run=True)))
+        assert preview["success"], preview["message"]
+        assert set(draft_ids[:2]) <= set(preview["removed_draft_ids"])
+        assert all(os.path.exists(os.path.join(DRAFTS_DIR, draft_id)) for draft_id in draft_ids)
+
+        result = module.handler(MockArgs(module.Input(ttl_hours=1, max_total_mb=0)))
+        assert result["success"], result["message"]
+        assert set(draft_ids[:2]) <= set(result["removed_draft_ids"])
+        assert fresh_id not in result["removed_draft_ids"]
+        assert result["reclaimed_bytes"] >= expected_bytes
+        assert not any(os.path.exists(os.path.join(DRAFTS_DIR, draft_id)) for draft_id in draft_ids[:2])
+        assert os.path.exists(os.path.join(DRAFTS_DIR, fresh_id))
+        assert "已删除" in result["message"]
+
+        result = module.handler(MockArgs(module.Input(ttl_hours=-1)))
+        assert not result["success"]
+        print("✅ Expired drafts reclaimed")
+    finally:
+        cleanup_test_drafts(draft_ids)
+
+
+def test_quota_evicts_oldest_first():
+    """Quota eviction walks from the oldest draft and never touches protected ones"""
+    print("=== Testing quota eviction ===")
+
+    module = load_module("cleanup_drafts_handler", "coze_plugin/tools/cleanup_drafts/handler.py")
+    now = 1700000000.0
+    entries = [
+        (now - 10, "newest", 100),
+        (now - 40, "oldest", 100),
+        (now - 30, "protected", 100),
+        (now - 20, "middle", 100),
+    ]
+
+    selected = module.select_drafts_to_remove(entries, 0, 250, now, protected=["protected"])
+    assert [entry[1] for entry in selected] == ["oldest", "middle"]
+
+    # TTL removals count towards the quota before any eviction
+    selected = module.select_drafts_to_remove(entries, 35, 250, now)
+    assert [entry[1] for entry in selected] == ["oldest", "protected"]
+
+    assert module.select_drafts_to_remove(entries, 0, 0, now) == []
+    print("✅ Oldest drafts evicted first")
+
+
+def test_create_draft_runs_janitor_with_rate_limit():
+    """create_draft cleans expired drafts at most once per interval"""
+    print("=== Testing opportunistic janitor in create_draft ===")
+
+    module = load_module("create_draft_handler", "coze_plugin/tools/create_draft/handler.py")
+    created_ids = []
+    old_ids = [create_old_draft()]
+
+    try:
+        # Pretend the janitor last ran long ago
+        if os.path.exists(module.JANITOR_STAMP_FILE):
+            os.utime(module.JANITOR_STAMP_FILE, (ANCIENT_TIMESTAMP, ANCIENT_TIMESTAMP))
+
+        result = module.handler(MockArgs(module.Input(draft_name="清理测试")))
+        assert result["success"], result["message"]
+        created_ids.append(result["draft_id"])
+        assert not os.path.exists(os.path.join(DRAFTS_DIR, old_ids[0]))
+        assert os.path.exists(os.path.join(DRAFTS_DIR, result["draft_id"]))
+
+        # Within the interval the janitor is skipped
+        old_ids.append(create_old_draft())
+        result = module.handler(MockArgs(module.Input(draft_name="清理测试")))
+        assert result["success"], result["message"]
+        created_ids.append(result["draft_id"])
+        assert os.path.exists(os.path.join(DRAFTS_DIR, old_ids[1]))
+        assert module.maybe_run_draft_janitor() is None
+        print("✅ Janitor rate limited")
+    finally:
+        cleanup_test_drafts(created_ids + old_ids)
+
+
+def test_create_draft_janitor_keeps_recent_drafts():
+    """The opportunistic janitor only applies the TTL and uses the draft index"""
+    print("=== Testing create_draft janitor scope ===")
+
+    module = load_module("create_draft_handler", "coze_plugin/tools/create_draft/handler.py")
+    export_module = load_module("export_drafts_handler", "coze_plugin/tools/export_drafts/handler.py")
+    created_ids = []
+    old_id = create_old_draft()
+    recent_id = create_old_draft(timestamp=time.time())
+
+    try:
+        # Register both drafts so the janitor can skip the directory scan
+        export_module.load_draft_index()
+        entries = module.collect_draft_entries_from_index()
+        assert entries is not None
+        assert {old_id, recent_id} <= {entry[1] for entry in entries}
+
+        def fail_scan():
+            raise AssertionError("janitor scanned the drafts directory")
+
+        original_scan = module.collect_draft_entries
+        module.collect_draft_entries = fail_scan
+        try:
+            os.makedirs(os.path.dirname(module.JANITOR_STAMP_FILE), exist_ok=True)
+            with open(module.JANITOR_STAMP_FILE, 'a'):
+                pass
+            os.utime(module.JANITOR_STAMP_FILE, (ANCIENT_TIMESTAMP, ANCIENT_TIMESTAMP))
+
+            result = module.handler(MockArgs(module.Input(draft_name="清理测试")))
+            assert result["success"], result["message"]
+            created_ids.append(result["draft_id"])
+        finally:
+            module.collect_draft_entries = original_scan
+
+        assert not os.path.exists(os.path.join(DRAFTS_DIR, old_id))
+        assert os.path.exists(os.path.join(DRAFTS_DIR, recent_id))
+        print("✅ Recent drafts survive create_draft")
+    finally:
+        cleanup_test_drafts(created_ids + [old_id, recent_id])
+
+
+if __name__ == "__main__":
+    test_ttl_cleanup_reports_reclaimed_bytes()
+    test_quota_evicts_oldest_first()
+    test_create_draft_runs_janitor_with_rate_limit()
+    test_create_draft_janitor_keeps_recent_drafts()
+    print("\n✅ All cleanup_drafts tests passed!")
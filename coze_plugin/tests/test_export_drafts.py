@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Test for export_drafts tool
+
+Tests the export functionality:
+1. export_all loads drafts through the thread pool in stable order
+2. Compact output and streaming to a file (concurrent writers, failed writes)
+3. Cursor-based pagination ordered by last_modified
+4. Draft index kept current by create_draft / add_* and used for discovery
+"""
+
+import os
+import sys
+import json
+import uuid
+import shutil
+import types
+import threading
+import importlib.util
+from typing import Generic, TypeVar
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+DRAFTS_DIR = os.path.join("/tmp", "jianying_assistant", "drafts")
+
+
+def load_module(name, relative_path):
+    """Load a tool handler with a mocked runtime module"""
+    T = TypeVar('T')
+
+    class MockArgsType(Generic[T]):
+        pass
+
+    runtime_mock = types.ModuleType('runtime')
+    runtime_mock.Args = MockArgsType
+    sys.modules['runtime'] = runtime_mock
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MockArgs:
+    def __init__(self, input_data):
+        self.input = input_data
+        self.logger = None
+
+
+def create_test_drafts(count, base_timestamp=1700000000.0):
+    """Create draft configs directly in the /tmp store"""
+    draft_ids = []
+    for i in range(count):
+        draft_id = str(uuid.uuid4())
+        draft_folder = os.path.join(DRAFTS_DIR, draft_id)
+        os.makedirs(draft_folder, exist_ok=True)
+        config = {
+            "draft_id": draft_id,
+            "project": {"name": f"导出测试 {i}", "width": 1920, "height": 1080, "fps": 30},
+            "media_resources": [],
+            "tracks": [],
+            "created_timestamp": base_timestamp + i,
+            "last_modified": base_timestamp + i,
+            "status": "created"
+        }
+        config_file = os.path.join(draft_folder, "draft_config.json")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+        os.utime(config_file, (base_timestamp + i, base_timestamp + i))
+        draft_ids.append(draft_id)
+    return draft_ids
+
+
+def cleanup_test_drafts(draft_ids):
+    for draft_id in draft_ids:
+        draft_folder = os.path.join(DRAFTS_DIR, draft_id)
+        if os.path.exists(draft_folder):
+            shutil.rmtree(draft_folder)
+
+
+def test_parallel_load_keeps_order():
+    """load_draft_configs returns results in input order, including failures"""
+    print("=== Testing parallel draft loading ===")
+
+    module = load_module("export_drafts_handler", "coze_plugin/tools/export_drafts/handler.py")
+    draft_ids = create_test_drafts(12)
+    missing_id = str(uuid.uuid4())
+
+    try:
+        requested = draft_ids[:6] + [missing_id] + draft_ids[6:]
+        results = module.load_draft_configs(requested, max_workers=4)
+
+        assert [r[0] for r in results] == requested
+        assert all(r[1] for r in results if r[0] != missing_id)
+        assert not results[6][1]
+        assert "草稿文件夹不存在" in results[6][3]
+        assert results[0][2]["draft_id"] == draft_ids[0]
+        print("✅ Results kept in input order")
+    finally:
+        cleanup_test_drafts(draft_ids)
+
+
+def test_streamed_and_compact_output():
+    """Indented output is unchanged, compact and file output work"""
+    print("=== Testing compact and streamed export output ===")
+
+    module = load_module("export_drafts_handler", "coze_plugin/tools/export_drafts/handler.py")
+    draft_ids = create_test_drafts(3)
+    output_name = f"{uuid.uuid4()}.json"
+    output_file = os.path.join(module.EXPORTS_DIR, output_name)
+
+    try:
+        result = module.handler(MockArgs(module.Input(draft_ids=draft_ids)))
+        assert result["success"], result["message"]
+        expected = module.create_draft_generator_data(
+            [module.load_draft_config(draft_id)[1] for draft_id in draft_ids]
+        )
+        assert result["draft_data"] == json.dumps(expected, ensure_ascii=False, indent=2)
+
+        compact = module.handler(MockArgs(module.Input(draft_ids=draft_ids, compact_output=True)))
+        assert compact["success"]
+        assert "\n" not in compact["draft_data"]
+        assert json.loads(compact["draft_data"]) == expected
+        assert len(compact["draft_data"]) < len(result["draft_data"])
+
+        streamed = module.handler(MockArgs(module.Input(
+            draft_ids=draft_ids, compact_output=True, output_file=output_name
+        )))
+        assert streamed["success"], streamed["message"]
+        assert streamed["draft_data"] == ""
+        assert streamed["output_file"] == output_file
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert f.read() == compact["draft_data"]
+        export_dir = os.path.dirname(output_file)
+        name = os.path.basename(output_file)
+
+        def leftovers():
+            return [f for f in os.listdir(export_dir) if f.startswith(name + ".")]
+
+        assert leftovers() == []
+
+        # Concurrent exports to the same file each use their own temp file
+        errors = []
+
+        def export():
+            try:
+                for _ in range(20):
+                    module.write_draft_data_file(
+                        output_file, module.iter_draft_generator_json(expected, compact=True))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=export) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == [], errors
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert json.load(f) == expected
+
+        # A failed write keeps the previous file and removes its temp file
+        def failing_chunks():
+            yield '{"partial":'
+            raise RuntimeError("encoder failed")
+
+        try:
+            module.write_draft_data_file(output_file, failing_chunks())
+            assert False, "should have raised"
+        except RuntimeError:
+            pass
+        with open(output_file, 'r', encoding='utf-8') as f:
+            assert json.load(f) == expected
+        assert leftovers() == []
+
+        # output_file must be a bare file name inside the exports directory
+        index_file = module.DRAFT_INDEX_FILE
+        for bad_name in [index_file, "../drafts_index.json", "..", "sub/batch.json", "sub\\batch.json"]:
+            rejected = module.handler(MockArgs(module.Input(draft_ids=draft_ids, output_file=bad_name)))
+            assert not rejected["success"], bad_name
+        try:
+            module.write_draft_data_file(index_file, module.iter_draft_generator_json(expected))
+            assert False, "should have raised"
+        except ValueError:
+            pass
+        print("✅ Compact and streamed output match")
+    finally:
+        cleanup_test_drafts(draft_ids)
+        if os.path.exists(output_file):
+            os.unlink(output_file)
+
+
+def test_cursor_pagination():
+    """Pages follow last_modified order and the cursor resumes after the last item"""
+    print("=== Testing cursor-based pagination ===")
+
+    module = load_module("export_drafts_handler", "coze_plugin/tools/export_drafts/handler.py")
+    draft_ids = create_test_drafts(5)
+    shuffled = [draft_ids[i] for i in (3, 0, 4, 1, 2)]
+
+    try:
+        exported = []
+        cursor = None
+        pages = 0
+        while True:
+            result = module.handler(MockArgs(module.Input(
+                draft_ids=shuffled, page_size=2, cursor=cursor, compact_output=True
+            )))
+            assert result["success"], result["message"]
+            pages += 1
+            exported.extend(d["draft_id"] for d in json.loads(result["draft_data"])["drafts"])
+            cursor = result["next_cursor"]
+            if not result["has_more"]:
+                break
+        assert pages == 3
+        assert exported == draft_ids, "Pages must be ordered by last_modified"
+
+        # A client polling with the final cursor sees nothing new
+        result = module.handler(MockArgs(module.Input(draft_ids=shuffled, page_size=2, cursor=cursor)))
+        assert result["success"] and result["exported_count"] == 0
+        assert result["next_cursor"] == cursor
+
+        # modified_since keeps only newer drafts
+        result = module.handler(MockArgs(module.Input(
+            draft_ids=shuffled, modified_since=1700000000.0 + 3
+        )))
+        assert result["exported_count"] == 2
+        assert [d["draft_id"] for d in json.loads(result["draft_data"])["drafts"]] == draft_ids[3:]
+
+        result = module.handler(MockArgs(module.Input(draft_ids=shuffled, cursor="not-a-cursor")))
+        assert not result["success"]
+        assert "无效的分页游标" in result["message"]
+        print("✅ Pagination walks all drafts exactly once")
+    finally:
+        cleanup_test_drafts(draft_ids)
+
+
+def test_draft_index_discovery():
+    """Tool writes keep the index current so export_all does not rescan the store"""
+    print("=== Testing draft index discovery ===")
+
+    module = load_module("export_drafts_handler", "coze_plugin/tools/export_drafts/handler.py")
+    create_draft = load_module("create_draft_handler", "coze_plugin/tools/create_draft/handler.py")
+    add_audios = load_module("add_audios_handler", "coze_plugin/tools/add_audios/handler.py")
+    draft_ids = []
+
+    try:
+        # First discovery builds the index
+        initial = set(module.discover_all_drafts())
+        index = module.read_draft_index()
+        assert index is not None and set(index["drafts"]) == initial
+
+        created = create_draft.handler(MockArgs(create_draft.Input(draft_name="索引测试")))
+        assert created["success"], created["message"]
+        draft_id = created["draft_id"]
+        draft_ids.append(draft_id)
+
+        entry = module.read_draft_index()["drafts"][draft_id]
+        assert entry["status"] == "created"
+        assert entry["size"] > 0
+
+        result = add_audios.handler(MockArgs(add_audios.Input(
+            draft_id=draft_id,
+            audio_infos=['{"audio_url":"https://example.com/a.mp3","start":0,"end":1000}']
+        )))
+        assert result.success, result.message
+        config_file = os.path.join(DRAFTS_DIR, draft_id, "draft_config.json")
+        updated = module.read_draft_index()["drafts"][draft_id]
+        assert updated["size"] == os.path.getsize(config_file)
+        assert updated["modified"] == os.stat(config_file).st_mtime
+
+        # Discovery is served from the index without rescanning
+        original_rebuild = module.rebuild_draft_index
+
+        def fail_rebuild(previous=None):
+            raise AssertionError("index should not be rebuilt")
+
+        module.rebuild_draft_index = fail_rebuild
+        try:
+            assert draft_id in module.discover_all_drafts()
+        finally:
+            module.rebuild_draft_index = original_rebuild
+
+        # Drafts written outside the tools are picked up by a rebuild
+        external = create_test_drafts(1)
+        draft_ids.extend(external)
+        assert external[0] in module.discover_all_drafts()
+
+        # Cleanup removes entries without invalidating the index
+        result = module.handler(MockArgs(module.Input(draft_ids=draft_ids, remove_temp_files=True)))
+        assert result["success"], result["message"]
+        index = module.read_draft_index()
+        assert not set(draft_ids) & set(index["drafts"])
+        assert index["dir_mtime_ns"] == module.get_drafts_dir_mtime_ns()
+        print("✅ Draft index kept current by tool writes")
+    finally:
+        cleanup_test_drafts(draft_ids)
+
+
+if __name__ == "__main__":
+    test_parallel_load_keeps_order()
+    test_streamed_and_compact_output()
+    test_cursor_pagination()
+    test_draft_index_discovery()
+    print("\n✅ All export_drafts tests passed!")
@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+Test for get_media_duration tool
+
+Network access is replaced by patched module functions so the tests run offline:
+1. Links are probed concurrently and timelines keep input order
+2. Failed links are skipped without breaking the cumulative timelines
+3. Range probing reads MP4/WAV durations from a few kilobytes
+4. One streaming GET per link; 403 retries header strategies, 404 fails fast
+5. Built-in container parsers (MP3/FLAC/OGG/WAV/MP4) with pymediainfo as fallback
+6. Persistent duration cache with signed-URL normalization and revalidation,
+   a configurable cache key rule and merged concurrent saves
+7. Small downloads are parsed from memory instead of temporary files
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import types
+import tempfile
+import threading
+import importlib.util
+import requests
+from typing import Generic, TypeVar
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def load_module(name, relative_path):
+    """Load a tool handler with a mocked runtime module"""
+    T = TypeVar('T')
+
+    class MockArgsType(Generic[T]):
+        pass
+
+    runtime_mock = types.ModuleType('runtime')
+    runtime_mock.Args = MockArgsType
+    sys.modules['runtime'] = runtime_mock
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MockArgs:
+    def __init__(self, input_data):
+        self.input = input_data
+        self.logger = None
+
+
+def load_duration_module():
+    module = load_module("get_media_duration_handler", "coze_plugin/tools/get_media_duration/handler.py")
+    # Keep each test's cache away from the shared /tmp cache file
+    module.DURATION_CACHE_FILE = os.path.join(tempfile.mkdtemp(), "media_duration_cache.json")
+    return module
+
+
+def patch_probe_steps(module, durations, delays, failing=()):
+    """
+    Replace the network steps with fakes
+
+    durations/delays map URL -> duration in ms / seconds spent "downloading".
+    URLs in failing raise from the initial request.
+    """
+    active = {"current": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_open(url, timeout=30, range_bytes=None):
+        if url in failing:
+            raise Exception(f"Media file not found at {url}")
+        return FakeResponse(200, b'', {'content-type': 'audio/mpeg'})
+
+    def fake_download(url, timeout=30, response=None):
+        with lock:
+            active["current"] += 1
+            active["peak"] = max(active["peak"], active["current"])
+        try:
+            time.sleep(delays.get(url, 0))
+            return url
+        finally:
+            with lock:
+                active["current"] -= 1
+
+    module.open_media_stream = fake_open
+    module.download_media_file = fake_download
+    module.get_media_duration_ms = lambda path: durations[path]
+    module.cleanup_temp_file = lambda path: None
+    return active
+
+
+def test_concurrent_probe_keeps_order():
+    """Slow early links do not reorder the timelines"""
+    print("=== Testing concurrent probing order ===")
+
+    module = load_duration_module()
+    links = [f"https://example.com/clip{i}.mp3" for i in range(6)]
+    durations = {url: (i + 1) * 1000 for i, url in enumerate(links)}
+    # Earlier links finish last
+    delays = {url: 0.05 * (len(links) - i) for i, url in enumerate(links)}
+    active = patch_probe_steps(module, durations, delays)
+
+    started = time.time()
+    result = module.handler(MockArgs(module.Input(links=links)))
+    elapsed = time.time() - started
+
+    assert [t["end"] - t["start"] for t in result.timelines] == [durations[url] for url in links]
+    assert result.timelines[0] == {"start": 0, "end": 1000}
+    assert result.timelines[-1]["end"] == sum(durations.values())
+    assert result.all_timelines == [{"start": 0, "end": sum(durations.values())}]
+    assert active["peak"] > 1, "Links should be probed concurrently"
+    assert elapsed < sum(delays.values()), f"Concurrent probing took {elapsed:.2f}s"
+    print(f"✅ {len(links)} links probed in {elapsed:.2f}s with order preserved")
+
+
+def test_failed_links_are_skipped():
+    """Failures are dropped and the remaining timelines stay contiguous"""
+    print("=== Testing failed link handling ===")
+
+    module = load_duration_module()
+    links = [f"https://example.com/clip{i}.mp3" for i in range(4)]
+    durations = {url: 2000 for url in links}
+    patch_probe_steps(module, durations, {}, failing={links[1]})
+
+    result = module.handler(MockArgs(module.Input(links=links)))
+    assert result.timelines == [
+        {"start": 0, "end": 2000},
+        {"start": 2000, "end": 4000},
+        {"start": 4000, "end": 6000}
+    ]
+
+    # Limit of one worker behaves like the old sequential loop
+    assert module.probe_media_durations(links, max_workers=1) == [2000, None, 2000, 2000]
+
+    empty = module.handler(MockArgs(module.Input(links=[])))
+    assert empty.timelines == [] and empty.all_timelines == []
+    print("✅ Failed links skipped")
+
+
+def mp4_box(box_type, payload):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def build_mp4(duration_ms, mdat_size, moov_at_end=True):
+    """Minimal MP4 with an mvhd at a 1000 Hz timescale"""
+    mvhd = mp4_box(b'mvhd', b'\x00\x00\x00\x00' + struct.pack('>IIII', 0, 0, 1000, duration_ms) + bytes(80))
+    moov = mp4_box(b'moov', mvhd + mp4_box(b'trak', bytes(64)))
+    ftyp = mp4_box(b'ftyp', b'isom\x00\x00\x02\x00isomiso2mp41')
+    mdat = mp4_box(b'mdat', bytes(mdat_size))
+    return ftyp + mdat + moov if moov_at_end else ftyp + moov + mdat
+
+
+def build_wav(duration_ms, sample_rate=16000):
+    byte_rate = sample_rate * 2
+    data_size = byte_rate * duration_ms // 1000
+    fmt = struct.pack('<HHIIHH', 1, 1, sample_rate, byte_rate, 2, 16)
+    return (b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE'
+            + b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+            + b'data' + struct.pack('<I', data_size) + bytes(data_size))
+
+
+class FakeResponse:
+    def __init__(self, status_code, body, headers):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+
+    def iter_content(self, chunk_size=8192):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Client Error for url")
+
+    def close(self):
+        pass
+
+
+class FakeRangeServer:
+    """Serves files from memory and counts the bytes sent"""
+
+    def __init__(self, files, support_range=True, etags=None, statuses=None):
+        self.files = files
+        self.support_range = support_range
+        self.etags = etags or {}
+        # URL -> error statuses returned to the first requests, in order
+        self.statuses = statuses or {}
+        self.bytes_sent = 0
+        self.requests = 0
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.requests += 1
+        if self.statuses.get(url):
+            return FakeResponse(self.statuses[url].pop(0), b'', {})
+        body = self.files[url.split('?')[0]]
+        range_header = (headers or {}).get('Range')
+        if self.support_range and range_header:
+            start, end = (int(v) for v in range_header.split('=')[1].split('-'))
+            part = body[start:end + 1]
+            self.bytes_sent += len(part)
+            return FakeResponse(206, part, {
+                'content-range': f'bytes {start}-{start + len(part) - 1}/{len(body)}',
+                'etag': self.etags.get(url.split('?')[0])
+            })
+        self.bytes_sent += len(body)
+        return FakeResponse(200, body, {'content-length': str(len(body))})
+
+
+def test_range_probe_reads_only_headers():
+    """MP4 with moov at either end and WAV are probed without a full download"""
+    print("=== Testing range-based probing ===")
+
+    module = load_duration_module()
+    mdat_size = 8 * 1024 * 1024
+    server = FakeRangeServer({
+        "https://example.com/tail.mp4": build_mp4(215000, mdat_size, moov_at_end=True),
+        "https://example.com/head.mp4": build_mp4(30500, mdat_size, moov_at_end=False),
+        "https://example.com/voice.wav": build_wav(2500),
+    })
+    module.requests = types.SimpleNamespace(get=server.get, exceptions=module.requests.exceptions)
+
+    assert module.probe_duration_by_range("https://example.com/tail.mp4") == 215000
+    assert server.bytes_sent <= 3 * module.PROBE_RANGE_BYTES, f"Read {server.bytes_sent} bytes"
+
+    server.bytes_sent = 0
+    assert module.probe_duration_by_range("https://example.com/head.mp4") == 30500
+    assert server.bytes_sent <= module.PROBE_RANGE_BYTES
+
+    assert module.probe_duration_by_range("https://example.com/voice.wav") == 2500
+    print("✅ Durations read from partial fetches")
+
+
+def test_range_probe_falls_back_to_download():
+    """Servers without Range support use the full download path"""
+    print("=== Testing range probe fallback ===")
+
+    module = load_duration_module()
+    server = FakeRangeServer({"https://example.com/tail.mp4": build_mp4(1000, 1024)}, support_range=False)
+    module.requests = types.SimpleNamespace(get=server.get, exceptions=module.requests.exceptions)
+    assert module.probe_duration_by_range("https://example.com/tail.mp4") is None
+
+    # The 200 response to the initial request is downloaded without a second request
+    server.requests = 0
+    assert module.probe_media_duration("https://example.com/tail.mp4") == 1000
+    assert server.requests == 1
+    print("✅ Full download used when Range is unsupported")
+
+
+def test_single_request_with_status_driven_fallback():
+    """One GET per healthy link; header strategies only retried on 403; 404 fails fast"""
+    print("=== Testing single request probing ===")
+
+    module = load_duration_module()
+    ok, forbidden, missing = (f"https://example.com/{name}.wav" for name in ("ok", "forbidden", "missing"))
+    server = FakeRangeServer(
+        {ok: build_wav(1500), forbidden: build_wav(500), missing: b''},
+        statuses={forbidden: [403, 403], missing: [404, 404, 404]}
+    )
+    module.requests = types.SimpleNamespace(get=server.get, exceptions=module.requests.exceptions)
+
+    assert module.probe_media_duration(ok, use_cache=False) == 1500
+    assert server.requests == 1
+
+    server.requests = 0
+    assert module.probe_media_duration(forbidden, use_cache=False) == 500
+    assert server.requests == len(module.DOWNLOAD_HEADER_STRATEGIES)
+
+    server.requests = 0
+    assert module.probe_media_duration(missing, use_cache=False) is None
+    assert server.requests == 1
+    try:
+        module.open_media_stream(missing)
+        assert False, "404 should raise"
+    except Exception as e:
+        assert "Media file not found" in str(e)
+    print("✅ Status codes drive skip and retry decisions")
+
+
+def test_signed_urls_scheduled_by_expiry():
+    """Earliest-expiring links are probed first; expired links never hit the network"""
+    print("=== Testing expiry-aware scheduling ===")
+
+    module = load_duration_module()
+    now = int(time.time())
+    links = [
+        "https://example.com/plain.mp4",
+        f"https://example.com/late.mp3?x-expires={now + 7200}",
+        f"https://example.com/expired.mp3?x-expires={now - 60}",
+        f"https://example.com/soon.mp3?X-Amz-Date={time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(now))}&X-Amz-Expires=600",
+    ]
+    durations = {url: 1000 for url in links}
+    patch_probe_steps(module, durations, {})
+    requested = []
+    fake_open = module.open_media_stream
+    module.open_media_stream = lambda url, **kwargs: requested.append(url) or fake_open(url, **kwargs)
+
+    assert module.get_signed_url_expiry(links[0]) is None
+    assert module.get_signed_url_expiry(links[3]) == now + 600
+
+    result = module.probe_media_durations(links, max_workers=1, use_cache=False)
+    assert result == [1000, 1000, None, 1000]
+    assert requested == [links[3], links[1], links[0]]
+    print("✅ Signed URLs probed earliest-expiry first")
+
+
+def test_duration_cache_hits_and_revalidation():
+    """Re-signed URLs hit the cache; stale entries are revalidated by ETag"""
+    print("=== Testing duration cache ===")
+
+    module = load_duration_module()
+    base = "https://example.com/voice.wav"
+    server = FakeRangeServer({base: build_wav(2500)}, etags={base: '"v1"'})
+    module.requests = types.SimpleNamespace(get=server.get, exceptions=module.requests.exceptions)
+
+    assert (module.normalize_media_url("https://EXAMPLE.com/a.mp3?x-expires=1&b=2&a=1&X-Amz-Signature=s#t")
+            == "https://example.com/a.mp3?a=1&b=2")
+
+    result = module.handler(MockArgs(module.Input(links=[base + "?x-expires=4102444800&x-signature=a"])))
+    assert result.all_timelines == [{"start": 0, "end": 2500}]
+    cache_file = module.DURATION_CACHE_FILE
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        entry = json.load(f)[base]
+    assert entry["format"] == "wav" and entry["etag"] == '"v1"'
+    assert entry["content_length"] == len(server.files[base])
+
+    # A fresh module instance reads the persisted cache without any request
+    module = load_module("get_media_duration_handler", "coze_plugin/tools/get_media_duration/handler.py")
+    module.DURATION_CACHE_FILE = cache_file
+    module.requests = types.SimpleNamespace(get=server.get, exceptions=module.requests.exceptions)
+    server.requests = 0
+    started = time.perf_counter()
+    assert module.probe_media_durations([base + "?x-expires=4102444801&x-signature=b"]) == [2500]
+    assert server.requests == 0
+    assert (time.perf_counter() - started) < 0.1
+
+    # Stale entries need one 1-byte request while the ETag still matches
+    module.DURATION_CACHE_TTL_SECONDS = 0
+    time.sleep(0.01)
+    assert module.get_cached_duration(base) == 2500
+    assert server.requests == 1 and server.bytes_sent > 0
+    server.etags[base] = '"v2"'
+    time.sleep(0.01)
+    assert module.get_cached_duration(base) is None
+
+    # use_cache=False bypasses the cache entirely
+    module.DURATION_CACHE_TTL_SECONDS = 3600
+    server.requests = 0
+    assert module.probe_media_durations([base], use_cache=False) == [2500]
+    assert server.requests > 0
+    print("✅ Cached durations reused across signed URLs")
+
+
+def test_signed_cache_entries_revalidate():
+    """Signed-URL entries are re-checked quickly so re-uploads are not served stale"""
+    print("=== Testing signed cache entry revalidation ===")
+
+    module = load_duration_module()
+    base = "https://example.com/voice.wav"
+    server = FakeRangeServer({base: build_wav(2500)}, etags={base: '"v1"'})
+    module.requests = types.SimpleNamespace(get=server.get, exceptions=module.requests.exceptions)
+
+    assert module.probe_media_durations([base + "?x-expires=4102444800&x-signature=a"]) == [2500]
+
+    # Within SIGNED_URL_CACHE_TTL_SECONDS the entry is used directly
+    server.requests = 0
+    assert module.get_cached_duration(base + "?x-expires=4102444801&x-signature=b") == 2500
+    assert server.requests == 0
+
+    # Afterwards a 1-byte request compares the ETag; a re-upload under a new signature misses
+    module.SIGNED_URL_CACHE_TTL_SECONDS = 0
+    time.sleep(0.01)
+    assert module.get_cached_duration(base + "?x-expires=4102444802&x-signature=c") == 2500
+    assert server.requests == 1
+    server.files[base] = build_wav(4000)
+    server.etags[base] = '"v2"'
+    time.sleep(0.01)
+    assert module.get_cached_duration(base + "?x-expires=4102444803&x-signature=d") is None
+    assert module.probe_media_durations([base + "?x-expires=4102444803&x-signature=d"]) == [4000]
+
+    # URLs without stripped parameters keep the long TTL
+    module.put_cached_duration("https://example.com/plain.wav?v=1", 1000)
+    requests_before = server.requests
+    assert module.get_cached_duration("https://example.com/plain.wav?v=1") == 1000
+    assert server.requests == requests_before
+    print("✅ Signed cache entries revalidated")
+
+
+def test_cache_key_rule_is_configurable():
+    """cache_ignore_params replaces the built-in signed-parameter rule"""
+    print("=== Testing configurable cache key rule ===")
+
+    module = load_duration_module()
+    url = "https://cdn.example.com/a.mp3?Token=1&v=2&X-Amz-Date=3&sig=4"
+    assert module.normalize_media_url(url) == "https://cdn.example.com/a.mp3?sig=4&v=2"
+
+    rule = module.build_cache_key_rule(["SIG", "x-amz-*", " "])
+    assert module.split_cache_key(url, rule) == ("https://cdn.example.com/a.mp3?Token=1&v=2", True)
+    assert module.split_cache_key(url, module.build_cache_key_rule([])) == (
+        "https://cdn.example.com/a.mp3?Token=1&X-Amz-Date=3&sig=4&v=2", False)
+    assert module.build_cache_key_rule(None) is module.DEFAULT_CACHE_KEY_RULE
+
+    durations = {}
+    seen_rules = []
+
+    def fake_probe(link, logger=None, use_cache=True, cache_rule=None):
+        seen_rules.append(cache_rule)
+        return durations.setdefault(link, 1000)
+
+    module.probe_media_duration = fake_probe
+    result = module.handler(MockArgs(module.Input(links=[url], cache_ignore_params=["sig"])))
+    assert result.all_timelines == [{"start": 0, "end": 1000}]
+    assert seen_rules == [(frozenset({"sig"}), ())]
+    print("✅ Cache key rule configurable")
+
+
+def test_concurrent_cache_saves_merge():
+    """Two module instances saving the same cache file keep each other's entries"""
+    print("=== Testing concurrent cache saves ===")
+
+    first = load_duration_module()
+    second = load_module("get_media_duration_handler_2", "coze_plugin/tools/get_media_duration/handler.py")
+    second.DURATION_CACHE_FILE = first.DURATION_CACHE_FILE
+
+    first.put_cached_duration("https://example.com/shared.mp3", 100)
+    first.put_cached_duration("https://example.com/a.mp3", 1000)
+    second.put_cached_duration("https://example.com/b.mp3", 2000)
+    time.sleep(0.01)
+    second.put_cached_duration("https://example.com/shared.mp3", 200)
+
+    threads = [threading.Thread(target=module.save_duration_cache) for module in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(first.DURATION_CACHE_FILE, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    assert entries["https://example.com/a.mp3"]["duration_ms"] == 1000
+    assert entries["https://example.com/b.mp3"]["duration_ms"] == 2000
+    # The newer entry wins for the same key
+    assert entries["https://example.com/shared.mp3"]["duration_ms"] == 200
+    assert sorted(os.listdir(os.path.dirname(first.DURATION_CACHE_FILE))) == [
+        "media_duration_cache.json", "media_duration_cache.json.lock"]
+    print("✅ Concurrent cache saves merged")
+
+
+def build_mp3(frame_count, xing=False, id3=False):
+    """MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo frames of 417 bytes"""
+    header = b'\xff\xfb\x90\x00'
+    frame = header + bytes(417 - 4)
+    data = b''
+    if id3:
+        data += b'ID3\x04\x00\x00' + bytes([0, 0, 1, 0]) + bytes(128)
+    if xing:
+        # Xing header sits after 32 bytes of side information
+        info = b'Xing' + struct.pack('>II', 1, frame_count)
+        data += header + bytes(32) + info + bytes(417 - 4 - 32 - len(info))
+    return data + frame * frame_count
+
+
+def build_flac(total_samples, sample_rate=44100):
+    packed = (sample_rate << 44) | (1 << 41) | (15 << 36) | total_samples
+    streaminfo = struct.pack('>HH', 4096, 4096) + bytes(6) + packed.to_bytes(8, 'big') + bytes(16)
+    return b'fLaC' + bytes([0x80]) + len(streaminfo).to_bytes(3, 'big') + streaminfo + bytes(256)
+
+
+def ogg_page(packet, granule, sequence):
+    return (b'OggS' + bytes([0, 0]) + struct.pack('<qII', granule, 1, sequence) + bytes(4)
+            + bytes([1, len(packet)]) + packet)
+
+
+def build_ogg(codec, granule):
+    if codec == 'vorbis':
+        ident = b'\x01vorbis' + struct.pack('<IBI', 0, 1, 22050) + bytes(13)
+    else:
+        ident = b'OpusHead' + bytes([1, 1]) + struct.pack('<HI', 312, 48000) + bytes(3)
+    return ogg_page(ident, 0, 0) + ogg_page(bytes(200), granule // 2, 1) + ogg_page(bytes(200), granule, 2)
+
+
+def parse_bytes(module, data, allow_scan=True):
+    return module.parse_media_duration(lambda offset, length: data[offset:offset + length], len(data), allow_scan)
+
+
+def test_builtin_container_parsers():
+    """Durations come from container headers without pymediainfo"""
+    print("=== Testing built-in container parsers ===")
+
+    module = load_duration_module()
+    module.MediaInfo = None
+
+    # 100 frames * 1152 samples / 44100 Hz
+    assert parse_bytes(module, build_mp3(100)) == 2612
+    assert parse_bytes(module, build_mp3(100), allow_scan=False) == 2606  # CBR estimate from size
+    assert parse_bytes(module, build_mp3(100, xing=True, id3=True), allow_scan=False) == 2612
+    assert parse_bytes(module, build_flac(441000)) == 10000
+    assert parse_bytes(module, build_ogg('vorbis', 22050 * 3)) == 3000
+    assert parse_bytes(module, build_ogg('opus', 48000 * 2 + 312)) == 2000
+    assert parse_bytes(module, build_wav(1500)) == 1500
+    assert parse_bytes(module, build_mp4(4321, 1024)) == 4321
+    assert parse_bytes(module, b'not a media file at all') is None
+
+    with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as f:
+        f.write(build_mp3(50, id3=True))
+    try:
+        assert module.get_media_duration_ms(f.name) == 1306
+    finally:
+        os.unlink(f.name)
+    print("✅ Built-in parsers read MP3/FLAC/OGG/WAV/MP4 durations")
+
+
+def test_mediainfo_fallback_accepts_audio_tracks():
+    """Unknown formats fall back to pymediainfo, which now matches Audio tracks"""
+    print("=== Testing pymediainfo fallback ===")
+
+    module = load_duration_module()
+
+    class FakeTrack:
+        def __init__(self, track_type, duration):
+            self.track_type = track_type
+            self.duration = duration
+
+    class FakeMediaInfo:
+        @staticmethod
+        def parse(path):
+            return types.SimpleNamespace(tracks=[FakeTrack('Audio', 1234.5)])
+
+    module.MediaInfo = FakeMediaInfo
+    with tempfile.NamedTemporaryFile(suffix='.aac', delete=False) as f:
+        f.write(b'\x00' * 64)
+    try:
+        assert module.get_media_duration_ms(f.name) == 1234
+        module.MediaInfo = None
+        try:
+            module.get_media_duration_ms(f.name)
+            assert False, "Unsupported format without pymediainfo should raise"
+        except Exception as e:
+            assert "pymediainfo" in str(e)
+    finally:
+        os.unlink(f.name)
+    print("✅ pymediainfo used only as fallback")
+
+
+def test_small_downloads_stay_in_memory():
+    """Downloads under SPOOL_MAX_BYTES are parsed from memory; larger ones spill to disk"""
+    print("=== Testing spooled downloads ===")
+
+    module = load_duration_module()
+    wav = build_wav(1200)
+
+    media = module.download_media_file("https://example.com/a.wav", response=FakeResponse(200, wav, {}))
+    assert media == wav
+    assert module.get_media_duration_ms(media) == 1200
+
+    module.SPOOL_MAX_BYTES = 1024
+    for headers in ({}, {'content-length': str(len(wav))}):
+        media = module.download_media_file("https://example.com/a.wav", response=FakeResponse(200, wav, headers))
+        try:
+            assert isinstance(media, str) and os.path.getsize(media) == len(wav)
+            assert module.get_media_duration_ms(media) == 1200
+        finally:
+            module.cleanup_temp_file(media)
+    print("✅ Temporary files only for large downloads")
+
+
+if __name__ == "__main__":
+    test_concurrent_probe_keeps_order()
+    test_failed_links_are_skipped()
+    test_range_probe_reads_only_headers()
+    test_range_probe_falls_back_to_download()
+    test_single_request_with_status_driven_fallback()
+    test_signed_urls_scheduled_by_expiry()
+    test_duration_cache_hits_and_revalidation()
+    test_signed_cache_entries_revalidate()
+    test_cache_key_rule_is_configurable()
+    test_concurrent_cache_saves_merge()
+    test_builtin_container_parsers()
+    test_mediainfo_fallback_accepts_audio_tracks()
+    test_small_downloads_stay_in_memory()
+    print("\n✅ All get_media_duration tests passed!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test for the local Coze runtime stand-in and the benchmark harness
+
+1. Tools run through run_tool with inputs built from dicts or JSON
+2. Invalid inputs are rejected before the handler runs
+3. The benchmark drives a full workflow and reports latency and store I/O
+"""
+
+import os
+import sys
+import json
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from coze_plugin import local_runtime
+from coze_plugin.benchmark import IoCounter, percentile, run_benchmark
+
+
+def test_run_tool_workflow():
+    """create_draft → add_captions → export_drafts through the local runtime"""
+    print("=== Testing local runtime workflow ===")
+
+    created = local_runtime.run_tool("create_draft", '{"draft_name": "本地运行时测试"}')
+    assert created["success"], created
+    draft_id = created["draft_id"]
+
+    caption_infos = [json.dumps({"content": "你好", "start": 0, "end": 1000}, ensure_ascii=False)]
+    added = local_runtime.run_tool("add_captions", {"draft_id": draft_id, "caption_infos": caption_infos})
+    assert added.success, added.message
+    assert local_runtime.result_to_dict(added)["segment_ids"] == added.segment_ids
+
+    exported = local_runtime.run_tool("export_drafts", {"draft_ids": draft_id, "remove_temp_files": True})
+    assert exported["success"], exported
+    assert json.loads(exported["draft_data"])["drafts"][0]["draft_id"] == draft_id
+    print("✅ Workflow runs through the local runtime")
+
+
+def test_invalid_inputs_rejected():
+    """Unknown tools, unknown fields and invalid JSON raise ValueError"""
+    print("=== Testing input validation ===")
+
+    for tool, data, expected in [
+        ("no_such_tool", None, "未知工具"),
+        ("create_draft", {"draft_nam": "x"}, "不支持的参数: draft_nam"),
+        ("create_draft", "{bad", "不是有效的 JSON"),
+        ("create_draft", "[1]", "必须是 JSON 对象"),
+    ]:
+        try:
+            local_runtime.run_tool(tool, data)
+            assert False, f"{tool} {data!r} should have raised"
+        except ValueError as e:
+            assert expected in str(e), str(e)
+    assert "create_draft" in local_runtime.list_tools()
+    print("✅ Invalid inputs rejected")
+
+
+def test_benchmark_reports_latency_and_io():
+    """The benchmark reports every tool in workflow order with store I/O"""
+    print("=== Testing benchmark harness ===")
+
+    assert percentile([], 99) == 0.0
+    assert percentile([5.0, 1.0, 3.0, 2.0, 4.0], 50) == 3.0
+    assert percentile(list(range(1, 101)), 99) == 99
+
+    stats = run_benchmark(drafts=2, add_calls=2, segments=3, tools=("add_videos", "add_captions"))
+    assert [s.tool for s in stats] == ["create_draft", "add_videos", "add_captions", "export_drafts"]
+    by_tool = {s.tool: s for s in stats}
+    assert by_tool["create_draft"].calls == 2
+    assert by_tool["add_videos"].calls == 4
+    assert by_tool["add_videos"].avg_bytes_read > 0 and by_tool["add_videos"].avg_bytes_written > 0
+    assert all(0 < s.p50_ms <= s.p99_ms <= s.max_ms for s in stats)
+
+    # 存储目录之外的文件不计入
+    counter = IoCounter()
+    with counter.count():
+        with open(__file__, 'r', encoding='utf-8') as f:
+            f.read()
+    assert counter.bytes_read == 0 and counter.bytes_written == 0
+    print("✅ Benchmark reports latency and I/O")
+
+
+if __name__ == "__main__":
+    test_run_tool_workflow()
+    test_invalid_inputs_rejected()
+    test_benchmark_reports_latency_and_io()
+    print("\n✅ All local runtime tests passed!")
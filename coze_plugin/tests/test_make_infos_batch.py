@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test for the batch make_*_infos tools
+
+1. Every row produces exactly the string the single make_*_info tool returns
+2. Parallel arrays with get_media_duration timelines and shared defaults
+3. All rows are validated in one pass and every error is reported
+"""
+
+import os
+import sys
+import json
+import types
+import importlib.util
+from typing import Generic, TypeVar
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def load_module(name, relative_path):
+    """Load a tool handler with a mocked runtime module"""
+    T = TypeVar('T')
+
+    class MockArgsType(Generic[T]):
+        pass
+
+    runtime_mock = types.ModuleType('runtime')
+    runtime_mock.Args = MockArgsType
+    sys.modules['runtime'] = runtime_mock
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MockArgs:
+    def __init__(self, input_data):
+        self.input = input_data
+        self.logger = None
+
+
+def load_pair(kind):
+    single = load_module(f"make_{kind}_info_handler", f"coze_plugin/tools/make_{kind}_info/handler.py")
+    batch = load_module(f"make_{kind}_infos_handler", f"coze_plugin/tools/make_{kind}_infos/handler.py")
+    return single, batch
+
+
+# Rows exercising defaults, optional fields and the None values Coze sends for empty parameters
+SAMPLE_ROWS = {
+    "audio": [
+        {"audio_url": "https://example.com/a.mp3", "start": 0, "end": 5000},
+        {"audio_url": "https://example.com/b.mp3", "start": 5000, "end": 8000, "volume": 0.6,
+         "fade_in": 200, "effect_type": "混响", "effect_intensity": 0.5, "speed": 1.5,
+         "change_pitch": True, "material_start": 100, "material_end": 3100},
+        {"audio_url": "https://example.com/c.mp3", "start": 1, "end": 2, "volume": None, "speed": None},
+    ],
+    "caption": [
+        {"content": "第一句", "start": 0, "end": 1500},
+        {"content": "第二句", "start": 1500, "end": 3000, "position_y": -0.5, "font_size": 60,
+         "font_weight": "bold", "color": "#FFFF00", "stroke_enabled": True, "stroke_width": 4,
+         "shadow_enabled": True, "shadow_blur": 8, "background_enabled": True,
+         "background_opacity": 0.8, "alignment": "left", "intro_animation": "淡入"},
+        {"content": "第三句", "start": 3000, "end": 4000, "position_x": None, "font_family": None,
+         "stroke_enabled": None, "alignment": None},
+    ],
+    "image": [
+        {"image_url": "https://example.com/a.png", "start": 0, "end": 3000},
+        {"image_url": "https://example.com/b.png", "start": 3000, "end": 6000, "scale_x": 1.2,
+         "crop_enabled": True, "crop_left": 0.1, "filter_type": "暖冬", "filter_intensity": 0.7,
+         "transition_type": "叠化", "fit_mode": "fill", "in_animation": "轻微放大",
+         "in_animation_duration": 800, "background_color": "#000000"},
+    ],
+    "video": [
+        {"video_url": "https://example.com/a.mp4", "start": 0, "end": 4000},
+        {"video_url": "https://example.com/b.mp4", "start": 4000, "end": 9000, "material_start": 0,
+         "material_end": 5000, "rotation": 90.0, "flip_horizontal": True, "crop_enabled": True,
+         "speed": 0.5, "reverse": True, "volume": 0.0, "background_blur": True},
+    ],
+    "effect": [
+        {"effect_type": "模糊", "start": 0, "end": 1000},
+        {"effect_type": "马赛克", "start": 0, "end": 2000, "intensity": 0.4, "position_x": 0.2,
+         "scale": 2.0, "properties": "{\"size\": 3}"},
+    ],
+}
+
+OUTPUT_FIELDS = {
+    "audio": ("audio_info_string", "audio_infos"),
+    "caption": ("caption_info_string", "caption_infos"),
+    "image": ("image_info_string", "image_infos"),
+    "video": ("video_info_string", "video_infos"),
+    "effect": ("effect_info_string", "effect_infos"),
+}
+
+
+def test_batch_matches_single_tool():
+    """Each batch row equals the single-tool output for the same parameters"""
+    print("=== Testing batch/single parity ===")
+
+    for kind, rows in SAMPLE_ROWS.items():
+        single, batch = load_pair(kind)
+        single_field, batch_field = OUTPUT_FIELDS[kind]
+
+        expected = []
+        for row in rows:
+            result = single.handler(MockArgs(single.Input(**row)))
+            assert result.success, f"{kind}: {result.message}"
+            expected.append(getattr(result, single_field))
+
+        result = batch.handler(MockArgs(batch.Input(rows=rows)))
+        assert result.success, f"{kind}: {result.message}"
+        assert getattr(result, batch_field) == expected, kind
+        assert result.count == len(rows)
+
+        # Rows may also arrive as one JSON string or as JSON strings per row
+        result = batch.handler(MockArgs(batch.Input(rows=json.dumps(rows, ensure_ascii=False))))
+        assert getattr(result, batch_field) == expected, kind
+        result = batch.handler(MockArgs(batch.Input(rows=[json.dumps(row, ensure_ascii=False) for row in rows])))
+        assert getattr(result, batch_field) == expected, kind
+    print("✅ Batch output identical to make_*_info")
+
+
+def test_parallel_arrays_with_defaults():
+    """Parallel arrays take get_media_duration timelines; row fields override defaults"""
+    print("=== Testing parallel arrays ===")
+
+    _, batch = load_pair("caption")
+    timelines = [{"start": i * 1000, "end": (i + 1) * 1000} for i in range(300)]
+    contents = [f"字幕 {i}" for i in range(300)]
+
+    result = batch.handler(MockArgs(batch.Input(
+        contents=contents, timelines=timelines, defaults={"font_size": 36, "color": "#FFFF00"}
+    )))
+    assert result.success, result.message
+    assert result.count == 300
+    first = json.loads(result.caption_infos[0])
+    assert first == {"content": "字幕 0", "start": 0, "end": 1000, "font_size": 36, "color": "#FFFF00"}
+
+    result = batch.handler(MockArgs(batch.Input(
+        rows=[{"content": "a", "start": 0, "end": 10, "font_size": 20}], defaults={"font_size": 36}
+    )))
+    assert json.loads(result.caption_infos[0])["font_size"] == 20
+
+    result = batch.handler(MockArgs(batch.Input(contents=contents, timelines=timelines[:-1])))
+    assert not result.success and "长度不一致" in result.message
+    result = batch.handler(MockArgs(batch.Input(rows=[], contents=contents)))
+    assert not result.success and "不能同时提供" in result.message
+    result = batch.handler(MockArgs(batch.Input()))
+    assert not result.success
+    print("✅ Parallel arrays and shared defaults")
+
+
+def test_all_errors_reported_in_one_pass():
+    """Every invalid row is reported with the single-tool message and no infos are returned"""
+    print("=== Testing one-pass validation ===")
+
+    _, batch = load_pair("audio")
+    rows = [
+        {"audio_url": "https://example.com/a.mp3", "start": 0, "end": 1000},
+        {"audio_url": "https://example.com/b.mp3", "start": 1000},
+        {"audio_url": "https://example.com/c.mp3", "start": 5, "end": 1, "volume": 3.0},
+        {"audio_url": "https://example.com/d.mp3", "start": 0, "end": 1000, "loudness": 2},
+        "not an object",
+    ]
+    result = batch.handler(MockArgs(batch.Input(rows=rows)))
+    assert not result.success
+    assert result.audio_infos == [] and result.count == 0
+    assert result.message.startswith("4 行校验失败")
+    assert "第 2 行: 缺少必需的 end 参数" in result.message
+    assert "第 3 行: end 时间必须大于 start 时间" in result.message
+    assert "第 4 行: 未知字段 loudness" in result.message
+    assert "第 5 行" in result.message
+
+    _, batch = load_pair("effect")
+    result = batch.handler(MockArgs(batch.Input(rows=[
+        {"effect_type": "模糊", "start": 0, "end": 1000, "properties": "{bad"}
+    ])))
+    assert not result.success and "properties 参数必须是有效的 JSON 字符串" in result.message
+    print("✅ All row errors reported together")
+
+
+if __name__ == "__main__":
+    test_batch_matches_single_tool()
+    test_parallel_arrays_with_defaults()
+    test_all_errors_reported_in_one_pass()
+    print("\n✅ All make_*_infos tests passed!")
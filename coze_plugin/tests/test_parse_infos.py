@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test for the *_infos parsers in the add_* handlers
+
+1. String lists, single JSON array strings and object lists parse to the same result
+2. Missing fields, wrong types and invalid JSON keep their per-index error messages
+3. Objects split across elements are rejected instead of being stitched back together
+4. Large caption arrays are decoded quickly
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import importlib.util
+from typing import Generic, TypeVar
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def load_module(name, relative_path):
+    """Load a tool handler with a mocked runtime module"""
+    T = TypeVar('T')
+
+    class MockArgsType(Generic[T]):
+        pass
+
+    runtime_mock = types.ModuleType('runtime')
+    runtime_mock.Args = MockArgsType
+    sys.modules['runtime'] = runtime_mock
+
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# (tool, parser name, primary field, sample value, url field)
+PARSERS = [
+    ("add_videos", "parse_video_infos", "video_url", "https://example.com/a.mp4", True),
+    ("add_images", "parse_image_infos", "image_url", "https://example.com/a.png", True),
+    ("add_audios", "parse_audio_infos", "audio_url", "https://example.com/a.mp3", True),
+    ("add_captions", "parse_caption_infos", "content", "字幕", False),
+    ("add_effects", "parse_effect_infos", "effect_type", "模糊", False),
+]
+
+
+def load_parser(tool, parser_name):
+    module = load_module(f"{tool}_handler", f"coze_plugin/tools/{tool}/handler.py")
+    return getattr(module, parser_name)
+
+
+def test_input_forms_parse_identically():
+    """String lists, single JSON strings and object lists give the same result"""
+    print("=== Testing *_infos input forms ===")
+
+    for tool, parser_name, field, value, has_url in PARSERS:
+        parse = load_parser(tool, parser_name)
+        infos = [{field: value, "start": i * 1000, "end": (i + 1) * 1000, "extra": i} for i in range(3)]
+
+        from_strings = parse([json.dumps(info, ensure_ascii=False) for info in infos])
+        from_json = parse(json.dumps(infos, ensure_ascii=False))
+        from_objects = parse(infos)
+
+        assert from_strings == from_json == from_objects, tool
+        assert [info["extra"] for info in from_strings] == [0, 1, 2]
+        assert ("material_url" in from_strings[0]) == has_url, tool
+        assert "material_url" not in infos[0], "caller dicts must not be modified"
+        assert parse([]) == []
+    print("✅ All input forms parse identically")
+
+
+def test_error_messages():
+    """Per-index error messages are kept for every handler"""
+    print("=== Testing *_infos error messages ===")
+
+    for tool, parser_name, field, value, _ in PARSERS:
+        param = parser_name[len("parse_"):]
+        parse = load_parser(tool, parser_name)
+        valid = json.dumps({field: value, "start": 0, "end": 1000}, ensure_ascii=False)
+
+        checks = [
+            ([valid, json.dumps({field: value, "start": 0})], f"{param}[1] 中缺少必需字段 'end'"),
+            ([valid, "not a json string"], f"Invalid JSON in {param}[1]"),
+            ([valid, "1"], f"{param}[1] 无法转换为字典"),
+            ([json.dumps({field: value, "start": "0", "end": 1000}, ensure_ascii=False)],
+             f"{param}[0] 中字段 'start' 必须是数字"),
+            # 单个元素内含两个对象时，拼接解码的元素数量对不上，需逐项报错
+            ([valid + "," + valid], f"Invalid JSON in {param}[0]"),
+            ("[{bad", f"{param} 中的 JSON 格式无效"),
+            (42, f"{param} 必须是字符串列表"),
+        ]
+        for infos_input, expected in checks:
+            try:
+                parse(infos_input)
+                assert False, f"{tool}: should have raised for {infos_input!r}"
+            except ValueError as e:
+                assert expected in str(e), f"{tool}: {str(e)}"
+                assert f"解析 {param} 时出错" in str(e)
+    print("✅ Error messages preserved")
+
+
+def test_split_objects_rejected():
+    """Elements that only form valid JSON once joined must not be accepted"""
+    print("=== Testing split objects ===")
+
+    for tool in ("add_videos", "add_tracks"):
+        module = load_module(f"{tool}_handler", f"coze_plugin/tools/{tool}/handler.py")
+        for infos_input in (['{"a":1}, {"b":2', '"c":3}'], ['{"a":1,"b":"x', 'y"}']):
+            try:
+                module.decode_infos(infos_input, "video_infos")
+                assert False, f"{tool}: should have raised for {infos_input!r}"
+            except ValueError as e:
+                assert "Invalid JSON in video_infos[0]" in str(e), f"{tool}: {str(e)}"
+
+        # 元素首尾的空白仍然允许
+        assert module.decode_infos([' {"a":1}\n', '\t{"b":2} '], "video_infos") == [{"a": 1}, {"b": 2}]
+
+    for tool, parser_name, _, _, _ in PARSERS:
+        parse = load_parser(tool, parser_name)
+        try:
+            parse(['{"a":1}, {"b":2', '"c":3}'])
+            assert False, f"{tool}: should have raised"
+        except ValueError as e:
+            assert f"Invalid JSON in {parser_name[len('parse_'):]}[0]" in str(e), f"{tool}: {str(e)}"
+    print("✅ Split objects rejected")
+
+
+def test_large_caption_array():
+    """5,000 captions parse well within a second"""
+    print("=== Testing large caption arrays ===")
+
+    parse = load_parser("add_captions", "parse_caption_infos")
+    caption_infos = [
+        json.dumps({"content": f"第 {i} 句字幕", "start": i * 1000, "end": (i + 1) * 1000, "font_size": 48},
+                   ensure_ascii=False)
+        for i in range(5000)
+    ]
+
+    started = time.perf_counter()
+    result = parse(caption_infos)
+    elapsed = time.perf_counter() - started
+
+    assert len(result) == 5000
+    assert result[4999]["content"] == "第 4999 句字幕"
+    print(f"Parsed 5000 caption infos in {elapsed * 1000:.1f} ms")
+    # 宽松上限，避免在慢速 CI 机器上误报
+    assert elapsed < 0.5, f"parsing took {elapsed:.3f}s"
+    print("✅ Large caption array parsed quickly")
+
+
+if __name__ == "__main__":
+    test_input_forms_parse_identically()
+    test_error_messages()
+    test_split_objects_rejected()
+    test_large_caption_array()
+    print("\n✅ All *_infos parser tests passed!")
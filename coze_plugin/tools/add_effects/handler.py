@@ -9,9 +9,18 @@ import os
 import json
 import uuid
 import time
-from typing import NamedTuple, List, Dict, Any
+from typing import NamedTuple, List, Dict, Any, Optional, Tuple
 from runtime import Args
 
+try:
+    import fcntl
+except ImportError:  # Windows 等平台没有 fcntl，退化为无锁写入
+    fcntl = None
+
+
+# 草稿索引文件（由 export_drafts 维护，见 export_drafts/handler.py）
+DRAFT_INDEX_FILE = os.path.join("/tmp", "jianying_assistant", "drafts_index.json")
+
 
 # Input/Output 类型定义（每个 Coze 工具都需要）
 class Input(NamedTuple):
@@ -64,69 +73,122 @@ def validate_uuid_format(uuid_str: str) -> bool:
         return False
 
 
-def parse_effect_infos(effect_infos_input: List[str]) -> List[Dict[str, Any]]:
-    """从输入格式解析 effect_infos 并验证"""
+class InfoField(NamedTuple):
+    """*_infos 中单个字段的校验规则"""
+    name: str
+    types: tuple        # 允许的类型（isinstance 检查）
+    type_name: str      # 类型说明（用于错误信息）
+    required: bool
+
+
+class InfoSchema(NamedTuple):
+    """*_infos 参数的校验表，在模块加载时构建，解析时直接按表校验"""
+    info_param: str                  # 参数名（用于错误信息）
+    fields: Tuple[InfoField, ...]    # 需要校验的字段，按错误报告顺序排列
+    url_field: Optional[str]         # 需要映射为 material_url 的字段名（无素材时为 None）
+
+
+NUMBER_TYPES = (int, float)
+
+EFFECT_INFO_SCHEMA = InfoSchema(
+    info_param='effect_infos',
+    fields=(
+        InfoField('effect_type', (str,), '字符串', True),
+        InfoField('start', NUMBER_TYPES, '数字', True),
+        InfoField('end', NUMBER_TYPES, '数字', True),
+    ),
+    url_field=None,
+)
+
+
+# 逐项解码 *_infos 元素时共用的解码器，以及 JSON 允许的首尾空白字符
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = ' \t\n\r'
+
+
+def decode_infos(infos_input: Any, info_param: str) -> List[Any]:
+    """
+    将 *_infos 输入解码为列表（为 Coze 工具独立性在此重复定义）
+
+    整个数组作为单个 JSON 字符串时只调用一次 json.loads；字符串列表的每个元素
+    用共用的解码器单独解码，并要求解码结束位置正好是元素末尾，元素内多余的内容
+    （如逗号分隔的多个对象、被拆开的对象）都会带下标报错。
+    调用方传入的字典会被复制，返回的字典可以直接修改。
+
+    Raises:
+        ValueError: 格式无效
+    """
+    if isinstance(infos_input, str):
+        try:
+            infos = json.loads(infos_input)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{info_param} 中的 JSON 格式无效：{str(e)}")
+        if not isinstance(infos, list):
+            raise ValueError(f"{info_param} 必须解析为列表，得到 {type(infos)}")
+        return infos
+
+    if isinstance(infos_input, tuple):
+        infos_input = list(infos_input)
+
+    if not isinstance(infos_input, list):
+        raise ValueError(f"{info_param} 必须是字符串列表，得到 {type(infos_input)}")
+
+    infos = []
+    for i, info in enumerate(infos_input):
+        if isinstance(info, str):
+            text = info.strip(_JSON_WHITESPACE)
+            try:
+                info, end = _JSON_DECODER.raw_decode(text)
+                if end != len(text):
+                    raise json.JSONDecodeError("Extra data", text, end)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON in {info_param}[{i}]: {str(e)}")
+        elif isinstance(info, dict):
+            info = dict(info)  # 为安全起见制作副本
+        infos.append(info)
+    return infos
+
+
+def validate_infos(infos: List[Any], schema: InfoSchema) -> List[Dict[str, Any]]:
+    """
+    按校验表检查必需字段和字段类型（为 Coze 工具独立性在此重复定义）
+
+    Raises:
+        ValueError: 元素不是对象、缺少必需字段或字段类型错误
+    """
+    info_param = schema.info_param
+    fields = schema.fields
+    url_field = schema.url_field
+
+    for i, info in enumerate(infos):
+        if not isinstance(info, dict):
+            raise ValueError(f"{info_param}[{i}] 无法转换为字典（类型：{type(info)}）")
+
+        for field in fields:
+            if field.name in info:
+                value = info[field.name]
+                if not isinstance(value, field.types):
+                    raise ValueError(f"{info_param}[{i}] 中字段 '{field.name}' 必须是{field.type_name}，"
+                                     f"得到 {type(value).__name__}")
+            elif field.required:
+                raise ValueError(f"{info_param}[{i}] 中缺少必需字段 '{field.name}'")
+
+        if url_field:
+            # 将 *_url 映射到 material_url 以保持一致性
+            info['material_url'] = info[url_field]
+
+    return infos
+
+
+def parse_effect_infos(effect_infos_input: Any) -> List[Dict[str, Any]]:
+    """
+    从输入格式解析 effect_infos 并验证
+
+    支持字符串列表（每个元素是一个 JSON 对象字符串）、对象列表，
+    以及整个数组作为单个 JSON 字符串传入。
+    """
     try:
-        # 处理 JSON 字符串列表格式
-        if isinstance(effect_infos_input, list):
-            # 字符串数组 - 将每个字符串解析为 JSON
-            parsed_infos = []
-            for i, info_str in enumerate(effect_infos_input):
-                try:
-                    parsed_info = json.loads(info_str)
-                    parsed_infos.append(parsed_info)
-                except json.JSONDecodeError as e:
-                    raise ValueError(f"Invalid JSON in effect_infos[{i}]: {str(e)}")
-            effects = parsed_infos
-        else:
-            raise ValueError(f"effect_infos 必须是字符串列表，得到 {type(effect_infos_input)}")
-        
-        # 确保是列表
-        if not isinstance(effects, list):
-            raise ValueError(f"effect_infos 必须解析为列表，得到 {type(effects)}")
-        
-        # 处理每一项并进行健壮性检查
-        result = []
-        for i, info in enumerate(effects):
-            # 转换为纯字典 - 处理各种对象类型
-            if isinstance(info, dict):
-                # 已经是纯字典
-                converted_info = dict(info)  # 为安全起见制作副本
-            else:
-                # 尝试各种转换策略
-                converted_info = {}
-                
-                # 策略 1：尝试像字典一样访问
-                try:
-                    if hasattr(info, 'keys') and hasattr(info, '__getitem__'):
-                        for key in info.keys():
-                            converted_info[key] = info[key]
-                    else:
-                        raise TypeError("Not dict-like")
-                except Exception:
-                    # 策略 2：尝试 vars() 获取对象属性
-                    try:
-                        converted_info = vars(info)
-                    except Exception:
-                        # 策略 3：尝试 dir() 和 getattr
-                        try:
-                            for attr in dir(info):
-                                if not attr.startswith('_'):
-                                    converted_info[attr] = getattr(info, attr)
-                        except Exception:
-                            raise ValueError(f"effect_infos[{i}] 无法转换为字典（类型：{type(info)}）")
-
-            # 验证必需字段
-            required_fields = ['effect_type', 'start', 'end']
-            for field in required_fields:
-                if field not in converted_info:
-                    raise ValueError(f"{info_param}[{{i}}] 中缺少必需字段 '{{field}}'")
-
-            result.append(converted_info)
-        
-        return result
-    except json.JSONDecodeError as e:
-        raise ValueError(f"effect_infos 中的 JSON 格式无效：{str(e)}")
+        return validate_infos(decode_infos(effect_infos_input, 'effect_infos'), EFFECT_INFO_SCHEMA)
     except Exception as e:
         raise ValueError(f"解析 effect_infos 时出错（类型：{type(effect_infos_input)}）：{str(e)}")
 
@@ -159,6 +221,40 @@ def save_draft_config(draft_id: str, config: Dict[str, Any]) -> None:
     except Exception as e:
         raise Exception(f"Failed to save draft config: {str(e)}")
 
+    update_draft_index(draft_id, config)
+
+
+def update_draft_index(draft_id: str, config: Dict[str, Any]) -> None:
+    """
+    更新草稿索引中该草稿的条目（为 Coze 工具独立性在此重复定义）
+
+    索引由 export_drafts 首次导出时建立，不存在时跳过。索引只用于加速
+    草稿发现，更新失败时静默忽略，不影响草稿本身的保存。
+    """
+    if not os.path.exists(DRAFT_INDEX_FILE):
+        return
+
+    config_file = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id, "draft_config.json")
+    try:
+        with open(f"{DRAFT_INDEX_FILE}.lock", 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(DRAFT_INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            stat = os.stat(config_file)
+            index["drafts"][draft_id] = {
+                "created": config.get("created_timestamp", 0.0),
+                "modified": stat.st_mtime,
+                "status": config.get("status", ""),
+                "size": stat.st_size
+            }
+            temp_file = f"{DRAFT_INDEX_FILE}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, DRAFT_INDEX_FILE)
+    except Exception:
+        pass
+
 
 def create_effect_track_with_segments(effect_infos: List[Dict[str, Any]]) -> tuple[List[str], Dict[str, Any]]:
     """
@@ -0,0 +1,602 @@
+"""
+批量添加轨道工具处理器
+
+在一次调用中向现有草稿添加多条不同类型的轨道（视频/图片/音频/字幕/特效）。
+所有轨道数据先全部解析和验证，然后只加载和保存一次草稿配置，
+将标准工作流中 4-6 次 add_* 调用合并为 1 次。
+"""
+
+import os
+import json
+import uuid
+import time
+from typing import NamedTuple, List, Dict, Any, Optional, Tuple
+from runtime import Args
+
+try:
+    import fcntl
+except ImportError:  # Windows 等平台没有 fcntl，退化为无锁写入
+    fcntl = None
+
+
+# 草稿索引文件（由 export_drafts 维护，见 export_drafts/handler.py）
+DRAFT_INDEX_FILE = os.path.join("/tmp", "jianying_assistant", "drafts_index.json")
+
+
+# Input/Output 类型定义（每个 Coze 工具都需要）
+class Input(NamedTuple):
+    """add_tracks 工具的输入参数"""
+    draft_id: str                              # 现有草稿的 UUID
+    video_infos: Optional[List[str]] = None    # 视频信息 JSON 字符串列表（make_video_info 输出）
+    image_infos: Optional[List[str]] = None    # 图片信息 JSON 字符串列表（make_image_info 输出）
+    audio_infos: Optional[List[str]] = None    # 音频信息 JSON 字符串列表（make_audio_info 输出）
+    caption_infos: Optional[List[str]] = None  # 字幕信息 JSON 字符串列表（make_caption_info 输出）
+    effect_infos: Optional[List[str]] = None   # 特效信息 JSON 字符串列表（make_effect_info 输出）
+
+
+class Output(NamedTuple):
+    """add_tracks 工具的输出"""
+    segment_ids: List[str]                      # 所有生成的片段 UUID（按轨道顺序）
+    track_segment_ids: Dict[str, List[str]]     # 每种轨道对应的片段 UUID 列表
+    track_count: int = 0                        # 本次添加的轨道数量
+    success: bool = True                        # 操作成功状态
+    message: str = "轨道添加成功"                 # 状态消息
+
+
+class InfoField(NamedTuple):
+    """*_infos 中单个字段的校验规则"""
+    name: str
+    types: tuple        # 允许的类型（isinstance 检查）
+    type_name: str      # 类型说明（用于错误信息）
+    required: bool
+
+
+class InfoSchema(NamedTuple):
+    """*_infos 参数的校验表，在模块加载时构建，解析时直接按表校验"""
+    info_param: str                  # 参数名（用于错误信息）
+    fields: Tuple[InfoField, ...]    # 需要校验的字段，按错误报告顺序排列
+    url_field: Optional[str]         # 需要映射为 material_url 的字段名（无素材时为 None）
+
+
+NUMBER_TYPES = (int, float)
+
+
+def _track_schema(info_param: str, primary_field: str, url_field: Optional[str]) -> InfoSchema:
+    """构建轨道的校验表：主字段为字符串，start/end 为数字，三者都必需"""
+    return InfoSchema(
+        info_param=info_param,
+        fields=(
+            InfoField(primary_field, (str,), '字符串', True),
+            InfoField('start', NUMBER_TYPES, '数字', True),
+            InfoField('end', NUMBER_TYPES, '数字', True),
+        ),
+        url_field=url_field,
+    )
+
+
+# 轨道规格：(轨道类别, 校验表)
+# 顺序即轨道写入草稿的顺序，与常规工作流中 add_* 的调用顺序一致
+TRACK_SPECS = [
+    ('video', _track_schema('video_infos', 'video_url', 'video_url')),
+    ('image', _track_schema('image_infos', 'image_url', 'image_url')),
+    ('audio', _track_schema('audio_infos', 'audio_url', 'audio_url')),
+    ('caption', _track_schema('caption_infos', 'content', None)),
+    ('effect', _track_schema('effect_infos', 'effect_type', None)),
+]
+
+
+def validate_uuid_format(uuid_str: str) -> bool:
+    """验证 UUID 字符串格式"""
+    try:
+        uuid.UUID(uuid_str)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+# 逐项解码 *_infos 元素时共用的解码器，以及 JSON 允许的首尾空白字符
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = ' \t\n\r'
+
+
+def decode_infos(infos_input: Any, info_param: str) -> List[Any]:
+    """
+    将 *_infos 输入解码为列表（为 Coze 工具独立性在此重复定义）
+
+    整个数组作为单个 JSON 字符串时只调用一次 json.loads；字符串列表的每个元素
+    用共用的解码器单独解码，并要求解码结束位置正好是元素末尾，元素内多余的内容
+    （如逗号分隔的多个对象、被拆开的对象）都会带下标报错。
+    调用方传入的字典会被复制，返回的字典可以直接修改。
+
+    Raises:
+        ValueError: 格式无效
+    """
+    if isinstance(infos_input, str):
+        try:
+            infos = json.loads(infos_input)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{info_param} 中的 JSON 格式无效：{str(e)}")
+        if not isinstance(infos, list):
+            raise ValueError(f"{info_param} 必须解析为列表，得到 {type(infos)}")
+        return infos
+
+    if isinstance(infos_input, tuple):
+        infos_input = list(infos_input)
+
+    if not isinstance(infos_input, list):
+        raise ValueError(f"{info_param} 必须是字符串列表，得到 {type(infos_input)}")
+
+    infos = []
+    for i, info in enumerate(infos_input):
+        if isinstance(info, str):
+            text = info.strip(_JSON_WHITESPACE)
+            try:
+                info, end = _JSON_DECODER.raw_decode(text)
+                if end != len(text):
+                    raise json.JSONDecodeError("Extra data", text, end)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON in {info_param}[{i}]: {str(e)}")
+        elif isinstance(info, dict):
+            info = dict(info)  # 为安全起见制作副本
+        infos.append(info)
+    return infos
+
+
+def validate_infos(infos: List[Any], schema: InfoSchema) -> List[Dict[str, Any]]:
+    """
+    按校验表检查必需字段和字段类型（为 Coze 工具独立性在此重复定义）
+
+    Raises:
+        ValueError: 元素不是对象、缺少必需字段或字段类型错误
+    """
+    info_param = schema.info_param
+    fields = schema.fields
+    url_field = schema.url_field
+
+    for i, info in enumerate(infos):
+        if not isinstance(info, dict):
+            raise ValueError(f"{info_param}[{i}] 无法转换为字典（类型：{type(info)}）")
+
+        for field in fields:
+            if field.name in info:
+                value = info[field.name]
+                if not isinstance(value, field.types):
+                    raise ValueError(f"{info_param}[{i}] 中字段 '{field.name}' 必须是{field.type_name}，"
+                                     f"得到 {type(value).__name__}")
+            elif field.required:
+                raise ValueError(f"{info_param}[{i}] 中缺少必需字段 '{field.name}'")
+
+        if url_field:
+            # 将 *_url 映射到 material_url 以保持一致性
+            info['material_url'] = info[url_field]
+
+    return infos
+
+
+def parse_track_infos(infos_input: Any, schema: InfoSchema) -> List[Dict[str, Any]]:
+    """
+    解析并验证单个轨道的 *_infos 参数
+
+    支持字符串列表（每个元素是一个 JSON 对象字符串）、对象列表，
+    以及整个数组作为单个 JSON 字符串传入。
+
+    Args:
+        infos_input: 原始输入
+        schema: 轨道的校验表
+
+    Returns:
+        解析后的信息字典列表
+
+    Raises:
+        ValueError: 格式无效、缺少必需字段或字段类型错误
+    """
+    return validate_infos(decode_infos(infos_input, schema.info_param), schema)
+
+
+def load_draft_config(draft_id: str) -> Dict[str, Any]:
+    """加载现有草稿配置"""
+    draft_folder = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id)
+    config_file = os.path.join(draft_folder, "draft_config.json")
+
+    if not os.path.exists(draft_folder):
+        raise FileNotFoundError(f"Draft with ID {draft_id} not found")
+
+    if not os.path.exists(config_file):
+        raise FileNotFoundError(f"Draft config file not found for ID {draft_id}")
+
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        raise Exception(f"Failed to load draft config: {str(e)}")
+
+
+def save_draft_config(draft_id: str, config: Dict[str, Any]) -> None:
+    """保存更新后的草稿配置"""
+    draft_folder = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id)
+    config_file = os.path.join(draft_folder, "draft_config.json")
+
+    try:
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        raise Exception(f"Failed to save draft config: {str(e)}")
+
+    update_draft_index(draft_id, config)
+
+
+def update_draft_index(draft_id: str, config: Dict[str, Any]) -> None:
+    """
+    更新草稿索引中该草稿的条目（为 Coze 工具独立性在此重复定义）
+
+    索引由 export_drafts 首次导出时建立，不存在时跳过。索引只用于加速
+    草稿发现，更新失败时静默忽略，不影响草稿本身的保存。
+    """
+    if not os.path.exists(DRAFT_INDEX_FILE):
+        return
+
+    config_file = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id, "draft_config.json")
+    try:
+        with open(f"{DRAFT_INDEX_FILE}.lock", 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(DRAFT_INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            stat = os.stat(config_file)
+            index["drafts"][draft_id] = {
+                "created": config.get("created_timestamp", 0.0),
+                "modified": stat.st_mtime,
+                "status": config.get("status", ""),
+                "size": stat.st_size
+            }
+            temp_file = f"{DRAFT_INDEX_FILE}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, DRAFT_INDEX_FILE)
+    except Exception:
+        pass
+
+
+def _pick_fields(info: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
+    """仅收集 info 中存在的字段"""
+    return {key: info[key] for key in keys if key in info}
+
+
+def _build_effects(info: Dict[str, Any]) -> Dict[str, Any]:
+    """构建滤镜/转场字典（视频与图片共用）"""
+    effects = {}
+    if 'filter_type' in info:
+        effects['filter_type'] = info['filter_type']
+        if 'filter_intensity' in info:
+            effects['filter_intensity'] = info['filter_intensity']
+    if 'transition_type' in info:
+        effects['transition_type'] = info['transition_type']
+        if 'transition_duration' in info:
+            effects['transition_duration'] = info['transition_duration']
+    return effects
+
+
+def _build_crop(info: Dict[str, Any]) -> Dict[str, Any]:
+    """构建裁剪字典（视频与图片共用）"""
+    return {
+        "enabled": True,
+        "left": info.get('crop_left', 0.0),
+        "top": info.get('crop_top', 0.0),
+        "right": info.get('crop_right', 1.0),
+        "bottom": info.get('crop_bottom', 1.0)
+    }
+
+
+def build_video_segment(info: Dict[str, Any], segment_id: str) -> Dict[str, Any]:
+    """构建视频片段，与 add_videos 的输出格式一致"""
+    segment = {
+        "id": segment_id,
+        "type": "video",
+        "material_url": info['material_url'],
+        "time_range": {"start": info['start'], "end": info['end']}
+    }
+    if 'material_start' in info and 'material_end' in info:
+        segment["material_range"] = {"start": info['material_start'], "end": info['material_end']}
+
+    transform = _pick_fields(info, ['position_x', 'position_y', 'scale_x', 'scale_y', 'rotation', 'opacity'])
+    if transform:
+        segment["transform"] = transform
+
+    if info.get('crop_enabled'):
+        segment["crop"] = _build_crop(info)
+
+    effects = _build_effects(info)
+    if effects:
+        segment["effects"] = effects
+
+    speed = {}
+    if 'speed' in info:
+        speed['speed'] = info['speed']
+    if 'reverse' in info:
+        speed['reverse'] = info['reverse']
+    if speed:
+        segment["speed"] = speed
+
+    background = {}
+    if 'background_blur' in info:
+        background['blur'] = info['background_blur']
+    if 'background_color' in info:
+        background['color'] = info['background_color']
+    if background:
+        segment["background"] = background
+
+    return segment
+
+
+def build_image_segment(info: Dict[str, Any], segment_id: str) -> Dict[str, Any]:
+    """构建图片片段，与 add_images 的输出格式一致"""
+    segment = {
+        "id": segment_id,
+        "type": "image",
+        "material_url": info['material_url'],
+        "time_range": {"start": info['start'], "end": info['end']}
+    }
+
+    transform = _pick_fields(info, ['position_x', 'position_y', 'scale_x', 'scale_y', 'rotation', 'opacity'])
+    if transform:
+        segment["transform"] = transform
+
+    if info.get('crop_enabled'):
+        segment["crop"] = _build_crop(info)
+
+    effects = _build_effects(info)
+    if effects:
+        segment["effects"] = effects
+
+    background = {}
+    if 'background_blur' in info:
+        background['blur'] = info['background_blur']
+    if 'background_color' in info:
+        background['color'] = info['background_color']
+    if 'fit_mode' in info:
+        background['fit_mode'] = info['fit_mode']
+    if background:
+        segment["background"] = background
+
+    animations = {}
+    if 'in_animation' in info:
+        animations['intro'] = info['in_animation']
+        if 'in_animation_duration' in info:
+            animations['intro_duration'] = info['in_animation_duration']
+    if 'outro_animation' in info:
+        animations['outro'] = info['outro_animation']
+        if 'outro_animation_duration' in info:
+            animations['outro_duration'] = info['outro_animation_duration']
+    if animations:
+        segment["animations"] = animations
+
+    return segment
+
+
+def build_audio_segment(info: Dict[str, Any], segment_id: str) -> Dict[str, Any]:
+    """构建音频片段，与 add_audios 的输出格式一致"""
+    segment = {
+        "id": segment_id,
+        "type": "audio",
+        "material_url": info['material_url'],
+        "time_range": {"start": info['start'], "end": info['end']}
+    }
+    if 'material_start' in info and 'material_end' in info:
+        segment["material_range"] = {"start": info['material_start'], "end": info['material_end']}
+
+    audio_props = _pick_fields(info, ['volume', 'fade_in', 'fade_out', 'effect_type',
+                                          'effect_intensity', 'speed', 'change_pitch'])
+    if audio_props:
+        segment["audio"] = audio_props
+
+    return segment
+
+
+def build_caption_segment(info: Dict[str, Any], segment_id: str) -> Dict[str, Any]:
+    """构建文本片段，与 add_captions 的输出格式一致"""
+    segment = {
+        "id": segment_id,
+        "type": "text",
+        "content": info['content'],
+        "time_range": {"start": info['start'], "end": info['end']}
+    }
+
+    transform = _pick_fields(info, ['position_x', 'position_y', 'scale', 'rotation', 'opacity'])
+    if transform:
+        segment["transform"] = transform
+
+    style = _pick_fields(info, ['font_family', 'font_size', 'font_weight', 'font_style', 'color'])
+    if info.get('stroke_enabled'):
+        stroke = {'enabled': True}
+        if 'stroke_color' in info:
+            stroke['color'] = info['stroke_color']
+        if 'stroke_width' in info:
+            stroke['width'] = info['stroke_width']
+        style['stroke'] = stroke
+    if info.get('shadow_enabled'):
+        shadow = {'enabled': True}
+        if 'shadow_color' in info:
+            shadow['color'] = info['shadow_color']
+        if 'shadow_offset_x' in info:
+            shadow['offset_x'] = info['shadow_offset_x']
+        if 'shadow_offset_y' in info:
+            shadow['offset_y'] = info['shadow_offset_y']
+        if 'shadow_blur' in info:
+            shadow['blur'] = info['shadow_blur']
+        style['shadow'] = shadow
+    if info.get('background_enabled'):
+        background = {'enabled': True}
+        if 'background_color' in info:
+            background['color'] = info['background_color']
+        if 'background_opacity' in info:
+            background['opacity'] = info['background_opacity']
+        style['background'] = background
+    if style:
+        segment["style"] = style
+
+    if 'alignment' in info:
+        segment["alignment"] = info['alignment']
+
+    animations = {}
+    if 'intro_animation' in info:
+        animations['intro'] = info['intro_animation']
+    if 'outro_animation' in info:
+        animations['outro'] = info['outro_animation']
+    if 'loop_animation' in info:
+        animations['loop'] = info['loop_animation']
+    if animations:
+        segment["animations"] = animations
+
+    return segment
+
+
+def build_effect_segment(info: Dict[str, Any], segment_id: str) -> Dict[str, Any]:
+    """构建特效片段，与 add_effects 的输出格式一致"""
+    segment = {
+        "id": segment_id,
+        "type": "effect",
+        "effect_type": info['effect_type'],
+        "time_range": {"start": info['start'], "end": info['end']},
+        "properties": {
+            "intensity": info.get('intensity', 1.0),
+            "position_x": info.get('position_x'),
+            "position_y": info.get('position_y'),
+            "scale": info.get('scale', 1.0)
+        }
+    }
+    if 'properties' in info and info['properties']:
+        segment["properties"].update(info['properties'])
+    return segment
+
+
+# 轨道类别 → (片段构建函数, 轨道的 track_type, 额外轨道属性)
+TRACK_BUILDERS = {
+    'video': (build_video_segment, 'video', {}),
+    # 图片放置在视频轨道上（没有单独的图片轨道类型）
+    'image': (build_image_segment, 'video', {}),
+    'audio': (build_audio_segment, 'audio', {}),
+    'caption': (build_caption_segment, 'text', {}),
+    'effect': (build_effect_segment, 'effect', {"muted": False, "volume": 1.0}),
+}
+
+
+def create_track_with_segments(kind: str, infos: List[Dict[str, Any]]) -> tuple[List[str], Dict[str, Any]]:
+    """
+    创建指定类别的轨道
+
+    Returns:
+        tuple: (segment_ids, track_dict)
+    """
+    build_segment, track_type, track_props = TRACK_BUILDERS[kind]
+
+    segment_ids = []
+    segments = []
+    for info in infos:
+        segment_id = str(uuid.uuid4())
+        segment_ids.append(segment_id)
+        segments.append(build_segment(info, segment_id))
+
+    track = {"track_type": track_type}
+    track.update(track_props)
+    track["segments"] = segments
+    return segment_ids, track
+
+
+def _error_output(message: str) -> Output:
+    return Output(
+        segment_ids=[],
+        track_segment_ids={},
+        track_count=0,
+        success=False,
+        message=message
+    )
+
+
+def handler(args: Args[Input]) -> Output:
+    """
+    批量添加轨道的主处理函数
+
+    参数:
+        args: 包含 draft_id 和各类 *_infos 的输入参数
+
+    返回值:
+        包含所有 segment_ids 的输出
+    """
+    logger = getattr(args, 'logger', None)
+    draft_id = getattr(args.input, 'draft_id', None)
+
+    if logger:
+        logger.info(f"Adding tracks to draft: {draft_id}")
+
+    try:
+        if not draft_id:
+            return _error_output("缺少必需的 draft_id 参数")
+
+        if not validate_uuid_format(draft_id):
+            return _error_output("无效的 draft_id 格式")
+
+        # 第一步：解析并验证所有轨道，任何一条失败都不写入草稿
+        parsed_tracks = []
+        for kind, schema in TRACK_SPECS:
+            info_param = schema.info_param
+            infos_input = getattr(args.input, info_param, None)
+            if infos_input is None:
+                continue
+            try:
+                infos = parse_track_infos(infos_input, schema)
+            except ValueError as e:
+                if logger:
+                    logger.error(f"Failed to parse {info_param}: {str(e)}")
+                return _error_output(f"解析 {info_param} 失败: {str(e)}")
+            if infos:
+                parsed_tracks.append((kind, infos))
+
+        if not parsed_tracks:
+            return _error_output("至少需要提供一种非空的 *_infos 参数")
+
+        if logger:
+            logger.info(f"Validated {len(parsed_tracks)} tracks: "
+                        f"{', '.join(f'{kind}({len(infos)})' for kind, infos in parsed_tracks)}")
+
+        # 第二步：加载一次草稿配置
+        try:
+            draft_config = load_draft_config(draft_id)
+        except (FileNotFoundError, Exception) as e:
+            return _error_output(f"加载草稿配置失败: {str(e)}")
+
+        if "tracks" not in draft_config:
+            draft_config["tracks"] = []
+
+        all_segment_ids = []
+        track_segment_ids = {}
+        for kind, infos in parsed_tracks:
+            segment_ids, track = create_track_with_segments(kind, infos)
+            draft_config["tracks"].append(track)
+            all_segment_ids.extend(segment_ids)
+            track_segment_ids[kind] = segment_ids
+
+        draft_config["last_modified"] = time.time()
+
+        # 第三步：一次性写回
+        try:
+            save_draft_config(draft_id, draft_config)
+        except Exception as e:
+            return _error_output(f"保存草稿配置失败: {str(e)}")
+
+        if logger:
+            logger.info(f"Successfully added {len(parsed_tracks)} tracks "
+                        f"({len(all_segment_ids)} segments) to draft {draft_id}")
+
+        return Output(
+            segment_ids=all_segment_ids,
+            track_segment_ids=track_segment_ids,
+            track_count=len(parsed_tracks),
+            success=True,
+            message=f"成功添加 {len(parsed_tracks)} 条轨道（共 {len(all_segment_ids)} 个片段）到草稿"
+        )
+
+    except Exception as e:
+        error_msg = f"添加轨道时发生错误: {str(e)}"
+        if logger:
+            logger.error(error_msg)
+        return _error_output(error_msg)
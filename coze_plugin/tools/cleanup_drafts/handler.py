@@ -0,0 +1,298 @@
+"""
+清理草稿工具处理器
+
+按 TTL 和总容量配额清理 /tmp/jianying_assistant/drafts 中的过期草稿。
+超过 TTL（按 last_modified）的草稿会被删除；删除后总大小仍超过配额时，
+按最旧优先继续淘汰，直到满足配额。create_draft 也会以限频方式自动运行同样的清理。
+"""
+
+import os
+import json
+import time
+import shutil
+from typing import NamedTuple, List, Dict, Any, Optional, Iterable
+from runtime import Args
+
+try:
+    import fcntl
+except ImportError:  # Windows 等平台没有 fcntl，退化为无锁写入
+    fcntl = None
+
+
+# 默认清理策略：超过 72 小时未修改的草稿过期，草稿总大小上限 256 MB
+# （Coze 平台 /tmp 空间限制为 512MB，需为媒体下载等临时文件留出余量）
+DEFAULT_TTL_HOURS = 72.0
+DEFAULT_MAX_TOTAL_MB = 256.0
+
+# 草稿索引文件（由 export_drafts 维护，见 export_drafts/handler.py）
+DRAFT_INDEX_FILE = os.path.join("/tmp", "jianying_assistant", "drafts_index.json")
+
+
+# Input/Output 类型定义（每个 Coze 工具都需要）
+class Input(NamedTuple):
+    """cleanup_drafts 工具的输入参数"""
+    ttl_hours: Optional[float] = None      # 草稿保留时长（小时），默认 72；0 表示不按时间清理
+    max_total_mb: Optional[float] = None   # 草稿总大小配额（MB），默认 256；0 表示不限制
+    dry_run: bool = False                  # 仅报告将要删除的草稿，不实际删除
+
+
+# Output 返回 Dict[str, Any]，与 create_draft / export_drafts 保持一致
+
+
+def validate_uuid_format(uuid_str: str) -> bool:
+    """验证 UUID 字符串格式"""
+    try:
+        import uuid
+        uuid.UUID(uuid_str)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def get_drafts_dir_mtime_ns() -> int:
+    """获取 drafts 目录的修改时间（纳秒），目录不存在时为 0"""
+    try:
+        return os.stat(os.path.join("/tmp", "jianying_assistant", "drafts")).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def get_folder_size(folder: str) -> int:
+    """递归计算文件夹中所有文件的总字节数"""
+    total = 0
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += get_folder_size(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return total
+
+
+def collect_draft_entries() -> List[tuple[float, str, int]]:
+    """
+    收集所有草稿的最后修改时间和占用空间
+
+    最后修改时间取 draft_config.json 的修改时间（每次保存时更新）；
+    没有配置文件的残留文件夹使用文件夹自身的修改时间，以便同样被回收。
+
+    Returns:
+        (last_modified, draft_id, size_bytes) 列表
+    """
+    drafts_dir = os.path.join("/tmp", "jianying_assistant", "drafts")
+    entries = []
+    try:
+        items = os.listdir(drafts_dir)
+    except OSError:
+        return []
+
+    for item in items:
+        item_path = os.path.join(drafts_dir, item)
+        if not validate_uuid_format(item) or not os.path.isdir(item_path):
+            continue
+        try:
+            last_modified = os.stat(os.path.join(item_path, "draft_config.json")).st_mtime
+        except OSError:
+            try:
+                last_modified = os.stat(item_path).st_mtime
+            except OSError:
+                continue
+        entries.append((last_modified, item, get_folder_size(item_path)))
+    return entries
+
+
+def select_drafts_to_remove(entries: List[tuple[float, str, int]], ttl_seconds: float,
+                            max_total_bytes: int, now: float,
+                            protected: Iterable[str] = ()) -> List[tuple[float, str, int]]:
+    """
+    选出需要删除的草稿
+
+    Args:
+        entries: collect_draft_entries 的返回值
+        ttl_seconds: 保留时长（秒），<= 0 表示不按时间清理
+        max_total_bytes: 总大小配额（字节），<= 0 表示不限制
+        now: 当前时间戳
+        protected: 不允许删除的草稿 ID（如刚创建的草稿）
+
+    Returns:
+        需要删除的条目，按最后修改时间从旧到新排列
+    """
+    protected = set(protected)
+    candidates = sorted(entry for entry in entries if entry[1] not in protected)
+
+    selected = []
+    remaining = []
+    for entry in candidates:
+        if ttl_seconds > 0 and now - entry[0] > ttl_seconds:
+            selected.append(entry)
+        else:
+            remaining.append(entry)
+
+    if max_total_bytes > 0:
+        total = sum(entry[2] for entry in entries) - sum(entry[2] for entry in selected)
+        for entry in remaining:
+            if total <= max_total_bytes:
+                break
+            selected.append(entry)
+            total -= entry[2]
+
+    return selected
+
+
+def remove_draft_index_entries(draft_ids: List[str], dir_mtime_before: int) -> None:
+    """
+    从草稿索引中移除已删除的草稿（为 Coze 工具独立性在此重复定义）
+
+    仅当删除前索引与目录一致时才更新记录的目录修改时间，否则保留旧值，
+    让 export_drafts 下次读取时重建索引。失败时静默忽略。
+    """
+    if not os.path.exists(DRAFT_INDEX_FILE):
+        return
+
+    try:
+        with open(f"{DRAFT_INDEX_FILE}.lock", 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(DRAFT_INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            for draft_id in draft_ids:
+                index["drafts"].pop(draft_id, None)
+            if index.get("dir_mtime_ns") == dir_mtime_before:
+                index["dir_mtime_ns"] = get_drafts_dir_mtime_ns()
+            temp_file = f"{DRAFT_INDEX_FILE}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, DRAFT_INDEX_FILE)
+    except Exception:
+        pass
+
+
+def run_draft_janitor(ttl_seconds: float, max_total_bytes: int, dry_run: bool = False,
+                      protected: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    执行一次草稿清理
+
+    Args:
+        ttl_seconds: 保留时长（秒），<= 0 表示不按时间清理
+        max_total_bytes: 总大小配额（字节），<= 0 表示不限制
+        dry_run: 仅统计，不删除
+        protected: 不允许删除的草稿 ID
+
+    Returns:
+        Dict containing removed_draft_ids, removed_count, reclaimed_bytes,
+        remaining_count, remaining_bytes and failures
+    """
+    entries = collect_draft_entries()
+    selected = select_drafts_to_remove(entries, ttl_seconds, max_total_bytes, time.time(), protected)
+
+    dir_mtime_before = get_drafts_dir_mtime_ns()
+    removed = []
+    failures = []
+    for last_modified, draft_id, size in selected:
+        if not dry_run:
+            draft_folder = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id)
+            try:
+                shutil.rmtree(draft_folder)
+            except FileNotFoundError:
+                pass  # 已被并发的清理或导出删除
+            except Exception as e:
+                failures.append(f"{draft_id}: {str(e)}")
+                continue
+        removed.append((draft_id, size))
+
+    if removed and not dry_run:
+        remove_draft_index_entries([draft_id for draft_id, _ in removed], dir_mtime_before)
+
+    reclaimed_bytes = sum(size for _, size in removed)
+    return {
+        "removed_draft_ids": [draft_id for draft_id, _ in removed],
+        "removed_count": len(removed),
+        "reclaimed_bytes": reclaimed_bytes,
+        "remaining_count": len(entries) - len(removed),
+        "remaining_bytes": sum(entry[2] for entry in entries) - reclaimed_bytes,
+        "failures": failures
+    }
+
+
+def handler(args: Args[Input]) -> Dict[str, Any]:
+    """
+    清理草稿的主处理函数
+
+    Args:
+        args: 包含 TTL、配额和 dry_run 选项的输入参数
+
+    Returns:
+        Dict containing removed_count, reclaimed_bytes, removed_draft_ids,
+        remaining_count, remaining_bytes, success status, and message
+    """
+    logger = getattr(args, 'logger', None)
+
+    if logger:
+        logger.info(f"Cleaning up drafts with parameters: {args.input}")
+
+    ttl_hours = getattr(args.input, 'ttl_hours', None)
+    max_total_mb = getattr(args.input, 'max_total_mb', None)
+    dry_run = getattr(args.input, 'dry_run', None) or False
+
+    if ttl_hours is None:
+        ttl_hours = DEFAULT_TTL_HOURS
+    if max_total_mb is None:
+        max_total_mb = DEFAULT_MAX_TOTAL_MB
+
+    if ttl_hours < 0 or max_total_mb < 0:
+        message = "ttl_hours 和 max_total_mb 不能为负数"
+        if logger:
+            logger.error(message)
+        return {
+            "removed_count": 0,
+            "reclaimed_bytes": 0,
+            "removed_draft_ids": [],
+            "remaining_count": 0,
+            "remaining_bytes": 0,
+            "success": False,
+            "message": message
+        }
+
+    try:
+        result = run_draft_janitor(
+            ttl_seconds=ttl_hours * 3600,
+            max_total_bytes=int(max_total_mb * 1024 * 1024),
+            dry_run=dry_run
+        )
+    except Exception as e:
+        if logger:
+            logger.error(f"Unexpected error in cleanup_drafts handler: {str(e)}")
+        return {
+            "removed_count": 0,
+            "reclaimed_bytes": 0,
+            "removed_draft_ids": [],
+            "remaining_count": 0,
+            "remaining_bytes": 0,
+            "success": False,
+            "message": f"清理草稿时发生意外错误: {str(e)}"
+        }
+
+    action = "将删除" if dry_run else "已删除"
+    message_parts = [
+        f"{action} {result['removed_count']} 个草稿，释放 {result['reclaimed_bytes']} 字节",
+        f"剩余 {result['remaining_count']} 个草稿，共 {result['remaining_bytes']} 字节"
+    ]
+    if result["failures"]:
+        message_parts.append(f"删除失败: {'; '.join(result['failures'])}")
+    message = "; ".join(message_parts)
+
+    if logger:
+        logger.info(f"Cleanup completed: {message}")
+
+    return {
+        "removed_count": result["removed_count"],
+        "reclaimed_bytes": result["reclaimed_bytes"],
+        "removed_draft_ids": result["removed_draft_ids"],
+        "remaining_count": result["remaining_count"],
+        "remaining_bytes": result["remaining_bytes"],
+        "success": not result["failures"],
+        "message": message
+    }
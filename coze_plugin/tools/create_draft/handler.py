@@ -9,9 +9,28 @@ import os
 import json
 import uuid
 import time
-from typing import NamedTuple, Dict, Any
+import shutil
+from typing import NamedTuple, List, Dict, Any, Optional, Iterable
 from runtime import Args
 
+try:
+    import fcntl
+except ImportError:  # Windows 等平台没有 fcntl，退化为无锁写入
+    fcntl = None
+
+
+# 草稿索引文件（由 export_drafts 维护，见 export_drafts/handler.py）
+DRAFT_INDEX_FILE = os.path.join("/tmp", "jianying_assistant", "drafts_index.json")
+DRAFT_INDEX_VERSION = 1
+
+# 创建草稿时顺带运行的过期草稿清理，TTL 与 cleanup_drafts 工具的默认值一致。
+# 自动清理只回收过期草稿，不做配额淘汰，以免删除其他工作流仍在使用的草稿；
+# 配额淘汰只由显式调用的 cleanup_drafts 工具执行
+DRAFT_TTL_SECONDS = 72 * 3600
+# 两次自动清理之间的最小间隔，通过标记文件的修改时间限频
+JANITOR_INTERVAL_SECONDS = 600
+JANITOR_STAMP_FILE = os.path.join("/tmp", "jianying_assistant", "janitor.stamp")
+
 
 # Input/Output 类型定义（每个 Coze 工具都需要）
 class Input(NamedTuple):
@@ -75,7 +94,286 @@ def create_draft_folder(draft_id: str) -> str:
         raise Exception(f"Failed to create draft folder: {str(e)}")
 
 
-def create_initial_draft_config(input_data: Input, draft_id: str, draft_folder: str) -> None:
+def get_drafts_dir_mtime_ns() -> int:
+    """获取 drafts 目录的修改时间（纳秒），目录不存在时为 0"""
+    try:
+        return os.stat(os.path.join("/tmp", "jianying_assistant", "drafts")).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def update_draft_index(draft_id: str, config: Dict[str, Any], dir_mtime_before: Optional[int] = None) -> None:
+    """
+    将新草稿登记到草稿索引（为 Coze 工具独立性在此重复定义）
+
+    索引由 export_drafts 首次导出时建立，不存在时跳过。创建草稿文件夹会改变
+    drafts 目录的修改时间，若创建前索引与目录一致，则同步更新索引记录的
+    目录修改时间，使下次导出无需重新扫描。失败时静默忽略。
+
+    Args:
+        draft_id: UUID string for the draft
+        config: 已保存的草稿配置
+        dir_mtime_before: 创建文件夹前 drafts 目录的修改时间（纳秒）
+    """
+    if not os.path.exists(DRAFT_INDEX_FILE):
+        return
+
+    config_file = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id, "draft_config.json")
+    try:
+        with open(f"{DRAFT_INDEX_FILE}.lock", 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(DRAFT_INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            stat = os.stat(config_file)
+            index["drafts"][draft_id] = {
+                "created": config.get("created_timestamp", 0.0),
+                "modified": stat.st_mtime,
+                "status": config.get("status", ""),
+                "size": stat.st_size
+            }
+            if dir_mtime_before is not None and index.get("dir_mtime_ns") == dir_mtime_before:
+                index["dir_mtime_ns"] = get_drafts_dir_mtime_ns()
+            temp_file = f"{DRAFT_INDEX_FILE}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, DRAFT_INDEX_FILE)
+    except Exception:
+        pass
+
+
+def get_folder_size(folder: str) -> int:
+    """递归计算文件夹中所有文件的总字节数"""
+    total = 0
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += get_folder_size(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return total
+
+
+def collect_draft_entries() -> List[tuple[float, str, int]]:
+    """
+    收集所有草稿的最后修改时间和占用空间
+
+    最后修改时间取 draft_config.json 的修改时间（每次保存时更新）；
+    没有配置文件的残留文件夹使用文件夹自身的修改时间，以便同样被回收。
+
+    Returns:
+        (last_modified, draft_id, size_bytes) 列表
+    """
+    drafts_dir = os.path.join("/tmp", "jianying_assistant", "drafts")
+    entries = []
+    try:
+        items = os.listdir(drafts_dir)
+    except OSError:
+        return []
+
+    for item in items:
+        item_path = os.path.join(drafts_dir, item)
+        if not os.path.isdir(item_path):
+            continue
+        try:
+            uuid.UUID(item)
+        except ValueError:
+            continue
+        try:
+            last_modified = os.stat(os.path.join(item_path, "draft_config.json")).st_mtime
+        except OSError:
+            try:
+                last_modified = os.stat(item_path).st_mtime
+            except OSError:
+                continue
+        entries.append((last_modified, item, get_folder_size(item_path)))
+    return entries
+
+
+def collect_draft_entries_from_index() -> Optional[List[tuple[float, str, int]]]:
+    """
+    从草稿索引读取所有草稿的最后修改时间和大小，避免列目录和递归统计
+
+    索引中的大小是 draft_config.json 的大小，只用于统计回收量。索引缺失、
+    损坏或记录的目录修改时间与 drafts 目录不一致（说明有草稿未登记）时
+    返回 None，由调用方退回到 collect_draft_entries 扫描。
+
+    Returns:
+        (last_modified, draft_id, size_bytes) 列表，索引不可用时为 None
+    """
+    try:
+        with open(DRAFT_INDEX_FILE, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(index, dict) or index.get("version") != DRAFT_INDEX_VERSION:
+        return None
+    if not isinstance(index.get("drafts"), dict):
+        return None
+    if index.get("dir_mtime_ns") != get_drafts_dir_mtime_ns():
+        return None
+
+    try:
+        return [
+            (float(entry["modified"]), draft_id, int(entry.get("size", 0)))
+            for draft_id, entry in index["drafts"].items()
+        ]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+def select_drafts_to_remove(entries: List[tuple[float, str, int]], ttl_seconds: float,
+                            max_total_bytes: int, now: float,
+                            protected: Iterable[str] = ()) -> List[tuple[float, str, int]]:
+    """
+    选出需要删除的草稿
+
+    Args:
+        entries: collect_draft_entries 的返回值
+        ttl_seconds: 保留时长（秒），<= 0 表示不按时间清理
+        max_total_bytes: 总大小配额（字节），<= 0 表示不限制
+        now: 当前时间戳
+        protected: 不允许删除的草稿 ID（如刚创建的草稿）
+
+    Returns:
+        需要删除的条目，按最后修改时间从旧到新排列
+    """
+    protected = set(protected)
+    candidates = sorted(entry for entry in entries if entry[1] not in protected)
+
+    selected = []
+    remaining = []
+    for entry in candidates:
+        if ttl_seconds > 0 and now - entry[0] > ttl_seconds:
+            selected.append(entry)
+        else:
+            remaining.append(entry)
+
+    if max_total_bytes > 0:
+        total = sum(entry[2] for entry in entries) - sum(entry[2] for entry in selected)
+        for entry in remaining:
+            if total <= max_total_bytes:
+                break
+            selected.append(entry)
+            total -= entry[2]
+
+    return selected
+
+
+def remove_draft_index_entries(draft_ids: List[str], dir_mtime_before: int) -> None:
+    """
+    从草稿索引中移除已删除的草稿
+
+    仅当删除前索引与目录一致时才更新记录的目录修改时间，否则保留旧值，
+    让 export_drafts 下次读取时重建索引。失败时静默忽略。
+    """
+    if not os.path.exists(DRAFT_INDEX_FILE):
+        return
+
+    try:
+        with open(f"{DRAFT_INDEX_FILE}.lock", 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(DRAFT_INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            for draft_id in draft_ids:
+                index["drafts"].pop(draft_id, None)
+            if index.get("dir_mtime_ns") == dir_mtime_before:
+                index["dir_mtime_ns"] = get_drafts_dir_mtime_ns()
+            temp_file = f"{DRAFT_INDEX_FILE}.{os.getpid()}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_file, DRAFT_INDEX_FILE)
+    except Exception:
+        pass
+
+
+def run_draft_janitor(ttl_seconds: float, max_total_bytes: int, dry_run: bool = False,
+                      protected: Iterable[str] = (),
+                      entries: Optional[List[tuple[float, str, int]]] = None) -> Dict[str, Any]:
+    """
+    执行一次草稿清理（与 cleanup_drafts 工具相同，为 Coze 工具独立性在此重复定义）
+
+    Args:
+        ttl_seconds: 保留时长（秒），<= 0 表示不按时间清理
+        max_total_bytes: 总大小配额（字节），<= 0 表示不限制
+        dry_run: 仅统计，不删除
+        protected: 不允许删除的草稿 ID
+        entries: 预先收集的草稿条目，为 None 时扫描 drafts 目录
+
+    Returns:
+        Dict containing removed_draft_ids, removed_count, reclaimed_bytes,
+        remaining_count, remaining_bytes and failures
+    """
+    if entries is None:
+        entries = collect_draft_entries()
+    selected = select_drafts_to_remove(entries, ttl_seconds, max_total_bytes, time.time(), protected)
+
+    dir_mtime_before = get_drafts_dir_mtime_ns()
+    removed = []
+    failures = []
+    for last_modified, draft_id, size in selected:
+        if not dry_run:
+            draft_folder = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id)
+            try:
+                shutil.rmtree(draft_folder)
+            except FileNotFoundError:
+                pass  # 已被并发的清理或导出删除
+            except Exception as e:
+                failures.append(f"{draft_id}: {str(e)}")
+                continue
+        removed.append((draft_id, size))
+
+    if removed and not dry_run:
+        remove_draft_index_entries([draft_id for draft_id, _ in removed], dir_mtime_before)
+
+    reclaimed_bytes = sum(size for _, size in removed)
+    return {
+        "removed_draft_ids": [draft_id for draft_id, _ in removed],
+        "removed_count": len(removed),
+        "reclaimed_bytes": reclaimed_bytes,
+        "remaining_count": len(entries) - len(removed),
+        "remaining_bytes": sum(entry[2] for entry in entries) - reclaimed_bytes,
+        "failures": failures
+    }
+
+
+def maybe_run_draft_janitor(protected: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    限频地运行过期草稿清理
+
+    距离上次运行不足 JANITOR_INTERVAL_SECONDS 时直接跳过，开销只有一次 stat。
+    先更新标记文件再清理，使并发的 create_draft 调用不会重复执行。
+    只删除超过 TTL 的草稿；草稿列表优先取自草稿索引，索引不可用时才扫描目录。
+
+    Args:
+        protected: 不允许删除的草稿 ID
+
+    Returns:
+        清理结果，本次跳过时为 None
+    """
+    now = time.time()
+    try:
+        if now - os.stat(JANITOR_STAMP_FILE).st_mtime < JANITOR_INTERVAL_SECONDS:
+            return None
+    except OSError:
+        pass
+
+    os.makedirs(os.path.dirname(JANITOR_STAMP_FILE), exist_ok=True)
+    with open(JANITOR_STAMP_FILE, 'a'):
+        pass
+    os.utime(JANITOR_STAMP_FILE, (now, now))
+
+    entries = collect_draft_entries_from_index()
+    return run_draft_janitor(DRAFT_TTL_SECONDS, 0, protected=protected, entries=entries)
+
+
+
+def create_initial_draft_config(input_data: Input, draft_id: str, draft_folder: str) -> Dict[str, Any]:
     """
     Create initial draft configuration file
     
@@ -84,6 +382,9 @@ def create_initial_draft_config(input_data: Input, draft_id: str, draft_folder:
         draft_id: UUID string for the draft
         draft_folder: Path to draft folder
         
+    Returns:
+        The saved draft configuration
+        
     Raises:
         Exception: If config creation fails
     """
@@ -118,6 +419,8 @@ def create_initial_draft_config(input_data: Input, draft_id: str, draft_folder:
             json.dump(draft_config, f, ensure_ascii=False, indent=2)
     except Exception as e:
         raise Exception(f"Failed to save draft config: {str(e)}")
+    
+    return draft_config
 
 
 def handler(args: Args[Input]) -> Dict[str, Any]:
@@ -161,6 +464,7 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
             logger.info(f"Generated draft ID: {draft_id}")
         
         # Create draft folder
+        dir_mtime_before = get_drafts_dir_mtime_ns()
         try:
             draft_folder = create_draft_folder(draft_id)
             if logger:
@@ -176,7 +480,7 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
         
         # Create initial draft configuration
         try:
-            create_initial_draft_config(args.input, draft_id, draft_folder)
+            draft_config = create_initial_draft_config(args.input, draft_id, draft_folder)
             if logger:
                 logger.info(f"Created initial draft configuration")
         except Exception as e:
@@ -188,6 +492,18 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
                 "message": f"创建草稿配置失败: {str(e)}"
             }
         
+        update_draft_index(draft_id, draft_config, dir_mtime_before)
+        
+        # 顺带清理过期草稿；清理失败不影响本次创建
+        try:
+            janitor_result = maybe_run_draft_janitor(protected=[draft_id])
+            if janitor_result and logger:
+                logger.info(f"Draft janitor removed {janitor_result['removed_count']} draft(s), "
+                           f"reclaimed {janitor_result['reclaimed_bytes']} bytes")
+        except Exception as e:
+            if logger:
+                logger.warning(f"Draft janitor failed: {str(e)}")
+        
         if logger:
             logger.info(f"Draft created successfully with ID: {draft_id}")
         
@@ -7,10 +7,35 @@
 
 import os
 import json
+import base64
 import shutil
-from typing import NamedTuple, Union, List, Dict, Any
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Union, List, Dict, Any, Optional, Iterator
 from runtime import Args
 
+try:
+    import fcntl
+except ImportError:  # Windows 等平台没有 fcntl，退化为无锁写入
+    fcntl = None
+
+
+# 并行加载草稿配置时的最大线程数（读取为 I/O 密集型操作）
+MAX_LOAD_WORKERS = 8
+
+# 分页导出：未指定 page_size 时的默认值与上限
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 200
+
+# 草稿索引文件：记录每个草稿的创建/修改时间、状态和配置大小，
+# 位于 drafts 目录之外，写入索引不会改变 drafts 目录的修改时间
+DRAFT_INDEX_FILE = os.path.join("/tmp", "jianying_assistant", "drafts_index.json")
+DRAFT_INDEX_VERSION = 1
+
+# output_file 只能是文件名，导出文件统一写入该目录，不会覆盖草稿或索引等其他文件
+EXPORTS_DIR = os.path.join("/tmp", "jianying_assistant", "exports")
+
 
 # Input/Output 类型定义（每个 Coze 工具都需要）
 class Input(NamedTuple):
@@ -18,6 +43,11 @@ class Input(NamedTuple):
     draft_ids: Union[str, List[str], None] = None  # 单个 UUID 字符串、UUID 列表或 None（用于 export_all）
     remove_temp_files: bool = False   # 是否在导出后删除临时文件
     export_all: bool = False          # 是否导出目录中的所有草稿
+    compact_output: bool = False      # 是否输出紧凑 JSON（无缩进），显著减小数据体积
+    output_file: Optional[str] = None  # 可选：将导出数据流式写入 EXPORTS_DIR 下的该文件名，draft_data 返回空字符串
+    page_size: Optional[int] = None   # 分页大小；设置后按 last_modified 升序分页导出
+    cursor: Optional[str] = None      # 上一页返回的 next_cursor，用于继续获取下一页
+    modified_since: Optional[float] = None  # 仅导出 last_modified >= 该时间戳（秒）的草稿
 
 
 # Output 现在返回 Dict[str, Any] 而不是 NamedTuple
@@ -94,6 +124,27 @@ def load_draft_config(draft_id: str) -> tuple[bool, dict, str]:
         return False, {}, f"读取草稿配置失败: {str(e)}"
 
 
+def load_draft_configs(draft_ids: List[str], max_workers: int = MAX_LOAD_WORKERS) -> List[tuple[str, bool, dict, str]]:
+    """
+    通过线程池并行加载多个草稿配置
+
+    Args:
+        draft_ids: 草稿 UUID 列表
+        max_workers: 最大线程数
+
+    Returns:
+        与 draft_ids 顺序一致的 (draft_id, success, config_dict, error_message) 列表
+    """
+    if len(draft_ids) <= 1:
+        return [(draft_id,) + load_draft_config(draft_id) for draft_id in draft_ids]
+
+    workers = min(max_workers, len(draft_ids))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # executor.map 按输入顺序返回结果，保证导出顺序稳定
+        results = executor.map(load_draft_config, draft_ids)
+        return [(draft_id,) + result for draft_id, result in zip(draft_ids, results)]
+
+
 def create_draft_generator_data(draft_configs: List[dict]) -> dict:
     """
     Create data structure for draft generator
@@ -123,34 +174,375 @@ def create_draft_generator_data(draft_configs: List[dict]) -> dict:
         }
 
 
+def make_draft_generator_encoder(compact: bool = False) -> json.JSONEncoder:
+    """
+    创建草稿生成器 JSON 的编码器
+
+    非紧凑模式的输出与 json.dumps(..., indent=2) 完全一致。
+
+    Args:
+        compact: 是否使用紧凑格式（无缩进、无多余空格）
+    """
+    if compact:
+        return json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    return json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def iter_draft_generator_json(draft_generator_data: dict, compact: bool = False) -> Iterator[str]:
+    """
+    增量生成草稿生成器 JSON 文本（写入文件时使用）
+
+    使用 JSONEncoder.iterencode 逐块产出，避免一次性构建完整字符串。
+
+    Args:
+        draft_generator_data: create_draft_generator_data 的返回值
+        compact: 是否使用紧凑格式（无缩进、无多余空格）
+
+    Returns:
+        JSON 文本片段的迭代器
+    """
+    return make_draft_generator_encoder(compact).iterencode(draft_generator_data)
+
+
+def build_draft_generator_json(draft_generator_data: dict, compact: bool = False) -> str:
+    """
+    一次性生成草稿生成器 JSON 字符串（未指定 output_file 时使用）
+
+    结果作为 draft_data 返回，完整字符串本来就要构建，因此直接调用 encode
+    （紧凑模式走 C 编码器），不再先产出片段列表再拼接。
+    """
+    return make_draft_generator_encoder(compact).encode(draft_generator_data)
+
+
+def resolve_output_file(file_name: str) -> str:
+    """
+    将 output_file 参数解析为导出目录下的路径
+
+    只接受不含目录部分的文件名，拒绝绝对路径、路径分隔符和 "."/".."，
+    保证导出不会替换导出目录之外的文件。
+
+    Args:
+        file_name: 工具输入的文件名
+
+    Returns:
+        EXPORTS_DIR 下的文件路径
+
+    Raises:
+        ValueError: 文件名不合法
+    """
+    # 同时拒绝两种分隔符，Windows 风格的路径在 Linux 上也不会被当作文件名
+    if (not file_name or file_name in ('.', '..') or '\0' in file_name
+            or '/' in file_name or '\\' in file_name):
+        raise ValueError(f"output_file 只能是文件名，不能包含路径: {file_name}")
+    return os.path.join(EXPORTS_DIR, file_name)
+
+
+def write_draft_data_file(output_file: str, chunks: Iterator[str]) -> int:
+    """
+    将 JSON 片段流式写入导出目录中的文件
+
+    先写入同目录下由 mkstemp 创建的临时文件，完成后再重命名，避免读取方看到不完整的文件；
+    同时导出到同一文件的调用各自使用独立的临时文件，写入失败时临时文件被删除。
+
+    Args:
+        output_file: 目标文件路径（resolve_output_file 的返回值）
+        chunks: JSON 文本片段
+
+    Returns:
+        写入的字节数
+
+    Raises:
+        ValueError: 目标文件不在 EXPORTS_DIR 中
+    """
+    output_dir = os.path.dirname(output_file)
+    if output_dir != EXPORTS_DIR or resolve_output_file(os.path.basename(output_file)) != output_file:
+        raise ValueError(f"导出文件必须位于 {EXPORTS_DIR}: {output_file}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    fd, temp_file = tempfile.mkstemp(
+        dir=output_dir,
+        prefix=os.path.basename(output_file) + '.',
+        suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if hasattr(os, 'fchmod'):
+                os.fchmod(f.fileno(), 0o644)  # mkstemp 创建的文件为 0600，导出文件需要可被其他进程读取
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(temp_file, output_file)
+    except BaseException:
+        try:
+            os.unlink(temp_file)
+        except OSError:
+            pass
+        raise
+    return os.path.getsize(output_file)
+
+
+def get_draft_last_modified(draft_id: str, draft_index: Optional[dict] = None) -> float:
+    """
+    获取草稿的最后修改时间（秒）
+
+    优先使用草稿索引中记录的时间；不在索引中时使用 draft_config.json 的
+    文件修改时间，它与配置中的 last_modified 在每次保存时同步更新，
+    无需读取和解析配置文件。
+
+    Args:
+        draft_id: UUID string for the draft
+        draft_index: 可选的草稿索引（load_draft_index 的返回值）
+
+    Returns:
+        最后修改时间戳，草稿不存在时为 0.0
+    """
+    if draft_index:
+        entry = draft_index.get("drafts", {}).get(draft_id)
+        if entry is not None:
+            return entry.get("modified", 0.0)
+
+    config_file = os.path.join("/tmp", "jianying_assistant", "drafts", draft_id, "draft_config.json")
+    try:
+        return os.stat(config_file).st_mtime
+    except OSError:
+        return 0.0
+
+
+def encode_cursor(last_modified: float, draft_id: str) -> str:
+    """将分页位置编码为不透明的游标字符串"""
+    payload = json.dumps({"m": last_modified, "id": draft_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    """
+    解码游标字符串
+
+    Raises:
+        ValueError: 游标格式无效
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        return float(payload["m"]), str(payload["id"])
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}")
+
+
+def paginate_draft_ids(draft_ids: List[str], page_size: Optional[int] = None,
+                       cursor: Optional[str] = None,
+                       modified_since: Optional[float] = None,
+                       draft_index: Optional[dict] = None) -> tuple[List[str], str, bool]:
+    """
+    按 (last_modified, draft_id) 升序对草稿进行游标分页
+
+    游标记录上一页最后一个草稿的位置，因此两次调用之间新增或删除草稿
+    不会导致重复或遗漏；被修改的草稿会移动到末尾并在后续页中再次出现。
+
+    Args:
+        draft_ids: 候选草稿 ID 列表
+        page_size: 每页数量（默认 DEFAULT_PAGE_SIZE，上限 MAX_PAGE_SIZE）
+        cursor: 上一页返回的 next_cursor
+        modified_since: 仅保留 last_modified >= 该值的草稿
+        draft_index: 可选的草稿索引，提供时直接使用其中的修改时间
+
+    Returns:
+        Tuple of (page_draft_ids, next_cursor, has_more)
+
+    Raises:
+        ValueError: 游标或分页大小无效
+    """
+    if page_size is None:
+        page_size = DEFAULT_PAGE_SIZE
+    if page_size <= 0:
+        raise ValueError(f"page_size 必须大于 0: {page_size}")
+    page_size = min(page_size, MAX_PAGE_SIZE)
+
+    entries = sorted((get_draft_last_modified(draft_id, draft_index), draft_id) for draft_id in draft_ids)
+
+    if modified_since is not None:
+        entries = [entry for entry in entries if entry[0] >= modified_since]
+
+    if cursor:
+        position = decode_cursor(cursor)
+        entries = [entry for entry in entries if entry > position]
+
+    page = entries[:page_size]
+    has_more = len(entries) > page_size
+    next_cursor = encode_cursor(*page[-1]) if page else (cursor or "")
+
+    return [draft_id for _, draft_id in page], next_cursor, has_more
+
+
+def get_drafts_dir_mtime_ns() -> int:
+    """获取 drafts 目录的修改时间（纳秒），目录不存在时为 0"""
+    try:
+        return os.stat(os.path.join("/tmp", "jianying_assistant", "drafts")).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@contextmanager
+def draft_index_lock():
+    """
+    获取草稿索引的独占锁
+
+    与 create_draft 和 add_* 工具使用同一个锁文件，避免并发的读-改-写互相覆盖。
+    """
+    os.makedirs(os.path.dirname(DRAFT_INDEX_FILE), exist_ok=True)
+    with open(f"{DRAFT_INDEX_FILE}.lock", 'w') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def read_draft_index() -> Optional[dict]:
+    """
+    读取草稿索引文件
+
+    Returns:
+        索引字典，文件不存在、损坏或版本不匹配时为 None
+    """
+    try:
+        with open(DRAFT_INDEX_FILE, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(index, dict) or index.get("version") != DRAFT_INDEX_VERSION:
+        return None
+    if not isinstance(index.get("drafts"), dict):
+        return None
+    return index
+
+
+def write_draft_index(index: dict) -> None:
+    """原子地写入草稿索引（调用方需持有 draft_index_lock）"""
+    temp_file = f"{DRAFT_INDEX_FILE}.{os.getpid()}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_file, DRAFT_INDEX_FILE)
+
+
+def rebuild_draft_index(previous: Optional[dict] = None) -> dict:
+    """
+    扫描 drafts 目录重建草稿索引
+
+    配置文件的修改时间和大小与旧索引一致的条目直接复用，只有新增或
+    变化的草稿才会读取配置文件。调用方需持有 draft_index_lock。
+
+    Args:
+        previous: 旧索引，用于复用未变化的条目
+
+    Returns:
+        重建后的索引
+    """
+    drafts_dir = os.path.join("/tmp", "jianying_assistant", "drafts")
+    # 在列目录之前记录修改时间：扫描期间的并发变化会在下次读取时触发重建
+    dir_mtime_ns = get_drafts_dir_mtime_ns()
+
+    if not dir_mtime_ns:
+        return {"version": DRAFT_INDEX_VERSION, "dir_mtime_ns": 0, "drafts": {}}
+
+    previous_entries = (previous or {}).get("drafts", {})
+    entries = {}
+    for item in os.listdir(drafts_dir):
+        if not validate_uuid_format(item):
+            continue
+
+        # 一次 stat 同时确认目录和配置文件存在
+        config_file = os.path.join(drafts_dir, item, "draft_config.json")
+        try:
+            stat = os.stat(config_file)
+        except OSError:
+            continue
+
+        entry = previous_entries.get(item)
+        if entry and entry.get("modified") == stat.st_mtime and entry.get("size") == stat.st_size:
+            entries[item] = entry
+            continue
+
+        created, status = 0.0, ""
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            created = config.get("created_timestamp", 0.0)
+            status = config.get("status", "")
+        except Exception:
+            pass
+
+        entries[item] = {
+            "created": created,
+            "modified": stat.st_mtime,
+            "status": status,
+            "size": stat.st_size
+        }
+
+    index = {"version": DRAFT_INDEX_VERSION, "dir_mtime_ns": dir_mtime_ns, "drafts": entries}
+    write_draft_index(index)
+    return index
+
+
+def load_draft_index() -> dict:
+    """
+    加载草稿索引，索引过期时重建
+
+    create_draft 在新建草稿时同步更新索引记录的目录修改时间，因此只要
+    drafts 目录没有被工具以外的方式修改，一次读取加一次 stat 即可得到
+    全部草稿，无需扫描目录。
+
+    Returns:
+        {"version", "dir_mtime_ns", "drafts": {draft_id: {"created", "modified", "status", "size"}}}
+    """
+    index = read_draft_index()
+    if index is not None and index.get("dir_mtime_ns") == get_drafts_dir_mtime_ns():
+        return index
+
+    with draft_index_lock():
+        # 等待锁期间其他进程可能已经完成重建
+        index = read_draft_index() or index
+        if index is not None and index.get("dir_mtime_ns") == get_drafts_dir_mtime_ns():
+            return index
+        return rebuild_draft_index(index)
+
+
+def remove_draft_index_entries(draft_ids: List[str], dir_mtime_before: int) -> None:
+    """
+    从草稿索引中移除已删除的草稿
+
+    仅当删除前索引与目录一致时才更新记录的目录修改时间，否则保留旧值，
+    让下次读取时重建索引。失败时静默忽略。
+
+    Args:
+        draft_ids: 已删除的草稿 ID 列表
+        dir_mtime_before: 删除前 drafts 目录的修改时间（纳秒）
+    """
+    try:
+        with draft_index_lock():
+            index = read_draft_index()
+            if index is None:
+                return
+            for draft_id in draft_ids:
+                index["drafts"].pop(draft_id, None)
+            if index.get("dir_mtime_ns") == dir_mtime_before:
+                index["dir_mtime_ns"] = get_drafts_dir_mtime_ns()
+            write_draft_index(index)
+    except Exception:
+        pass
+
+
 def discover_all_drafts() -> List[str]:
     """
     Discover all draft IDs in the drafts directory
+
+    从草稿索引读取，索引缺失或过期时才扫描目录。
     
     Returns:
         List of draft UUID strings found in the directory
     """
-    drafts_dir = os.path.join("/tmp", "jianying_assistant", "drafts")
-    
-    if not os.path.exists(drafts_dir):
-        return []
-    
-    draft_ids = []
     try:
-        # List all directories in the drafts folder
-        for item in os.listdir(drafts_dir):
-            item_path = os.path.join(drafts_dir, item)
-            # Check if it's a directory and has a valid UUID format
-            if os.path.isdir(item_path) and validate_uuid_format(item):
-                # Check if it has a draft_config.json file
-                config_file = os.path.join(item_path, "draft_config.json")
-                if os.path.exists(config_file):
-                    draft_ids.append(item)
+        return list(load_draft_index()["drafts"])
     except Exception:
         # Return empty list if there's any error accessing the directory
         return []
-    
-    return draft_ids
 
 
 def cleanup_draft_files(draft_id: str) -> tuple[bool, str]:
@@ -193,17 +585,28 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
     try:
         # 处理 export_all 模式
         export_all = getattr(args.input, 'export_all', None) or False
+        draft_index = None
         
         if export_all:
-            # Discover all drafts in the directory
-            draft_ids = discover_all_drafts()
+            # Discover all drafts from the draft index
+            try:
+                draft_index = load_draft_index()
+                draft_ids = list(draft_index["drafts"])
+            except Exception:
+                draft_ids = []
             if logger:
                 logger.info(f"Export all mode: discovered {len(draft_ids)} drafts")
         else:
             # Normalize and validate input
             draft_ids = normalize_draft_ids(args.input.draft_ids)
         
-        if not draft_ids:
+        # 分页模式：任一分页参数被设置即启用
+        page_size = getattr(args.input, 'page_size', None)
+        cursor = getattr(args.input, 'cursor', None)
+        modified_since = getattr(args.input, 'modified_since', None)
+        paginate = page_size is not None or bool(cursor) or modified_since is not None
+        
+        if not draft_ids and not (paginate and export_all):
             if export_all:
                 message = "未找到任何草稿文件"
             else:
@@ -235,6 +638,53 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
                     "message": f"无效的UUID格式: {', '.join(invalid_uuids)}"
                 }
         
+        output_file = getattr(args.input, 'output_file', None) or ""
+        if output_file:
+            try:
+                output_file = resolve_output_file(output_file)
+            except ValueError as e:
+                if logger:
+                    logger.error(str(e))
+                return {
+                    "draft_data": "",
+                    "exported_count": 0,
+                    "success": False,
+                    "message": str(e)
+                }
+        
+        next_cursor = ""
+        has_more = False
+        if paginate:
+            try:
+                draft_ids, next_cursor, has_more = paginate_draft_ids(
+                    draft_ids, page_size=page_size, cursor=cursor, modified_since=modified_since,
+                    draft_index=draft_index
+                )
+            except ValueError as e:
+                if logger:
+                    logger.error(f"Invalid pagination parameters: {str(e)}")
+                return {
+                    "draft_data": "",
+                    "exported_count": 0,
+                    "success": False,
+                    "message": str(e)
+                }
+            
+            if logger:
+                logger.info(f"Paginated export: {len(draft_ids)} draft(s) in page, has_more={has_more}")
+            
+            if not draft_ids:
+                # 增量拉取时没有新草稿属于正常情况
+                return {
+                    "draft_data": "",
+                    "exported_count": 0,
+                    "success": True,
+                    "message": "没有符合条件的草稿",
+                    "output_file": "",
+                    "next_cursor": next_cursor,
+                    "has_more": False
+                }
+        
         if logger:
             logger.info(f"Processing {len(draft_ids)} draft(s): {draft_ids}")
         
@@ -242,9 +692,7 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
         loaded_configs = []
         failed_drafts = []
         
-        for draft_id in draft_ids:
-            success, config, error_msg = load_draft_config(draft_id)
-            
+        for draft_id, success, config, error_msg in load_draft_configs(draft_ids):
             if success:
                 loaded_configs.append(config)
                 if logger:
@@ -267,12 +715,21 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
             }
         
         # Create draft generator data structure
+        compact_output = getattr(args.input, 'compact_output', None) or False
         try:
             draft_generator_data = create_draft_generator_data(loaded_configs)
-            draft_json_string = json.dumps(draft_generator_data, ensure_ascii=False, indent=2)
             
-            if logger:
-                logger.info(f"Created draft generator data, size: {len(draft_json_string)} characters")
+            if output_file:
+                # 流式写入文件，不在内存中构建完整字符串
+                chunks = iter_draft_generator_json(draft_generator_data, compact=compact_output)
+                written_bytes = write_draft_data_file(output_file, chunks)
+                draft_json_string = ""
+                if logger:
+                    logger.info(f"Streamed draft generator data to {output_file}, size: {written_bytes} bytes")
+            else:
+                draft_json_string = build_draft_generator_json(draft_generator_data, compact=compact_output)
+                if logger:
+                    logger.info(f"Created draft generator data, size: {len(draft_json_string)} characters")
                 
         except Exception as e:
             if logger:
@@ -290,6 +747,8 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
             if logger:
                 logger.info("Cleaning up temporary files")
             
+            dir_mtime_before = get_drafts_dir_mtime_ns()
+            removed_drafts = []
             for draft_id in draft_ids:
                 if draft_id in [config['draft_id'] for config in loaded_configs]:
                     # Only clean up successfully loaded drafts
@@ -299,8 +758,12 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
                         if logger:
                             logger.warning(f"Failed to cleanup draft {draft_id}: {error_msg}")
                     else:
+                        removed_drafts.append(draft_id)
                         if logger:
                             logger.info(f"Cleaned up draft: {draft_id}")
+            
+            if removed_drafts:
+                remove_draft_index_entries(removed_drafts, dir_mtime_before)
         
         # Prepare success message
         exported_count = len(loaded_configs)
@@ -311,6 +774,9 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
         if failed_drafts:
             message_parts.append(f"失败 {len(failed_drafts)} 个: {'; '.join(failed_drafts)}")
         
+        if output_file:
+            message_parts.append(f"数据已写入 {output_file}")
+        
         if cleanup_failures:
             message_parts.append(f"清理失败: {'; '.join(cleanup_failures)}")
         elif args.input.remove_temp_files and exported_count > 0:
@@ -325,7 +791,10 @@ def handler(args: Args[Input]) -> Dict[str, Any]:
             "draft_data": draft_json_string,
             "exported_count": exported_count,
             "success": True,
-            "message": success_message
+            "message": success_message,
+            "output_file": output_file,
+            "next_cursor": next_cursor,
+            "has_more": has_more
         }
         
     except Exception as e:
@@ -5,26 +5,106 @@ This tool analyzes audio/video files from URLs and returns timeline information
 including individual and cumulative durations.
 """
 
+import io
 import os
+import time
+import struct
 import tempfile
+import threading
 import requests
-from typing import List, Dict, Any, NamedTuple
-from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, NamedTuple, Optional, Callable, Union, FrozenSet, Tuple
+from calendar import timegm
+from urllib.parse import urlparse, parse_qsl, urlencode
 import json
 
-# Import pymediainfo for media analysis
+# pymediainfo 仅作为内置容器解析器不支持的格式的后备
 try:
     from pymediainfo import MediaInfo
 except ImportError:
     MediaInfo = None
 
+try:
+    import fcntl
+except ImportError:  # Windows 等平台没有 fcntl，退化为无锁写入
+    fcntl = None
+
 from runtime import Args
 
 
+# 并发探测链接时的最大线程数（探测为网络 I/O 密集型操作）
+MAX_PROBE_WORKERS = 8
+
+# 分段探测：每次 Range 请求读取的字节数、单个链接的最大请求次数，以及跟随 MP4 顶层 box 的最大次数
+PROBE_RANGE_BYTES = 64 * 1024
+PROBE_MAX_FETCHES = 4
+PROBE_MAX_BOXES = 32
+
+# 完整下载时，不超过此大小的内容保存在内存中直接解析，超过时才写入临时文件
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# 时长缓存：保存在 /tmp 中跨调用复用，条目超过 TTL 后用 1 字节的 Range 请求按 ETag/大小重新验证
+DURATION_CACHE_FILE = os.path.join("/tmp", "jianying_assistant", "media_duration_cache.json")
+DURATION_CACHE_TTL_SECONDS = 7 * 24 * 3600
+DURATION_CACHE_MAX_ENTRIES = 5000
+
+# 缓存键去掉了签名参数的条目（签名 URL）只在这段时间内直接使用：同一路径可能以新的签名
+# 重新上传为不同的文件，超过后用 ETag/大小重新验证，验证不了时重新探测
+SIGNED_URL_CACHE_TTL_SECONDS = 60
+
+# 签名 URL 规范化：生成缓存键时移除以下查询参数（不区分大小写），
+# 同一文件重新签名后路径不变、只有签名参数变化，仍能命中缓存。
+# 调用方可以通过 Input.cache_ignore_params 替换这组规则（见 build_cache_key_rule）
+SIGNED_URL_QUERY_PARAMS = {
+    'x-expires', 'x-signature', 'expires', 'signature', 'sign', 'auth_key',
+    'token', 'policy', 'key-pair-id', 'ossaccesskeyid', 'security-token'
+}
+SIGNED_URL_QUERY_PREFIXES = ('x-amz-', 'x-oss-', 'x-tos-', 'x-goog-')
+
+# 签名 URL 过期时间：直接给出过期时间戳的查询参数，以及成对出现的 (签名时间, 有效秒数) 参数（小写）
+EXPIRES_AT_PARAMS = ('x-expires', 'expires')
+SIGNED_DATE_PARAMS = (
+    ('x-amz-date', 'x-amz-expires'),
+    ('x-tos-date', 'x-tos-expires'),
+)
+
+# 下载请求头策略，前一种失败时依次尝试下一种
+DOWNLOAD_HEADER_STRATEGIES = [
+    # Strategy 1: Comprehensive modern browser headers
+    {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'audio/*,video/*,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7',
+        'Accept-Encoding': 'identity',
+        'Connection': 'keep-alive',
+        'Sec-Fetch-Dest': 'audio',
+        'Sec-Fetch-Mode': 'cors',
+        'Sec-Fetch-Site': 'cross-site',
+        'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+        'sec-ch-ua-mobile': '?0',
+        'sec-ch-ua-platform': '"Windows"'
+    },
+    {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': '*/*',
+        'Accept-Language': 'en-US,en;q=0.9',
+        'Accept-Encoding': 'identity'
+    },
+    {
+        'User-Agent': 'curl/7.68.0',
+        'Accept': '*/*'
+    }
+]
+
+
 # Input/Output 类型定义（每个 Coze 工具都需要）
 class Input(NamedTuple):
     """输入参数 for get_media_duration tool"""
     links: List[str]  # List of media file URLs to analyze
+    use_cache: bool = True  # 是否使用持久化的时长缓存
+    # 生成缓存键时忽略的查询参数名（不区分大小写，以 * 结尾表示前缀），
+    # None 时使用 SIGNED_URL_QUERY_PARAMS / SIGNED_URL_QUERY_PREFIXES，空列表表示不忽略任何参数
+    cache_ignore_params: Optional[List[str]] = None
 
 
 class Output(NamedTuple):
@@ -52,30 +132,13 @@ def handle_volcano_tts_url(url: str, logger=None) -> dict:
     """
     Special handling for Volcano Engine TTS URLs
     
+    过期检查由 probe_media_duration 通过 get_signed_url_expiry 统一完成
+    
     Returns:
         Dict with success status and any extracted info
     """
-    from urllib.parse import urlparse, parse_qs
-    import time
-    
     try:
         parsed = urlparse(url)
-        params = parse_qs(parsed.query)
-        
-        # Check if URL has expired
-        expires = params.get('x-expires', [None])[0]
-        if expires:
-            expires_timestamp = int(expires)
-            current_timestamp = int(time.time())
-            
-            if expires_timestamp < current_timestamp:
-                if logger:
-                    logger.warning(f"Volcano TTS URL has expired. Expired {current_timestamp - expires_timestamp} seconds ago")
-                return {
-                    'success': False,
-                    'error': 'signed_url_expired',
-                    'message': f'TTS URL expired {current_timestamp - expires_timestamp} seconds ago'
-                }
         
         # Extract any useful metadata from the URL
         filename = parsed.path.split('/')[-1]
@@ -86,7 +149,7 @@ def handle_volcano_tts_url(url: str, logger=None) -> dict:
             'success': True,
             'filename': filename,
             'service': 'volcano_tts',
-            'expires': expires
+            'expires': get_signed_url_expiry(url)
         }
         
     except Exception as e:
@@ -97,180 +160,657 @@ def handle_volcano_tts_url(url: str, logger=None) -> dict:
         }
 
 
-def check_media_url_accessibility(url: str, timeout: int = 10) -> dict:
+def get_signed_url_expiry(url: str) -> Optional[float]:
+    """
+    解析签名 URL 查询参数中的过期时间（为 Coze 工具独立性在此重复定义，见 src/utils/signed_url.py）
+
+    支持 x-expires / Expires 时间戳（火山引擎 TTS、OSS、CloudFront），
+    以及 X-Amz-Date + X-Amz-Expires、X-Tos-Date + X-Tos-Expires 形式的签名。
+
+    Returns:
+        过期时间戳（秒），没有过期时间时为 None
+    """
+    try:
+        params = {name.lower(): value for name, value in parse_qsl(urlparse(url).query)}
+    except (TypeError, ValueError):
+        return None
+    
+    for name in EXPIRES_AT_PARAMS:
+        value = params.get(name, '')
+        if value.isdigit():
+            return float(value)
+    
+    for date_name, expires_name in SIGNED_DATE_PARAMS:
+        date_value = params.get(date_name, '')
+        expires_value = params.get(expires_name, '')
+        if date_value and expires_value.isdigit():
+            try:
+                signed_at = timegm(time.strptime(date_value, '%Y%m%dT%H%M%SZ'))
+            except ValueError:
+                continue
+            return float(signed_at + int(expires_value))
+    
+    return None
+
+
+def build_download_headers(url: str, base_headers: Dict[str, str]) -> Dict[str, str]:
+    """
+    在基础请求头上添加针对 CDN 的请求头
+
+    Args:
+        url: 媒体文件 URL
+        base_headers: DOWNLOAD_HEADER_STRATEGIES 中的一种
+
+    Returns:
+        新的请求头字典
     """
-    Check if a media URL is accessible and get basic info
+    headers = base_headers.copy()
     
+    # Add CDN-specific headers based on URL
+    if 'oceancloudapi.com' in url or 'volccdn.com' in url or 'bytedance.com' in url:
+        headers['Referer'] = 'https://www.coze.cn/'
+        headers['Origin'] = 'https://www.coze.cn'
+    
+        # Special handling for Volcano TTS URLs
+        if 'VolcanoUserVoice' in url or 'speech_' in url:
+            headers['Accept'] = 'audio/mpeg,audio/*,*/*;q=0.9'
+            headers['Accept-Language'] = 'zh-CN,zh;q=0.9,en;q=0.8'
+            headers['Cache-Control'] = 'no-cache'
+            headers['Pragma'] = 'no-cache'
+            # Preserve all query parameters exactly as provided
+            headers['Connection'] = 'keep-alive'
+    
+    elif 'amazonaws.com' in url or 'cloudfront.net' in url:
+        headers['Referer'] = 'https://aws.amazon.com/'
+    elif 'googleapis.com' in url or 'gstatic.com' in url:
+        headers['Referer'] = 'https://cloud.google.com/'
+    
+    return headers
+
+
+def describe_download_error(url: str, error: Exception) -> Exception:
+    """
+    将请求错误转换为带有排查提示的异常
+
+    Args:
+        url: 媒体文件 URL
+        error: 原始异常
+
+    Returns:
+        新的异常对象
+    """
+    error_msg = str(error)
+    if "403" in error_msg or "Forbidden" in error_msg:
+        if is_volcano_tts_url(url):
+            return Exception(f"Access denied to Volcano TTS URL: {url}. This signed URL may have expired, require re-authentication, or need to be accessed from the original Coze session. Original error: {error_msg}")
+        else:
+            return Exception(f"Access denied to {url}. This may be a signed URL that requires specific authentication or has expired. Original error: {error_msg}")
+    elif "404" in error_msg or "Not Found" in error_msg:
+        return Exception(f"Media file not found at {url}. Please verify the URL is correct and accessible.")
+    elif "timeout" in error_msg.lower():
+        return Exception(f"Download timeout for {url}. The file may be too large or the server is slow to respond.")
+    else:
+        return Exception(f"Failed to download {url}: {error_msg}")
+
+
+def open_media_stream(url: str, timeout: int = 30, range_bytes: Optional[int] = None):
+    """
+    发起流式 GET 请求，其状态码和响应头同时作为可访问性检查
+
+    仅在返回 403 时依次尝试 DOWNLOAD_HEADER_STRATEGIES 中的其他请求头；
+    404、其他错误状态、连接失败和超时立即失败，不再重试。
+
     Args:
         url: 媒体文件 URL
         timeout: Request timeout
-        
+        range_bytes: 只请求文件开头的字节数（Range），服务器不支持时返回完整内容（200）
+
     Returns:
-        Dict with accessibility info and content details
+        状态码为 200 或 206 的 requests 响应，由调用方关闭
+
+    Raises:
+        Exception: 请求失败时，消息中包含排查提示
     """
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': '*/*'
-        }
+    if not validate_url(url):
+        raise ValueError(f"Invalid URL: {url}")
+    
+    for i, base_headers in enumerate(DOWNLOAD_HEADER_STRATEGIES):
+        headers = build_download_headers(url, base_headers)
+        if range_bytes:
+            headers['Range'] = f'bytes=0-{range_bytes - 1}'
         
-        # Add CDN-specific headers
-        if 'oceancloudapi.com' in url or 'volccdn.com' in url or 'bytedance.com' in url:
-            headers['Referer'] = 'https://www.coze.cn/'
-            headers['Origin'] = 'https://www.coze.cn'
-            
-            # Special handling for Volcano TTS URLs
-            if 'VolcanoUserVoice' in url or 'speech_' in url:
-                headers['Accept'] = 'audio/mpeg,audio/*,*/*;q=0.9'
-                headers['Accept-Language'] = 'zh-CN,zh;q=0.9,en;q=0.8'
-                headers['Cache-Control'] = 'no-cache'
-                headers['Pragma'] = 'no-cache'
+        try:
+            response = requests.get(url, headers=headers, timeout=timeout, stream=True)
+        except requests.exceptions.RequestException as e:
+            raise describe_download_error(url, e)
         
-        response = requests.head(url, headers=headers, timeout=timeout)
+        if response.status_code == 403 and i < len(DOWNLOAD_HEADER_STRATEGIES) - 1:
+            response.close()
+            continue  # Try next strategy
         
-        return {
-            'accessible': response.status_code == 200,
-            'status_code': response.status_code,
-            'content_type': response.headers.get('content-type', 'unknown'),
-            'content_length': response.headers.get('content-length'),
-            'headers': dict(response.headers)
-        }
-    except Exception as e:
-        return {
-            'accessible': False,
-            'error': str(e),
-            'status_code': None
-        }
+        try:
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            response.close()
+            raise describe_download_error(url, e)
+        return response
 
 
-def download_media_file(url: str, timeout: int = 30) -> str:
+def download_media_file(url: str, timeout: int = 30, response=None) -> Union[bytes, str]:
     """
-    Download media file to temporary location for analysis
+    Download media file for analysis
+    
+    内容不超过 SPOOL_MAX_BYTES 时保存在内存中（常见的 TTS 短音频），
+    超过时才写入临时文件，由调用方通过 cleanup_temp_file 删除。
     
     Args:
         url: 媒体文件 URL
         timeout: Download timeout in seconds
+        response: 可选，open_media_stream 已返回的完整内容响应（200），省略时重新请求
         
     Returns:
-        Path to downloaded temporary file
+        文件内容（bytes），或大文件的临时文件路径（str）
         
     Raises:
         Exception: If download fails
     """
-    if not validate_url(url):
-        raise ValueError(f"Invalid URL: {url}")
+    if response is None:
+        response = open_media_stream(url, timeout)
     
-    # Create temporary file
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.tmp')
-    temp_path = temp_file.name
-    temp_file.close()
+    buffer = bytearray()
+    temp_file = None
     
     try:
-        # Try downloading with different header strategies
-        success = False
-        last_error = None
-        
-        # Strategy 1: Comprehensive modern browser headers
-        headers_strategies = [
-            {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'audio/*,video/*,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7',
-                'Accept-Encoding': 'identity',
-                'Connection': 'keep-alive',
-                'Sec-Fetch-Dest': 'audio',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'cross-site',
-                'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-                'sec-ch-ua-mobile': '?0',
-                'sec-ch-ua-platform': '"Windows"'
-            },
-            {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': '*/*',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'identity'
-            },
-            {
-                'User-Agent': 'curl/7.68.0',
-                'Accept': '*/*'
-            }
-        ]
-        
-        for i, base_headers in enumerate(headers_strategies):
-            try:
-                headers = base_headers.copy()
-                
-                # Add CDN-specific headers based on URL
-                if 'oceancloudapi.com' in url or 'volccdn.com' in url or 'bytedance.com' in url:
-                    headers['Referer'] = 'https://www.coze.cn/'
-                    headers['Origin'] = 'https://www.coze.cn'
-                    
-                    # Special handling for Volcano TTS URLs
-                    if 'VolcanoUserVoice' in url or 'speech_' in url:
-                        headers['Accept'] = 'audio/mpeg,audio/*,*/*;q=0.9'
-                        headers['Accept-Language'] = 'zh-CN,zh;q=0.9,en;q=0.8'
-                        headers['Cache-Control'] = 'no-cache'
-                        headers['Pragma'] = 'no-cache'
-                        # Preserve all query parameters exactly as provided
-                        headers['Connection'] = 'keep-alive'
-                        
-                elif 'amazonaws.com' in url or 'cloudfront.net' in url:
-                    headers['Referer'] = 'https://aws.amazon.com/'
-                elif 'googleapis.com' in url or 'gstatic.com' in url:
-                    headers['Referer'] = 'https://cloud.google.com/'
-                
-                response = requests.get(url, headers=headers, timeout=timeout, stream=True)
-                response.raise_for_status()
-                
-                # If we get here, download was successful
-                success = True
-                break
-                
-            except requests.exceptions.RequestException as e:
-                last_error = e
-                if i < len(headers_strategies) - 1:
-                    continue  # Try next strategy
-                else:
-                    break  # All strategies failed
-        
-        if not success:
-            raise last_error or Exception("All download strategies failed")
+        content_length = response.headers.get('content-length', '')
+        spill = content_length.isdigit() and int(content_length) > SPOOL_MAX_BYTES
         
-        # Write to temporary file
-        with open(temp_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            if not chunk:
+                continue
+            if temp_file:
+                temp_file.write(chunk)
+                continue
+            buffer += chunk
+            if spill or len(buffer) > SPOOL_MAX_BYTES:
+                # Large file: move what we have to a temporary file
+                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.tmp')
+                temp_file.write(buffer)
+                buffer = bytearray()
         
-        return temp_path
+        if temp_file:
+            temp_file.close()
+            return temp_file.name
+        return bytes(buffer)
         
     except Exception as e:
         # Clean up temporary file on error
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        
-        # Provide more specific error messages
-        error_msg = str(e)
-        if "403" in error_msg or "Forbidden" in error_msg:
-            if is_volcano_tts_url(url):
-                raise Exception(f"Access denied to Volcano TTS URL: {url}. This signed URL may have expired, require re-authentication, or need to be accessed from the original Coze session. Original error: {error_msg}")
+        if temp_file:
+            temp_file.close()
+            cleanup_temp_file(temp_file.name)
+        raise describe_download_error(url, e)
+    finally:
+        response.close()
+
+
+def read_range_response(response, length: int) -> tuple[bytes, Optional[int], Optional[str]]:
+    """
+    读取 206 响应的内容和 Content-Range 中的文件总大小
+
+    Args:
+        response: 状态码为 206 的流式响应
+        length: 读取的最大字节数
+
+    Returns:
+        (data, total_size, etag)，total_size 未知时为 None
+    """
+    chunks = []
+    received = 0
+    for chunk in response.iter_content(chunk_size=8192):
+        chunks.append(chunk)
+        received += len(chunk)
+        if received >= length:
+            break
+    
+    total_size = None
+    content_range = response.headers.get('content-range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[1].strip()
+        if total.isdigit():
+            total_size = int(total)
+    
+    return b''.join(chunks)[:length], total_size, response.headers.get('etag')
+
+
+def fetch_byte_range(url: str, start: int, length: int,
+                     timeout: int = 10) -> Optional[tuple[bytes, Optional[int], Optional[str]]]:
+    """
+    通过 HTTP Range 请求读取文件的一段字节
+
+    Args:
+        url: 媒体文件 URL
+        start: 起始偏移
+        length: 读取的最大字节数
+        timeout: Request timeout
+
+    Returns:
+        (data, total_size, etag)，total_size 来自 Content-Range，未知时为 None；
+        服务器不支持 Range（未返回 206）时为 None
+    """
+    headers = build_download_headers(url, DOWNLOAD_HEADER_STRATEGIES[0])
+    headers['Range'] = f'bytes={start}-{start + length - 1}'
+    
+    response = requests.get(url, headers=headers, timeout=timeout, stream=True)
+    try:
+        if response.status_code != 206:
+            return None
+        return read_range_response(response, length)
+    finally:
+        response.close()
+
+
+def make_range_reader(url: str, head: bytes, total_size: Optional[int]) -> Callable[[int, int], bytes]:
+    """
+    创建基于 HTTP Range 的 read_at(offset, length) 读取函数
+
+    已读取的数据块会被缓存，每次新请求至少读取 PROBE_RANGE_BYTES，
+    总请求次数不超过 PROBE_MAX_FETCHES。读取失败时返回空字节串。
+
+    Args:
+        url: 媒体文件 URL
+        head: 已读取的文件开头
+        total_size: 文件总大小（可能未知）
+    """
+    blocks = [(0, head)]
+    
+    def read_at(offset: int, length: int) -> bytes:
+        for start, data in blocks:
+            end = start + len(data)
+            if start <= offset and (offset + length <= end or end == total_size):
+                return data[offset - start:offset - start + length]
+        
+        if len(blocks) > PROBE_MAX_FETCHES or (total_size is not None and offset >= total_size):
+            return b''
+        fetched = fetch_byte_range(url, offset, max(length, PROBE_RANGE_BYTES))
+        if not fetched:
+            return b''
+        blocks.append((offset, fetched[0]))
+        return fetched[0][:length]
+    
+    return read_at
+
+
+def read_mp4_box_header(data: bytes, offset: int) -> Optional[tuple[int, bytes, int]]:
+    """
+    读取 MP4 box 头
+
+    Returns:
+        (box_size, box_type, header_size)，数据不足时为 None；
+        box_size 为 0 表示该 box 延伸到文件末尾
+    """
+    if offset + 8 > len(data):
+        return None
+    size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+    if size == 1:
+        if offset + 16 > len(data):
+            return None
+        size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+        return size, box_type, 16
+    return size, box_type, 8
+
+
+def parse_mp4_mvhd_duration(moov_body: bytes) -> Optional[int]:
+    """
+    从 moov box 内容中读取 mvhd 的时长
+
+    Args:
+        moov_body: moov box 头之后的字节（可以被截断，只要包含完整的 mvhd）
+
+    Returns:
+        时长（毫秒），找不到 mvhd 时为 None
+    """
+    offset = 0
+    while True:
+        header = read_mp4_box_header(moov_body, offset)
+        if header is None:
+            return None
+        size, box_type, header_size = header
+        if box_type == b'mvhd':
+            body = moov_body[offset + header_size:]
+            if body[:1] == b'\x01':
+                # version 1: 64 位创建/修改时间和时长
+                if len(body) < 32:
+                    return None
+                timescale, duration = struct.unpack('>IQ', body[20:32])
             else:
-                raise Exception(f"Access denied to {url}. This may be a signed URL that requires specific authentication or has expired. Original error: {error_msg}")
-        elif "404" in error_msg or "Not Found" in error_msg:
-            raise Exception(f"Media file not found at {url}. Please verify the URL is correct and accessible.")
-        elif "timeout" in error_msg.lower():
-            raise Exception(f"Download timeout for {url}. The file may be too large or the server is slow to respond.")
-        else:
-            raise Exception(f"Failed to download {url}: {error_msg}")
+                if len(body) < 20:
+                    return None
+                timescale, duration = struct.unpack('>II', body[12:20])
+            if not timescale:
+                return None
+            return duration * 1000 // timescale
+        if size < header_size:
+            return None
+        offset += size
+
+
+def parse_mp4_duration(read_at: Callable[[int, int], bytes], total_size: Optional[int]) -> Optional[int]:
+    """
+    沿 MP4/MOV 顶层 box 跳转读取 moov/mvhd 中的时长
+
+    moov 位于文件末尾（mdat 之后）时，根据 mdat 的大小直接定位到 moov，
+    不需要读取中间的媒体数据。
+
+    Returns:
+        时长（毫秒），找不到 moov/mvhd 时为 None
+    """
+    offset = 0
+    for _ in range(PROBE_MAX_BOXES):
+        if total_size is not None and offset >= total_size:
+            return None
+        
+        header = read_mp4_box_header(read_at(offset, 16), 0)
+        if header is None:
+            return None
+        
+        size, box_type, header_size = header
+        if box_type == b'moov':
+            body_size = size - header_size if size else PROBE_RANGE_BYTES
+            return parse_mp4_mvhd_duration(read_at(offset + header_size, min(body_size, PROBE_RANGE_BYTES)))
+        
+        if size < header_size:
+            # size 为 0 表示该 box 延伸到文件末尾，后面不会再有 moov
+            return None
+        offset += size
+    
+    return None
+
+
+def parse_wav_duration(data: bytes, total_size: Optional[int] = None) -> Optional[int]:
+    """
+    从 WAV 文件头的 fmt/data chunk 计算时长
+
+    Args:
+        data: 文件开头的字节
+        total_size: 文件总大小，data chunk 未写入长度时用于估算
+
+    Returns:
+        时长（毫秒），不是 WAV 或信息不足时为 None
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+    
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack('<4sI', data[offset:offset + 8])
+        body = offset + 8
+        if chunk_id == b'fmt ' and body + 12 <= len(data):
+            byte_rate = struct.unpack('<I', data[body + 8:body + 12])[0]
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            if chunk_size in (0, 0xFFFFFFFF) and total_size:
+                # 流式写入的 WAV 可能没有回填 data 长度
+                chunk_size = total_size - body
+            return chunk_size * 1000 // byte_rate
+        # chunk 按 2 字节对齐
+        offset = body + chunk_size + (chunk_size & 1)
+    
+    return None
+
+
+def parse_flac_duration(data: bytes) -> Optional[int]:
+    """
+    从 FLAC 的 STREAMINFO 元数据块计算时长
+
+    STREAMINFO 必须是第一个元数据块，其中包含采样率和总采样数。
+
+    Returns:
+        时长（毫秒），总采样数未知时为 None
+    """
+    if len(data) < 42 or data[:4] != b'fLaC' or data[4] & 0x7F != 0:
+        return None
+    
+    # STREAMINFO 第 10-17 字节：采样率(20 bit) | 声道(3) | 位深(5) | 总采样数(36)
+    packed = int.from_bytes(data[18:26], 'big')
+    sample_rate = packed >> 44
+    total_samples = packed & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples * 1000 // sample_rate
+
+
+def parse_ogg_duration(read_at: Callable[[int, int], bytes], head: bytes,
+                       total_size: Optional[int]) -> Optional[int]:
+    """
+    从 OGG（Vorbis/Opus）最后一页的 granule position 计算时长
+
+    采样率取自第一页的识别头，Opus 固定为 48 kHz 并扣除 pre-skip。
+
+    Returns:
+        时长（毫秒），编码不支持或找不到最后一页时为 None
+    """
+    if len(head) < 28 or head[:4] != b'OggS' or not total_size:
+        return None
+    
+    segment_count = head[26]
+    packet = head[27 + segment_count:]
+    pre_skip = 0
+    if packet[:7] == b'\x01vorbis' and len(packet) >= 16:
+        sample_rate = struct.unpack('<I', packet[12:16])[0]
+    elif packet[:8] == b'OpusHead' and len(packet) >= 12:
+        sample_rate = 48000
+        pre_skip = struct.unpack('<H', packet[10:12])[0]
+    else:
+        return None
+    if not sample_rate:
+        return None
+    
+    tail_start = max(0, total_size - PROBE_RANGE_BYTES)
+    tail = read_at(tail_start, total_size - tail_start)
+    page = tail.rfind(b'OggS')
+    if page < 0 or page + 14 > len(tail):
+        return None
+    
+    granule = struct.unpack('<q', tail[page + 6:page + 14])[0]
+    if granule <= pre_skip:
+        return None
+    return (granule - pre_skip) * 1000 // sample_rate
+
+
+# MP3 帧头查找表：按 (MPEG 版本, 层) 索引的码率 (kbps)，以及按版本索引的采样率
+MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+
+def parse_mp3_frame_header(data: bytes, offset: int) -> Optional[Dict[str, Any]]:
+    """
+    解析 MP3 帧头
+
+    Returns:
+        包含 version、bitrate、sample_rate、samples、frame_length、side_info 的字典，
+        不是有效帧头时为 None
+    """
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version = {3: 1, 2: 2, 0: 2.5}.get((b1 >> 3) & 0x03)
+    layer = {3: 1, 2: 2, 1: 3}.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    
+    bitrate = MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_index]
+    sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    mono = (b3 >> 6) == 3
+    
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or version == 1 else 576
+        frame_length = samples // 8 * bitrate * 1000 // sample_rate + padding
+    
+    if version == 1:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    
+    return {
+        'version': version,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'samples': samples,
+        'frame_length': frame_length,
+        'side_info': side_info
+    }
 
 
-def get_media_duration_ms(file_path: str) -> int:
+def parse_mp3_duration(read_at: Callable[[int, int], bytes], head: bytes,
+                       total_size: Optional[int], allow_scan: bool = False) -> Optional[int]:
     """
-    Get media duration in milliseconds using pymediainfo
+    计算 MP3 时长
+
+    依次尝试：Xing/Info 头中的帧数、VBRI 头中的帧数、逐帧扫描（allow_scan 时）、
+    按首帧码率和文件大小估算（CBR）。
+
+    Args:
+        read_at: read_at(offset, length) 读取函数
+        head: 文件开头的字节
+        total_size: 文件总大小（可能未知）
+        allow_scan: 是否允许读取整个文件逐帧扫描（仅适用于本地数据）
+
+    Returns:
+        时长（毫秒），找不到有效帧时为 None
+    """
+    audio_start = 0
+    if head[:3] == b'ID3' and len(head) >= 10:
+        # ID3v2 标签大小为 syncsafe 整数（每字节 7 位）
+        tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+        audio_start = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+    
+    data = read_at(audio_start, PROBE_RANGE_BYTES)
+    first = None
+    for position in range(max(0, len(data) - 4)):
+        frame = parse_mp3_frame_header(data, position)
+        # 要求下一帧也有效，避免把数据中的 0xFFE 误当作帧头
+        if frame and (position + frame['frame_length'] + 4 > len(data)
+                      or parse_mp3_frame_header(data, position + frame['frame_length'])):
+            first = position
+            break
+    if first is None:
+        return None
+    
+    audio_start += first
+    data = data[first:]
+    
+    # Xing/Info 头位于首帧的 side information 之后，VBRI 头固定在帧头后 32 字节
+    xing = 4 + frame['side_info']
+    frames = None
+    if data[xing:xing + 4] in (b'Xing', b'Info') and len(data) >= xing + 12:
+        flags = struct.unpack('>I', data[xing + 4:xing + 8])[0]
+        if flags & 0x01:
+            frames = struct.unpack('>I', data[xing + 8:xing + 12])[0]
+    elif data[36:40] == b'VBRI' and len(data) >= 54:
+        frames = struct.unpack('>I', data[50:54])[0]
+    if frames:
+        return frames * frame['samples'] * 1000 // frame['sample_rate']
+    
+    if allow_scan:
+        samples = 0
+        offset = audio_start
+        buffer_start, buffer = audio_start, data
+        while True:
+            relative = offset - buffer_start
+            if relative + 4 > len(buffer):
+                buffer_start, buffer = offset, read_at(offset, PROBE_RANGE_BYTES)
+                relative = 0
+            current = parse_mp3_frame_header(buffer, relative)
+            if current is None:
+                break
+            samples += current['samples']
+            offset += current['frame_length']
+        if samples:
+            return samples * 1000 // frame['sample_rate']
+    
+    if total_size and frame['bitrate']:
+        return (total_size - audio_start) * 8 // frame['bitrate']
+    return None
+
+
+def detect_media_format(head: bytes) -> Optional[str]:
+    """
+    根据文件开头的特征字节识别容器格式
+
+    Returns:
+        'mp4'、'wav'、'flac'、'ogg'、'mp3' 之一，无法识别时为 None
+    """
+    if len(head) < 12:
+        return None
+    if head[4:8] == b'ftyp':
+        return 'mp4'
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'wav'
+    if head[:4] == b'fLaC':
+        return 'flac'
+    if head[:4] == b'OggS':
+        return 'ogg'
+    if head[:3] == b'ID3' or (head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+def parse_media_duration(read_at: Callable[[int, int], bytes], total_size: Optional[int],
+                         allow_scan: bool = False) -> Optional[int]:
+    """
+    使用内置解析器读取媒体时长
+
+    根据文件开头的特征字节选择解析器：MP4/MOV、WAV、FLAC、OGG、MP3。
+    所有解析器只通过 read_at 按需读取，因此同样适用于本地文件、
+    HTTP Range 和内存中的数据。
+
+    Args:
+        read_at: read_at(offset, length) 读取函数，越界时返回较短或空的字节串
+        total_size: 文件总大小（可能未知）
+        allow_scan: 是否允许读取整个文件（MP3 逐帧扫描）
+
+    Returns:
+        时长（毫秒），格式不支持或解析失败时为 None
+    """
+    head = read_at(0, PROBE_RANGE_BYTES)
+    media_format = detect_media_format(head)
+    
+    if media_format == 'mp4':
+        return parse_mp4_duration(read_at, total_size)
+    if media_format == 'wav':
+        return parse_wav_duration(head, total_size)
+    if media_format == 'flac':
+        return parse_flac_duration(head)
+    if media_format == 'ogg':
+        return parse_ogg_duration(read_at, head, total_size)
+    if media_format == 'mp3':
+        return parse_mp3_duration(read_at, head, total_size, allow_scan)
+    return None
+
+
+def get_media_duration_ms(media: Union[bytes, str]) -> int:
+    """
+    Get media duration in milliseconds
+
+    优先使用内置的容器头解析器，不支持的格式再使用 pymediainfo
     
     Args:
-        file_path: Path to media file
+        media: 文件内容（bytes）或媒体文件路径，即 download_media_file 的返回值
         
     Returns:
         时长（毫秒）
@@ -278,20 +818,42 @@ def get_media_duration_ms(file_path: str) -> int:
     Raises:
         Exception: If duration cannot be determined
     """
-    if not MediaInfo:
-        raise Exception("pymediainfo is not available")
+    if isinstance(media, bytes):
+        try:
+            duration_ms = parse_media_duration(
+                lambda offset, length: media[offset:offset + length], len(media), allow_scan=True
+            )
+            if duration_ms is not None:
+                return duration_ms
+        except Exception:
+            pass  # 交给 pymediainfo 处理
+    else:
+        if not os.path.exists(media):
+            raise Exception(f"File not found: {media}")
+        
+        try:
+            with open(media, 'rb') as f:
+                def read_at(offset: int, length: int) -> bytes:
+                    f.seek(offset)
+                    return f.read(length)
+                
+                duration_ms = parse_media_duration(read_at, os.path.getsize(media), allow_scan=True)
+            if duration_ms is not None:
+                return duration_ms
+        except Exception:
+            pass  # 交给 pymediainfo 处理
     
-    if not os.path.exists(file_path):
-        raise Exception(f"File not found: {file_path}")
+    if not MediaInfo:
+        raise Exception("Unsupported media format and pymediainfo is not available")
     
     try:
-        media_info = MediaInfo.parse(file_path)
+        media_info = MediaInfo.parse(io.BytesIO(media) if isinstance(media, bytes) else media)
         
         # Look for duration in video or audio tracks
         duration_ms = None
         
         for track in media_info.tracks:
-            if track.track_type in ['Video', '音频', 'General']:
+            if track.track_type in ['Video', 'Audio', 'General']:
                 if hasattr(track, 'duration') and track.duration:
                     duration_ms = int(float(track.duration))
                     break
@@ -305,6 +867,256 @@ def get_media_duration_ms(file_path: str) -> int:
         raise Exception(f"Failed to analyze media file: {str(e)}")
 
 
+def probe_duration_by_range(url: str, logger=None, media_info: Optional[Dict[str, Any]] = None,
+                            response=None) -> Optional[int]:
+    """
+    只读取文件的部分字节来确定时长
+
+    先请求文件开头，再由内置解析器按需请求其他位置（如位于末尾的 MP4 moov、
+    OGG 最后一页）。服务器不支持 Range、格式不支持或解析失败时返回 None，
+    由调用方完整下载。
+
+    Args:
+        url: 媒体文件 URL
+        logger: 可选的日志记录器
+        media_info: 可选字典，写入读取到的 format、etag 和 content_length，供缓存使用
+        response: 可选，open_media_stream 已返回的 Range 响应，省略时自行请求文件开头
+
+    Returns:
+        时长（毫秒），无法通过分段读取确定时为 None
+    """
+    try:
+        if response is None:
+            fetched = fetch_byte_range(url, 0, PROBE_RANGE_BYTES)
+        elif response.status_code == 206:
+            fetched = read_range_response(response, PROBE_RANGE_BYTES)
+        else:
+            fetched = None
+        if not fetched:
+            if logger:
+                logger.info(f"Range requests not supported for {url}, falling back to full download")
+            return None
+        
+        head, total_size, etag = fetched
+        if media_info is not None:
+            media_info.update(format=detect_media_format(head), etag=etag, content_length=total_size)
+        duration_ms = parse_media_duration(make_range_reader(url, head, total_size), total_size)
+        
+        if duration_ms is not None and logger:
+            logger.info(f"Duration for {url} read from partial fetch")
+        return duration_ms
+    
+    except Exception as e:
+        if logger:
+            logger.info(f"Partial probe failed for {url}: {str(e)}, falling back to full download")
+        return None
+
+
+# 进程内的时长缓存副本，由 _duration_cache_lock 保护
+_duration_cache_lock = threading.Lock()
+_duration_cache: Dict[str, Dict[str, Any]] = {}
+_duration_cache_loaded_mtime = None
+_duration_cache_dirty = False
+
+
+# 缓存键规则：(忽略的参数名, 忽略的参数名前缀)，均为小写
+CacheKeyRule = Tuple[FrozenSet[str], Tuple[str, ...]]
+
+DEFAULT_CACHE_KEY_RULE: CacheKeyRule = (frozenset(SIGNED_URL_QUERY_PARAMS), SIGNED_URL_QUERY_PREFIXES)
+
+
+def build_cache_key_rule(ignore_params: Optional[List[str]]) -> CacheKeyRule:
+    """
+    根据 Input.cache_ignore_params 生成缓存键规则
+
+    None 时使用默认规则；名称以 * 结尾时按前缀匹配（如 "x-amz-*"）。
+    """
+    if ignore_params is None:
+        return DEFAULT_CACHE_KEY_RULE
+    names = set()
+    prefixes = []
+    for param in ignore_params:
+        param = str(param).strip().lower()
+        if param.endswith('*'):
+            if param[:-1]:
+                prefixes.append(param[:-1])
+        elif param:
+            names.add(param)
+    return frozenset(names), tuple(prefixes)
+
+
+def split_cache_key(url: str, rule: Optional[CacheKeyRule] = None) -> Tuple[str, bool]:
+    """
+    生成缓存键，并返回是否去掉了查询参数
+
+    Returns:
+        (规范化 URL, 是否有查询参数按规则被忽略)
+    """
+    names, prefixes = rule or DEFAULT_CACHE_KEY_RULE
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    query = sorted(
+        (name, value) for name, value in params
+        if name.lower() not in names and not name.lower().startswith(prefixes)
+    )
+    key = parsed._replace(netloc=parsed.netloc.lower(), query=urlencode(query), fragment='').geturl()
+    return key, len(query) != len(params)
+
+
+def normalize_media_url(url: str, rule: Optional[CacheKeyRule] = None) -> str:
+    """
+    生成缓存键使用的规范化 URL
+
+    去掉 fragment 和规则中的查询参数（默认为签名相关的 SIGNED_URL_QUERY_PARAMS /
+    SIGNED_URL_QUERY_PREFIXES），其余查询参数按名称排序，主机名转为小写。
+    """
+    return split_cache_key(url, rule)[0]
+
+
+def load_duration_cache() -> None:
+    """从缓存文件加载时长缓存，文件未变化时直接使用进程内副本"""
+    global _duration_cache, _duration_cache_loaded_mtime
+    
+    try:
+        mtime = os.stat(DURATION_CACHE_FILE).st_mtime
+    except OSError:
+        return
+    
+    with _duration_cache_lock:
+        if _duration_cache_dirty or mtime == _duration_cache_loaded_mtime:
+            return
+        try:
+            with open(DURATION_CACHE_FILE, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                _duration_cache = entries
+                _duration_cache_loaded_mtime = mtime
+        except (OSError, ValueError):
+            pass
+
+
+def save_duration_cache() -> None:
+    """
+    将时长缓存写回文件
+
+    在锁文件的独占锁内重新读取缓存文件，与本进程的条目合并（同一键保留 cached_at 较新的条目），
+    并发的工具调用不会丢失彼此写入的条目。只保留最近写入的 DURATION_CACHE_MAX_ENTRIES 个条目，
+    写入采用临时文件 + 重命名。失败时静默忽略，缓存只用于加速。
+    """
+    global _duration_cache_dirty, _duration_cache_loaded_mtime
+    
+    with _duration_cache_lock:
+        if not _duration_cache_dirty:
+            return
+        temp_file = None
+        try:
+            os.makedirs(os.path.dirname(DURATION_CACHE_FILE), exist_ok=True)
+            with open(f"{DURATION_CACHE_FILE}.lock", 'w') as lock:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                
+                try:
+                    with open(DURATION_CACHE_FILE, 'r', encoding='utf-8') as f:
+                        entries = json.load(f)
+                    if not isinstance(entries, dict):
+                        entries = {}
+                except (OSError, ValueError):
+                    entries = {}
+                for key, entry in _duration_cache.items():
+                    existing = entries.get(key)
+                    if not isinstance(existing, dict) or \
+                            existing.get('cached_at', 0) <= entry.get('cached_at', 0):
+                        entries[key] = entry
+                
+                if len(entries) > DURATION_CACHE_MAX_ENTRIES:
+                    newest = sorted(entries.items(), key=lambda item: item[1].get('cached_at', 0))
+                    entries = dict(newest[-DURATION_CACHE_MAX_ENTRIES:])
+                
+                fd, temp_file = tempfile.mkstemp(
+                    dir=os.path.dirname(DURATION_CACHE_FILE),
+                    prefix=os.path.basename(DURATION_CACHE_FILE) + '.',
+                    suffix='.tmp'
+                )
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(temp_file, DURATION_CACHE_FILE)
+                temp_file = None
+                _duration_cache_loaded_mtime = os.stat(DURATION_CACHE_FILE).st_mtime
+            
+            _duration_cache.clear()
+            _duration_cache.update(entries)
+            _duration_cache_dirty = False
+        except Exception:
+            pass
+        finally:
+            if temp_file:
+                cleanup_temp_file(temp_file)
+
+
+def get_cached_duration(url: str, logger=None, rule: Optional[CacheKeyRule] = None) -> Optional[int]:
+    """
+    查询缓存的时长
+
+    未超过 TTL 的条目直接返回，不发起网络请求。缓存键去掉了签名参数的链接使用较短的
+    SIGNED_URL_CACHE_TTL_SECONDS（同一路径可能以新的签名上传了不同的文件），其他链接使用
+    DURATION_CACHE_TTL_SECONDS。过期但记录了 ETag 或文件大小的条目，用 1 字节的 Range
+    请求重新验证，验证通过则刷新条目并返回。
+
+    Args:
+        url: 媒体文件 URL
+        logger: 可选的日志记录器
+        rule: 缓存键规则（见 build_cache_key_rule），None 时使用默认规则
+
+    Returns:
+        时长（毫秒），未命中时为 None
+    """
+    key, signed = split_cache_key(url, rule)
+    with _duration_cache_lock:
+        entry = _duration_cache.get(key)
+    if entry is None:
+        return None
+    
+    ttl = min(SIGNED_URL_CACHE_TTL_SECONDS, DURATION_CACHE_TTL_SECONDS) if signed else DURATION_CACHE_TTL_SECONDS
+    if time.time() - entry.get('cached_at', 0) <= ttl:
+        return entry['duration_ms']
+    
+    if not entry.get('etag') and not entry.get('content_length'):
+        return None
+    try:
+        fetched = fetch_byte_range(url, 0, 1)
+    except Exception:
+        return None
+    if not fetched:
+        return None
+    
+    _, content_length, etag = fetched
+    if ((entry.get('etag') and etag != entry['etag'])
+            or (entry.get('content_length') and content_length != entry['content_length'])):
+        return None
+    
+    if logger:
+        logger.info(f"Revalidated cached duration for {url}")
+    put_cached_duration(url, entry['duration_ms'], entry.get('format'), etag, content_length, rule)
+    return entry['duration_ms']
+
+
+def put_cached_duration(url: str, duration_ms: int, media_format: Optional[str] = None,
+                        etag: Optional[str] = None, content_length: Optional[int] = None,
+                        rule: Optional[CacheKeyRule] = None) -> None:
+    """记录链接的时长，以及用于重新验证的 ETag 和文件大小"""
+    global _duration_cache_dirty
+    
+    with _duration_cache_lock:
+        _duration_cache[normalize_media_url(url, rule)] = {
+            'duration_ms': duration_ms,
+            'format': media_format or 'unknown',
+            'etag': etag,
+            'content_length': content_length,
+            'cached_at': time.time()
+        }
+        _duration_cache_dirty = True
+
+
 def cleanup_temp_file(file_path: str):
     """Safely remove temporary file"""
     try:
@@ -314,6 +1126,153 @@ def cleanup_temp_file(file_path: str):
         pass  # Ignore cleanup errors
 
 
+def probe_media_duration(url: str, logger=None, use_cache: bool = True,
+                         cache_rule: Optional[CacheKeyRule] = None) -> Optional[int]:
+    """
+    探测单个链接的媒体时长
+
+    依次进行签名过期检查、火山 TTS 检查、缓存查询，然后对每个链接只发起一次带 Range 的流式 GET：
+    其状态码决定是否跳过该链接（404 等立即失败，403 时更换请求头重试），
+    206 响应交给分段解析，200 响应直接写入临时文件。
+    分段读取无法确定时长时才重新完整下载。
+    单个链接的任何失败都只记录日志并返回 None，由调用方跳过该链接。
+
+    Args:
+        url: 媒体文件 URL
+        logger: 可选的日志记录器
+        use_cache: 是否查询和写入时长缓存
+        cache_rule: 缓存键规则（见 build_cache_key_rule），None 时使用默认规则
+
+    Returns:
+        时长（毫秒），链接被跳过时为 None
+    """
+    media = None
+    try:
+        # Expired signed URLs can only return 403, skip them without any request
+        expires_at = get_signed_url_expiry(url)
+        if expires_at is not None and expires_at <= time.time():
+            if logger:
+                logger.warning(f"Skipping {url}: signed URL expired {time.time() - expires_at:.0f} seconds ago")
+            return None
+        
+        # Special handling for Volcano TTS URLs
+        if is_volcano_tts_url(url):
+            if logger:
+                logger.info(f"Detected Volcano TTS URL, applying special handling")
+            
+            tts_info = handle_volcano_tts_url(url, logger)
+            if not tts_info['success'] and logger:
+                logger.warning(f"TTS URL validation failed: {tts_info.get('message', 'Unknown error')}")
+        
+        if use_cache:
+            cached = get_cached_duration(url, logger, cache_rule)
+            if cached is not None:
+                if logger:
+                    logger.info(f"Duration for {url}: {cached}ms (cached)")
+                return cached
+        
+        # A single streaming GET serves as the accessibility check; servers that
+        # honour Range return only the container header, others the whole file
+        if logger:
+            logger.info(f"Requesting {url}")
+        
+        response = open_media_stream(url, range_bytes=PROBE_RANGE_BYTES)
+        if logger:
+            content_type = response.headers.get('content-type', 'unknown')
+            logger.info(f"URL accessible (status: {response.status_code}), content-type: {content_type}")
+        
+        media_info = {}
+        duration_ms = None
+        if response.status_code == 206:
+            try:
+                duration_ms = probe_duration_by_range(url, logger, media_info, response)
+            finally:
+                response.close()
+            # Unsupported format in the partial fetch: download the whole file
+            response = None
+        
+        if duration_ms is None:
+            # Download into memory (large files spill to a temporary file)
+            media = download_media_file(url, response=response)
+            
+            # Get duration
+            duration_ms = get_media_duration_ms(media)
+            
+            if isinstance(media, bytes):
+                media_info['format'] = detect_media_format(media[:16])
+                media_info['content_length'] = len(media)
+            else:
+                try:
+                    with open(media, 'rb') as f:
+                        media_info['format'] = detect_media_format(f.read(16))
+                    media_info['content_length'] = os.path.getsize(media)
+                except OSError:
+                    pass
+        
+        if use_cache:
+            put_cached_duration(url, duration_ms, media_info.get('format'),
+                                media_info.get('etag'), media_info.get('content_length'), cache_rule)
+        
+        if logger:
+            logger.info(f"Duration for {url}: {duration_ms}ms")
+        return duration_ms
+            
+    except Exception as e:
+        if logger:
+            logger.error(f"Error processing {url}: {str(e)}")
+        # For failed files, we'll skip them rather than fail entirely
+        return None
+    
+    finally:
+        # Only downloads above SPOOL_MAX_BYTES leave a temporary file behind
+        if isinstance(media, str):
+            cleanup_temp_file(media)
+
+
+def probe_media_durations(links: List[str], logger=None, max_workers: int = MAX_PROBE_WORKERS,
+                          use_cache: bool = True,
+                          cache_rule: Optional[CacheKeyRule] = None) -> List[Optional[int]]:
+    """
+    通过线程池并发探测多个链接的时长
+
+    签名 URL 按过期时间从早到晚提交，避免短时效的 TTS 链接排在大文件之后过期。
+
+    Args:
+        links: 媒体文件 URL 列表
+        logger: 可选的日志记录器
+        max_workers: 最大线程数
+        use_cache: 是否使用持久化的时长缓存
+        cache_rule: 缓存键规则（见 build_cache_key_rule），None 时使用默认规则
+
+    Returns:
+        与 links 顺序一致的时长列表，被跳过的链接为 None
+    """
+    # sorted 是稳定排序，没有过期时间的链接排在最后并保持输入顺序
+    expiries = [get_signed_url_expiry(url) for url in links]
+    schedule = sorted(range(len(links)), key=lambda i: (expiries[i] is None, expiries[i] or 0))
+    
+    if use_cache:
+        load_duration_cache()
+    
+    try:
+        durations: List[Optional[int]] = [None] * len(links)
+        if len(links) <= 1 or max_workers <= 1:
+            for i in schedule:
+                durations[i] = probe_media_duration(links[i], logger, use_cache, cache_rule)
+            return durations
+        
+        workers = min(max_workers, len(links))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {i: executor.submit(probe_media_duration, links[i], logger, use_cache, cache_rule) for i in schedule}
+            # 按输入顺序收集结果，保证累计时间线正确
+            for i, future in futures.items():
+                durations[i] = future.result()
+        return durations
+    finally:
+        if use_cache:
+            save_duration_cache()
+
+
 def handler(args: Args[Input]) -> Output:
     """
     获取媒体时长的主处理函数
@@ -336,89 +1295,12 @@ def handler(args: Args[Input]) -> Output:
             timelines=[]
         )
     
-    durations = []
-    temp_files = []
-    
     try:
-        # Process each URL
-        for i, url in enumerate(links):
-            if logger:
-                logger.info(f"Processing link {i+1}/{len(links)}: {url}")
-            
-            try:
-                # Special handling for Volcano TTS URLs
-                if is_volcano_tts_url(url):
-                    if logger:
-                        logger.info(f"Detected Volcano TTS URL, applying special handling")
-                    
-                    tts_info = handle_volcano_tts_url(url, logger)
-                    if not tts_info['success']:
-                        if logger:
-                            logger.warning(f"TTS URL validation failed: {tts_info.get('message', 'Unknown error')}")
-                        
-                        # For expired URLs, skip entirely
-                        if tts_info.get('error') == 'signed_url_expired':
-                            continue
-                
-                # First check URL accessibility for better error reporting
-                if logger:
-                    logger.info(f"Checking accessibility of {url}")
-                
-                access_info = check_media_url_accessibility(url)
-                
-                # Only skip for definitive failures, not authentication issues
-                should_skip = False
-                if not access_info['accessible']:
-                    status_code = access_info.get('status_code')
-                    error_msg = access_info.get('error', '')
-                    
-                    # Skip only for definitive failures
-                    if (status_code == 404 or 
-                        'NameResolutionError' in error_msg or 
-                        'Connection refused' in error_msg or
-                        'timeout' in error_msg.lower()):
-                        
-                        error_detail = f"URL not accessible (status: {status_code})"
-                        if 'error' in access_info:
-                            error_detail += f". Error: {access_info['error']}"
-                        
-                        if logger:
-                            logger.warning(f"Skipping {url}: {error_detail}")
-                        should_skip = True
-                    
-                    elif status_code == 403:
-                        # For 403 errors, log warning but continue with download attempt
-                        if logger:
-                            logger.warning(f"HEAD request returned 403 for {url}, will attempt download with enhanced headers")
-                    else:
-                        # For other errors, log but still attempt download
-                        if logger:
-                            logger.warning(f"Accessibility check failed for {url} (status: {status_code}), will attempt download")
-                
-                if should_skip:
-                    continue
-                
-                if access_info['accessible'] and logger:
-                    content_type = access_info.get('content_type', 'unknown')
-                    logger.info(f"URL accessible, content-type: {content_type}")
-                
-                # Download file temporarily
-                temp_path = download_media_file(url)
-                temp_files.append(temp_path)
-                
-                # Get duration
-                duration_ms = get_media_duration_ms(temp_path)
-                durations.append(duration_ms)
-                
-                if logger:
-                    logger.info(f"Duration for {url}: {duration_ms}ms")
-                    
-            except Exception as e:
-                error_msg = f"Error processing {url}: {str(e)}"
-                if logger:
-                    logger.error(error_msg)
-                # For failed files, we'll skip them rather than fail entirely
-                continue
+        # Probe all links concurrently; failed links are skipped
+        use_cache = getattr(args.input, 'use_cache', True) is not False
+        cache_rule = build_cache_key_rule(getattr(args.input, 'cache_ignore_params', None))
+        probed = probe_media_durations(links, logger, use_cache=use_cache, cache_rule=cache_rule)
+        durations = [duration for duration in probed if duration is not None]
         
         # Calculate timelines
         if not durations:
@@ -461,9 +1343,3 @@ def handler(args: Args[Input]) -> Output:
             all_timelines=[],
             timelines=[]
         )
-        
-    finally:
-        # Clean up all temporary files
-        for temp_file in temp_files:
-            cleanup_temp_file(temp_file)
-
@@ -0,0 +1,248 @@
+"""
+批量生成音频信息工具处理器
+
+一次调用生成多个音频信息字符串，输出可直接作为 add_audios 的 audio_infos 参数，
+替代逐条调用 make_audio_info。支持两种输入方式：
+1. rows：行对象数组，每行的字段与 make_audio_info 的参数相同
+2. 并行数组：audio_urls + timelines（可直接使用 get_media_duration 输出的 timelines）
+
+defaults 中的参数对所有行生效，行内的同名字段优先。
+所有行在一次遍历中完成校验，任何一行失败时返回全部错误且不输出结果。
+"""
+
+import json
+from typing import NamedTuple, Optional, Dict, Any, List
+from runtime import Args
+
+
+# 失败时消息中最多列出的错误条数
+MAX_REPORTED_ERRORS = 20
+
+
+# Input/Output 类型定义（每个 Coze 工具都需要）
+class Input(NamedTuple):
+    """make_audio_infos 工具的输入参数"""
+    rows: Optional[List[Dict[str, Any]]] = None          # 行对象数组，字段同 make_audio_info
+    audio_urls: Optional[List[str]] = None               # 并行数组：音频 URL
+    timelines: Optional[List[Dict[str, int]]] = None     # 并行数组：{"start", "end"}（毫秒）
+    defaults: Optional[Dict[str, Any]] = None            # 所有行共享的参数
+
+
+class Output(NamedTuple):
+    """make_audio_infos 工具的输出"""
+    audio_infos: List[str]    # 音频信息 JSON 字符串数组，可直接传给 add_audios
+    count: int                # 生成的音频信息数量
+    success: bool             # Operation success status
+    message: str              # Status message
+
+
+class AudioInfoParams(NamedTuple):
+    """单条音频信息的参数（与 make_audio_info 的 Input 相同，必需字段缺省为 None 以便给出中文错误）"""
+    audio_url: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    volume: Optional[float] = 1.0
+    fade_in: Optional[int] = 0
+    fade_out: Optional[int] = 0
+    effect_type: Optional[str] = None
+    effect_intensity: Optional[float] = 1.0
+    speed: Optional[float] = 1.0
+    change_pitch: Optional[bool] = False
+    material_start: Optional[int] = None
+    material_end: Optional[int] = None
+
+
+def build_audio_info(params: AudioInfoParams) -> Dict[str, Any]:
+    """
+    校验参数并构建音频信息字典（规则与 make_audio_info 相同，为 Coze 工具独立性在此重复定义）
+
+    Raises:
+        ValueError: 参数无效，消息与 make_audio_info 一致
+    """
+    if not params.audio_url:
+        raise ValueError("缺少必需的 audio_url 参数")
+    if params.start is None:
+        raise ValueError("缺少必需的 start 参数")
+    if params.end is None:
+        raise ValueError("缺少必需的 end 参数")
+    if params.start < 0:
+        raise ValueError("start 时间不能为负数")
+    if params.end <= params.start:
+        raise ValueError("end 时间必须大于 start 时间")
+
+    if params.volume is not None and (params.volume < 0.0 or params.volume > 2.0):
+        raise ValueError("volume 必须在 0.0 到 2.0 之间")
+    if params.speed is not None and (params.speed < 0.5 or params.speed > 2.0):
+        raise ValueError("speed 必须在 0.5 到 2.0 之间")
+    if params.fade_in is not None and params.fade_in < 0:
+        raise ValueError("fade_in 时间不能为负数")
+    if params.fade_out is not None and params.fade_out < 0:
+        raise ValueError("fade_out 时间不能为负数")
+
+    if params.material_start is not None or params.material_end is not None:
+        if params.material_start is None or params.material_end is None:
+            raise ValueError("material_start 和 material_end 必须同时提供")
+        if params.material_start < 0:
+            raise ValueError("material_start 时间不能为负数")
+        if params.material_end <= params.material_start:
+            raise ValueError("material_end 时间必须大于 material_start 时间")
+
+    audio_info = {
+        "audio_url": params.audio_url,
+        "start": params.start,
+        "end": params.end
+    }
+
+    # 仅在非 None 或非默认值时添加可选参数
+    if params.volume is not None and params.volume != 1.0:
+        audio_info["volume"] = params.volume
+    if params.fade_in is not None and params.fade_in != 0:
+        audio_info["fade_in"] = params.fade_in
+    if params.fade_out is not None and params.fade_out != 0:
+        audio_info["fade_out"] = params.fade_out
+
+    if params.effect_type is not None:
+        audio_info["effect_type"] = params.effect_type
+        if params.effect_intensity is not None and params.effect_intensity != 1.0:
+            audio_info["effect_intensity"] = params.effect_intensity
+
+    if params.speed is not None and params.speed != 1.0:
+        audio_info["speed"] = params.speed
+    if params.change_pitch:
+        audio_info["change_pitch"] = params.change_pitch
+
+    if params.material_start is not None and params.material_end is not None:
+        audio_info["material_start"] = params.material_start
+        audio_info["material_end"] = params.material_end
+
+    return audio_info
+
+
+def parse_json_param(value: Any, name: str) -> Any:
+    """Coze 可能以 JSON 字符串传入数组或对象参数，这里统一解码"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{name} 不是有效的 JSON: {str(e)}")
+    return value
+
+
+def collect_rows(input_data: Input) -> List[Dict[str, Any]]:
+    """
+    将 rows 或并行数组统一为行对象列表
+
+    Raises:
+        ValueError: 输入形式无效
+    """
+    rows = parse_json_param(getattr(input_data, 'rows', None), "rows")
+    audio_urls = parse_json_param(getattr(input_data, 'audio_urls', None), "audio_urls")
+    timelines = parse_json_param(getattr(input_data, 'timelines', None), "timelines")
+
+    if rows is not None and (audio_urls is not None or timelines is not None):
+        raise ValueError("rows 与 audio_urls/timelines 不能同时提供")
+
+    if rows is not None:
+        if not isinstance(rows, list):
+            raise ValueError("rows 必须是数组")
+        return rows
+
+    if audio_urls is None and timelines is None:
+        raise ValueError("请提供 rows，或 audio_urls 与 timelines")
+    if not isinstance(audio_urls, list) or not isinstance(timelines, list):
+        raise ValueError("audio_urls 和 timelines 必须同时提供且都是数组")
+    if len(audio_urls) != len(timelines):
+        raise ValueError(f"audio_urls 与 timelines 长度不一致: {len(audio_urls)} != {len(timelines)}")
+
+    rows = []
+    for i, (audio_url, timeline) in enumerate(zip(audio_urls, timelines)):
+        timeline = parse_json_param(timeline, f"timelines[{i}]")
+        if not isinstance(timeline, dict):
+            raise ValueError(f"timelines[{i}] 必须是包含 start 和 end 的对象")
+        rows.append({"audio_url": audio_url, "start": timeline.get("start"), "end": timeline.get("end")})
+    return rows
+
+
+def make_audio_infos(rows: List[Dict[str, Any]], defaults: Dict[str, Any]) -> tuple[List[str], List[str]]:
+    """
+    校验所有行并生成音频信息字符串
+
+    Returns:
+        (audio_infos, errors)，errors 非空时 audio_infos 不可用
+    """
+    audio_infos = []
+    errors = []
+    for i, row in enumerate(rows):
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                errors.append(f"第 {i + 1} 行: 不是有效的 JSON: {str(e)}")
+                continue
+        if not isinstance(row, dict):
+            errors.append(f"第 {i + 1} 行: 必须是对象")
+            continue
+
+        merged = {**defaults, **row}
+        unknown = [field for field in merged if field not in AudioInfoParams._fields]
+        if unknown:
+            errors.append(f"第 {i + 1} 行: 未知字段 {', '.join(unknown)}")
+            continue
+
+        try:
+            audio_info = build_audio_info(AudioInfoParams(**merged))
+            audio_infos.append(json.dumps(audio_info, ensure_ascii=False, separators=(',', ':')))
+        except ValueError as e:
+            errors.append(f"第 {i + 1} 行: {str(e)}")
+        except Exception as e:
+            errors.append(f"第 {i + 1} 行: 生成音频信息字符串时发生错误: {str(e)}")
+
+    return audio_infos, errors
+
+
+def handler(args: Args[Input]) -> Output:
+    """
+    批量创建音频信息字符串的主处理函数
+
+    Args:
+        args: 包含 rows 或并行数组，以及共享 defaults 的输入参数
+
+    Returns:
+        Output containing audio_infos, count, success status, and message
+    """
+    logger = getattr(args, 'logger', None)
+
+    try:
+        rows = collect_rows(args.input)
+        defaults = parse_json_param(getattr(args.input, 'defaults', None), "defaults") or {}
+        if not isinstance(defaults, dict):
+            raise ValueError("defaults 必须是对象")
+        if not rows:
+            raise ValueError("没有需要生成的音频信息")
+    except ValueError as e:
+        if logger:
+            logger.error(str(e))
+        return Output(audio_infos=[], count=0, success=False, message=str(e))
+
+    if logger:
+        logger.info(f"Creating {len(rows)} audio info strings")
+
+    audio_infos, errors = make_audio_infos(rows, defaults)
+
+    if errors:
+        message = f"{len(errors)} 行校验失败: " + "; ".join(errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            message += f"; 以及另外 {len(errors) - MAX_REPORTED_ERRORS} 个错误"
+        if logger:
+            logger.error(message)
+        return Output(audio_infos=[], count=0, success=False, message=message)
+
+    if logger:
+        logger.info(f"Successfully created {len(audio_infos)} audio info strings")
+
+    return Output(
+        audio_infos=audio_infos,
+        count=len(audio_infos),
+        success=True,
+        message=f"成功生成 {len(audio_infos)} 个音频信息字符串"
+    )
@@ -0,0 +1,294 @@
+"""
+批量生成字幕信息工具处理器
+
+一次调用生成多个字幕信息字符串，输出可直接作为 add_captions 的 caption_infos 参数，
+替代逐条调用 make_caption_info。支持两种输入方式：
+1. rows：行对象数组，每行的字段与 make_caption_info 的参数相同
+2. 并行数组：contents + timelines（可直接使用 get_media_duration 输出的 timelines）
+
+defaults 中的参数对所有行生效，行内的同名字段优先。
+所有行在一次遍历中完成校验，任何一行失败时返回全部错误且不输出结果。
+"""
+
+import json
+from typing import NamedTuple, Optional, Dict, Any, List
+from runtime import Args
+
+
+# 失败时消息中最多列出的错误条数
+MAX_REPORTED_ERRORS = 20
+
+
+# Input/Output 类型定义（每个 Coze 工具都需要）
+class Input(NamedTuple):
+    """make_caption_infos 工具的输入参数"""
+    rows: Optional[List[Dict[str, Any]]] = None          # 行对象数组，字段同 make_caption_info
+    contents: Optional[List[str]] = None                 # 并行数组：字幕文本
+    timelines: Optional[List[Dict[str, int]]] = None     # 并行数组：{"start", "end"}（毫秒）
+    defaults: Optional[Dict[str, Any]] = None            # 所有行共享的参数
+
+
+class Output(NamedTuple):
+    """make_caption_infos 工具的输出"""
+    caption_infos: List[str]  # 字幕信息 JSON 字符串数组，可直接传给 add_captions
+    count: int                # 生成的字幕信息数量
+    success: bool             # Operation success status
+    message: str              # Status message
+
+
+class CaptionInfoParams(NamedTuple):
+    """单条字幕信息的参数（与 make_caption_info 的 Input 相同，必需字段缺省为 None 以便给出中文错误）"""
+    content: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    position_x: Optional[float] = 0.5
+    position_y: Optional[float] = -0.9
+    scale: Optional[float] = 1.0
+    rotation: Optional[float] = 0.0
+    opacity: Optional[float] = 1.0
+    font_family: Optional[str] = "默认"
+    font_size: Optional[int] = 48
+    font_weight: Optional[str] = "normal"
+    font_style: Optional[str] = "normal"
+    color: Optional[str] = "#FFFFFF"
+    stroke_enabled: Optional[bool] = False
+    stroke_color: Optional[str] = "#000000"
+    stroke_width: Optional[int] = 2
+    shadow_enabled: Optional[bool] = False
+    shadow_color: Optional[str] = "#000000"
+    shadow_offset_x: Optional[int] = 2
+    shadow_offset_y: Optional[int] = 2
+    shadow_blur: Optional[int] = 4
+    background_enabled: Optional[bool] = False
+    background_color: Optional[str] = "#000000"
+    background_opacity: Optional[float] = 0.5
+    alignment: Optional[str] = "center"
+    intro_animation: Optional[str] = None
+    outro_animation: Optional[str] = None
+    loop_animation: Optional[str] = None
+
+
+# 可选字段的默认值：值为 None 时按默认值处理，等于默认值时不写入输出
+CAPTION_STYLE_DEFAULTS = (
+    ("position_x", 0.5),
+    ("position_y", -0.9),
+    ("scale", 1.0),
+    ("rotation", 0.0),
+    ("opacity", 1.0),
+    ("font_family", "默认"),
+    ("font_size", 48),
+    ("font_weight", "normal"),
+    ("font_style", "normal"),
+    ("color", "#FFFFFF"),
+)
+
+# 开关字段及其附属字段：开关开启时才写入附属字段
+CAPTION_TOGGLE_GROUPS = (
+    ("stroke_enabled", (("stroke_color", "#000000"), ("stroke_width", 2))),
+    ("shadow_enabled", (("shadow_color", "#000000"), ("shadow_offset_x", 2),
+                        ("shadow_offset_y", 2), ("shadow_blur", 4))),
+    ("background_enabled", (("background_color", "#000000"), ("background_opacity", 0.5))),
+)
+
+VALID_ALIGNMENTS = ["left", "center", "right"]
+VALID_WEIGHTS = ["normal", "bold"]
+VALID_STYLES = ["normal", "italic"]
+
+
+def value_or_default(value: Any, default: Any) -> Any:
+    """Coze 会把未填写的可选参数传为 None，此时使用默认值"""
+    return value if value is not None else default
+
+
+def build_caption_info(params: CaptionInfoParams) -> Dict[str, Any]:
+    """
+    校验参数并构建字幕信息字典（规则与 make_caption_info 相同，为 Coze 工具独立性在此重复定义）
+
+    Raises:
+        ValueError: 参数无效，消息与 make_caption_info 一致
+    """
+    if not params.content:
+        raise ValueError("缺少必需的 content 参数")
+    if params.start is None:
+        raise ValueError("缺少必需的 start 参数")
+    if params.end is None:
+        raise ValueError("缺少必需的 end 参数")
+    if params.start < 0:
+        raise ValueError("start 时间不能为负数")
+    if params.end <= params.start:
+        raise ValueError("end 时间必须大于 start 时间")
+
+    if not (-1.0 <= value_or_default(params.position_x, 0.5) <= 1.0):
+        raise ValueError("position_x 必须在 -1.0 到 1.0 之间")
+    if not (-1.0 <= value_or_default(params.position_y, -0.9) <= 1.0):
+        raise ValueError("position_y 必须在 -1.0 到 1.0 之间")
+    if not (0.0 <= value_or_default(params.opacity, 1.0) <= 1.0):
+        raise ValueError("opacity 必须在 0.0 到 1.0 之间")
+    if not (0.0 <= value_or_default(params.background_opacity, 0.5) <= 1.0):
+        raise ValueError("background_opacity 必须在 0.0 到 1.0 之间")
+    if value_or_default(params.alignment, "center") not in VALID_ALIGNMENTS:
+        raise ValueError(f"alignment 必须是以下值之一: {', '.join(VALID_ALIGNMENTS)}")
+    if value_or_default(params.font_weight, "normal") not in VALID_WEIGHTS:
+        raise ValueError(f"font_weight 必须是以下值之一: {', '.join(VALID_WEIGHTS)}")
+    if value_or_default(params.font_style, "normal") not in VALID_STYLES:
+        raise ValueError(f"font_style 必须是以下值之一: {', '.join(VALID_STYLES)}")
+
+    caption_info = {
+        "content": params.content,
+        "start": params.start,
+        "end": params.end
+    }
+
+    # 仅写入与默认值不同的参数
+    for field, default in CAPTION_STYLE_DEFAULTS:
+        value = value_or_default(getattr(params, field), default)
+        if value != default:
+            caption_info[field] = value
+
+    for toggle, fields in CAPTION_TOGGLE_GROUPS:
+        if value_or_default(getattr(params, toggle), False):
+            caption_info[toggle] = getattr(params, toggle)
+            for field, default in fields:
+                value = value_or_default(getattr(params, field), default)
+                if value != default:
+                    caption_info[field] = value
+
+    alignment = value_or_default(params.alignment, "center")
+    if alignment != "center":
+        caption_info["alignment"] = alignment
+
+    for field in ("intro_animation", "outro_animation", "loop_animation"):
+        if getattr(params, field) is not None:
+            caption_info[field] = getattr(params, field)
+
+    return caption_info
+
+
+def parse_json_param(value: Any, name: str) -> Any:
+    """Coze 可能以 JSON 字符串传入数组或对象参数，这里统一解码"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{name} 不是有效的 JSON: {str(e)}")
+    return value
+
+
+def collect_rows(input_data: Input) -> List[Dict[str, Any]]:
+    """
+    将 rows 或并行数组统一为行对象列表
+
+    Raises:
+        ValueError: 输入形式无效
+    """
+    rows = parse_json_param(getattr(input_data, 'rows', None), "rows")
+    contents = parse_json_param(getattr(input_data, 'contents', None), "contents")
+    timelines = parse_json_param(getattr(input_data, 'timelines', None), "timelines")
+
+    if rows is not None and (contents is not None or timelines is not None):
+        raise ValueError("rows 与 contents/timelines 不能同时提供")
+
+    if rows is not None:
+        if not isinstance(rows, list):
+            raise ValueError("rows 必须是数组")
+        return rows
+
+    if contents is None and timelines is None:
+        raise ValueError("请提供 rows，或 contents 与 timelines")
+    if not isinstance(contents, list) or not isinstance(timelines, list):
+        raise ValueError("contents 和 timelines 必须同时提供且都是数组")
+    if len(contents) != len(timelines):
+        raise ValueError(f"contents 与 timelines 长度不一致: {len(contents)} != {len(timelines)}")
+
+    rows = []
+    for i, (content, timeline) in enumerate(zip(contents, timelines)):
+        timeline = parse_json_param(timeline, f"timelines[{i}]")
+        if not isinstance(timeline, dict):
+            raise ValueError(f"timelines[{i}] 必须是包含 start 和 end 的对象")
+        rows.append({"content": content, "start": timeline.get("start"), "end": timeline.get("end")})
+    return rows
+
+
+def make_caption_infos(rows: List[Dict[str, Any]], defaults: Dict[str, Any]) -> tuple[List[str], List[str]]:
+    """
+    校验所有行并生成字幕信息字符串
+
+    Returns:
+        (caption_infos, errors)，errors 非空时 caption_infos 不可用
+    """
+    caption_infos = []
+    errors = []
+    for i, row in enumerate(rows):
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                errors.append(f"第 {i + 1} 行: 不是有效的 JSON: {str(e)}")
+                continue
+        if not isinstance(row, dict):
+            errors.append(f"第 {i + 1} 行: 必须是对象")
+            continue
+
+        merged = {**defaults, **row}
+        unknown = [field for field in merged if field not in CaptionInfoParams._fields]
+        if unknown:
+            errors.append(f"第 {i + 1} 行: 未知字段 {', '.join(unknown)}")
+            continue
+
+        try:
+            caption_info = build_caption_info(CaptionInfoParams(**merged))
+            caption_infos.append(json.dumps(caption_info, ensure_ascii=False, separators=(',', ':')))
+        except ValueError as e:
+            errors.append(f"第 {i + 1} 行: {str(e)}")
+        except Exception as e:
+            errors.append(f"第 {i + 1} 行: 生成字幕信息字符串时发生错误: {str(e)}")
+
+    return caption_infos, errors
+
+
+def handler(args: Args[Input]) -> Output:
+    """
+    批量创建字幕信息字符串的主处理函数
+
+    Args:
+        args: 包含 rows 或并行数组，以及共享 defaults 的输入参数
+
+    Returns:
+        Output containing caption_infos, count, success status, and message
+    """
+    logger = getattr(args, 'logger', None)
+
+    try:
+        rows = collect_rows(args.input)
+        defaults = parse_json_param(getattr(args.input, 'defaults', None), "defaults") or {}
+        if not isinstance(defaults, dict):
+            raise ValueError("defaults 必须是对象")
+        if not rows:
+            raise ValueError("没有需要生成的字幕信息")
+    except ValueError as e:
+        if logger:
+            logger.error(str(e))
+        return Output(caption_infos=[], count=0, success=False, message=str(e))
+
+    if logger:
+        logger.info(f"Creating {len(rows)} caption info strings")
+
+    caption_infos, errors = make_caption_infos(rows, defaults)
+
+    if errors:
+        message = f"{len(errors)} 行校验失败: " + "; ".join(errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            message += f"; 以及另外 {len(errors) - MAX_REPORTED_ERRORS} 个错误"
+        if logger:
+            logger.error(message)
+        return Output(caption_infos=[], count=0, success=False, message=message)
+
+    if logger:
+        logger.info(f"Successfully created {len(caption_infos)} caption info strings")
+
+    return Output(
+        caption_infos=caption_infos,
+        count=len(caption_infos),
+        success=True,
+        message=f"成功生成 {len(caption_infos)} 个字幕信息字符串"
+    )
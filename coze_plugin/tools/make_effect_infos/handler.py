@@ -0,0 +1,223 @@
+"""
+批量生成特效信息工具处理器
+
+一次调用生成多个特效信息字符串，输出可直接作为 add_effects 的 effect_infos 参数，
+替代逐条调用 make_effect_info。支持两种输入方式：
+1. rows：行对象数组，每行的字段与 make_effect_info 的参数相同
+2. 并行数组：effect_types + timelines（可直接使用 get_media_duration 输出的 timelines）
+
+defaults 中的参数对所有行生效，行内的同名字段优先。
+所有行在一次遍历中完成校验，任何一行失败时返回全部错误且不输出结果。
+"""
+
+import json
+from typing import NamedTuple, Optional, Dict, Any, List
+from runtime import Args
+
+
+# 失败时消息中最多列出的错误条数
+MAX_REPORTED_ERRORS = 20
+
+
+# Input/Output 类型定义（每个 Coze 工具都需要）
+class Input(NamedTuple):
+    """make_effect_infos 工具的输入参数"""
+    rows: Optional[List[Dict[str, Any]]] = None          # 行对象数组，字段同 make_effect_info
+    effect_types: Optional[List[str]] = None             # 并行数组：特效类型
+    timelines: Optional[List[Dict[str, int]]] = None     # 并行数组：{"start", "end"}（毫秒）
+    defaults: Optional[Dict[str, Any]] = None            # 所有行共享的参数
+
+
+class Output(NamedTuple):
+    """make_effect_infos 工具的输出"""
+    effect_infos: List[str]   # 特效信息 JSON 字符串数组，可直接传给 add_effects
+    count: int                # 生成的特效信息数量
+    success: bool             # Operation success status
+    message: str              # Status message
+
+
+class EffectInfoParams(NamedTuple):
+    """单条特效信息的参数（与 make_effect_info 的 Input 相同，必需字段缺省为 None 以便给出中文错误）"""
+    effect_type: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    intensity: Optional[float] = 1.0
+    position_x: Optional[float] = None
+    position_y: Optional[float] = None
+    scale: Optional[float] = 1.0
+    properties: Optional[str] = None
+
+
+def build_effect_info(params: EffectInfoParams) -> Dict[str, Any]:
+    """
+    校验参数并构建特效信息字典（规则与 make_effect_info 相同，为 Coze 工具独立性在此重复定义）
+
+    Raises:
+        ValueError: 参数无效，消息与 make_effect_info 一致
+    """
+    if not params.effect_type:
+        raise ValueError("缺少必需的 effect_type 参数")
+    if params.start is None:
+        raise ValueError("缺少必需的 start 参数")
+    if params.end is None:
+        raise ValueError("缺少必需的 end 参数")
+    if params.start < 0:
+        raise ValueError("start 时间不能为负数")
+    if params.end <= params.start:
+        raise ValueError("end 时间必须大于 start 时间")
+
+    effect_info = {
+        "effect_type": params.effect_type,
+        "start": params.start,
+        "end": params.end
+    }
+
+    # 仅在非 None 或非默认值时添加可选参数
+    if params.intensity != 1.0:
+        effect_info["intensity"] = params.intensity
+    if params.position_x is not None:
+        effect_info["position_x"] = params.position_x
+    if params.position_y is not None:
+        effect_info["position_y"] = params.position_y
+    if params.scale != 1.0:
+        effect_info["scale"] = params.scale
+
+    if params.properties is not None:
+        try:
+            properties_dict = json.loads(params.properties)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"properties 参数必须是有效的 JSON 字符串: {str(e)}")
+        if properties_dict:
+            effect_info["properties"] = properties_dict
+
+    return effect_info
+
+
+def parse_json_param(value: Any, name: str) -> Any:
+    """Coze 可能以 JSON 字符串传入数组或对象参数，这里统一解码"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{name} 不是有效的 JSON: {str(e)}")
+    return value
+
+
+def collect_rows(input_data: Input) -> List[Dict[str, Any]]:
+    """
+    将 rows 或并行数组统一为行对象列表
+
+    Raises:
+        ValueError: 输入形式无效
+    """
+    rows = parse_json_param(getattr(input_data, 'rows', None), "rows")
+    effect_types = parse_json_param(getattr(input_data, 'effect_types', None), "effect_types")
+    timelines = parse_json_param(getattr(input_data, 'timelines', None), "timelines")
+
+    if rows is not None and (effect_types is not None or timelines is not None):
+        raise ValueError("rows 与 effect_types/timelines 不能同时提供")
+
+    if rows is not None:
+        if not isinstance(rows, list):
+            raise ValueError("rows 必须是数组")
+        return rows
+
+    if effect_types is None and timelines is None:
+        raise ValueError("请提供 rows，或 effect_types 与 timelines")
+    if not isinstance(effect_types, list) or not isinstance(timelines, list):
+        raise ValueError("effect_types 和 timelines 必须同时提供且都是数组")
+    if len(effect_types) != len(timelines):
+        raise ValueError(f"effect_types 与 timelines 长度不一致: {len(effect_types)} != {len(timelines)}")
+
+    rows = []
+    for i, (effect_type, timeline) in enumerate(zip(effect_types, timelines)):
+        timeline = parse_json_param(timeline, f"timelines[{i}]")
+        if not isinstance(timeline, dict):
+            raise ValueError(f"timelines[{i}] 必须是包含 start 和 end 的对象")
+        rows.append({"effect_type": effect_type, "start": timeline.get("start"), "end": timeline.get("end")})
+    return rows
+
+
+def make_effect_infos(rows: List[Dict[str, Any]], defaults: Dict[str, Any]) -> tuple[List[str], List[str]]:
+    """
+    校验所有行并生成特效信息字符串
+
+    Returns:
+        (effect_infos, errors)，errors 非空时 effect_infos 不可用
+    """
+    effect_infos = []
+    errors = []
+    for i, row in enumerate(rows):
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                errors.append(f"第 {i + 1} 行: 不是有效的 JSON: {str(e)}")
+                continue
+        if not isinstance(row, dict):
+            errors.append(f"第 {i + 1} 行: 必须是对象")
+            continue
+
+        merged = {**defaults, **row}
+        unknown = [field for field in merged if field not in EffectInfoParams._fields]
+        if unknown:
+            errors.append(f"第 {i + 1} 行: 未知字段 {', '.join(unknown)}")
+            continue
+
+        try:
+            effect_info = build_effect_info(EffectInfoParams(**merged))
+            effect_infos.append(json.dumps(effect_info, ensure_ascii=False, separators=(',', ':')))
+        except ValueError as e:
+            errors.append(f"第 {i + 1} 行: {str(e)}")
+        except Exception as e:
+            errors.append(f"第 {i + 1} 行: 生成特效信息字符串时发生错误: {str(e)}")
+
+    return effect_infos, errors
+
+
+def handler(args: Args[Input]) -> Output:
+    """
+    批量创建特效信息字符串的主处理函数
+
+    Args:
+        args: 包含 rows 或并行数组，以及共享 defaults 的输入参数
+
+    Returns:
+        Output containing effect_infos, count, success status, and message
+    """
+    logger = getattr(args, 'logger', None)
+
+    try:
+        rows = collect_rows(args.input)
+        defaults = parse_json_param(getattr(args.input, 'defaults', None), "defaults") or {}
+        if not isinstance(defaults, dict):
+            raise ValueError("defaults 必须是对象")
+        if not rows:
+            raise ValueError("没有需要生成的特效信息")
+    except ValueError as e:
+        if logger:
+            logger.error(str(e))
+        return Output(effect_infos=[], count=0, success=False, message=str(e))
+
+    if logger:
+        logger.info(f"Creating {len(rows)} effect info strings")
+
+    effect_infos, errors = make_effect_infos(rows, defaults)
+
+    if errors:
+        message = f"{len(errors)} 行校验失败: " + "; ".join(errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            message += f"; 以及另外 {len(errors) - MAX_REPORTED_ERRORS} 个错误"
+        if logger:
+            logger.error(message)
+        return Output(effect_infos=[], count=0, success=False, message=message)
+
+    if logger:
+        logger.info(f"Successfully created {len(effect_infos)} effect info strings")
+
+    return Output(
+        effect_infos=effect_infos,
+        count=len(effect_infos),
+        success=True,
+        message=f"成功生成 {len(effect_infos)} 个特效信息字符串"
+    )
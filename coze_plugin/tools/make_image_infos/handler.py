@@ -0,0 +1,268 @@
+"""
+批量生成图片信息工具处理器
+
+一次调用生成多个图片信息字符串，输出可直接作为 add_images 的 image_infos 参数，
+替代逐条调用 make_image_info。支持两种输入方式：
+1. rows：行对象数组，每行的字段与 make_image_info 的参数相同
+2. 并行数组：image_urls + timelines（可直接使用 get_media_duration 输出的 timelines）
+
+defaults 中的参数对所有行生效，行内的同名字段优先。
+所有行在一次遍历中完成校验，任何一行失败时返回全部错误且不输出结果。
+"""
+
+import json
+from typing import NamedTuple, Optional, Dict, Any, List
+from runtime import Args
+
+
+# 失败时消息中最多列出的错误条数
+MAX_REPORTED_ERRORS = 20
+
+
+# Input/Output 类型定义（每个 Coze 工具都需要）
+class Input(NamedTuple):
+    """make_image_infos 工具的输入参数"""
+    rows: Optional[List[Dict[str, Any]]] = None          # 行对象数组，字段同 make_image_info
+    image_urls: Optional[List[str]] = None               # 并行数组：图片 URL
+    timelines: Optional[List[Dict[str, int]]] = None     # 并行数组：{"start", "end"}（毫秒）
+    defaults: Optional[Dict[str, Any]] = None            # 所有行共享的参数
+
+
+class Output(NamedTuple):
+    """make_image_infos 工具的输出"""
+    image_infos: List[str]    # 图片信息 JSON 字符串数组，可直接传给 add_images
+    count: int                # 生成的图片信息数量
+    success: bool             # Operation success status
+    message: str              # Status message
+
+
+class ImageInfoParams(NamedTuple):
+    """单条图片信息的参数（与 make_image_info 的 Input 相同，必需字段缺省为 None 以便给出中文错误）"""
+    image_url: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    position_x: Optional[float] = 0.0
+    position_y: Optional[float] = 0.0
+    scale_x: Optional[float] = 1.0
+    scale_y: Optional[float] = 1.0
+    rotation: Optional[float] = 0.0
+    opacity: Optional[float] = 1.0
+    crop_enabled: Optional[bool] = False
+    crop_left: Optional[float] = 0.0
+    crop_top: Optional[float] = 0.0
+    crop_right: Optional[float] = 1.0
+    crop_bottom: Optional[float] = 1.0
+    filter_type: Optional[str] = None
+    filter_intensity: Optional[float] = 1.0
+    transition_type: Optional[str] = None
+    transition_duration: Optional[int] = 500
+    background_blur: Optional[bool] = False
+    background_color: Optional[str] = None
+    fit_mode: Optional[str] = "fit"
+    in_animation: Optional[str] = None
+    in_animation_duration: Optional[int] = 500
+    outro_animation: Optional[str] = None
+    outro_animation_duration: Optional[int] = 500
+
+
+def build_image_info(params: ImageInfoParams) -> Dict[str, Any]:
+    """
+    校验参数并构建图片信息字典（规则与 make_image_info 相同，为 Coze 工具独立性在此重复定义）
+
+    Raises:
+        ValueError: 参数无效，消息与 make_image_info 一致
+    """
+    if not params.image_url:
+        raise ValueError("缺少必需的 image_url 参数")
+    if params.start is None:
+        raise ValueError("缺少必需的 start 参数")
+    if params.end is None:
+        raise ValueError("缺少必需的 end 参数")
+    if params.start < 0:
+        raise ValueError("start 时间不能为负数")
+    if params.end <= params.start:
+        raise ValueError("end 时间必须大于 start 时间")
+
+    image_info = {
+        "image_url": params.image_url,
+        "start": params.start,
+        "end": params.end
+    }
+
+    # 仅在非 None 或非默认值时添加可选参数
+    if params.position_x is not None and params.position_x != 0.0:
+        image_info["position_x"] = params.position_x
+    if params.position_y is not None and params.position_y != 0.0:
+        image_info["position_y"] = params.position_y
+    if params.scale_x is not None and params.scale_x != 1.0:
+        image_info["scale_x"] = params.scale_x
+    if params.scale_y is not None and params.scale_y != 1.0:
+        image_info["scale_y"] = params.scale_y
+    if params.rotation is not None and params.rotation != 0.0:
+        image_info["rotation"] = params.rotation
+    if params.opacity is not None and params.opacity != 1.0:
+        image_info["opacity"] = params.opacity
+
+    if params.crop_enabled:
+        image_info["crop_enabled"] = params.crop_enabled
+        image_info["crop_left"] = params.crop_left
+        image_info["crop_top"] = params.crop_top
+        image_info["crop_right"] = params.crop_right
+        image_info["crop_bottom"] = params.crop_bottom
+
+    if params.filter_type is not None:
+        image_info["filter_type"] = params.filter_type
+        if params.filter_intensity != 1.0:
+            image_info["filter_intensity"] = params.filter_intensity
+    if params.transition_type is not None:
+        image_info["transition_type"] = params.transition_type
+        if params.transition_duration != 500:
+            image_info["transition_duration"] = params.transition_duration
+
+    if params.background_blur:
+        image_info["background_blur"] = params.background_blur
+    if params.background_color is not None:
+        image_info["background_color"] = params.background_color
+    if params.fit_mode is not None and params.fit_mode != "fit":
+        image_info["fit_mode"] = params.fit_mode
+
+    if params.in_animation is not None:
+        image_info["in_animation"] = params.in_animation
+        if params.in_animation_duration != 500:
+            image_info["in_animation_duration"] = params.in_animation_duration
+    if params.outro_animation is not None:
+        image_info["outro_animation"] = params.outro_animation
+        if params.outro_animation_duration != 500:
+            image_info["outro_animation_duration"] = params.outro_animation_duration
+
+    return image_info
+
+
+def parse_json_param(value: Any, name: str) -> Any:
+    """Coze 可能以 JSON 字符串传入数组或对象参数，这里统一解码"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{name} 不是有效的 JSON: {str(e)}")
+    return value
+
+
+def collect_rows(input_data: Input) -> List[Dict[str, Any]]:
+    """
+    将 rows 或并行数组统一为行对象列表
+
+    Raises:
+        ValueError: 输入形式无效
+    """
+    rows = parse_json_param(getattr(input_data, 'rows', None), "rows")
+    image_urls = parse_json_param(getattr(input_data, 'image_urls', None), "image_urls")
+    timelines = parse_json_param(getattr(input_data, 'timelines', None), "timelines")
+
+    if rows is not None and (image_urls is not None or timelines is not None):
+        raise ValueError("rows 与 image_urls/timelines 不能同时提供")
+
+    if rows is not None:
+        if not isinstance(rows, list):
+            raise ValueError("rows 必须是数组")
+        return rows
+
+    if image_urls is None and timelines is None:
+        raise ValueError("请提供 rows，或 image_urls 与 timelines")
+    if not isinstance(image_urls, list) or not isinstance(timelines, list):
+        raise ValueError("image_urls 和 timelines 必须同时提供且都是数组")
+    if len(image_urls) != len(timelines):
+        raise ValueError(f"image_urls 与 timelines 长度不一致: {len(image_urls)} != {len(timelines)}")
+
+    rows = []
+    for i, (image_url, timeline) in enumerate(zip(image_urls, timelines)):
+        timeline = parse_json_param(timeline, f"timelines[{i}]")
+        if not isinstance(timeline, dict):
+            raise ValueError(f"timelines[{i}] 必须是包含 start 和 end 的对象")
+        rows.append({"image_url": image_url, "start": timeline.get("start"), "end": timeline.get("end")})
+    return rows
+
+
+def make_image_infos(rows: List[Dict[str, Any]], defaults: Dict[str, Any]) -> tuple[List[str], List[str]]:
+    """
+    校验所有行并生成图片信息字符串
+
+    Returns:
+        (image_infos, errors)，errors 非空时 image_infos 不可用
+    """
+    image_infos = []
+    errors = []
+    for i, row in enumerate(rows):
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                errors.append(f"第 {i + 1} 行: 不是有效的 JSON: {str(e)}")
+                continue
+        if not isinstance(row, dict):
+            errors.append(f"第 {i + 1} 行: 必须是对象")
+            continue
+
+        merged = {**defaults, **row}
+        unknown = [field for field in merged if field not in ImageInfoParams._fields]
+        if unknown:
+            errors.append(f"第 {i + 1} 行: 未知字段 {', '.join(unknown)}")
+            continue
+
+        try:
+            image_info = build_image_info(ImageInfoParams(**merged))
+            image_infos.append(json.dumps(image_info, ensure_ascii=False, separators=(',', ':')))
+        except ValueError as e:
+            errors.append(f"第 {i + 1} 行: {str(e)}")
+        except Exception as e:
+            errors.append(f"第 {i + 1} 行: 生成图片信息字符串时发生错误: {str(e)}")
+
+    return image_infos, errors
+
+
+def handler(args: Args[Input]) -> Output:
+    """
+    批量创建图片信息字符串的主处理函数
+
+    Args:
+        args: 包含 rows 或并行数组，以及共享 defaults 的输入参数
+
+    Returns:
+        Output containing image_infos, count, success status, and message
+    """
+    logger = getattr(args, 'logger', None)
+
+    try:
+        rows = collect_rows(args.input)
+        defaults = parse_json_param(getattr(args.input, 'defaults', None), "defaults") or {}
+        if not isinstance(defaults, dict):
+            raise ValueError("defaults 必须是对象")
+        if not rows:
+            raise ValueError("没有需要生成的图片信息")
+    except ValueError as e:
+        if logger:
+            logger.error(str(e))
+        return Output(image_infos=[], count=0, success=False, message=str(e))
+
+    if logger:
+        logger.info(f"Creating {len(rows)} image info strings")
+
+    image_infos, errors = make_image_infos(rows, defaults)
+
+    if errors:
+        message = f"{len(errors)} 行校验失败: " + "; ".join(errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            message += f"; 以及另外 {len(errors) - MAX_REPORTED_ERRORS} 个错误"
+        if logger:
+            logger.error(message)
+        return Output(image_infos=[], count=0, success=False, message=message)
+
+    if logger:
+        logger.info(f"Successfully created {len(image_infos)} image info strings")
+
+    return Output(
+        image_infos=image_infos,
+        count=len(image_infos),
+        success=True,
+        message=f"成功生成 {len(image_infos)} 个图片信息字符串"
+    )
@@ -0,0 +1,289 @@
+"""
+批量生成视频信息工具处理器
+
+一次调用生成多个视频信息字符串，输出可直接作为 add_videos 的 video_infos 参数，
+替代逐条调用 make_video_info。支持两种输入方式：
+1. rows：行对象数组，每行的字段与 make_video_info 的参数相同
+2. 并行数组：video_urls + timelines（可直接使用 get_media_duration 输出的 timelines）
+
+defaults 中的参数对所有行生效，行内的同名字段优先。
+所有行在一次遍历中完成校验，任何一行失败时返回全部错误且不输出结果。
+"""
+
+import json
+from typing import NamedTuple, Optional, Dict, Any, List
+from runtime import Args
+
+
+# 失败时消息中最多列出的错误条数
+MAX_REPORTED_ERRORS = 20
+
+
+# Input/Output 类型定义（每个 Coze 工具都需要）
+class Input(NamedTuple):
+    """make_video_infos 工具的输入参数"""
+    rows: Optional[List[Dict[str, Any]]] = None          # 行对象数组，字段同 make_video_info
+    video_urls: Optional[List[str]] = None               # 并行数组：视频 URL
+    timelines: Optional[List[Dict[str, int]]] = None     # 并行数组：{"start", "end"}（毫秒）
+    defaults: Optional[Dict[str, Any]] = None            # 所有行共享的参数
+
+
+class Output(NamedTuple):
+    """make_video_infos 工具的输出"""
+    video_infos: List[str]    # 视频信息 JSON 字符串数组，可直接传给 add_videos
+    count: int                # 生成的视频信息数量
+    success: bool             # Operation success status
+    message: str              # Status message
+
+
+class VideoInfoParams(NamedTuple):
+    """单条视频信息的参数（与 make_video_info 的 Input 相同，必需字段缺省为 None 以便给出中文错误）"""
+    video_url: Optional[str] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+    material_start: Optional[int] = None
+    material_end: Optional[int] = None
+    position_x: Optional[float] = 0.0
+    position_y: Optional[float] = 0.0
+    scale_x: Optional[float] = 1.0
+    scale_y: Optional[float] = 1.0
+    rotation: Optional[float] = 0.0
+    opacity: Optional[float] = 1.0
+    flip_horizontal: Optional[bool] = False
+    flip_vertical: Optional[bool] = False
+    crop_enabled: Optional[bool] = False
+    crop_left: Optional[float] = 0.0
+    crop_top: Optional[float] = 0.0
+    crop_right: Optional[float] = 1.0
+    crop_bottom: Optional[float] = 1.0
+    filter_type: Optional[str] = None
+    filter_intensity: Optional[float] = 1.0
+    transition_type: Optional[str] = None
+    transition_duration: Optional[int] = 500
+    speed: Optional[float] = 1.0
+    reverse: Optional[bool] = False
+    volume: Optional[float] = 1.0
+    change_pitch: Optional[bool] = False
+    background_blur: Optional[bool] = False
+    background_color: Optional[str] = None
+
+
+def build_video_info(params: VideoInfoParams) -> Dict[str, Any]:
+    """
+    校验参数并构建视频信息字典（规则与 make_video_info 相同，为 Coze 工具独立性在此重复定义）
+
+    Raises:
+        ValueError: 参数无效，消息与 make_video_info 一致
+    """
+    if not params.video_url:
+        raise ValueError("缺少必需的 video_url 参数")
+    if params.start is None:
+        raise ValueError("缺少必需的 start 参数")
+    if params.end is None:
+        raise ValueError("缺少必需的 end 参数")
+    if params.start < 0:
+        raise ValueError("start 时间不能为负数")
+    if params.end <= params.start:
+        raise ValueError("end 时间必须大于 start 时间")
+
+    if params.material_start is not None or params.material_end is not None:
+        if params.material_start is None or params.material_end is None:
+            raise ValueError("material_start 和 material_end 必须同时提供")
+        if params.material_start < 0:
+            raise ValueError("material_start 时间不能为负数")
+        if params.material_end <= params.material_start:
+            raise ValueError("material_end 时间必须大于 material_start 时间")
+
+    if params.speed is not None and (params.speed < 0.5 or params.speed > 2.0):
+        raise ValueError("speed 必须在 0.5 到 2.0 之间")
+
+    video_info = {
+        "video_url": params.video_url,
+        "start": params.start,
+        "end": params.end
+    }
+
+    # 仅在非 None 或非默认值时添加可选参数
+    if params.material_start is not None and params.material_end is not None:
+        video_info["material_start"] = params.material_start
+        video_info["material_end"] = params.material_end
+
+    if params.position_x is not None and params.position_x != 0.0:
+        video_info["position_x"] = params.position_x
+    if params.position_y is not None and params.position_y != 0.0:
+        video_info["position_y"] = params.position_y
+    if params.scale_x is not None and params.scale_x != 1.0:
+        video_info["scale_x"] = params.scale_x
+    if params.scale_y is not None and params.scale_y != 1.0:
+        video_info["scale_y"] = params.scale_y
+    if params.rotation is not None and params.rotation != 0.0:
+        video_info["rotation"] = params.rotation
+    if params.opacity is not None and params.opacity != 1.0:
+        video_info["opacity"] = params.opacity
+    if params.flip_horizontal:
+        video_info["flip_horizontal"] = params.flip_horizontal
+    if params.flip_vertical:
+        video_info["flip_vertical"] = params.flip_vertical
+
+    if params.crop_enabled:
+        video_info["crop_enabled"] = params.crop_enabled
+        video_info["crop_left"] = params.crop_left
+        video_info["crop_top"] = params.crop_top
+        video_info["crop_right"] = params.crop_right
+        video_info["crop_bottom"] = params.crop_bottom
+
+    if params.filter_type is not None:
+        video_info["filter_type"] = params.filter_type
+        if params.filter_intensity != 1.0:
+            video_info["filter_intensity"] = params.filter_intensity
+    if params.transition_type is not None:
+        video_info["transition_type"] = params.transition_type
+        if params.transition_duration != 500:
+            video_info["transition_duration"] = params.transition_duration
+
+    if params.speed != 1.0:
+        video_info["speed"] = params.speed
+    if params.reverse:
+        video_info["reverse"] = params.reverse
+
+    if params.volume != 1.0:
+        video_info["volume"] = params.volume
+    if params.change_pitch:
+        video_info["change_pitch"] = params.change_pitch
+
+    if params.background_blur:
+        video_info["background_blur"] = params.background_blur
+    if params.background_color is not None:
+        video_info["background_color"] = params.background_color
+
+    return video_info
+
+
+def parse_json_param(value: Any, name: str) -> Any:
+    """Coze 可能以 JSON 字符串传入数组或对象参数，这里统一解码"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{name} 不是有效的 JSON: {str(e)}")
+    return value
+
+
+def collect_rows(input_data: Input) -> List[Dict[str, Any]]:
+    """
+    将 rows 或并行数组统一为行对象列表
+
+    Raises:
+        ValueError: 输入形式无效
+    """
+    rows = parse_json_param(getattr(input_data, 'rows', None), "rows")
+    video_urls = parse_json_param(getattr(input_data, 'video_urls', None), "video_urls")
+    timelines = parse_json_param(getattr(input_data, 'timelines', None), "timelines")
+
+    if rows is not None and (video_urls is not None or timelines is not None):
+        raise ValueError("rows 与 video_urls/timelines 不能同时提供")
+
+    if rows is not None:
+        if not isinstance(rows, list):
+            raise ValueError("rows 必须是数组")
+        return rows
+
+    if video_urls is None and timelines is None:
+        raise ValueError("请提供 rows，或 video_urls 与 timelines")
+    if not isinstance(video_urls, list) or not isinstance(timelines, list):
+        raise ValueError("video_urls 和 timelines 必须同时提供且都是数组")
+    if len(video_urls) != len(timelines):
+        raise ValueError(f"video_urls 与 timelines 长度不一致: {len(video_urls)} != {len(timelines)}")
+
+    rows = []
+    for i, (video_url, timeline) in enumerate(zip(video_urls, timelines)):
+        timeline = parse_json_param(timeline, f"timelines[{i}]")
+        if not isinstance(timeline, dict):
+            raise ValueError(f"timelines[{i}] 必须是包含 start 和 end 的对象")
+        rows.append({"video_url": video_url, "start": timeline.get("start"), "end": timeline.get("end")})
+    return rows
+
+
+def make_video_infos(rows: List[Dict[str, Any]], defaults: Dict[str, Any]) -> tuple[List[str], List[str]]:
+    """
+    校验所有行并生成视频信息字符串
+
+    Returns:
+        (video_infos, errors)，errors 非空时 video_infos 不可用
+    """
+    video_infos = []
+    errors = []
+    for i, row in enumerate(rows):
+        if isinstance(row, str):
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                errors.append(f"第 {i + 1} 行: 不是有效的 JSON: {str(e)}")
+                continue
+        if not isinstance(row, dict):
+            errors.append(f"第 {i + 1} 行: 必须是对象")
+            continue
+
+        merged = {**defaults, **row}
+        unknown = [field for field in merged if field not in VideoInfoParams._fields]
+        if unknown:
+            errors.append(f"第 {i + 1} 行: 未知字段 {', '.join(unknown)}")
+            continue
+
+        try:
+            video_info = build_video_info(VideoInfoParams(**merged))
+            video_infos.append(json.dumps(video_info, ensure_ascii=False, separators=(',', ':')))
+        except ValueError as e:
+            errors.append(f"第 {i + 1} 行: {str(e)}")
+        except Exception as e:
+            errors.append(f"第 {i + 1} 行: 生成视频信息字符串时发生错误: {str(e)}")
+
+    return video_infos, errors
+
+
+def handler(args: Args[Input]) -> Output:
+    """
+    批量创建视频信息字符串的主处理函数
+
+    Args:
+        args: 包含 rows 或并行数组，以及共享 defaults 的输入参数
+
+    Returns:
+        Output containing video_infos, count, success status, and message
+    """
+    logger = getattr(args, 'logger', None)
+
+    try:
+        rows = collect_rows(args.input)
+        defaults = parse_json_param(getattr(args.input, 'defaults', None), "defaults") or {}
+        if not isinstance(defaults, dict):
+            raise ValueError("defaults 必须是对象")
+        if not rows:
+            raise ValueError("没有需要生成的视频信息")
+    except ValueError as e:
+        if logger:
+            logger.error(str(e))
+        return Output(video_infos=[], count=0, success=False, message=str(e))
+
+    if logger:
+        logger.info(f"Creating {len(rows)} video info strings")
+
+    video_infos, errors = make_video_infos(rows, defaults)
+
+    if errors:
+        message = f"{len(errors)} 行校验失败: " + "; ".join(errors[:MAX_REPORTED_ERRORS])
+        if len(errors) > MAX_REPORTED_ERRORS:
+            message += f"; 以及另外 {len(errors) - MAX_REPORTED_ERRORS} 个错误"
+        if logger:
+            logger.error(message)
+        return Output(video_infos=[], count=0, success=False, message=message)
+
+    if logger:
+        logger.info(f"Successfully created {len(video_infos)} video info strings")
+
+    return Output(
+        video_infos=video_infos,
+        count=len(video_infos),
+        success=True,
+        message=f"成功生成 {len(video_infos)} 个视频信息字符串"
+    )
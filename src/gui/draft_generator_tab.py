@@ -12,7 +12,9 @@ import threading
 
 from gui.base_tab import BaseTab
 from utils.draft_generator import DraftGenerator
+from utils.draft_meta_watcher import DraftMetaWatcher
 from utils.logger import get_logger
+from utils.progress import format_progress
 
 
 class DraftGeneratorTab(BaseTab):
@@ -34,6 +36,10 @@ class DraftGeneratorTab(BaseTab):
         # 初始化草稿生成器（标签页特定）
         self.draft_generator = DraftGenerator()
         
+        # 最近一条进度事件（生成线程写入，_check_generation_status 在主线程中显示）
+        self._latest_progress = None
+        self.draft_generator.progress.subscribe(self._on_progress)
+        
         # 输出文件夹路径（标签页特定）
         self.output_folder = None
         
@@ -41,6 +47,9 @@ class DraftGeneratorTab(BaseTab):
         self.generation_thread = None
         self.is_generating = False
         
+        # 元信息自动更新（监视草稿文件夹）
+        self.meta_watcher = None
+        
         # 调用父类初始化
         super().__init__(parent, "手动草稿生成")
     
@@ -94,6 +103,13 @@ class DraftGeneratorTab(BaseTab):
             text="清空",
             command=self._clear_input
         )
+        self.watch_meta_var = tk.BooleanVar(value=False)
+        self.watch_meta_check = ttk.Checkbutton(
+            self.button_frame,
+            text="自动更新元信息",
+            variable=self.watch_meta_var,
+            command=self._toggle_meta_watch
+        )
         
         # 状态栏
         self.status_var = tk.StringVar(value="就绪")
@@ -127,6 +143,7 @@ class DraftGeneratorTab(BaseTab):
         self.generate_btn.pack(side=tk.LEFT, padx=(0, 5))
         self.generate_meta_btn.pack(side=tk.LEFT, padx=(0, 5))
         self.clear_btn.pack(side=tk.LEFT, padx=(0, 5))
+        self.watch_meta_check.pack(side=tk.LEFT, padx=(10, 0))
         
         # 状态栏
         self.status_bar.grid(row=4, column=0, sticky=(tk.W, tk.E))
@@ -146,6 +163,7 @@ class DraftGeneratorTab(BaseTab):
             self.folder_var.set(folder)
             self.logger.info(f"已选择输出文件夹: {folder}")
             self.status_var.set(f"输出文件夹: {folder}")
+            self._restart_meta_watch()
     
     def _auto_detect_folder(self):
         """自动检测剪映草稿文件夹"""
@@ -158,6 +176,7 @@ class DraftGeneratorTab(BaseTab):
             self.folder_var.set(detected_path)
             self.logger.info(f"检测到剪映草稿文件夹: {detected_path}")
             self.status_var.set(f"已检测到: {detected_path}")
+            self._restart_meta_watch()
             messagebox.showinfo("检测成功", f"已检测到剪映草稿文件夹:\n{detected_path}")
         else:
             self.logger.warning("未能检测到剪映草稿文件夹")
@@ -229,9 +248,16 @@ class DraftGeneratorTab(BaseTab):
             # 使用after方法在主线程中更新GUI
             self.frame.after(0, self._on_generation_error, e)
     
+    def _on_progress(self, event):
+        """进度事件回调（在生成线程中执行，只记录最新事件）"""
+        self._latest_progress = event
+    
     def _check_generation_status(self):
         """定期检查生成状态"""
         if self.generation_thread and self.generation_thread.is_alive():
+            event = self._latest_progress
+            if event is not None:
+                self.status_var.set(format_progress(event))
             # 线程仍在运行，100ms后再次检查
             self.frame.after(100, self._check_generation_status)
         else:
@@ -241,6 +267,7 @@ class DraftGeneratorTab(BaseTab):
     def _on_generation_success(self, draft_paths):
         """生成成功的回调"""
         self.logger.info(f"草稿生成成功: {draft_paths}")
+        self._latest_progress = None
         self.status_var.set("草稿生成成功")
         self.generate_btn.config(state=tk.NORMAL)
         
@@ -254,6 +281,7 @@ class DraftGeneratorTab(BaseTab):
     def _on_generation_error(self, error):
         """生成失败的回调"""
         self.logger.error(f"草稿生成失败: {error}", exc_info=True)
+        self._latest_progress = None
         self.status_var.set("草稿生成失败")
         self.generate_btn.config(state=tk.NORMAL)
         messagebox.showerror("错误", f"草稿生成失败:\n{error}")
@@ -300,8 +328,15 @@ class DraftGeneratorTab(BaseTab):
         self.generate_meta_btn.config(state=tk.DISABLED)
         
         try:
-            # 调用草稿生成器的方法
-            meta_info_path = self.draft_generator.generate_root_meta_info(target_folder)
+            watcher = self.meta_watcher
+            if watcher is not None and watcher.is_running() and \
+                    os.path.normcase(watcher.draft_root_path) == os.path.normcase(os.path.abspath(target_folder)):
+                # 自动更新已开启：由监视器立即重新检查并重写，保留已有草稿的 ID，避免两处同时写入
+                watcher.refresh(force=True)
+                meta_info_path = watcher.meta_info_path
+            else:
+                # 调用草稿生成器的方法
+                meta_info_path = self.draft_generator.generate_root_meta_info(target_folder)
             
             self.logger.info(f"元信息文件生成成功: {meta_info_path}")
             self.status_var.set("元信息生成成功")
@@ -315,8 +350,77 @@ class DraftGeneratorTab(BaseTab):
         finally:
             self.generate_meta_btn.config(state=tk.NORMAL)
     
+    def _toggle_meta_watch(self):
+        """开启或关闭元信息自动更新"""
+        if not self.watch_meta_var.get():
+            self._stop_meta_watch()
+            self.status_var.set("已停止自动更新元信息")
+            return
+        
+        # 确定目标文件夹
+        target_folder = self.output_folder
+        if target_folder is None:
+            target_folder = self.draft_generator.detect_default_draft_folder()
+            if target_folder is None:
+                self.watch_meta_var.set(False)
+                messagebox.showerror(
+                    "错误",
+                    "未指定文件夹，且无法自动检测到剪映草稿文件夹。\n\n请点击「选择文件夹...」或「自动检测」按钮指定位置。"
+                )
+                return
+            self.logger.info(f"自动检测到文件夹: {target_folder}")
+        
+        if not os.path.isdir(target_folder):
+            self.watch_meta_var.set(False)
+            messagebox.showerror("错误", f"指定的文件夹不存在:\n{target_folder}\n\n请重新选择有效的文件夹。")
+            return
+        
+        # 回调在监视线程中执行，使用after方法在主线程中更新GUI
+        def on_update(changed, root_meta_info):
+            self.frame.after(0, self._on_meta_updated, changed, root_meta_info["draft_ids"])
+        
+        self.meta_watcher = DraftMetaWatcher(target_folder, on_update=on_update)
+        try:
+            self.meta_watcher.start()
+        except Exception as e:
+            self.meta_watcher = None
+            self.watch_meta_var.set(False)
+            self.logger.error(f"启动元信息自动更新失败: {e}", exc_info=True)
+            messagebox.showerror("错误", f"启动元信息自动更新失败:\n{e}")
+            return
+        
+        self.logger.info(f"已开启元信息自动更新: {target_folder}")
+        self.status_var.set("正在监视草稿文件夹，root_meta_info.json 将自动更新")
+    
+    def _on_meta_updated(self, changed, draft_count):
+        """元信息自动更新后的回调"""
+        if self.meta_watcher is None:
+            return
+        time_str = datetime.now().strftime("%H:%M:%S")
+        self.status_var.set(f"[{time_str}] 元信息已更新：{len(changed)} 个草稿变化，共 {draft_count} 个草稿")
+    
+    def _restart_meta_watch(self):
+        """输出文件夹变化后，如果自动更新已开启，则改为监视新的文件夹"""
+        if self.meta_watcher is None:
+            return
+        self._stop_meta_watch()
+        self.watch_meta_var.set(True)
+        self._toggle_meta_watch()
+    
+    def _stop_meta_watch(self):
+        """停止元信息自动更新"""
+        if self.meta_watcher is not None:
+            self.meta_watcher.stop()
+            self.meta_watcher = None
+            self.logger.info("已停止元信息自动更新")
+        if self.watch_meta_var.get():
+            self.watch_meta_var.set(False)
+    
     def cleanup(self):
         """清理标签页资源"""
+        self._stop_meta_watch()
+        if self.draft_generator:
+            self.draft_generator.progress.unsubscribe(self._on_progress)
         super().cleanup()
         # 清理标签页特定的资源
         self.output_folder = None
@@ -5,18 +5,39 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext
 from datetime import datetime
 
+from utils.logger import export_log_file
+from utils.log_buffer import (
+    DEFAULT_MAX_LOG_LINES, build_log_chunks, classify_log_level, flatten_chunks, level_tag, lines_to_trim
+)
+
+
+def trim_log_text(log_text, max_lines: int):
+    """
+    删除日志文本框中超出上限的最旧行（调用时文本框须处于可编辑状态）
+    
+    Args:
+        log_text: 日志文本框
+        max_lines: 最多保留的行数，小于等于 0 表示不限制
+    """
+    line_count = int(log_text.index("end-1c").split(".")[0])
+    trim = lines_to_trim(line_count, max_lines)
+    if trim:
+        log_text.delete("1.0", f"{trim + 1}.0")
+
 
 class LogWindow:
     """日志窗口类"""
     
-    def __init__(self, parent):
+    def __init__(self, parent, max_lines: int = DEFAULT_MAX_LOG_LINES):
         """
         初始化日志窗口
         
         Args:
             parent: 父窗口
+            max_lines: 最多显示的日志行数，小于等于 0 表示不限制
         """
         self.parent = parent
+        self.max_lines = max_lines
         self.window = tk.Toplevel(parent)
         self.window.title("日志查看器")
         self.window.geometry("800x500")
@@ -96,36 +117,36 @@ class LogWindow:
         # 日志文本框
         self.log_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
     
-    def append_log(self, message: str):
+    def append_log(self, message: str, level: str = None):
         """
         添加日志消息
         
         Args:
             message: 日志消息
+            level: 日志级别名称，为 None 时从消息文本推断
         """
-        if not self.is_open():
-            return
+        tag = level_tag(level) if level else classify_log_level(message)
+        self.append_logs(build_log_chunks([(message, tag)]))
+    
+    def append_logs(self, chunks):
+        """
+        批量添加日志（一次插入、一次滚动）
         
-        # 确定日志级别
-        tag = "INFO"
-        if "ERROR" in message:
-            tag = "ERROR"
-        elif "WARNING" in message:
-            tag = "WARNING"
-        elif "DEBUG" in message:
-            tag = "DEBUG"
+        Args:
+            chunks: build_log_chunks 生成的 (文本, 标签) 片段
+        """
+        if not self.is_open() or not chunks:
+            return
         
         # 添加日志
         self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, message + "\n", tag)
+        self.log_text.insert(tk.END, *flatten_chunks(chunks))
+        trim_log_text(self.log_text, self.max_lines)
         self.log_text.config(state=tk.DISABLED)
         
         # 自动滚动到底部
         if self.auto_scroll_var.get():
             self.log_text.see(tk.END)
-        
-        # 强制更新显示
-        self.log_text.update_idletasks()
     
     def _clear_logs(self):
         """清空日志"""
@@ -134,12 +155,9 @@ class LogWindow:
         self.log_text.config(state=tk.DISABLED)
     
     def _save_logs(self):
-        """保存日志到文件"""
+        """保存日志到文件（从日志文件复制完整记录，没有日志文件时保存窗口中的内容）"""
         from tkinter import filedialog
         
-        # 获取日志内容
-        log_content = self.log_text.get("1.0", tk.END)
-        
         # 选择保存位置
         filename = filedialog.asksaveasfilename(
             defaultextension=".log",
@@ -149,8 +167,9 @@ class LogWindow:
         
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(log_content)
+                if not export_log_file(filename):
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        f.write(self.log_text.get("1.0", tk.END))
                 from tkinter import messagebox
                 messagebox.showinfo("成功", f"日志已保存到: {filename}")
             except Exception as e:
@@ -7,18 +7,26 @@ from pathlib import Path
 from datetime import datetime
 import os
 
-from gui.log_window import LogWindow
+from gui.log_window import LogWindow, trim_log_text
 from gui.draft_generator_tab import DraftGeneratorTab
 from gui.local_service_tab import LocalServiceTab
 from gui.example_tab import ExampleTab
-from utils.logger import get_logger, set_gui_log_callback
+from utils.logger import get_logger, set_gui_log_callback, export_log_file
+from utils.log_buffer import (
+    LogBuffer, LOG_FLUSH_INTERVAL_MS, DEFAULT_MAX_LOG_LINES, build_log_chunks, flatten_chunks
+)
 
 
 class MainWindow:
     """主窗口类"""
     
-    def __init__(self):
+    def __init__(self, max_log_lines: int = DEFAULT_MAX_LOG_LINES):
+        """
+        Args:
+            max_log_lines: 日志面板最多显示的行数，小于等于 0 表示不限制（完整日志见日志文件）
+        """
         self.logger = get_logger(__name__)
+        self.max_log_lines = max_log_lines
         self.root = tk.Tk()
         self.root.title("Coze剪映草稿生成器")
         self.root.geometry("900x700")
@@ -37,6 +45,9 @@ class MainWindow:
         # 标签页列表（用于管理所有标签页）
         self.tabs = []
         
+        # 日志缓冲区：任意线程写入，主线程按固定间隔批量显示
+        self.log_buffer = LogBuffer()
+        
         # 设置GUI日志回调
         set_gui_log_callback(self._on_log_message)
         
@@ -44,6 +55,9 @@ class MainWindow:
         self._create_widgets()
         self._setup_layout()
         
+        # 开始定时刷新日志
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log_buffer)
+        
         # 绑定关闭事件
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
     
@@ -179,12 +193,9 @@ class MainWindow:
         self.embedded_log_text.config(state=tk.DISABLED)
     
     def _save_embedded_logs(self):
-        """保存嵌入式日志到文件"""
+        """保存日志到文件（从日志文件复制完整记录，没有日志文件时保存面板中的内容）"""
         from tkinter import filedialog
         
-        # 获取日志内容
-        log_content = self.embedded_log_text.get("1.0", tk.END)
-        
         # 选择保存位置
         filename = filedialog.asksaveasfilename(
             defaultextension=".log",
@@ -194,39 +205,33 @@ class MainWindow:
         
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(log_content)
+                if not export_log_file(filename):
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        f.write(self.embedded_log_text.get("1.0", tk.END))
                 messagebox.showinfo("成功", f"日志已保存到: {filename}")
             except Exception as e:
                 messagebox.showerror("错误", f"保存日志失败: {e}")
     
-    def _append_to_embedded_log(self, message: str):
-        """添加日志到嵌入式日志面板"""
-        # 确定日志级别
-        tag = "INFO"
-        if "ERROR" in message:
-            tag = "ERROR"
-        elif "WARNING" in message:
-            tag = "WARNING"
-        elif "DEBUG" in message:
-            tag = "DEBUG"
-        
-        # 添加日志
+    def _append_to_embedded_log(self, chunks):
+        """
+        添加日志到嵌入式日志面板
+        
+        Args:
+            chunks: build_log_chunks 生成的 (文本, 标签) 片段，一次插入
+        """
         self.embedded_log_text.config(state=tk.NORMAL)
-        self.embedded_log_text.insert(tk.END, message + "\n", tag)
+        self.embedded_log_text.insert(tk.END, *flatten_chunks(chunks))
+        trim_log_text(self.embedded_log_text, self.max_log_lines)
         self.embedded_log_text.config(state=tk.DISABLED)
         
         # 自动滚动到底部
         if self.auto_scroll_var.get():
             self.embedded_log_text.see(tk.END)
-        
-        # 强制更新显示
-        self.embedded_log_text.update_idletasks()
     
     def _show_log_window(self):
         """显示独立日志窗口"""
         if self.log_window is None or not self.log_window.is_open():
-            self.log_window = LogWindow(self.root)
+            self.log_window = LogWindow(self.root, max_lines=self.max_log_lines)
         else:
             self.log_window.focus()
     
@@ -240,22 +245,28 @@ class MainWindow:
 © 2025 版权所有"""
         messagebox.showinfo("关于", about_text)
     
-    def _on_log_message(self, message: str):
-        """处理日志消息（线程安全）"""
-        # 使用after方法确保在主线程中更新GUI
-        def update_log():
-            # 更新嵌入式日志面板
-            self._append_to_embedded_log(message)
-            
-            # 同时更新独立日志窗口（如果已打开）
-            if self.log_window and self.log_window.is_open():
-                self.log_window.append_log(message)
-        
+    def _on_log_message(self, message: str, level: str = None):
+        """处理日志消息（线程安全，只写入缓冲区，由 _flush_log_buffer 在主线程中显示）"""
+        self.log_buffer.append(message, level)
+    
+    def _flush_log_buffer(self):
+        """将缓冲区中的日志一次性显示到日志面板，并安排下一次刷新"""
         try:
-            self.root.after(0, update_log)
-        except:
-            # 如果root已销毁，忽略错误
-            pass
+            entries, dropped = self.log_buffer.drain()
+            if entries or dropped:
+                chunks = build_log_chunks(entries, dropped)
+                
+                # 更新嵌入式日志面板
+                self._append_to_embedded_log(chunks)
+                
+                # 同时更新独立日志窗口（如果已打开）
+                if self.log_window and self.log_window.is_open():
+                    self.log_window.append_logs(chunks)
+        except tk.TclError:
+            # 窗口正在销毁
+            return
+        
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log_buffer)
     
     def _on_closing(self):
         """窗口关闭事件"""
@@ -0,0 +1,269 @@
+"""
+素材清单
+MaterialManager 每下载一个素材就在内存中的清单（AssetManifest）里记录
+文件名 -> (大小, mtime, sha256)，批量下载结束或生成草稿结束时一次写入素材文件夹，
+元信息扫描计算素材大小时直接读取清单。
+
+清单缺失、损坏或与文件夹内容不一致（有文件被手动增删或替换导致大小/mtime 变化、
+或存在子文件夹）时视为过期，此时回退为单次 os.scandir 遍历。
+"""
+import os
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Set
+from utils.atomic_write import DURABILITY_NONE, TEMP_SUFFIX, atomic_write_json
+
+
+# 清单文件名（位于素材文件夹内）
+MANIFEST_FILENAME = ".coze_asset_manifest.json"
+
+# 清单格式版本
+MANIFEST_VERSION = 1
+
+# 同一进程内多个 MaterialManager 可能同时写入同一清单
+_manifest_lock = threading.Lock()
+
+
+def file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """计算文件的 sha256 摘要（十六进制）"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(folder: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    读取素材清单
+
+    Args:
+        folder: 素材文件夹路径
+
+    Returns:
+        文件名 -> {"size", "mtime_ns", "digest"}；清单不存在或无效时返回 None
+    """
+    try:
+        with open(os.path.join(folder, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    files = manifest.get("files")
+    return files if isinstance(files, dict) else None
+
+
+def _save_manifest(folder: str, files: Dict[str, Dict[str, Any]]) -> None:
+    """写入素材清单（原子替换；清单失效时会回退到扫描，不需要 fsync）"""
+    atomic_write_json(os.path.join(folder, MANIFEST_FILENAME),
+                      {"version": MANIFEST_VERSION, "files": files}, durability=DURABILITY_NONE)
+
+
+def _entry_matches(info: Any, stat: os.stat_result) -> bool:
+    """清单条目的大小和 mtime 是否与文件一致"""
+    return (isinstance(info, dict) and info.get("size") == stat.st_size
+            and info.get("mtime_ns") == stat.st_mtime_ns)
+
+
+class AssetManifest:
+    """
+    内存中的素材清单
+
+    record 只更新内存，flush 时一次写入文件：重新读取磁盘上的清单合并本实例记录的条目
+    （同一文件夹可能有其他写入者），并用一次 scandir 移除已经不存在的文件。
+    """
+
+    def __init__(self, folder: str):
+        """
+        Args:
+            folder: 素材文件夹路径
+        """
+        self.folder = folder
+        self._files: Optional[Dict[str, Dict[str, Any]]] = None
+        self._recorded: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _loaded(self) -> Dict[str, Dict[str, Any]]:
+        if self._files is None:
+            self._files = load_manifest(self.folder) or {}
+        return self._files
+
+    def is_current(self, file_path: str) -> bool:
+        """文件是否已记录且大小和 mtime 与清单一致"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        with self._lock:
+            return _entry_matches(self._loaded().get(os.path.basename(file_path)), stat)
+
+    def record(self, file_path: str, digest: Optional[str] = None) -> Dict[str, Any]:
+        """
+        记录素材文件（只更新内存，调用 flush 后写入）
+
+        Args:
+            file_path: 素材文件路径（必须直接位于清单所在的文件夹中）
+            digest: 已知的 sha256 摘要（下载时边写边算），None 时读取文件计算
+
+        Returns:
+            该文件的清单条目
+
+        Raises:
+            OSError: 文件不存在或无法读取
+        """
+        stat = os.stat(file_path)
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": digest or file_digest(file_path),
+        }
+        name = os.path.basename(file_path)
+        with self._lock:
+            self._loaded()[name] = entry
+            self._recorded[name] = entry
+        return entry
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未写入的记录"""
+        return bool(self._recorded)
+
+    def flush(self) -> None:
+        """
+        将记录写入清单文件（没有新记录时不写入）
+
+        Raises:
+            OSError: 清单无法写入（记录保留，下次 flush 时重试）
+        """
+        with self._lock:
+            if not self._recorded:
+                return
+            with _manifest_lock:
+                files = load_manifest(self.folder) or {}
+                files.update(self._recorded)
+                try:
+                    names = _list_asset_names(self.folder, allow_subfolders=True)
+                except OSError:
+                    names = None
+                if names is not None:
+                    files = {name: info for name, info in files.items() if name in names}
+                _save_manifest(self.folder, files)
+            self._files = files
+            self._recorded = {}
+
+
+def record_asset(folder: str, file_path: str, digest: Optional[str] = None) -> Dict[str, Any]:
+    """
+    将单个素材文件记录到清单并立即写入
+
+    同时移除清单中已经不存在的文件，保持清单与文件夹一致。
+    连续记录多个素材时应使用 AssetManifest，最后 flush 一次。
+
+    Args:
+        folder: 素材文件夹路径
+        file_path: 素材文件路径（必须直接位于 folder 中）
+        digest: 已知的 sha256 摘要（下载时边写边算），None 时读取文件计算
+
+    Returns:
+        该文件的清单条目
+
+    Raises:
+        OSError: 文件不存在或清单无法写入
+    """
+    manifest = AssetManifest(folder)
+    entry = manifest.record(file_path, digest)
+    manifest.flush()
+    return entry
+
+
+def _list_asset_names(folder: str, allow_subfolders: bool = False) -> Optional[Set[str]]:
+    """
+    列出素材文件名（只读目录项，不 stat 文件）
+
+    存在子文件夹时返回 None；allow_subfolders 为 True 时忽略子文件夹。
+    """
+    names = set()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name == MANIFEST_FILENAME or entry.name.endswith(TEMP_SUFFIX):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if allow_subfolders:
+                    continue
+                return None
+            names.add(entry.name)
+    return names
+
+
+def _manifest_matches_folder(folder: str, files: Dict[str, Dict[str, Any]]) -> bool:
+    """
+    单次 scandir 检查清单是否与文件夹一致
+
+    文件名集合相同，且每个文件的大小和 mtime 与清单记录一致（DirEntry.stat 在 Windows 上
+    直接使用目录项中的信息，不额外调用 stat）。存在子文件夹时视为不一致。
+    """
+    seen = 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name == MANIFEST_FILENAME or entry.name.endswith(TEMP_SUFFIX):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                return False
+            if not _entry_matches(files.get(entry.name), entry.stat(follow_symlinks=False)):
+                return False
+            seen += 1
+    return seen == len(files)
+
+
+def scan_folder_size(folder: str) -> int:
+    """
+    单次 os.scandir 遍历计算文件夹总大小（字节）
+
+    使用 DirEntry 自带的类型信息和 stat 缓存，每个文件最多一次 stat 调用。
+    清单文件本身不计入。
+    """
+    total_size = 0
+    pending = [folder]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and entry.name != MANIFEST_FILENAME:
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue  # 遍历过程中被删除的文件
+        except OSError:
+            continue
+    return total_size
+
+
+def get_folder_size(folder: str) -> int:
+    """
+    获取素材文件夹总大小（字节），优先使用清单
+
+    清单中的文件与文件夹中的一致（文件名、大小和 mtime 都相同）时直接累加清单记录的大小；
+    否则回退到 scan_folder_size。文件夹不存在时返回 0。
+    """
+    if not os.path.isdir(folder):
+        return 0
+
+    files = load_manifest(folder)
+    if files is not None:
+        try:
+            matches = _manifest_matches_folder(folder, files)
+        except OSError:
+            matches = False
+        if matches:
+            try:
+                return sum(int(info["size"]) for info in files.values())
+            except (KeyError, TypeError, ValueError):
+                pass
+
+    return scan_folder_size(folder)
@@ -0,0 +1,177 @@
+"""
+原子写入工具
+先写入同目录下的临时文件，flush 后按持久化级别 fsync，再用 os.replace 替换目标文件。
+剪映或其他进程读取时只会看到旧文件或完整的新文件，写入中途崩溃也不会留下截断的文件。
+
+持久化级别：
+- DURABILITY_NONE: 不调用 fsync，只保证替换的原子性（断电时可能丢失最近的写入）
+- DURABILITY_FILE: 替换前 fsync 临时文件，保证替换后的内容已落盘
+- DURABILITY_FULL: 在 DURABILITY_FILE 的基础上，替换后再 fsync 所在目录，保证替换本身也已落盘
+
+批量生成多个文件时，可以逐个使用 DURABILITY_NONE 写入，全部完成后调用一次 sync_paths，
+每个目录只同步一次。
+"""
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, IO, Optional, Tuple
+
+
+DURABILITY_NONE = "none"
+DURABILITY_FILE = "file"
+DURABILITY_FULL = "full"
+
+DURABILITY_LEVELS = (DURABILITY_NONE, DURABILITY_FILE, DURABILITY_FULL)
+
+# 默认持久化级别
+DEFAULT_DURABILITY = DURABILITY_FILE
+
+# 临时文件后缀（与素材下载、清单写入使用的后缀相同，扫描时会被忽略）
+TEMP_SUFFIX = ".tmp"
+
+
+# 独占创建临时文件的标志；O_NOFOLLOW 防止预先放置的符号链接被跟随
+_TEMP_FLAGS = (os.O_WRONLY | os.O_CREAT | os.O_EXCL
+               | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0))
+
+
+def _check_durability(durability: str) -> None:
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"未知的持久化级别: {durability}（可选: {', '.join(DURABILITY_LEVELS)}）")
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    同步目录项（使文件创建、替换和删除落盘）
+
+    Windows 不支持打开目录进行 fsync，此时直接返回（NTFS 的元数据由日志保证）。
+    """
+    if os.name == 'nt':
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _create_temp_file(path: str) -> Tuple[int, str]:
+    """
+    在目标文件所在目录中独占创建临时文件
+
+    以 0o666 创建，由进程 umask 决定最终权限，与直接 open 创建的文件一致
+    （mkstemp 固定为 0600；umask 是进程级的，不能为了读取它而临时修改）。
+    文件名带随机部分，同名时重试，多个线程同时写入同一路径互不干扰。
+
+    Returns:
+        (文件描述符, 临时文件路径)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    prefix = os.path.basename(path) + '.'
+    for _ in range(tempfile.TMP_MAX):
+        temp_path = os.path.join(directory, f"{prefix}{os.urandom(6).hex()}{TEMP_SUFFIX}")
+        try:
+            return os.open(temp_path, _TEMP_FLAGS, 0o666), temp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"无法在 {directory} 中创建临时文件")
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = 'w', durability: str = DEFAULT_DURABILITY,
+                encoding: Optional[str] = 'utf-8') -> Iterator[IO]:
+    """
+    以原子替换的方式打开文件用于写入
+
+    with 块正常结束时替换目标文件；块内抛出异常时删除临时文件，目标文件保持不变。
+    临时文件在目标目录中独占创建，同一进程内多个线程同时写入同一路径也不会互相覆盖，
+    最后一次替换的内容生效。
+
+    Args:
+        path: 目标文件路径
+        mode: 'w'（文本）或 'wb'（二进制）
+        durability: 持久化级别
+        encoding: 文本模式的编码
+
+    Raises:
+        ValueError: mode 或 durability 无效
+        OSError: 写入或替换失败
+    """
+    if mode not in ('w', 'wb'):
+        raise ValueError(f"atomic_open 只支持 'w' 和 'wb' 模式，得到 {mode!r}")
+    _check_durability(durability)
+
+    fd, temp_path = _create_temp_file(path)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding if mode == 'w' else None) as f:
+            yield f
+            f.flush()
+            if durability != DURABILITY_NONE:
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if durability == DURABILITY_FULL:
+        fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def atomic_write_text(path: str, text: str, durability: str = DEFAULT_DURABILITY,
+                      encoding: str = 'utf-8') -> None:
+    """原子写入文本文件"""
+    with atomic_open(path, 'w', durability=durability, encoding=encoding) as f:
+        f.write(text)
+
+
+def atomic_write_json(path: str, data: Any, durability: str = DEFAULT_DURABILITY, **dump_kwargs: Any) -> None:
+    """
+    原子写入 JSON 文件
+
+    默认输出不转义中文的紧凑 JSON，dump_kwargs 会传给 json.dump（如 indent）。
+    """
+    dump_kwargs.setdefault('ensure_ascii', False)
+    if 'indent' not in dump_kwargs:
+        dump_kwargs.setdefault('separators', (',', ':'))
+    with atomic_open(path, 'w', durability=durability) as f:
+        json.dump(data, f, **dump_kwargs)
+
+
+def sync_paths(paths: Iterable[str], durability: str = DURABILITY_FULL) -> None:
+    """
+    批量写入结束后统一同步
+
+    DURABILITY_FILE 时 fsync 每个文件；DURABILITY_FULL 时再对涉及的目录各 fsync 一次；
+    DURABILITY_NONE 时不做任何操作。已经不存在的文件会被跳过。
+
+    Args:
+        paths: 以 DURABILITY_NONE 写入的文件路径
+        durability: 需要达到的持久化级别
+    """
+    _check_durability(durability)
+    if durability == DURABILITY_NONE:
+        return
+
+    # Windows 上 fsync（FlushFileBuffers）需要写权限
+    flags = os.O_RDWR if os.name == 'nt' else os.O_RDONLY
+    directories = []
+    for path in dict.fromkeys(paths):
+        try:
+            fd = os.open(path, flags)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directory = os.path.dirname(os.path.abspath(path))
+        if directory not in directories:
+            directories.append(directory)
+
+    if durability == DURABILITY_FULL:
+        for directory in directories:
+            fsync_directory(directory)
@@ -8,6 +8,7 @@ from pyJianYingDraft import (
     VideoSegment, AudioSegment, TextSegment, IntroType, TransitionType, trange, tim
 )
 
+import logging
 from typing import Dict, Any, Optional
 from utils.logger import get_logger
 
@@ -41,7 +42,7 @@ class DraftInterfaceConverter:
         # 归一化到 [0, 1]
         rgb_tuple = (r / 255.0, g / 255.0, b / 255.0)
         
-        self.logger.debug(f"颜色转换: {hex_color} -> {rgb_tuple}")
+        self.logger.debug("颜色转换: %s -> %s", hex_color, rgb_tuple)
         return rgb_tuple
     
     def convert_timerange(self, time_range_dict: Dict[str, int]) -> Timerange:
@@ -60,7 +61,7 @@ class DraftInterfaceConverter:
         end = time_range_dict["end"]
         duration = end - start
         
-        self.logger.info(f"转换时间范围: start={start}ms, end={end}ms -> duration={duration}ms")
+        self.logger.debug("转换时间范围: start=%sms, end=%sms -> duration=%sms", start, end, duration)
         return Timerange(start=start, duration=duration)
     
     def convert_crop_settings(self, crop_dict: Dict[str, Any]) -> Optional[CropSettings]:
@@ -84,7 +85,7 @@ class DraftInterfaceConverter:
         right = crop_dict.get("right", 1.0)
         bottom = crop_dict.get("bottom", 1.0)
         
-        self.logger.debug(f"转换裁剪设置: L={left}, T={top}, R={right}, B={bottom}")
+        self.logger.debug("转换裁剪设置: L=%s, T=%s, R=%s, B=%s", left, top, right, bottom)
         
         return CropSettings(
             upper_left_x=left,
@@ -123,7 +124,7 @@ class DraftInterfaceConverter:
             transform_y=get_value_or_default("position_y", 0.0)
         )
         
-        self.logger.debug(f"转换变换设置: alpha={settings.alpha}, rotation={settings.rotation}")
+        self.logger.debug("转换变换设置: alpha=%s, rotation=%s", settings.alpha, settings.rotation)
         return settings
     
     def convert_filter_intensity(self, intensity_0_1: float) -> float:
@@ -139,7 +140,7 @@ class DraftInterfaceConverter:
             0到100之间的强度值
         """
         result = intensity_0_1 * 100.0
-        self.logger.debug(f"转换滤镜强度: {intensity_0_1} -> {result}")
+        self.logger.debug("转换滤镜强度: %s -> %s", intensity_0_1, result)
         return result
     
     # ========== Segment转换函数 ==========
@@ -159,7 +160,7 @@ class DraftInterfaceConverter:
         Returns:
             VideoSegment 实例
         """
-        self.logger.info("转换图片段配置")
+        self.logger.debug("转换图片段配置")
         
         # 1. 时间范围（必须）
         target_timerange = self.convert_timerange(segment_config["time_range"])
@@ -184,7 +185,7 @@ class DraftInterfaceConverter:
                 target_timerange=target_timerange
             )
         
-        self.logger.info(f"图片段创建完成: {target_timerange.start}ms - {target_timerange.end}ms")
+        self.logger.debug("图片段创建完成: %sms - %sms", target_timerange.start, target_timerange.end)
         return image_segment
 
     def convert_video_segment_config(
@@ -202,7 +203,7 @@ class DraftInterfaceConverter:
         Returns:
             VideoSegment 实例
         """
-        self.logger.info("转换视频段配置")
+        self.logger.debug("转换视频段配置")
         
         # 1. 时间范围（必须）
         target_timerange = self.convert_timerange(segment_config["time_range"])
@@ -239,7 +240,7 @@ class DraftInterfaceConverter:
         
         video_segment = VideoSegment(**kwargs)
         
-        self.logger.info(f"视频段创建完成: {target_timerange.start}ms - {target_timerange.end}ms")
+        self.logger.debug("视频段创建完成: %sms - %sms", target_timerange.start, target_timerange.end)
         return video_segment
     
     def convert_audio_segment_config(
@@ -257,7 +258,7 @@ class DraftInterfaceConverter:
         Returns:
             AudioSegment 实例
         """
-        self.logger.info("转换音频段配置")
+        self.logger.debug("转换音频段配置")
         
         # 1. 时间范围
         target_timerange = self.convert_timerange(segment_config["time_range"])
@@ -292,7 +293,7 @@ class DraftInterfaceConverter:
         
         audio_segment = AudioSegment(**kwargs)
         
-        self.logger.info(f"音频段创建完成: {target_timerange.start}ms - {target_timerange.end}ms")
+        self.logger.debug("音频段创建完成: %sms - %sms", target_timerange.start, target_timerange.end)
         return audio_segment
     
     def convert_text_segment_config(
@@ -308,7 +309,7 @@ class DraftInterfaceConverter:
         Returns:
             TextSegment 实例
         """
-        self.logger.info("转换文本段配置")
+        self.logger.debug("转换文本段配置")
         
         # 1. 基本信息
         text_content = segment_config["content"]
@@ -355,7 +356,7 @@ class DraftInterfaceConverter:
             elif font_size_input > 20:
                 # 假设输入是像素值，转换为pyJianYingDraft的范围（通常<20）
                 font_size = font_size_input / 6.0  # 48px -> 8.0
-                self.logger.warning(f"字体大小从像素值{font_size_input}转换为{font_size}")
+                self.logger.warning("字体大小从像素值%s转换为%s", font_size_input, font_size)
             else:
                 font_size = font_size_input
             
@@ -377,7 +378,7 @@ class DraftInterfaceConverter:
         
         text_segment = TextSegment(**kwargs)
         
-        # 先切片，再放入 f-string，避免解析问题
-        text_preview = text_content[:20] if len(text_content) > 20 else text_content
-        self.logger.info(f"文本段创建完成: '{text_preview}...' at {timerange.start}ms")
+        # 预览文本只在输出调试日志时截取
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("文本段创建完成: '%s...' at %sms", text_content[:20], timerange.start)
         return text_segment
\ No newline at end of file
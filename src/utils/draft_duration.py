@@ -0,0 +1,231 @@
+"""
+草稿时长流式提取
+从 draft_content.json 中读取草稿总时长，不把整个文件解析为 Python 对象。
+
+draft_content.json 可能有几十 MB（大量关键帧和素材），而计算时长只需要：
+1. 顶层的 duration 字段（微秒），剪映和 pyJianYingDraft 都会写入，且位于 materials 之前
+2. 没有顶层 duration 时，tracks[].segments[] 中的 target_timerange（微秒）或旧格式的 time_range（毫秒）
+
+文件通过 mmap 只读映射，用正则表达式在 C 层面跳过不需要的子树（materials 等），
+只有上述几个小对象会被 json 解析，内存占用与文件大小无关。
+"""
+import json
+import mmap
+import re
+from typing import Callable, Optional
+
+
+# JSON 空白
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+
+# 完整的 JSON 字符串（展开循环写法，避免逐字符回溯）
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+
+# 跳过字符串和其他字符，找到下一个括号（普通字符段与字符串交替出现，写法无歧义，不会回溯爆炸）
+_NEXT_BRACKET = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*([\[\]{}])')
+
+# { 和 [ 的字节值
+_OPEN_BRACKETS = frozenset(b'{[')
+
+# 标量值（数字、true、false、null）
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+
+
+class _DurationFound(Exception):
+    """找到顶层 duration 时提前结束扫描"""
+
+    def __init__(self, duration: int):
+        super().__init__(duration)
+        self.duration = duration
+
+
+class _Scanner:
+    """在只读缓冲区上按结构遍历 JSON，只解析调用方关心的值"""
+
+    def __init__(self, buf):
+        self.buf = buf
+
+    def skip_ws(self, pos: int) -> int:
+        return _WHITESPACE.match(self.buf, pos).end()
+
+    def expect(self, pos: int, char: bytes) -> int:
+        pos = self.skip_ws(pos)
+        if self.buf[pos:pos + 1] != char:
+            raise ValueError(f"位置 {pos} 处应为 {char.decode()}")
+        return pos + 1
+
+    def skip_value(self, pos: int) -> int:
+        """跳过 pos 处的值，返回值结束后的位置"""
+        pos = self.skip_ws(pos)
+        first = self.buf[pos:pos + 1]
+        if first == b'"':
+            match = _STRING.match(self.buf, pos)
+            if not match:
+                raise ValueError(f"位置 {pos} 处的字符串未结束")
+            return match.end()
+        if first in (b'{', b'['):
+            # 每次匹配消耗到下一个括号为止，匹配结果首尾相接；按最后一个字节判断开闭
+            buf = self.buf
+            depth = 0
+            end = pos
+            for match in _NEXT_BRACKET.finditer(buf, pos):
+                if match.start() != end:
+                    break  # 中间有无法匹配的内容（如未结束的字符串），结构无效
+                end = match.end()
+                if buf[end - 1] in _OPEN_BRACKETS:
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return end
+            raise ValueError(f"位置 {pos} 处的对象或数组未结束")
+        match = _SCALAR.match(self.buf, pos)
+        if not match:
+            raise ValueError(f"位置 {pos} 处缺少值")
+        return match.end()
+
+    def load_value(self, pos: int):
+        """解析 pos 处的值（只用于小对象），返回 (值, 结束位置)"""
+        start = self.skip_ws(pos)
+        end = self.skip_value(start)
+        return json.loads(bytes(self.buf[start:end])), end
+
+    def walk_object(self, pos: int, on_member: Callable[[str, int], Optional[int]]) -> int:
+        """
+        遍历 pos 处的对象
+
+        on_member(key, value_pos) 处理成员值并返回值结束位置；返回 None 表示跳过该值。
+        值不是对象时直接跳过。返回对象结束后的位置。
+        """
+        pos = self.skip_ws(pos)
+        if self.buf[pos:pos + 1] != b'{':
+            return self.skip_value(pos)
+        pos = self.skip_ws(pos + 1)
+        if self.buf[pos:pos + 1] == b'}':
+            return pos + 1
+        while True:
+            match = _STRING.match(self.buf, self.skip_ws(pos))
+            if not match:
+                raise ValueError(f"位置 {pos} 处应为字段名")
+            key = json.loads(bytes(match.group()))
+            value_pos = self.expect(match.end(), b':')
+            end = on_member(key, value_pos)
+            pos = self.skip_ws(end if end is not None else self.skip_value(value_pos))
+            separator = self.buf[pos:pos + 1]
+            if separator == b'}':
+                return pos + 1
+            if separator != b',':
+                raise ValueError(f"位置 {pos} 处应为 , 或 }}")
+            pos += 1
+
+    def walk_array(self, pos: int, on_item: Callable[[int], int]) -> int:
+        """遍历 pos 处的数组，on_item(item_pos) 返回元素结束位置；值不是数组时直接跳过"""
+        pos = self.skip_ws(pos)
+        if self.buf[pos:pos + 1] != b'[':
+            return self.skip_value(pos)
+        pos = self.skip_ws(pos + 1)
+        if self.buf[pos:pos + 1] == b']':
+            return pos + 1
+        while True:
+            pos = self.skip_ws(on_item(pos))
+            separator = self.buf[pos:pos + 1]
+            if separator == b']':
+                return pos + 1
+            if separator != b',':
+                raise ValueError(f"位置 {pos} 处应为 , 或 ]")
+            pos += 1
+
+
+def _segment_end_us(key: str, timerange) -> int:
+    """片段时间范围的结束时间（微秒）"""
+    if not isinstance(timerange, dict):
+        return 0
+    if key == 'target_timerange':
+        start = timerange.get('start', 0)
+        duration = timerange.get('duration', 0)
+        if isinstance(start, (int, float)) and isinstance(duration, (int, float)):
+            return int(start + duration)
+        return 0
+    # 旧格式 time_range 使用毫秒
+    end = timerange.get('end', 0)
+    return int(end * 1000) if isinstance(end, (int, float)) else 0
+
+
+def scan_draft_duration(buf) -> int:
+    """
+    从 draft_content.json 的内容中提取草稿总时长（微秒）
+
+    Args:
+        buf: 文件内容（bytes、bytearray 或 mmap）
+
+    Returns:
+        顶层 duration 大于 0 时直接返回；否则返回所有片段的最大结束时间
+
+    Raises:
+        ValueError: JSON 结构无效
+    """
+    scanner = _Scanner(buf)
+    max_end = 0
+
+    def on_segment_member(key: str, value_pos: int) -> Optional[int]:
+        nonlocal max_end
+        if key not in ('target_timerange', 'time_range'):
+            return None
+        timerange, end = scanner.load_value(value_pos)
+        max_end = max(max_end, _segment_end_us(key, timerange))
+        return end
+
+    def on_segment(item_pos: int) -> int:
+        return scanner.walk_object(item_pos, on_segment_member)
+
+    def on_track_member(key: str, value_pos: int) -> Optional[int]:
+        if key != 'segments':
+            return None
+        return scanner.walk_array(value_pos, on_segment)
+
+    def on_track(item_pos: int) -> int:
+        return scanner.walk_object(item_pos, on_track_member)
+
+    def on_root_member(key: str, value_pos: int) -> Optional[int]:
+        if key == 'duration':
+            duration, end = scanner.load_value(value_pos)
+            if isinstance(duration, (int, float)) and duration > 0:
+                raise _DurationFound(int(duration))
+            return end
+        if key == 'tracks':
+            return scanner.walk_array(value_pos, on_track)
+        return None
+
+    start = scanner.skip_ws(0)
+    if buf[start:start + 1] != b'{':
+        raise ValueError("draft_content.json 顶层必须是对象")
+    try:
+        scanner.walk_object(start, on_root_member)
+    except _DurationFound as found:
+        return found.duration
+    return max_end
+
+
+def extract_draft_duration(draft_content_path: str) -> int:
+    """
+    读取 draft_content.json 文件并提取草稿总时长（微秒）
+
+    Args:
+        draft_content_path: draft_content.json 文件路径
+
+    Returns:
+        草稿总时长（微秒）
+
+    Raises:
+        OSError: 文件无法读取
+        ValueError: 文件为空或 JSON 结构无效
+    """
+    with open(draft_content_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("draft_content.json 为空")
+        try:
+            return scan_draft_duration(buf)
+        finally:
+            buf.close()
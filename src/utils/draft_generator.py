@@ -6,11 +6,16 @@
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 import os
+import time
 from utils.logger import get_logger
 from utils.coze_parser import CozeOutputParser
 from utils.converter import DraftInterfaceConverter
 from utils.material_manager import MaterialManager, create_material_manager
 from utils.draft_meta_manager import DraftMetaManager, create_draft_meta_manager
+from utils.atomic_write import DEFAULT_DURABILITY, DURABILITY_NONE, atomic_write_text, sync_paths
+from utils.progress import (
+    ProgressReporter, STAGE_DRAFT_START, STAGE_SEGMENT, STAGE_SAVE, STAGE_DRAFT_DONE
+)
 import pyJianYingDraft as draft
 from pyJianYingDraft import ScriptFile  
 
@@ -24,20 +29,26 @@ class DraftGenerator:
         r"C:\Users\{username}\AppData\Roaming\JianyingPro\User Data\Projects\com.lveditor.draft",
     ]
     
-    def __init__(self, output_base_dir: str = "./JianyingProjects"):
+    def __init__(self, output_base_dir: str = "./JianyingProjects", durability: str = DEFAULT_DURABILITY):
         """
         初始化草稿生成器
         
         Args:
             output_base_dir: 输出根目录(存放所有草稿项目)
+            durability: draft_content.json 和 root_meta_info.json 的持久化级别（见 utils.atomic_write）；
+                一次生成多个草稿时不逐个 fsync，全部保存后统一同步
         """
         self.logger = get_logger(__name__)
         self.logger.info("初始化草稿生成器")
         
         self.output_base_dir = output_base_dir
+        self.durability = durability
         self.parser = CozeOutputParser()
         self.material_managers: Dict[str, MaterialManager] = {}
         
+        # 进度事件（GUI 订阅后显示当前草稿、轨道和片段）
+        self.progress = ProgressReporter()
+        
         # 确保输出目录存在
         os.makedirs(output_base_dir, exist_ok=True)
         self.logger.info(f"输出目录: {output_base_dir}")
@@ -162,6 +173,10 @@ class DraftGenerator:
         draft_paths = []
         drafts = parsed_data.get('drafts', [])
         
+        # 批量生成时每个草稿只做原子替换，结束后统一 fsync，每个目录只同步一次
+        batch_sync = len(drafts) > 1 and self.durability != DURABILITY_NONE
+        save_durability = DURABILITY_NONE if batch_sync else self.durability
+        
         self.logger.info(f"步骤3: 开始转换 {len(drafts)} 个草稿...")
         
         for i, draft_data in enumerate(drafts, 1):
@@ -170,29 +185,38 @@ class DraftGenerator:
             self.logger.info(f"{'='*60}")
             
             try:
-                draft_path = self._convert_single_draft(draft_data)
+                draft_path = self._convert_single_draft(draft_data, durability=save_durability)
                 draft_paths.append(draft_path)
                 self.logger.info(f"✅ 草稿 {i} 生成成功: {draft_path}")
             except Exception as e:
                 self.logger.error(f"❌ 草稿 {i} 生成失败: {e}")
                 self.logger.exception("详细错误信息:")
         
+        if batch_sync and draft_paths:
+            sync_paths(
+                (os.path.join(path, "draft_content.json") for path in draft_paths),
+                durability=self.durability
+            )
+        
         self.logger.info(f"\n{'='*60}")
         self.logger.info(f"转换完成! 成功: {len(draft_paths)}/{len(drafts)}")
         self.logger.info(f"{'='*60}")
         
         return draft_paths
     
-    def _convert_single_draft(self, draft_data: Dict[str, Any]) -> str:
+    def _convert_single_draft(self, draft_data: Dict[str, Any], durability: Optional[str] = None) -> str:
         """
         转换单个草稿
         
         Args:
             draft_data: 单个草稿数据
+            durability: 保存 draft_content.json 的持久化级别，None 时使用 self.durability
             
         Returns:
             草稿路径
         """
+        draft_started = time.perf_counter()
+        
         # 1. 提取项目信息
         project = draft_data.get('project', {})
         draft_id = draft_data.get('draft_id', None)
@@ -246,24 +270,49 @@ class DraftGenerator:
         # 4. 初始化Converter
         converter = DraftInterfaceConverter()
         
-        # 5. 处理所有轨道
+        # 5. 按签名URL过期时间预先下载素材，处理片段时直接使用缓存
         tracks = draft_data.get('tracks', [])
+        material_urls = list(dict.fromkeys(
+            segment['material_url']
+            for track in tracks
+            for segment in track.get('segments', [])
+            if segment.get('material_url')
+        ))
+        if material_urls:
+            material_manager.batch_create_materials(material_urls)
+            failed_urls = material_manager.failed_urls.intersection(material_urls)
+            if failed_urls:
+                failed_segments = sum(
+                    1 for track in tracks for segment in track.get('segments', [])
+                    if segment.get('material_url') in failed_urls
+                )
+                self.logger.warning(
+                    f"⚠️  {len(failed_urls)} 个素材下载失败，引用它们的 {failed_segments} 个片段将被跳过"
+                )
+        
+        # 6. 处理所有轨道
         self.logger.info(f"处理 {len(tracks)} 条轨道...")
+        self.progress.emit(
+            STAGE_DRAFT_START, draft_id,
+            segment_count=sum(len(track.get('segments', [])) for track in tracks)
+        )
         
         for track_idx, track in enumerate(tracks, 1):
             track_type = track.get('track_type', 'unknown')
             segments = track.get('segments', [])
             self.logger.info(f"  轨道 {track_idx}: {track_type} ({len(segments)} 个片段)")
             
-            # 6. 根据轨道类型创建对应的轨道
+            # 7. 根据轨道类型创建对应的轨道
             track_name = f"{track_type}_track_{track_idx}"
             if not self._create_track_by_type(script, track_type, track_name):
                 continue
             
-            # 处理轨道中的所有片段
+            # 处理轨道中的所有片段（逐片段的进度通过事件发出，不再逐条输出 INFO 日志）
+            failed_count = 0
             for seg_idx, segment in enumerate(segments, 0):
+                segment_started = time.perf_counter()
                 try:
-                    self._process_segment(
+                    ok = self._process_segment(
                         segment=segment,
                         track_type=track_type,
                         track_name=track_name,
@@ -273,19 +322,56 @@ class DraftGenerator:
                         seg_idx=seg_idx
                     )
                 except Exception as e:
-                    self.logger.error(f"    ❌ 片段 {seg_idx} 处理失败: {e}")
+                    ok = False
+                    self.logger.error("    ❌ 片段 %d 处理失败: %s", seg_idx, e)
+                if not ok:
+                    failed_count += 1
+                self.progress.emit(
+                    STAGE_SEGMENT, draft_id,
+                    track=track_name,
+                    segment_index=seg_idx,
+                    segment_count=len(segments),
+                    elapsed=time.perf_counter() - segment_started,
+                    ok=ok
+                )
+            
+            if failed_count:
+                self.logger.warning(f"  轨道 {track_idx}: {failed_count}/{len(segments)} 个片段处理失败")
         
-        # 7. 保存草稿
+        # 8. 保存草稿
         self.logger.info("保存草稿...")
-        script.save()
+        save_started = time.perf_counter()
+        saved_bytes = self._save_script(script, self.durability if durability is None else durability)
+        self.progress.emit(STAGE_SAVE, draft_id, bytes=saved_bytes, elapsed=time.perf_counter() - save_started)
         
-        # 8. 打印素材统计
+        # 9. 打印素材统计
         downloaded_materials = material_manager.list_downloaded_materials()
         self.logger.info(f"下载素材数量: {len(downloaded_materials)}")
         self.logger.info(f"素材文件夹大小: {material_manager.get_assets_folder_size():.2f} MB")
         
+        self.progress.emit(STAGE_DRAFT_DONE, draft_id, bytes=saved_bytes, elapsed=time.perf_counter() - draft_started)
         return draft_folder
     
+    def _save_script(self, script: ScriptFile, durability: str) -> int:
+        """
+        原子保存 draft_content.json
+        
+        ScriptFile.save() 直接以 'w' 打开目标文件写入，剪映同时读取时可能看到截断的文件；
+        这里用 dumps() 得到内容后通过临时文件替换写入。
+        
+        Returns:
+            写入的字节数（无法确定时为 0）
+        """
+        save_path = getattr(script, 'save_path', None)
+        if not save_path or not hasattr(script, 'dumps'):
+            script.save()
+        else:
+            atomic_write_text(save_path, script.dumps(), durability=durability)
+        try:
+            return os.path.getsize(save_path) if save_path else 0
+        except OSError:
+            return 0
+    
     def _create_track_by_type(self, script: ScriptFile, track_type: str, track_name: str) -> bool:
         """
         根据轨道类型创建对应的轨道
@@ -341,12 +427,8 @@ class DraftGenerator:
             # 创建元信息管理器
             meta_manager = create_draft_meta_manager()
             
-            # 扫描草稿文件夹并生成元信息
-            root_meta_info = meta_manager.scan_and_generate_meta_info(target_folder)
-            
-            # 保存到输出文件夹
-            meta_info_path = os.path.join(target_folder, "root_meta_info.json")
-            meta_manager.save_root_meta_info(root_meta_info, meta_info_path)
+            # 扫描草稿文件夹并保存到输出文件夹（与自动更新共用根目录的写入锁）
+            meta_info_path = meta_manager.generate_root_meta_info(target_folder, durability=self.durability)
             
             self.logger.info("✅ root_meta_info.json 生成完成")
             return meta_info_path
@@ -376,6 +458,9 @@ class DraftGenerator:
             material_manager: 素材管理器实例
             script: Script对象
             seg_idx: 片段索引(用于日志)
+            
+        Returns:
+            片段是否已添加到轨道
         """
         segment_type = segment.get('type', track_type)
         
@@ -384,8 +469,12 @@ class DraftGenerator:
         material_path = None  # 局部变量：素材的本地文件路径（仅用于image类型）
         
         if material_url:
+            if material_url in material_manager.failed_urls:
+                # 预先下载时已失败（已汇总警告），不再为每个片段重复等待下载超时
+                self.logger.debug("    跳过片段 %d：素材下载失败 %s", seg_idx, material_url)
+                return False
             try:
-                self.logger.info(f"    下载素材 {seg_idx}...")
+                self.logger.debug("    下载素材 %d...", seg_idx)
                 material = material_manager.create_material(material_url)
                 segment['_material_object'] = material
                 
@@ -393,10 +482,10 @@ class DraftGenerator:
                 if segment_type == 'image':
                     material_path = material.path if hasattr(material, 'path') else None
                 
-                self.logger.info(f"    ✅ 素材下载成功")
+                self.logger.debug("    ✅ 素材下载成功")
             except Exception as e:
-                self.logger.error(f"    ❌ 素材下载失败: {e}")
-                return
+                self.logger.error("    ❌ 片段 %d 素材下载失败: %s", seg_idx, e)
+                return False
         
         # 根据类型转换片段并添加到Script
         # 注意: pyJianYingDraft 的正确 API 是:
@@ -411,7 +500,7 @@ class DraftGenerator:
                     video_material=material_obj
                 )
                 script.add_segment(video_segment, track_name)
-                self.logger.info(f"    ✅ 视频片段 {seg_idx} 添加到轨道 {track_name}")
+                self.logger.debug("    ✅ 视频片段 %d 添加到轨道 %s", seg_idx, track_name)
                 
             elif segment_type == 'audio' and material_obj:
                 audio_segment = converter.convert_audio_segment_config(
@@ -419,7 +508,7 @@ class DraftGenerator:
                     audio_material=material_obj
                 )
                 script.add_segment(audio_segment, track_name)
-                self.logger.info(f"    ✅ 音频片段 {seg_idx} 添加到轨道 {track_name}")
+                self.logger.debug("    ✅ 音频片段 %d 添加到轨道 %s", seg_idx, track_name)
                 
             elif segment_type == 'image' and material_path:
                 # 图片片段：直接使用本地文件路径 material_path
@@ -428,26 +517,23 @@ class DraftGenerator:
                     image_file_path=material_path
                 )
                 script.add_segment(video_segment, track_name)
-                self.logger.info(f"    ✅ 图片片段 {seg_idx} 添加到轨道 {track_name}")
+                self.logger.debug("    ✅ 图片片段 %d 添加到轨道 %s", seg_idx, track_name)
                 
             elif segment_type == 'text':
-                self.logger.info(f"    转换文本片段...")
                 text_segment = converter.convert_text_segment_config(segment)
-                self.logger.info(f"    文本片段创建完成，类型: {type(text_segment)}")
-                self.logger.info(f"    添加到轨道 {track_name}...")
                 script.add_segment(text_segment, track_name)
-                self.logger.info(f"    ✅ 文字片段 {seg_idx} 添加到轨道 {track_name}")
+                self.logger.debug("    ✅ 文字片段 %d 添加到轨道 %s", seg_idx, track_name)
                 
             else:
-                self.logger.warning(f"    ⚠️  未知片段类型或缺少素材: {segment_type}")
+                self.logger.warning("    ⚠️  片段 %d 未知片段类型或缺少素材: %s", seg_idx, segment_type)
+                return False
+            
+            return True
                 
         except Exception as e:
-            self.logger.error(f"    ❌ 片段转换/添加失败: {e}")
-            self.logger.error(f"       错误类型: {type(e).__name__}")
-            self.logger.error(f"       错误repr: {repr(e)}")
-            import traceback
-            self.logger.error(f"       堆栈:\n{traceback.format_exc()}")
             # 不再重新抛出，避免中断整个轨道的处理
+            self.logger.error("    ❌ 片段 %d 转换/添加失败: %r", seg_idx, e, exc_info=True)
+            return False
     
     def validate_content(self, content: str) -> bool:
         """
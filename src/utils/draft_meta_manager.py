@@ -6,23 +6,70 @@ import os
 import json
 import time
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from utils.logger import get_logger
+from utils.draft_duration import extract_draft_duration
+from utils.asset_manifest import MANIFEST_FILENAME, get_folder_size
+from utils.atomic_write import DEFAULT_DURABILITY, DURABILITY_NONE, atomic_write_json
+
+
+# 草稿分析结果缓存文件（位于草稿根目录，剪映只识别文件夹，不会受影响）
+META_CACHE_FILENAME = ".coze_draft_meta_cache.json"
+
+# 缓存格式版本，分析逻辑或指纹组成变化导致旧结果失效时递增
+META_CACHE_VERSION = 3
+
+# 素材文件夹相对位置：草稿内的 Assets/ 与根目录下的 CozeJianYingAssistantAssets/{草稿名}/
+COZE_ASSETS_FOLDER = "CozeJianYingAssistantAssets"
+
+# 默认并行扫描线程数
+DEFAULT_SCAN_WORKERS = 8
+
+# 草稿根目录 -> 写入锁，由 folder_lock 创建
+_folder_locks: Dict[str, threading.RLock] = {}
+_folder_locks_guard = threading.Lock()
+
+
+def folder_lock(draft_root_path: str) -> threading.RLock:
+    """
+    获取草稿根目录的写入锁
+    
+    同一根目录下的 root_meta_info.json 和分析缓存可能同时被手动生成和自动更新（监视线程）写入，
+    所有写入者在扫描和写入期间持有同一把锁，文件内容总是来自同一次完整的扫描。
+    """
+    key = os.path.normcase(os.path.abspath(draft_root_path))
+    with _folder_locks_guard:
+        lock = _folder_locks.get(key)
+        if lock is None:
+            lock = _folder_locks[key] = threading.RLock()
+        return lock
 
 
 class DraftMetaManager:
     """剪映草稿元信息管理器"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = DEFAULT_SCAN_WORKERS):
+        """
+        Args:
+            max_workers: 并行扫描草稿的线程数，小于等于 1 时逐个扫描
+        """
         self.logger = get_logger(__name__)
+        self.max_workers = max_workers
     
-    def scan_and_generate_meta_info(self, draft_root_path: str) -> Dict[str, Any]:
+    def scan_and_generate_meta_info(self, draft_root_path: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         扫描草稿文件夹并生成 root_meta_info.json 的内容
         
+        每个草稿的分析结果（时长、素材大小、封面）按文件夹名缓存在
+        {draft_root_path}/.coze_draft_meta_cache.json 中，指纹见 draft_fingerprint。
+        指纹未变化的草稿直接复用缓存，只有新增或修改过的草稿会重新分析。
+        
         Args:
             draft_root_path: 草稿根目录路径
+            use_cache: 是否使用分析结果缓存，False 时重新分析所有草稿（仍会刷新缓存）
             
         Returns:
             root_meta_info.json 的完整内容
@@ -34,51 +81,58 @@ class DraftMetaManager:
             self.logger.error(f"草稿根目录不存在: {draft_root_path}")
             raise FileNotFoundError(f"草稿根目录不存在: {draft_root_path}")
         
-        # 扫描所有草稿文件夹
-        draft_stores = []
-        draft_count = 0
-        failed_drafts = []  # 记录失败的草稿
+        # 扫描和写入缓存期间持有根目录的写入锁，与监视线程的自动更新互斥
+        with folder_lock(draft_root_path):
+            # 扫描所有草稿文件夹（按文件夹名排序，保证输出顺序稳定）
+            draft_stores = []
+            draft_count = 0
+            failed_drafts = []  # 记录失败的草稿
+            cached_entries = self.load_meta_cache(draft_root_path) if use_cache else {}
+            new_cache_entries = {}
+            reused_count = 0
         
-        for item in os.listdir(draft_root_path):
-            item_path = os.path.join(draft_root_path, item)
-            
-            # 跳过文件，只处理文件夹
-            if not os.path.isdir(item_path):
-                continue
-            
-            # 检查是否为有效的草稿文件夹
-            draft_content_path = os.path.join(item_path, "draft_content.json")
-            draft_meta_path = os.path.join(item_path, "draft_meta_info.json")
-            
-            if os.path.exists(draft_content_path) and os.path.exists(draft_meta_path):
-                try:
-                    draft_info = self._generate_draft_store_info(
-                        draft_folder_name=item,
-                        draft_folder_path=item_path,
-                        draft_root_path=draft_root_path
-                    )
-                    
-                    if draft_info:
-                        draft_stores.append(draft_info)
-                        draft_count += 1
-                        self.logger.info(f"  ✅ 找到草稿: {item}")
-                    else:
-                        failed_drafts.append(item)
-                    
-                except Exception as e:
-                    self.logger.error(f"  ❌ 处理草稿 {item} 失败: {e}")
+            folder_names = sorted(
+                item for item in os.listdir(draft_root_path)
+                if os.path.isdir(os.path.join(draft_root_path, item))
+            )
+        
+            def scan_folder(item: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+                return self.scan_draft_folder(item, draft_root_path, cached_entries.get(item))
+        
+            # 草稿分析以文件读取为主，多线程可以并行等待 I/O；map 按输入顺序返回结果
+            workers = min(self.max_workers, len(folder_names))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(scan_folder, folder_names))
+            else:
+                results = [scan_folder(item) for item in folder_names]
+        
+            for item, (status, draft_info, cache_entry) in zip(folder_names, results):
+                if status == "skipped":
+                    continue
+                if status == "failed":
                     failed_drafts.append(item)
                     continue
+                draft_stores.append(draft_info)
+                draft_count += 1
+                new_cache_entries[item] = cache_entry
+                if status == "cached":
+                    reused_count += 1
         
-        # 生成完整的 root_meta_info 结构
-        root_meta_info = {
-            "all_draft_store": draft_stores,
-            "draft_ids": draft_count,
-            "root_path": draft_root_path.replace("\\", "/")  # 统一使用正斜杠
-        }
+            # 生成完整的 root_meta_info 结构
+            root_meta_info = {
+                "all_draft_store": draft_stores,
+                "draft_ids": draft_count,
+                "root_path": draft_root_path.replace("\\", "/")  # 统一使用正斜杠
+            }
+        
+            self.save_meta_cache(draft_root_path, new_cache_entries)
         
         # 输出扫描总结
-        self.logger.info(f"扫描完成，共找到 {draft_count} 个有效草稿")
+        self.logger.info(
+            f"扫描完成，共找到 {draft_count} 个有效草稿"
+            f"（重新分析 {draft_count - reused_count} 个，复用缓存 {reused_count} 个）"
+        )
         if failed_drafts:
             self.logger.warning(
                 f"⚠️  以下 {len(failed_drafts)} 个草稿由于文件损坏或格式错误被跳过: "
@@ -91,11 +145,175 @@ class DraftMetaManager:
         
         return root_meta_info
     
+    def scan_draft_folder(
+        self,
+        item: str,
+        draft_root_path: str,
+        cached: Optional[Dict[str, Any]]
+    ) -> Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        扫描单个文件夹（可在线程池中并行调用）
+        
+        Args:
+            item: 文件夹名称
+            draft_root_path: 草稿根目录路径
+            cached: 该文件夹的缓存条目（没有时为 None）
+            
+        Returns:
+            (状态, draft_store 信息, 新的缓存条目)，状态为：
+            "analyzed" 重新分析、"cached" 复用缓存、"failed" 处理失败、"skipped" 不是草稿文件夹
+        """
+        item_path = os.path.join(draft_root_path, item)
+        
+        # 检查是否为有效的草稿文件夹
+        draft_content_path = os.path.join(item_path, "draft_content.json")
+        draft_meta_path = os.path.join(item_path, "draft_meta_info.json")
+        if not (os.path.exists(draft_content_path) and os.path.exists(draft_meta_path)):
+            return "skipped", None, None
+        
+        try:
+            fingerprint = self.draft_fingerprint(item_path)
+            analysis = None
+            if cached and cached.get("fingerprint") == fingerprint:
+                analysis = self._valid_analysis(cached.get("analysis"))
+            
+            draft_info = self._generate_draft_store_info(
+                draft_folder_name=item,
+                draft_folder_path=item_path,
+                draft_root_path=draft_root_path,
+                analysis=analysis
+            )
+            if not draft_info:
+                return "failed", None, None
+            
+            cache_entry = {
+                "fingerprint": fingerprint,
+                "analysis": self._extract_analysis(draft_info)
+            }
+            if analysis is not None:
+                self.logger.debug(f"  ✅ 找到草稿（缓存）: {item}")
+                return "cached", draft_info, cache_entry
+            self.logger.info(f"  ✅ 找到草稿: {item}")
+            return "analyzed", draft_info, cache_entry
+            
+        except Exception as e:
+            self.logger.error(f"  ❌ 处理草稿 {item} 失败: {e}")
+            return "failed", None, None
+    
+    def draft_fingerprint(self, draft_folder_path: str) -> List[int]:
+        """
+        计算草稿的缓存指纹
+        
+        包含 draft_content.json 的 mtime 和大小、草稿文件夹的 mtime（封面增删）、
+        两个素材文件夹的 mtime（素材增删），以及素材文件夹中素材清单的 mtime 和大小
+        （MaterialManager 替换或重新下载素材时会更新清单）。不存在的路径记为 0。
+        
+        限制：其他程序在素材子文件夹中增删文件，或原地修改素材文件而不更新清单时，
+        上述字段都不会变化，缓存的素材大小会保持旧值。需要完全准确的结果时使用
+        scan_and_generate_meta_info(use_cache=False) 或 DraftMetaWatcher.refresh(force=True)。
+        
+        Args:
+            draft_folder_path: 草稿文件夹路径
+            
+        Returns:
+            指纹列表（可直接 JSON 序列化并与缓存比较）
+        """
+        draft_folder_name = os.path.basename(draft_folder_path)
+        draft_root = os.path.dirname(draft_folder_path)
+        
+        def stat_or_none(path: str) -> Optional[os.stat_result]:
+            try:
+                return os.stat(path)
+            except OSError:
+                return None
+        
+        content_stat = stat_or_none(os.path.join(draft_folder_path, "draft_content.json"))
+        fingerprint = [
+            content_stat.st_mtime_ns if content_stat else 0,
+            content_stat.st_size if content_stat else 0,
+        ]
+        folder_stat = stat_or_none(draft_folder_path)
+        fingerprint.append(folder_stat.st_mtime_ns if folder_stat else 0)
+        for assets_folder in (
+            os.path.join(draft_folder_path, "Assets"),
+            os.path.join(draft_root, COZE_ASSETS_FOLDER, draft_folder_name),
+        ):
+            folder_stat = stat_or_none(assets_folder)
+            manifest_stat = stat_or_none(os.path.join(assets_folder, MANIFEST_FILENAME)) if folder_stat else None
+            fingerprint.extend([
+                folder_stat.st_mtime_ns if folder_stat else 0,
+                manifest_stat.st_mtime_ns if manifest_stat else 0,
+                manifest_stat.st_size if manifest_stat else 0,
+            ])
+        return fingerprint
+    
+    def _extract_analysis(self, draft_store: Dict[str, Any]) -> Dict[str, Any]:
+        """从 draft_store 中提取需要缓存的分析结果"""
+        return {
+            "tm_duration": draft_store["tm_duration"],
+            "draft_timeline_materials_size": draft_store["draft_timeline_materials_size"],
+            "draft_cover": draft_store["draft_cover"],
+        }
+    
+    def _valid_analysis(self, analysis: Any) -> Optional[Dict[str, Any]]:
+        """校验缓存中的分析结果，字段不完整时返回 None（按未命中处理）"""
+        if isinstance(analysis, dict) and all(
+            key in analysis for key in ("tm_duration", "draft_timeline_materials_size", "draft_cover")
+        ):
+            return analysis
+        return None
+    
+    def load_meta_cache(self, draft_root_path: str) -> Dict[str, Dict[str, Any]]:
+        """
+        读取分析结果缓存
+        
+        缓存不存在、损坏或版本不一致时返回空字典，所有草稿会被重新分析。
+        
+        Args:
+            draft_root_path: 草稿根目录路径
+            
+        Returns:
+            文件夹名 -> {"fingerprint": [...], "analysis": {...}}
+        """
+        cache_path = os.path.join(draft_root_path, META_CACHE_FILENAME)
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"元信息缓存无法读取，将重新分析所有草稿: {e}")
+            return {}
+        
+        if not isinstance(cache, dict) or cache.get("version") != META_CACHE_VERSION:
+            return {}
+        drafts = cache.get("drafts")
+        return drafts if isinstance(drafts, dict) else {}
+    
+    def save_meta_cache(self, draft_root_path: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        保存分析结果缓存（原子替换，避免中途失败留下损坏的缓存；缓存可以重建，不需要 fsync）
+        
+        只保留本次扫描到的草稿，已删除的草稿会从缓存中移除。
+        保存失败只记录警告，不影响 root_meta_info 的生成。
+        
+        Args:
+            draft_root_path: 草稿根目录路径
+            entries: 文件夹名 -> 缓存条目
+        """
+        cache_path = os.path.join(draft_root_path, META_CACHE_FILENAME)
+        try:
+            atomic_write_json(cache_path, {"version": META_CACHE_VERSION, "drafts": entries},
+                              durability=DURABILITY_NONE)
+        except OSError as e:
+            self.logger.warning(f"保存元信息缓存失败: {e}")
+    
     def _generate_draft_store_info(
         self,
         draft_folder_name: str,
         draft_folder_path: str,
-        draft_root_path: str
+        draft_root_path: str,
+        analysis: Optional[Dict[str, Any]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         为单个草稿生成 draft_store 信息
@@ -104,6 +322,7 @@ class DraftMetaManager:
             draft_folder_name: 草稿文件夹名称
             draft_folder_path: 草稿文件夹完整路径
             draft_root_path: 草稿根目录路径
+            analysis: 缓存的分析结果（时长、素材大小、封面），提供时不再读取草稿文件
             
         Returns:
             单个草稿的 draft_store 信息
@@ -116,15 +335,20 @@ class DraftMetaManager:
             该文件的存在性检查在 scan_and_generate_meta_info() 中进行
         """
         try:
-            # 读取 draft_content.json 获取时长信息
             draft_content_path = os.path.join(draft_folder_path, "draft_content.json")
-            duration = self._calculate_draft_duration(draft_content_path)
-            
-            # 计算素材文件夹大小
-            assets_size = self._calculate_assets_size(draft_folder_path)
-            
-            # 获取草稿封面路径（如果存在）
-            draft_cover_path = self._find_draft_cover(draft_folder_path)
+            if analysis is not None:
+                duration = analysis["tm_duration"]
+                assets_size = analysis["draft_timeline_materials_size"]
+                draft_cover_path = analysis["draft_cover"]
+            else:
+                # 读取 draft_content.json 获取时长信息
+                duration = self._calculate_draft_duration(draft_content_path)
+                
+                # 计算素材文件夹大小
+                assets_size = self._calculate_assets_size(draft_folder_path)
+                
+                # 获取草稿封面路径（如果存在）
+                draft_cover_path = self._find_draft_cover(draft_folder_path)
             
             # 生成当前时间戳（微秒）
             current_time_us = int(time.time() * 1000000)
@@ -181,6 +405,10 @@ class DraftMetaManager:
         """
         从 draft_content.json 计算草稿总时长（微秒）
         
+        使用流式提取（见 utils.draft_duration）：优先读取顶层 duration，
+        没有时只遍历 tracks[].segments[] 的时间范围，跳过 materials 等子树，
+        不会把整个文件解析为 Python 对象。
+        
         Args:
             draft_content_path: draft_content.json 文件路径
             
@@ -188,27 +416,7 @@ class DraftMetaManager:
             草稿总时长（微秒）
         """
         try:
-            with open(draft_content_path, 'r', encoding='utf-8') as f:
-                draft_content = json.load(f)
-            
-            # 查找所有轨道中的最大结束时间
-            max_end_time = 0
-            
-            tracks = draft_content.get('tracks', [])
-            for track in tracks:
-                segments = track.get('segments', [])
-                for segment in segments:
-                    # 从时间范围获取结束时间
-                    time_range = segment.get('time_range', {})
-                    end_time = time_range.get('end', 0)
-                    
-                    # pyJianYingDraft 通常使用毫秒，需要转换为微秒
-                    if isinstance(end_time, (int, float)):
-                        end_time_us = int(end_time * 1000)  # 毫秒转微秒
-                        max_end_time = max(max_end_time, end_time_us)
-            
-            return max_end_time
-            
+            return extract_draft_duration(draft_content_path)
         except Exception as e:
             self.logger.error(f"计算草稿时长失败: {e}")
             return 0
@@ -221,6 +429,9 @@ class DraftMetaManager:
         1. {draft_folder_path}/Assets/ (传统位置)
         2. {draft_root}/CozeJianYingAssistantAssets/{draft_folder_name}/ (新位置)
         
+        MaterialManager 下载素材时会在文件夹中维护素材清单，清单与文件夹内容一致时
+        直接累加清单中的大小，否则单次 scandir 遍历（见 utils.asset_manifest）。
+        
         Args:
             draft_folder_path: 草稿文件夹路径
             
@@ -228,31 +439,14 @@ class DraftMetaManager:
             Assets 文件夹总大小（字节）
         """
         try:
-            total_size = 0
-            
-            # 检查传统位置: draft_folder_path/Assets/
-            assets_path = os.path.join(draft_folder_path, "Assets")
-            if os.path.exists(assets_path):
-                for root, dirs, files in os.walk(assets_path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        if os.path.exists(file_path):
-                            total_size += os.path.getsize(file_path)
-            
-            # 检查新位置: {draft_root}/CozeJianYingAssistantAssets/{draft_folder_name}/
-            # 从完整路径中提取草稿文件夹名称
             draft_folder_name = os.path.basename(draft_folder_path)
             draft_root = os.path.dirname(draft_folder_path)
-            coze_assets_path = os.path.join(draft_root, "CozeJianYingAssistantAssets", draft_folder_name)
-            
-            if os.path.exists(coze_assets_path):
-                for root, dirs, files in os.walk(coze_assets_path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        if os.path.exists(file_path):
-                            total_size += os.path.getsize(file_path)
             
-            return total_size
+            # 传统位置 + 新位置
+            return (
+                get_folder_size(os.path.join(draft_folder_path, "Assets"))
+                + get_folder_size(os.path.join(draft_root, COZE_ASSETS_FOLDER, draft_folder_name))
+            )
             
         except Exception as e:
             self.logger.error(f"计算 Assets 文件夹大小失败: {e}")
@@ -293,30 +487,57 @@ class DraftMetaManager:
         """
         return str(uuid.uuid4()).upper()
     
-    def save_root_meta_info(self, root_meta_info: Dict[str, Any], output_path: str):
+    def save_root_meta_info(self, root_meta_info: Dict[str, Any], output_path: str,
+                            durability: str = DEFAULT_DURABILITY):
         """
         保存 root_meta_info.json 文件
         
+        先写入同目录的临时文件再替换，剪映同时读取时不会看到不完整的文件。
+        
         Args:
             root_meta_info: root_meta_info 数据
             output_path: 输出文件路径
+            durability: 持久化级别（见 utils.atomic_write）
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(root_meta_info, f, ensure_ascii=False, separators=(',', ':'))
+            atomic_write_json(output_path, root_meta_info, durability=durability)
             
             self.logger.info(f"✅ root_meta_info.json 已保存到: {output_path}")
             
         except Exception as e:
             self.logger.error(f"保存 root_meta_info.json 失败: {e}")
             raise
+    
+    def generate_root_meta_info(self, draft_root_path: str, output_path: Optional[str] = None,
+                                durability: str = DEFAULT_DURABILITY) -> str:
+        """
+        扫描草稿根目录并保存 root_meta_info.json
+        
+        扫描和保存在根目录的写入锁内完成，不会与监视线程的自动更新交错写入。
+        
+        Args:
+            draft_root_path: 草稿根目录路径
+            output_path: 输出文件路径（默认为根目录下的 root_meta_info.json）
+            durability: 持久化级别（见 utils.atomic_write）
+            
+        Returns:
+            root_meta_info.json 的路径
+        """
+        output_path = output_path or os.path.join(draft_root_path, "root_meta_info.json")
+        with folder_lock(draft_root_path):
+            root_meta_info = self.scan_and_generate_meta_info(draft_root_path)
+            self.save_root_meta_info(root_meta_info, output_path, durability=durability)
+        return output_path
 
 
-def create_draft_meta_manager() -> DraftMetaManager:
+def create_draft_meta_manager(max_workers: int = DEFAULT_SCAN_WORKERS) -> DraftMetaManager:
     """
     创建草稿元信息管理器实例
     
+    Args:
+        max_workers: 并行扫描草稿的线程数，小于等于 1 时逐个扫描
+    
     Returns:
         DraftMetaManager 实例
     """
-    return DraftMetaManager()
\ No newline at end of file
+    return DraftMetaManager(max_workers=max_workers)
\ No newline at end of file
@@ -0,0 +1,536 @@
+"""
+草稿元信息监视器
+监视剪映草稿根目录，草稿新增、修改或删除时增量更新 root_meta_info.json。
+
+Linux 上使用 inotify（通过 ctypes 调用 libc，无额外依赖），其他平台或 inotify
+不可用时回退为定时轮询草稿指纹。一段时间内的连续变化会合并为一次更新（防抖），
+每次只重新分析受影响的草稿，未变化草稿的 all_draft_store 条目（包括 draft_id）保持不变，
+root_meta_info.json 通过 atomic_write 原子替换，剪映读取时不会看到写了一半的文件。
+"""
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from utils.logger import get_logger
+from utils.atomic_write import DEFAULT_DURABILITY, TEMP_SUFFIX, atomic_write_json
+from utils.draft_meta_manager import (
+    COZE_ASSETS_FOLDER,
+    META_CACHE_FILENAME,
+    DraftMetaManager,
+    create_draft_meta_manager,
+    folder_lock,
+)
+
+try:
+    import ctypes
+    import ctypes.util
+except ImportError:
+    ctypes = None
+
+
+# 元信息文件名（剪映从草稿根目录读取）
+ROOT_META_INFO_FILENAME = "root_meta_info.json"
+
+# 默认防抖时间：最后一次变化后保持安静多久才开始更新（秒）
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+
+# 持续有变化时最长等待时间，避免长时间批量生成期间一直不更新（秒）
+DEFAULT_MAX_DELAY_SECONDS = 10.0
+
+# 轮询模式的检查间隔（秒）
+DEFAULT_POLL_INTERVAL = 2.0
+
+# 等待事件时检查停止标志的间隔（秒）
+_STOP_CHECK_INTERVAL = 0.5
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO
+               | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+# struct inotify_event 的固定部分：wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+
+# 这些文件由本模块或 DraftMetaManager 写入，变化时不触发更新
+_IGNORED_FILES = frozenset((ROOT_META_INFO_FILENAME, META_CACHE_FILENAME))
+
+
+class _PollingBackend:
+    """轮询后端：定时比较所有草稿的指纹"""
+
+    name = "polling"
+
+    def __init__(self, watcher: "DraftMetaWatcher", poll_interval: float):
+        self.watcher = watcher
+        self.poll_interval = poll_interval
+        self._snapshot = watcher.snapshot()
+
+    def wait(self, timeout: Optional[float]) -> Set[str]:
+        """
+        等待到下一次检查，返回指纹发生变化的草稿文件夹名
+
+        timeout 为 None 时等待一个轮询间隔；停止时返回空集合。
+        """
+        delay = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        if self.watcher.stop_event.wait(delay):
+            return set()
+        snapshot = self.watcher.snapshot()
+        changed = {name for name in set(snapshot) | set(self._snapshot)
+                   if snapshot.get(name) != self._snapshot.get(name)}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifyBackend:
+    """
+    inotify 后端
+
+    监视草稿根目录、每个草稿文件夹及其 Assets/、以及 CozeJianYingAssistantAssets/{草稿名}/，
+    事件按监视描述符映射回草稿文件夹名。
+    """
+
+    name = "inotify"
+
+    def __init__(self, watcher: "DraftMetaWatcher"):
+        if ctypes is None or not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify 不可用")
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        for func in ("inotify_init1", "inotify_add_watch"):
+            if not hasattr(self._libc, func):
+                raise OSError(errno.ENOSYS, "inotify 不可用")
+
+        self.watcher = watcher
+        self.root = watcher.draft_root_path
+        self.assets_root = os.path.join(self.root, COZE_ASSETS_FOLDER)
+        # 监视描述符 -> (路径, 草稿文件夹名)；根目录和素材根目录的文件夹名为 None
+        self._watches: Dict[int, tuple] = {}
+        self._paths: Dict[str, int] = {}
+
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._fd = fd
+        try:
+            self._add_watch(self.root, None, required=True)
+            for name in self._list_dirs(self.root):
+                if name != COZE_ASSETS_FOLDER:
+                    self._watch_draft(name)
+            if os.path.isdir(self.assets_root):
+                self._add_watch(self.assets_root, None, required=True)
+        except OSError:
+            self.close()
+            raise
+
+    def _list_dirs(self, path: str) -> List[str]:
+        try:
+            with os.scandir(path) as entries:
+                return [entry.name for entry in entries if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
+
+    def _add_watch(self, path: str, draft_name: Optional[str], required: bool = False) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            # 监视数量达到上限时无法保证不漏事件，由调用方回退到轮询
+            if required or error == errno.ENOSPC:
+                raise OSError(error, f"无法监视 {path}: {os.strerror(error)}")
+            return  # 目录在添加前已被删除
+        self._watches[wd] = (path, draft_name)
+        self._paths[path] = wd
+
+    def _watch_draft(self, name: str) -> None:
+        """监视草稿文件夹、草稿内的 Assets/ 和对应的 Coze 素材文件夹"""
+        draft_path = os.path.join(self.root, name)
+        for path in (draft_path,
+                     os.path.join(draft_path, "Assets"),
+                     os.path.join(self.assets_root, name)):
+            if path not in self._paths and os.path.isdir(path):
+                self._add_watch(path, name)
+
+    def _forget(self, wd: int) -> None:
+        path, _ = self._watches.pop(wd, (None, None))
+        if path is not None:
+            self._paths.pop(path, None)
+
+    def _read_events(self) -> Optional[Set[str]]:
+        """读取所有已到达的事件，返回受影响的草稿文件夹名；None 表示需要检查全部草稿"""
+        changed: Optional[Set[str]] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].split(b"\0", 1)[0].decode("utf-8", "surrogateescape")
+                offset += length
+                affected = self._handle_event(wd, mask, name)
+                if affected is None:
+                    changed = None
+                elif changed is not None:
+                    changed.update(affected)
+        return changed
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> Optional[Set[str]]:
+        if mask & IN_Q_OVERFLOW:
+            # 事件队列溢出，可能有遗漏：重新建立草稿文件夹的监视并检查全部草稿
+            for draft_name in self._list_dirs(self.root):
+                if draft_name != COZE_ASSETS_FOLDER:
+                    self._watch_draft(draft_name)
+            return None
+        if mask & IN_IGNORED:
+            self._forget(wd)
+            return set()
+
+        path, draft_name = self._watches.get(wd, (None, None))
+        if path is None:
+            return set()
+        is_dir = bool(mask & IN_ISDIR)
+
+        if path == self.root:
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                return None
+            if not is_dir:
+                return set()  # 根目录下的文件（root_meta_info.json、缓存等）不影响草稿
+            if name == COZE_ASSETS_FOLDER:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.assets_root not in self._paths:
+                    self._add_watch(self.assets_root, None)
+                    for draft_name in self._list_dirs(self.assets_root):
+                        self._add_watch(os.path.join(self.assets_root, draft_name), draft_name)
+                return set(self._list_dirs(self.assets_root))
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_draft(name)
+            return {name}
+
+        if path == self.assets_root:
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_watch(os.path.join(self.assets_root, name), name)
+            return {name} if is_dir else set()
+
+        if name in _IGNORED_FILES or name.endswith(TEMP_SUFFIX):
+            return set()
+        if is_dir and name == "Assets" and mask & (IN_CREATE | IN_MOVED_TO):
+            self._add_watch(os.path.join(path, name), draft_name)
+        return {draft_name}
+
+    def wait(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        """
+        等待事件，返回受影响的草稿文件夹名
+
+        超时或停止时返回空集合；返回 None 表示无法确定范围，需要检查全部草稿。
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.watcher.stop_event.is_set():
+            step = _STOP_CHECK_INTERVAL
+            if deadline is not None:
+                step = min(step, deadline - time.monotonic())
+                if step <= 0:
+                    return set()
+            readable, _, _ = select.select([self._fd], [], [], step)
+            if readable:
+                changed = self._read_events()
+                if changed is None or changed:
+                    return changed
+        return set()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+class DraftMetaWatcher:
+    """
+    草稿根目录监视器
+
+    start() 后在后台线程中先完成一次扫描（复用 DraftMetaManager 的分析缓存），
+    之后等待文件变化，防抖后调用 refresh() 增量更新 root_meta_info.json。
+    refresh() 也可以直接调用，用于在生成草稿后立即同步。
+    """
+
+    def __init__(
+        self,
+        draft_root_path: str,
+        manager: Optional[DraftMetaManager] = None,
+        debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+        max_delay_seconds: float = DEFAULT_MAX_DELAY_SECONDS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+        durability: str = DEFAULT_DURABILITY,
+        on_update: Optional[Callable[[List[str], Dict[str, Any]], None]] = None
+    ):
+        """
+        Args:
+            draft_root_path: 草稿根目录路径
+            manager: 用于分析草稿的元信息管理器，None 时新建
+            debounce_seconds: 最后一次变化后等待多久开始更新
+            max_delay_seconds: 持续有变化时最长等待多久必须更新一次
+            poll_interval: 轮询模式的检查间隔
+            use_inotify: 是否尝试使用 inotify，False 时直接使用轮询
+            durability: 写入 root_meta_info.json 的持久化级别（见 utils.atomic_write）
+            on_update: 每次写入 root_meta_info.json 后在监视线程中调用
+                on_update(变化的草稿文件夹名列表, root_meta_info)
+        """
+        self.draft_root_path = os.path.abspath(draft_root_path)
+        self.manager = manager or create_draft_meta_manager()
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.durability = durability
+        self.on_update = on_update
+        self.logger = get_logger(__name__)
+
+        self.stop_event = threading.Event()
+        self.backend_name: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._refresh_lock = threading.Lock()
+
+        # 文件夹名 -> draft_store 条目 / 缓存条目（指纹和分析结果）
+        self._draft_stores: Dict[str, Dict[str, Any]] = {}
+        self._cache_entries: Dict[str, Dict[str, Any]] = {}
+        self._initialized = False
+
+    @property
+    def meta_info_path(self) -> str:
+        """root_meta_info.json 的路径"""
+        return os.path.join(self.draft_root_path, ROOT_META_INFO_FILENAME)
+
+    def is_running(self) -> bool:
+        """监视线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, wait_ready: bool = False) -> None:
+        """
+        启动监视线程
+
+        Args:
+            wait_ready: 是否等待首次扫描完成、监视开始后再返回
+
+        Raises:
+            FileNotFoundError: 草稿根目录不存在
+        """
+        if self.is_running():
+            return
+        if not os.path.isdir(self.draft_root_path):
+            raise FileNotFoundError(f"草稿根目录不存在: {self.draft_root_path}")
+        self.stop_event.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="DraftMetaWatcher", daemon=True)
+        self._thread.start()
+        if wait_ready:
+            self._ready.wait()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """停止监视线程（正在进行的更新会完成后再退出）"""
+        self.stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+
+    def snapshot(self) -> Dict[str, List[int]]:
+        """当前所有子文件夹的指纹（轮询后端用于检测变化）"""
+        snapshot = {}
+        try:
+            with os.scandir(self.draft_root_path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        snapshot[entry.name] = self.manager.draft_fingerprint(entry.path)
+        except OSError:
+            pass
+        return snapshot
+
+    def refresh(self, names: Optional[Set[str]] = None, force: bool = False) -> List[str]:
+        """
+        重新检查草稿并在有变化时写入 root_meta_info.json
+
+        检查和写入期间持有根目录的写入锁（见 draft_meta_manager.folder_lock），
+        与手动生成元信息互斥。
+
+        Args:
+            names: 需要检查的草稿文件夹名，None 表示检查全部
+            force: 不使用分析缓存、重新分析全部草稿，并且没有变化也重写 root_meta_info.json
+                （用于手动生成元信息，可以纠正指纹检测不到的素材变化）；此时写入失败会抛出 OSError
+
+        Returns:
+            all_draft_store 发生变化（新增、修改或删除）的草稿文件夹名，按名称排序
+        """
+        if force:
+            names = None
+        with self._refresh_lock, folder_lock(self.draft_root_path):
+            if not self._initialized:
+                # 首次检查：从分析缓存恢复，只有缓存未命中的草稿需要重新分析
+                self._cache_entries = self.manager.load_meta_cache(self.draft_root_path)
+                names = None
+
+            if names is None:
+                try:
+                    names = {
+                        entry.name for entry in os.scandir(self.draft_root_path)
+                        if entry.is_dir(follow_symlinks=False)
+                    }
+                except OSError as e:
+                    self.logger.error(f"无法读取草稿根目录 {self.draft_root_path}: {e}")
+                    return []
+                names |= set(self._draft_stores)
+
+            changed = [name for name in sorted(names) if self._refresh_draft(name, use_cache=not force)]
+
+            if not self._initialized:
+                # 缓存中可能有已删除的草稿，保存时只保留当前存在的
+                self._cache_entries = {name: self._cache_entries[name] for name in self._draft_stores}
+                self._initialized = True
+                self._write(changed, force=True, raise_errors=force)
+                return changed
+
+            if changed or force:
+                self._write(changed, force=force, raise_errors=force)
+            return changed
+
+    def _refresh_draft(self, name: str, use_cache: bool = True) -> bool:
+        """
+        检查单个草稿，all_draft_store 条目发生变化时返回 True
+
+        use_cache 为 False 时忽略指纹重新分析，分析结果与之前相同则不算变化。
+        """
+        draft_path = os.path.join(self.draft_root_path, name)
+        current = self._draft_stores.get(name)
+        previous = self._cache_entries.get(name)
+
+        if use_cache and current is not None and os.path.isdir(draft_path):
+            if previous and previous.get("fingerprint") == self.manager.draft_fingerprint(draft_path):
+                return False
+
+        status, draft_info, cache_entry = "skipped", None, None
+        if os.path.isdir(draft_path):
+            status, draft_info, cache_entry = self.manager.scan_draft_folder(
+                name, self.draft_root_path, previous if use_cache else None
+            )
+
+        if status in ("analyzed", "cached"):
+            if (not use_cache and current is not None and previous
+                    and previous.get("analysis") == cache_entry["analysis"]):
+                # 强制重新分析的结果没有变化：只更新缓存条目，all_draft_store 条目保持不变
+                self._cache_entries[name] = cache_entry
+                return False
+            if current is not None:
+                # 保留剪映已经见过的草稿 ID，避免同一草稿在列表中被当作新草稿
+                draft_info["draft_id"] = current["draft_id"]
+            self._draft_stores[name] = draft_info
+            self._cache_entries[name] = cache_entry
+            return True
+
+        self._cache_entries.pop(name, None)
+        return self._draft_stores.pop(name, None) is not None
+
+    def build_root_meta_info(self) -> Dict[str, Any]:
+        """按当前状态生成 root_meta_info.json 的内容（草稿按文件夹名排序）"""
+        draft_stores = [self._draft_stores[name] for name in sorted(self._draft_stores)]
+        return {
+            "all_draft_store": draft_stores,
+            "draft_ids": len(draft_stores),
+            "root_path": self.draft_root_path.replace("\\", "/")
+        }
+
+    def _write(self, changed: List[str], force: bool = False, raise_errors: bool = False) -> None:
+        if not changed and not force:
+            return
+        root_meta_info = self.build_root_meta_info()
+        try:
+            atomic_write_json(self.meta_info_path, root_meta_info, durability=self.durability)
+        except OSError as e:
+            self.logger.error(f"更新 root_meta_info.json 失败: {e}")
+            if raise_errors:
+                raise
+            return
+        self.manager.save_meta_cache(self.draft_root_path, self._cache_entries)
+        self.logger.info(
+            f"root_meta_info.json 已更新：{len(changed)} 个草稿变化，共 {root_meta_info['draft_ids']} 个草稿"
+        )
+        if self.on_update:
+            try:
+                self.on_update(changed, root_meta_info)
+            except Exception as e:
+                self.logger.error(f"元信息更新回调失败: {e}")
+
+    def _create_backend(self):
+        if self.use_inotify:
+            try:
+                return _InotifyBackend(self)
+            except OSError as e:
+                self.logger.info(f"inotify 不可用，改为每 {self.poll_interval} 秒轮询: {e}")
+        return _PollingBackend(self, self.poll_interval)
+
+    def _run(self) -> None:
+        backend = None
+        try:
+            # 先建立监视再做首次扫描，扫描期间发生的变化不会遗漏
+            backend = self._create_backend()
+            self.backend_name = backend.name
+            self.refresh()
+            self.logger.info(f"开始监视草稿文件夹（{backend.name}）: {self.draft_root_path}")
+            self._ready.set()
+
+            while not self.stop_event.is_set():
+                pending = backend.wait(None)
+                if pending is not None and not pending:
+                    continue
+
+                # 防抖：持续收集事件，直到安静 debounce_seconds 或达到最长等待时间
+                deadline = time.monotonic() + self.max_delay_seconds
+                while not self.stop_event.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    more = backend.wait(min(self.debounce_seconds, remaining))
+                    if more is not None and not more:
+                        break
+                    pending = None if pending is None or more is None else pending | more
+
+                if self.stop_event.is_set():
+                    break
+                try:
+                    self.refresh(pending)
+                except Exception as e:
+                    self.logger.error(f"更新草稿元信息失败: {e}")
+        except Exception as e:
+            self.logger.error(f"草稿文件夹监视已停止: {e}")
+        finally:
+            self._ready.set()
+            if backend is not None:
+                backend.close()
+            self.logger.info(f"停止监视草稿文件夹: {self.draft_root_path}")
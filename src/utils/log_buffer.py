@@ -0,0 +1,148 @@
+"""
+GUI 日志缓冲
+日志记录可能来自任意线程，且生成草稿时每秒可达数千条。逐条调用 Tk 的 after()
+会让事件循环饱和，反过来拖慢生成。这里把日志先放入线程安全的环形缓冲区，
+由 GUI 以固定间隔一次性取出，合并成少量 (文本, 标签) 片段后一次插入文本框。
+日志级别由 GUIHandler 随消息一起传入（record.levelname），不再从格式化后的文本中匹配。
+
+日志面板只保留最近的 max_lines 行，超出 LOG_TRIM_CHUNK 行后一次删除最旧的部分，
+避免长时间运行后文本框无限增长；完整日志由文件处理器保存在日志文件中。
+"""
+import threading
+from collections import deque
+from typing import List, Optional, Tuple
+
+
+# 默认缓冲容量（条），GUI 来不及显示时丢弃最旧的日志，完整日志仍保存在日志文件中
+DEFAULT_BUFFER_CAPACITY = 10000
+
+# GUI 取出缓冲区日志的间隔（毫秒）
+LOG_FLUSH_INTERVAL_MS = 50
+
+# 日志面板默认最多保留的行数，0 表示不限制
+DEFAULT_MAX_LOG_LINES = 5000
+
+# 超出上限多少行后裁剪一次（按块删除，避免每次插入都删除）
+LOG_TRIM_CHUNK = 500
+
+# 日志级别标签，与文本框中配置的 tag 同名
+LOG_TAGS = ("ERROR", "WARNING", "DEBUG", "INFO")
+
+
+class LogBuffer:
+    """线程安全的日志环形缓冲区"""
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_CAPACITY):
+        """
+        Args:
+            capacity: 最多缓存的日志条数，超出时丢弃最旧的日志
+        """
+        self._lines = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def append(self, message: str, level: Optional[str] = None) -> None:
+        """
+        添加一条日志（可在任意线程调用，不访问 Tk）
+
+        Args:
+            message: 日志消息
+            level: 日志级别名称（如 record.levelname），为 None 时从消息文本推断
+        """
+        tag = level_tag(level) if level else classify_log_level(message)
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1
+            self._lines.append((message, tag))
+
+    def drain(self) -> Tuple[List[Tuple[str, str]], int]:
+        """
+        取出所有缓存的日志
+
+        Returns:
+            ([(日志, 标签), ...], 自上次取出以来因缓冲区已满而丢弃的条数)
+        """
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+        return lines, dropped
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._lines)
+
+
+def level_tag(level: str) -> str:
+    """将日志级别名称映射为标签（CRITICAL 显示为 ERROR，未知级别显示为 INFO）"""
+    if level == "CRITICAL":
+        return "ERROR"
+    return level if level in LOG_TAGS else "INFO"
+
+
+def classify_log_level(message: str) -> str:
+    """根据日志内容判断级别标签（仅用于没有级别信息的消息，如直接调用 append_log）"""
+    if "ERROR" in message:
+        return "ERROR"
+    if "WARNING" in message:
+        return "WARNING"
+    if "DEBUG" in message:
+        return "DEBUG"
+    return "INFO"
+
+
+def build_log_chunks(entries: List[Tuple[str, str]], dropped: int = 0) -> List[Tuple[str, str]]:
+    """
+    将日志合并为 (文本, 标签) 片段
+
+    相邻的同级别日志合并为一个片段，可以作为 Text.insert(END, 文本1, 标签1, 文本2, 标签2, ...)
+    的参数一次插入。
+
+    Args:
+        entries: [(日志, 标签), ...]，即 LogBuffer.drain() 的结果
+        dropped: 丢弃的条数，大于 0 时在开头插入一条提示
+    """
+    chunks: List[Tuple[str, str]] = []
+    if dropped:
+        chunks.append((f"... 日志过多，已省略 {dropped} 条（完整日志见日志文件）\n", "WARNING"))
+
+    current_tag = None
+    current_lines: List[str] = []
+    for line, tag in entries:
+        if tag != current_tag and current_lines:
+            chunks.append(("\n".join(current_lines) + "\n", current_tag))
+            current_lines = []
+        current_tag = tag
+        current_lines.append(line)
+    if current_lines:
+        chunks.append(("\n".join(current_lines) + "\n", current_tag))
+    return chunks
+
+
+def flatten_chunks(chunks: List[Tuple[str, str]]) -> List[str]:
+    """将片段展开为 Text.insert 的参数列表 [文本1, 标签1, 文本2, 标签2, ...]"""
+    args: List[str] = []
+    for text, tag in chunks:
+        args.append(text)
+        args.append(tag)
+    return args
+
+
+def lines_to_trim(line_count: int, max_lines: int, chunk: int = LOG_TRIM_CHUNK) -> int:
+    """
+    计算日志面板需要删除的最旧行数
+
+    行数超过 max_lines + chunk 时裁剪回 max_lines，因此面板中的行数保持在
+    max_lines 到 max_lines + chunk 之间，平均每 chunk 行才删除一次。
+
+    Args:
+        line_count: 当前行数
+        max_lines: 最多保留的行数，小于等于 0 表示不限制
+        chunk: 允许超出的行数
+
+    Returns:
+        需要删除的行数，0 表示不需要裁剪
+    """
+    if max_lines <= 0 or line_count <= max_lines + chunk:
+        return 0
+    return line_count - max_lines
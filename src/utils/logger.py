@@ -1,12 +1,28 @@
 """
 日志系统模块
 提供统一的日志记录功能，支持文件和GUI显示
+
+根日志记录器只挂一个 QueueHandler，记录放入队列后立即返回；格式化以及控制台、文件、
+GUI 三个输出都在 QueueListener 的后台线程中完成，生成草稿的工作线程不再等待 I/O。
 """
+import atexit
 import logging
+import logging.handlers
+import queue
+import shutil
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+
+# 导出日志前等待队列写出的最长时间（秒）
+DRAIN_TIMEOUT_SECONDS = 5.0
+
+# 当前的日志监听器和根日志记录器上的队列处理器（setup_logger 创建，shutdown_logger 停止并移除）
+_listener: Optional["_DrainableQueueListener"] = None
+_queue_handler: Optional[logging.Handler] = None
 
 
 class LogHandler:
@@ -26,10 +42,10 @@ class LogHandler:
         cls._gui_callback = callback
     
     @classmethod
-    def emit_to_gui(cls, message: str):
-        """发送日志消息到GUI"""
+    def emit_to_gui(cls, message: str, level: str = "INFO"):
+        """发送日志消息和级别名称到GUI"""
         if cls._gui_callback:
-            cls._gui_callback(message)
+            cls._gui_callback(message, level)
 
 
 class GUIHandler(logging.Handler):
@@ -39,27 +55,67 @@ class GUIHandler(logging.Handler):
         """处理日志记录"""
         try:
             msg = self.format(record)
-            LogHandler.emit_to_gui(msg)
-            # 强制刷新，确保日志立即显示
-            sys.stdout.flush()
+            LogHandler.emit_to_gui(msg, record.levelname)
         except Exception:
             self.handleError(record)
 
 
+class _EnqueueHandler(logging.handlers.QueueHandler):
+    """只把记录放入队列的处理器"""
+    
+    def prepare(self, record):
+        # 队列在同一进程内，记录不需要序列化；消息格式化留给监听线程
+        return record
+
+
+class _DrainableQueueListener(logging.handlers.QueueListener):
+    """可以等待队列中已有记录全部写出的监听器"""
+    
+    def handle(self, record):
+        # drain 放入的标记记录：之前的记录都已处理完毕，刷新处理器后通知等待方
+        drained = getattr(record, 'drained', None)
+        if isinstance(drained, threading.Event):
+            for handler in self.handlers:
+                handler.flush()
+            drained.set()
+            return
+        super().handle(record)
+    
+    def drain(self, timeout: float = DRAIN_TIMEOUT_SECONDS) -> bool:
+        """
+        等待调用前已放入队列的记录全部写出
+        
+        Returns:
+            是否在超时前写出完毕；监听线程未运行或在监听线程中调用时直接返回 False
+        """
+        if self._thread is None or threading.current_thread() is self._thread:
+            return False
+        drained = threading.Event()
+        self.queue.put_nowait(logging.makeLogRecord({'drained': drained}))
+        return drained.wait(timeout)
+
+
 def setup_logger(log_file: Optional[Path] = None, level=logging.INFO):
     """
     设置日志系统
     
+    控制台、文件和GUI处理器由后台监听线程调用，根日志记录器上只有一个队列处理器。
+    程序退出时（或调用 shutdown_logger 时）队列中剩余的日志会全部写出。
+    
     Args:
         log_file: 日志文件路径，如果为None则只输出到控制台
         level: 日志级别
     """
+    global _listener, _queue_handler
+    
     # 创建根日志记录器
     logger = logging.getLogger()
     logger.setLevel(level)
     
-    # 清除现有的处理器
+    # 停止之前的监听器并清除现有的处理器
+    shutdown_logger()
     logger.handlers.clear()
+    handlers = []
     
     # 创建格式化器
     formatter = logging.Formatter(
@@ -71,7 +127,7 @@ def setup_logger(log_file: Optional[Path] = None, level=logging.INFO):
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # 文件处理器
     if log_file:
@@ -82,17 +138,55 @@ def setup_logger(log_file: Optional[Path] = None, level=logging.INFO):
         )
         file_handler.setLevel(level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
     
     # GUI处理器
     gui_handler = GUIHandler()
     gui_handler.setLevel(level)
     gui_handler.setFormatter(formatter)
-    logger.addHandler(gui_handler)
+    handlers.append(gui_handler)
+    
+    # 队列处理器和监听线程
+    log_queue = queue.SimpleQueue()
+    _queue_handler = _EnqueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    _listener = _DrainableQueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
     
     return logger
 
 
+def shutdown_logger():
+    """
+    停止日志监听线程，写出队列中剩余的日志并关闭处理器
+    
+    同时从根日志记录器上移除队列处理器，之后的日志不会再放入无人处理的队列而被丢弃
+    （没有处理器时由 logging 的 lastResort 输出 WARNING 及以上的日志到 stderr）。
+    """
+    global _listener, _queue_handler
+    
+    queue_handler, _queue_handler = _queue_handler, None
+    if queue_handler is not None:
+        logging.getLogger().removeHandler(queue_handler)
+    
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(shutdown_logger)
+
+
+def _iter_handlers() -> Iterator[logging.Handler]:
+    """根日志记录器上的处理器以及监听线程中的处理器"""
+    yield from logging.getLogger().handlers
+    if _listener is not None:
+        yield from _listener.handlers
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     获取日志记录器
@@ -111,6 +205,50 @@ def set_gui_log_callback(callback):
     设置GUI日志回调函数
     
     Args:
-        callback: 回调函数，接收一个字符串参数（日志消息）
+        callback: 回调函数，接收日志消息和级别名称（如 "INFO"、"ERROR"）两个参数
     """
     LogHandler.set_gui_callback(callback)
+
+
+def get_log_file_path() -> Optional[Path]:
+    """
+    获取日志文件路径
+    
+    Returns:
+        根日志记录器的文件处理器写入的文件路径，未配置日志文件时返回 None
+    """
+    for handler in _iter_handlers():
+        if isinstance(handler, logging.FileHandler):
+            return Path(handler.baseFilename)
+    return None
+
+
+def export_log_file(destination: str) -> bool:
+    """
+    将日志文件复制到指定位置（分块流式复制，不把整个文件读入内存）
+    
+    复制前先等待监听线程写出队列中已有的日志，导出内容包含调用前记录的最新日志。
+    
+    Args:
+        destination: 目标文件路径
+        
+    Returns:
+        是否已复制；未配置日志文件或文件不存在时返回 False
+        
+    Raises:
+        OSError: 复制失败
+    """
+    listener = _listener
+    if listener is not None:
+        listener.drain()
+    for handler in _iter_handlers():
+        if isinstance(handler, logging.FileHandler):
+            handler.flush()
+    
+    log_file = get_log_file_path()
+    if log_file is None or not log_file.exists():
+        return False
+    
+    with open(log_file, 'rb') as src, open(destination, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    return True
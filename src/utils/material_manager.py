@@ -6,10 +6,12 @@ import os
 import requests
 import hashlib
 from pathlib import Path
-from typing import Union, Optional, Dict, Any
+from typing import Union, Optional, Dict, Any, Set
 from urllib.parse import urlparse, unquote
 import pyJianYingDraft as draft
 from utils.logger import get_logger
+from utils.signed_url import inspect_signed_url, order_urls_by_expiry
+from utils.asset_manifest import MANIFEST_FILENAME, TEMP_SUFFIX, AssetManifest, get_folder_size
 
 
 class MaterialManager:
@@ -21,6 +23,8 @@ class MaterialManager:
     2. 自动识别素材类型(视频/音频/图片)
     3. 创建对应的Material对象
     4. 支持素材缓存(避免重复下载)
+    5. 签名URL按过期时间优先下载，已过期的直接跳过
+    6. 维护素材清单（文件 -> 大小、摘要），供元信息扫描直接读取素材大小
     """
     
     def __init__(self, draft_folder_path: str, draft_name: str, project_id: Optional[str] = None):
@@ -58,9 +62,15 @@ class MaterialManager:
         # 素材缓存 {url: material_object}
         self.material_cache: Dict[str, Union[draft.VideoMaterial, draft.AudioMaterial]] = {}
         
+        # 批量下载中失败的URL，处理片段时直接跳过，不再逐个片段重试下载
+        self.failed_urls: Set[str] = set()
+        
         # 确保Assets文件夹存在
         self._ensure_assets_folder()
         
+        # 素材清单：下载时只更新内存，批量下载结束或计算文件夹大小时写入一次
+        self.asset_manifest = AssetManifest(str(self.assets_path))
+        
         self.logger.info(f"素材管理器已初始化: {self.assets_path}")
     
     def _ensure_assets_folder(self) -> None:
@@ -288,7 +298,13 @@ class MaterialManager:
             
         Raises:
             requests.RequestException: 下载失败
+            ValueError: 签名URL已过期
         """
+        # 已过期的签名URL必然返回403，不再发起任何请求
+        signed_info = inspect_signed_url(url)
+        if signed_info.is_expired():
+            raise ValueError(f"签名URL已过期 {-signed_info.seconds_left():.0f} 秒，跳过下载: {url}")
+        
         # 如果没有指定文件名,先发送HEAD请求获取Content-Type
         content_type = None
         if filename is None:
@@ -313,6 +329,8 @@ class MaterialManager:
         # 检查文件是否已存在
         if target_path.exists() and not force_download:
             self.logger.info(f"素材已存在，跳过下载: {filename}")
+            if not self.asset_manifest.is_current(str(target_path)):
+                self._record_asset(target_path)
             return str(target_path)
         
         # 下载文件 - 添加重试机制
@@ -349,11 +367,13 @@ class MaterialManager:
                 # 写入文件，增加进度监控
                 total_size = int(response.headers.get('Content-Length', 0))
                 downloaded_size = 0
+                digest = hashlib.sha256()  # 边下载边计算摘要，写入素材清单
                 
                 with open(temp_path, 'wb') as f:
                     for chunk in response.iter_content(chunk_size=8192):
                         if chunk:
                             f.write(chunk)
+                            digest.update(chunk)
                             downloaded_size += len(chunk)
                             
                             # 每下载1MB打印一次进度（避免日志过多）
@@ -384,11 +404,15 @@ class MaterialManager:
                     final_path = target_path
                     temp_path.rename(final_path)
                 
+                self._record_asset(final_path, digest.hexdigest())
                 self.logger.info(f"✅ 素材下载完成: {final_path.name} ({final_path.stat().st_size / 1024 / 1024:.2f} MB)")
                 return str(final_path)
                 
             except requests.RequestException as e:
                 self.logger.warning(f"第{attempt + 1}次下载尝试失败: {e}")
+                if signed_info.is_expired():
+                    self.logger.error(f"❌ 签名URL已在下载过程中过期，不再重试: {url}")
+                    raise
                 if attempt < max_retries - 1:
                     self.logger.info(f"等待{(attempt + 1) * 2}秒后重试...")
                     import time
@@ -408,6 +432,20 @@ class MaterialManager:
         # 如果所有重试都失败，这里不应该到达，但为了类型安全添加
         raise RuntimeError("下载失败：所有重试尝试均已用尽")
     
+    def _record_asset(self, file_path: Path, digest: Optional[str] = None) -> None:
+        """将素材记录到内存中的清单；失败只影响元信息扫描的速度，不影响下载结果"""
+        try:
+            self.asset_manifest.record(str(file_path), digest)
+        except OSError as e:
+            self.logger.warning(f"更新素材清单失败: {e}")
+    
+    def flush_asset_manifest(self) -> None:
+        """将素材清单写入素材文件夹（没有新记录时不写入）"""
+        try:
+            self.asset_manifest.flush()
+        except OSError as e:
+            self.logger.warning(f"保存素材清单失败: {e}")
+    
     def create_material(
         self,
         url: str,
@@ -533,6 +571,10 @@ class MaterialManager:
         """
         批量下载并创建素材
         
+        签名URL按过期时间从早到晚下载，避免大文件占用时间导致短时效的
+        TTS 链接过期；已过期的URL直接失败，不消耗带宽。
+        失败的URL记录在 failed_urls 中，调用方据此跳过引用它们的片段。
+        
         Args:
             urls: URL列表
             force_download: 是否强制重新下载
@@ -543,15 +585,20 @@ class MaterialManager:
         self.logger.info(f"开始批量下载 {len(urls)} 个素材")
         
         results = {}
-        for i, url in enumerate(urls, 1):
+        for i, url in enumerate(order_urls_by_expiry(urls), 1):
             try:
                 self.logger.info(f"处理 [{i}/{len(urls)}]: {url}")
                 material = self.create_material(url, force_download=force_download)
                 results[url] = material
+                self.failed_urls.discard(url)
             except Exception as e:
                 self.logger.error(f"处理素材失败 [{i}/{len(urls)}]: {url} - {e}")
+                self.failed_urls.add(url)
                 continue
         
+        # 清单在整批下载结束后写入一次
+        self.flush_asset_manifest()
+        
         self.logger.info(f"✅ 批量下载完成: {len(results)}/{len(urls)} 成功")
         return results
     
@@ -587,16 +634,13 @@ class MaterialManager:
     
     def get_assets_folder_size(self) -> float:
         """
-        获取Assets文件夹大小
+        获取Assets文件夹大小（优先读取素材清单，清单过期时单次 scandir 遍历）
         
         Returns:
             文件夹大小（MB）
         """
-        total_size = 0
-        for file in self.assets_path.rglob('*'):
-            if file.is_file():
-                total_size += file.stat().st_size
-        
+        self.flush_asset_manifest()
+        total_size = get_folder_size(str(self.assets_path))
         return total_size / 1024 / 1024  # 转换为MB
     
     def list_downloaded_materials(self) -> list[str]:
@@ -609,7 +653,10 @@ class MaterialManager:
         if not self.assets_path.exists():
             return []
         
-        return [f.name for f in self.assets_path.iterdir() if f.is_file()]
+        return [
+            f.name for f in self.assets_path.iterdir()
+            if f.is_file() and f.name != MANIFEST_FILENAME and not f.name.endswith(TEMP_SUFFIX)
+        ]
 
 
 # ========== 便捷函数 ==========
@@ -0,0 +1,90 @@
+"""
+草稿生成进度事件
+生成草稿时按阶段发出结构化事件（阶段、草稿、轨道、片段序号、字节数、耗时），
+GUI 等调用方直接订阅事件显示进度，不再从逐片段的日志文本中解析。
+
+没有订阅者时 emit 直接返回，不创建事件对象，片段循环中的开销可以忽略。
+"""
+import threading
+from typing import Callable, List, NamedTuple, Optional
+
+from utils.logger import get_logger
+
+
+# 事件阶段
+STAGE_DRAFT_START = "draft_start"   # 开始生成一个草稿，segment_count 为片段总数
+STAGE_SEGMENT = "segment"           # 一个片段处理完成（ok 表示是否成功）
+STAGE_SAVE = "save"                 # draft_content.json 已保存，bytes 为文件大小
+STAGE_DRAFT_DONE = "draft_done"     # 草稿生成完成，elapsed 为整个草稿的耗时
+
+
+class ProgressEvent(NamedTuple):
+    """一条进度事件"""
+    stage: str                            # 阶段，见 STAGE_* 常量
+    draft: str                            # 草稿 ID
+    track: Optional[str] = None           # 轨道名称
+    segment_index: Optional[int] = None   # 片段在轨道中的序号（从 0 开始）
+    segment_count: Optional[int] = None   # 片段总数（轨道内或整个草稿）
+    bytes: int = 0                        # 本阶段写入的字节数
+    elapsed: float = 0.0                  # 本阶段耗时（秒）
+    ok: bool = True                       # 是否成功
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    """进度事件分发器（订阅和发出都可以在任意线程调用）"""
+
+    def __init__(self):
+        self.logger = get_logger(__name__)
+        self._callbacks: List[ProgressCallback] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """是否有订阅者"""
+        return bool(self._callbacks)
+
+    def subscribe(self, callback: ProgressCallback) -> None:
+        """订阅进度事件，回调在发出事件的线程中执行，应尽快返回"""
+        with self._lock:
+            self._callbacks = self._callbacks + [callback]
+
+    def unsubscribe(self, callback: ProgressCallback) -> None:
+        """取消订阅"""
+        with self._lock:
+            self._callbacks = [cb for cb in self._callbacks if cb != callback]
+
+    def emit(self, stage: str, draft: str, **fields) -> None:
+        """
+        发出进度事件
+
+        Args:
+            stage: 阶段
+            draft: 草稿 ID
+            **fields: ProgressEvent 的其他字段
+        """
+        callbacks = self._callbacks
+        if not callbacks:
+            return
+        event = ProgressEvent(stage, draft, **fields)
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                self.logger.debug("进度回调出错: %s", e)
+
+
+def format_progress(event: ProgressEvent) -> str:
+    """将进度事件格式化为一行状态文本"""
+    if event.stage == STAGE_DRAFT_START:
+        return f"开始生成草稿 {event.draft}（{event.segment_count} 个片段）"
+    if event.stage == STAGE_SEGMENT:
+        text = f"草稿 {event.draft}：{event.track} 片段 {event.segment_index + 1}/{event.segment_count}"
+        return text if event.ok else text + "（失败）"
+    if event.stage == STAGE_SAVE:
+        return f"草稿 {event.draft} 已保存（{event.bytes / 1024:.1f} KB）"
+    if event.stage == STAGE_DRAFT_DONE:
+        return f"草稿 {event.draft} 生成完成，用时 {event.elapsed:.1f} 秒"
+    return f"{event.stage}: {event.draft}"
@@ -0,0 +1,108 @@
+"""
+签名 URL 过期检查
+解析火山引擎 TTS、TOS、OSS、S3 等签名 URL 中的过期时间，
+用于优先下载即将过期的素材，并跳过已经过期（必然 403）的链接
+"""
+import time
+from calendar import timegm
+from typing import Iterable, List, NamedTuple, Optional
+from urllib.parse import urlparse, parse_qsl
+
+
+# 直接给出过期时间戳（秒）的查询参数（小写）
+EXPIRES_AT_PARAMS = ('x-expires', 'expires')
+
+# (签名时间, 有效秒数) 成对出现的查询参数（小写），签名时间格式为 20240101T000000Z
+SIGNED_DATE_PARAMS = (
+    ('x-amz-date', 'x-amz-expires'),
+    ('x-tos-date', 'x-tos-expires'),
+)
+
+
+class SignedUrlInfo(NamedTuple):
+    """签名 URL 的过期信息"""
+    url: str
+    expires_at: Optional[float]  # 过期时间戳（秒），不是签名 URL 时为 None
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """URL 是否已经过期"""
+        if self.expires_at is None:
+            return False
+        return self.expires_at <= (time.time() if now is None else now)
+
+    def seconds_left(self, now: Optional[float] = None) -> Optional[float]:
+        """距离过期的秒数，已过期时为负数"""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - (time.time() if now is None else now)
+
+
+def get_signed_url_expiry(url: str) -> Optional[float]:
+    """
+    解析 URL 查询参数中的过期时间
+
+    支持 x-expires / Expires 时间戳（火山引擎 TTS、OSS、CloudFront），
+    以及 X-Amz-Date + X-Amz-Expires、X-Tos-Date + X-Tos-Expires 形式的签名。
+    参数名不区分大小写，无法解析时视为没有过期时间。
+
+    coze_plugin/tools/get_media_duration/handler.py 中有相同的实现（Coze 工具需独立），
+    修改时请同步。
+
+    Args:
+        url: 素材 URL
+
+    Returns:
+        过期时间戳（秒），没有过期时间时为 None
+    """
+    try:
+        params = {name.lower(): value for name, value in parse_qsl(urlparse(url).query)}
+    except (TypeError, ValueError):
+        return None
+
+    for name in EXPIRES_AT_PARAMS:
+        value = params.get(name, '')
+        if value.isdigit():
+            return float(value)
+
+    for date_name, expires_name in SIGNED_DATE_PARAMS:
+        date_value = params.get(date_name, '')
+        expires_value = params.get(expires_name, '')
+        if date_value and expires_value.isdigit():
+            try:
+                signed_at = timegm(time.strptime(date_value, '%Y%m%dT%H%M%SZ'))
+            except ValueError:
+                continue
+            return float(signed_at + int(expires_value))
+
+    return None
+
+
+def inspect_signed_url(url: str) -> SignedUrlInfo:
+    """
+    检查素材 URL 的签名过期信息
+
+    Args:
+        url: 素材 URL
+
+    Returns:
+        SignedUrlInfo 对象
+    """
+    return SignedUrlInfo(url, get_signed_url_expiry(url))
+
+
+def order_urls_by_expiry(urls: Iterable[str]) -> List[str]:
+    """
+    按过期时间排序 URL，最早过期的排在最前
+
+    没有过期时间的 URL 排在所有签名 URL 之后，并保持原有顺序。
+
+    Args:
+        urls: URL 列表
+
+    Returns:
+        排序后的新列表
+    """
+    inspected = [inspect_signed_url(url) for url in urls]
+    # sorted 是稳定排序，过期时间相同或没有过期时间的 URL 保持原有顺序
+    ordered = sorted(inspected, key=lambda info: (info.expires_at is None, info.expires_at or 0))
+    return [info.url for info in ordered]
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+测试素材清单
+验证素材大小优先从清单读取，清单缺失或过期时回退到 scandir 遍历，
+以及内存中的清单在 flush 时才写入、与其他写入者的记录合并
+"""
+import sys
+import os
+import json
+import hashlib
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from utils import asset_manifest
+from utils.asset_manifest import (
+    MANIFEST_FILENAME, AssetManifest, get_folder_size, load_manifest, record_asset, scan_folder_size,
+)
+from utils.draft_meta_manager import DraftMetaManager
+
+
+def write_file(path, size):
+    with open(path, 'wb') as f:
+        f.write(b'a' * size)
+    return path
+
+
+def test_record_and_read_manifest():
+    """测试下载后记录的清单被直接用于计算大小"""
+    print("=== 测试素材清单 ===")
+
+    with tempfile.TemporaryDirectory() as folder:
+        video = write_file(os.path.join(folder, 'video.mp4'), 1000)
+        audio = write_file(os.path.join(folder, 'audio.mp3'), 300)
+        record_asset(folder, video, digest='known-digest')
+        entry = record_asset(folder, audio)
+        assert entry['digest'] == hashlib.sha256(b'a' * 300).hexdigest()
+
+        files = load_manifest(folder)
+        assert files['video.mp4'] == {'size': 1000, 'mtime_ns': os.stat(video).st_mtime_ns, 'digest': 'known-digest'}
+        assert get_folder_size(folder) == 1300
+        assert scan_folder_size(folder) == 1300  # 清单文件本身不计入
+
+        # 清单与文件夹一致时不再遍历文件
+        original_scan = asset_manifest.scan_folder_size
+        asset_manifest.scan_folder_size = lambda _: (_ for _ in ()).throw(AssertionError("不应遍历"))
+        try:
+            assert get_folder_size(folder) == 1300
+        finally:
+            asset_manifest.scan_folder_size = original_scan
+
+        # 下载中的临时文件不影响清单是否有效
+        write_file(os.path.join(folder, 'image.png.tmp'), 50)
+        assert get_folder_size(folder) == 1300
+
+        # 删除的文件在下次记录时从清单中移除
+        os.remove(audio)
+        record_asset(folder, write_file(os.path.join(folder, 'image.png'), 200))
+        assert sorted(load_manifest(folder)) == ['image.png', 'video.mp4']
+    print("✅ 清单记录和读取正确")
+
+
+def test_stale_manifest_falls_back():
+    """测试清单过期、损坏或缺失时回退到遍历"""
+    print("=== 测试清单回退 ===")
+
+    with tempfile.TemporaryDirectory() as folder:
+        record_asset(folder, write_file(os.path.join(folder, 'a.mp4'), 100))
+
+        # 手动添加的文件：清单过期
+        write_file(os.path.join(folder, 'manual.mp3'), 40)
+        assert get_folder_size(folder) == 140
+
+        # 子文件夹：清单不覆盖
+        os.makedirs(os.path.join(folder, 'sub'))
+        write_file(os.path.join(folder, 'sub', 'b.png'), 7)
+        assert get_folder_size(folder) == 147
+
+    with tempfile.TemporaryDirectory() as folder:
+        # 同名文件被替换（大小或 mtime 变化）：清单过期
+        path = write_file(os.path.join(folder, 'a.mp4'), 100)
+        record_asset(folder, path)
+        write_file(path, 120)
+        os.utime(path, ns=(0, 1))
+        assert get_folder_size(folder) == 120
+
+        with open(os.path.join(folder, MANIFEST_FILENAME), 'w') as f:
+            f.write('{broken')
+        assert load_manifest(folder) is None
+        assert get_folder_size(folder) == 120
+
+    assert get_folder_size(os.path.join(folder, 'missing')) == 0
+    print("✅ 清单过期时回退到遍历")
+
+
+def test_in_memory_manifest_flush():
+    """测试内存中的清单只在 flush 时写入"""
+    print("=== 测试内存清单 ===")
+
+    with tempfile.TemporaryDirectory() as folder:
+        manifest = AssetManifest(folder)
+        saves = []
+        original_save = asset_manifest._save_manifest
+        asset_manifest._save_manifest = lambda *args: (saves.append(args[0]), original_save(*args))
+        try:
+            for i in range(50):
+                manifest.record(write_file(os.path.join(folder, f'{i}.mp4'), 10), digest=f'd{i}')
+            assert manifest.dirty and load_manifest(folder) is None
+            assert manifest.is_current(os.path.join(folder, '0.mp4'))
+            manifest.flush()
+            manifest.flush()  # 没有新记录时不写入
+            assert len(saves) == 1 and not manifest.dirty
+        finally:
+            asset_manifest._save_manifest = original_save
+        assert len(load_manifest(folder)) == 50
+        assert get_folder_size(folder) == 500
+
+        # 文件被修改后不再是最新记录
+        write_file(os.path.join(folder, '0.mp4'), 11)
+        os.utime(os.path.join(folder, '0.mp4'), ns=(0, 1))
+        assert not manifest.is_current(os.path.join(folder, '0.mp4'))
+
+        # 另一个写入者的记录在 flush 时合并，已删除的文件被移除
+        other = AssetManifest(folder)
+        other.record(write_file(os.path.join(folder, 'other.mp3'), 5))
+        other.flush()
+        os.remove(os.path.join(folder, '1.mp4'))
+        manifest.record(os.path.join(folder, '0.mp4'))
+        manifest.flush()
+        files = load_manifest(folder)
+        assert 'other.mp3' in files and '1.mp4' not in files
+        assert files['0.mp4']['size'] == 11
+        assert get_folder_size(folder) == 11 + 48 * 10 + 5
+    print("✅ 内存清单只在 flush 时写入")
+
+
+def test_meta_manager_uses_manifest():
+    """测试元信息扫描从两个素材位置读取大小"""
+    print("=== 测试元信息扫描读取清单 ===")
+
+    with tempfile.TemporaryDirectory() as root:
+        draft_dir = os.path.join(root, 'draft_1')
+        os.makedirs(os.path.join(draft_dir, 'Assets'))
+        write_file(os.path.join(draft_dir, 'Assets', 'old.mp4'), 10)
+        coze_assets = os.path.join(root, 'CozeJianYingAssistantAssets', 'draft_1')
+        os.makedirs(coze_assets)
+        record_asset(coze_assets, write_file(os.path.join(coze_assets, 'new.mp4'), 500))
+        with open(os.path.join(draft_dir, 'draft_content.json'), 'w') as f:
+            json.dump({'duration': 1000000, 'tracks': []}, f)
+        open(os.path.join(draft_dir, 'draft_meta_info.json'), 'w').close()
+
+        result = DraftMetaManager(max_workers=1).scan_and_generate_meta_info(root, use_cache=False)
+        assert result['draft_ids'] == 1
+        assert result['all_draft_store'][0]['draft_timeline_materials_size'] == 510
+    print("✅ 元信息扫描读取素材清单")
+
+
+if __name__ == "__main__":
+    test_record_and_read_manifest()
+    test_stale_manifest_falls_back()
+    test_in_memory_manifest_flush()
+    test_meta_manager_uses_manifest()
+    print("\n✅ 所有素材清单测试通过!")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+测试原子写入工具
+验证写入成功时完整替换目标文件，写入失败时原文件保持不变且不留下临时文件，
+以及各持久化级别和批量同步都能正常工作
+"""
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.atomic_write import (
+    DURABILITY_FILE, DURABILITY_FULL, DURABILITY_LEVELS, DURABILITY_NONE,
+    atomic_open, atomic_write_json, atomic_write_text, sync_paths,
+)
+
+
+def test_write_and_replace():
+    """测试各持久化级别下的写入和替换"""
+    print("=== 测试原子写入 ===")
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, 'root_meta_info.json')
+        for level in DURABILITY_LEVELS:
+            atomic_write_json(path, {"all_draft_store": [], "level": level, "name": "草稿"}, durability=level)
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            assert json.loads(text)["level"] == level
+            assert '草稿' in text and ', ' not in text  # 默认不转义中文、紧凑输出
+
+        atomic_write_json(path, {"a": 1}, indent=4)
+        with open(path, 'r', encoding='utf-8') as f:
+            assert f.read() == '{\n    "a": 1\n}'
+
+        atomic_write_text(path, "内容")
+        with open(path, 'r', encoding='utf-8') as f:
+            assert f.read() == "内容"
+
+        with atomic_open(os.path.join(folder, 'data.bin'), 'wb', durability=DURABILITY_FULL) as f:
+            f.write(b'\x00\x01')
+        with open(os.path.join(folder, 'data.bin'), 'rb') as f:
+            assert f.read() == b'\x00\x01'
+
+        assert sorted(os.listdir(folder)) == ['data.bin', 'root_meta_info.json']
+        print("✅ 原子写入测试通过")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def test_failed_write_keeps_original():
+    """测试写入失败时保留原文件"""
+    print("=== 测试写入失败 ===")
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, 'draft_content.json')
+        atomic_write_json(path, {"duration": 1})
+
+        # 不可序列化的对象：json.dump 中途失败
+        try:
+            atomic_write_json(path, {"duration": 2, "bad": object()})
+            assert False, "应该抛出 TypeError"
+        except TypeError:
+            pass
+
+        with open(path, 'r', encoding='utf-8') as f:
+            assert json.load(f) == {"duration": 1}
+        assert os.listdir(folder) == ['draft_content.json']
+
+        for bad_call in (lambda: atomic_write_text(path, "x", durability="always"),
+                         lambda: atomic_open(path, 'a').__enter__(),
+                         lambda: sync_paths([path], durability="always")):
+            try:
+                bad_call()
+                assert False, "应该抛出 ValueError"
+            except ValueError:
+                pass
+        print("✅ 写入失败测试通过")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def test_batch_sync():
+    """测试批量写入后统一同步"""
+    print("=== 测试批量同步 ===")
+
+    folder = tempfile.mkdtemp()
+    try:
+        paths = []
+        for i in range(3):
+            draft_dir = os.path.join(folder, f'draft_{i}')
+            os.makedirs(draft_dir)
+            path = os.path.join(draft_dir, 'draft_content.json')
+            atomic_write_json(path, {"index": i}, durability=DURABILITY_NONE)
+            paths.append(path)
+
+        # 不存在的文件被跳过
+        sync_paths(paths + [os.path.join(folder, 'missing.json')], durability=DURABILITY_FULL)
+        sync_paths(paths, durability=DURABILITY_FILE)
+        sync_paths(paths, durability=DURABILITY_NONE)
+        print("✅ 批量同步测试通过")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def test_concurrent_writers_same_path():
+    """测试同一进程内多个线程同时写入同一文件"""
+    print("=== 测试并发写入同一文件 ===")
+
+    folder = tempfile.mkdtemp()
+    try:
+        path = os.path.join(folder, 'root_meta_info.json')
+        errors = []
+
+        def writer(index):
+            try:
+                for i in range(300):
+                    atomic_write_json(path, {"writer": index, "i": i, "all_draft_store": []},
+                                      durability=DURABILITY_NONE)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == [], errors
+        with open(path, 'r', encoding='utf-8') as f:
+            assert json.load(f)["i"] == 299
+        assert os.listdir(folder) == ['root_meta_info.json']
+
+        # 权限与直接 open 新建的文件一致（由 umask 决定，而不是 mkstemp 的 0600）
+        reference = os.path.join(folder, 'reference.json')
+        with open(reference, 'w'):
+            pass
+        assert os.stat(path).st_mode & 0o777 == os.stat(reference).st_mode & 0o777
+        print("✅ 并发写入同一文件测试通过")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_write_and_replace()
+    test_failed_write_keeps_original()
+    test_batch_sync()
+    test_concurrent_writers_same_path()
+    print("\n🎉 所有测试通过")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测试 draft_content.json 时长的流式提取
+验证只读取顶层 duration 或 tracks 中片段的时间范围，跳过 materials 等子树
+"""
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.draft_duration import extract_draft_duration, scan_draft_duration
+
+
+def dumps(data, **kwargs):
+    return json.dumps(data, ensure_ascii=False, **kwargs).encode('utf-8')
+
+
+def test_top_level_duration():
+    """测试优先使用顶层 duration"""
+    print("=== 测试顶层 duration ===")
+
+    content = {
+        "canvas_config": {"width": 1920, "height": 1080},
+        "duration": 12345678,
+        "materials": {"videos": [{"duration": 99999999, "path": "C:/素材/a.mp4"}]},
+        "tracks": [{"segments": [{"target_timerange": {"start": 0, "duration": 50000000}}]}],
+    }
+    assert scan_draft_duration(dumps(content)) == 12345678
+    assert scan_draft_duration(dumps(content, indent=2)) == 12345678
+
+    # 找到顶层 duration 后不再读取后面的内容
+    assert scan_draft_duration(dumps({"duration": 1000})[:-1] + b', "materials": [') == 1000
+
+    # 顶层 duration 为 0 时按片段计算
+    content["duration"] = 0
+    assert scan_draft_duration(dumps(content)) == 50000000
+    print("✅ 顶层 duration 提取正确")
+
+
+def test_segment_timeranges():
+    """测试没有顶层 duration 时从片段计算最大结束时间"""
+    print("=== 测试片段时间范围 ===")
+
+    content = {
+        "materials": {
+            # materials 中的同名字段不参与计算
+            "tracks": [{"segments": [{"target_timerange": {"start": 0, "duration": 10 ** 12}}]}],
+            "texts": [{"content": "含有 {\"括号\": [\"和引号\"]} 的字幕 \\", "duration": 10 ** 12}],
+        },
+        "tracks": [
+            {"type": "video", "segments": [
+                {"id": "a", "source_timerange": {"start": 0, "duration": 10 ** 11},
+                 "target_timerange": {"start": 0, "duration": 3000000}},
+                {"id": "b", "target_timerange": {"start": 3000000, "duration": 2000000}},
+            ]},
+            {"type": "text", "segments": []},
+            {"type": "audio", "segments": [
+                {"time_range": {"start": 0, "end": 5500}},  # 旧格式：毫秒
+            ]},
+        ],
+    }
+    assert scan_draft_duration(dumps(content)) == 5500000
+    assert scan_draft_duration(dumps(content, indent=4)) == 5500000
+    assert scan_draft_duration(b'{}') == 0
+    assert scan_draft_duration(b'{"tracks": []}') == 0
+    print("✅ 片段时间范围提取正确")
+
+
+def test_invalid_content():
+    """测试无效内容抛出 ValueError"""
+    print("=== 测试无效内容 ===")
+
+    for data in (b'[]', b'not json', b'{"tracks": [{"segments": [', b'{"materials": {"a": "unterminated}'):
+        try:
+            scan_draft_duration(data)
+            assert False, f"应该抛出 ValueError: {data!r}"
+        except ValueError:
+            pass
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        empty_path = os.path.join(temp_dir, "draft_content.json")
+        open(empty_path, 'wb').close()
+        try:
+            extract_draft_duration(empty_path)
+            assert False, "空文件应该抛出 ValueError"
+        except ValueError:
+            pass
+
+        with open(empty_path, 'wb') as f:
+            f.write(dumps({"duration": 42, "tracks": []}))
+        assert extract_draft_duration(empty_path) == 42
+    print("✅ 无效内容处理正确")
+
+
+if __name__ == "__main__":
+    test_top_level_duration()
+    test_segment_timeranges()
+    test_invalid_content()
+    print("\n✅ 所有时长提取测试通过!")
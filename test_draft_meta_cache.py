@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+测试 draft_meta_manager 的增量扫描缓存和并行扫描
+验证未变化的草稿直接复用缓存，只有新增或修改的草稿会被重新分析；
+并行扫描与逐个扫描的结果一致
+"""
+import sys
+import os
+import json
+import shutil
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from utils.draft_meta_manager import DraftMetaManager, META_CACHE_FILENAME
+
+
+def write_draft(root, name, end_ms):
+    """创建一个最小的草稿文件夹"""
+    draft_dir = os.path.join(root, name)
+    os.makedirs(draft_dir, exist_ok=True)
+    with open(os.path.join(draft_dir, 'draft_content.json'), 'w') as f:
+        json.dump({'tracks': [{'segments': [{'time_range': {'start': 0, 'end': end_ms}}]}]}, f)
+    with open(os.path.join(draft_dir, 'draft_meta_info.json'), 'w') as f:
+        f.write('encrypted')
+    return draft_dir
+
+
+class CountingManager(DraftMetaManager):
+    """记录重新分析过的草稿"""
+
+    def __init__(self, max_workers=4):
+        super().__init__(max_workers=max_workers)
+        self.analyzed = []
+
+    def _calculate_draft_duration(self, draft_content_path):
+        self.analyzed.append(os.path.basename(os.path.dirname(draft_content_path)))
+        return super()._calculate_draft_duration(draft_content_path)
+
+
+def scan(root, max_workers=4, **kwargs):
+    manager = CountingManager(max_workers=max_workers)
+    result = manager.scan_and_generate_meta_info(root, **kwargs)
+    durations = {d['draft_name']: d['tm_duration'] for d in result['all_draft_store']}
+    return sorted(manager.analyzed), durations
+
+
+def test_incremental_scan():
+    """测试只重新分析新增和修改过的草稿"""
+    print("=== 测试增量扫描 ===")
+
+    root = tempfile.mkdtemp()
+    try:
+        for i in range(3):
+            write_draft(root, f"draft_{i}", 1000 * (i + 1))
+
+        analyzed, durations = scan(root)
+        assert analyzed == ['draft_0', 'draft_1', 'draft_2']
+        assert durations == {'draft_0': 1000000, 'draft_1': 2000000, 'draft_2': 3000000}
+        assert os.path.exists(os.path.join(root, META_CACHE_FILENAME))
+
+        # 没有变化：全部复用缓存，结果相同
+        analyzed, cached_durations = scan(root)
+        assert analyzed == []
+        assert cached_durations == durations
+
+        # 修改一个草稿、新增一个草稿、删除一个草稿
+        write_draft(root, 'draft_1', 20000)
+        write_draft(root, 'draft_3', 4000)
+        shutil.rmtree(os.path.join(root, 'draft_2'))
+        analyzed, durations = scan(root)
+        assert analyzed == ['draft_1', 'draft_3']
+        assert durations == {'draft_0': 1000000, 'draft_1': 20000000, 'draft_3': 4000000}
+
+        with open(os.path.join(root, META_CACHE_FILENAME), 'r', encoding='utf-8') as f:
+            assert sorted(json.load(f)['drafts']) == ['draft_0', 'draft_1', 'draft_3']
+
+        # 素材文件夹中新增文件时重新分析
+        assets_dir = os.path.join(root, 'draft_0', 'Assets')
+        os.makedirs(assets_dir)
+        with open(os.path.join(assets_dir, 'a.mp3'), 'wb') as f:
+            f.write(b'x' * 100)
+        manager = CountingManager()
+        result = manager.scan_and_generate_meta_info(root)
+        assert manager.analyzed == ['draft_0']
+        sizes = {d['draft_name']: d['draft_timeline_materials_size'] for d in result['all_draft_store']}
+        assert sizes['draft_0'] == 100
+        print("✅ 只重新分析了新增和修改的草稿")
+    finally:
+        shutil.rmtree(root)
+
+
+def test_cache_fallbacks():
+    """测试缓存损坏和禁用缓存时完整扫描"""
+    print("=== 测试缓存回退 ===")
+
+    root = tempfile.mkdtemp()
+    try:
+        write_draft(root, 'draft_a', 1000)
+        write_draft(root, 'draft_b', 2000)
+        scan(root)
+
+        with open(os.path.join(root, META_CACHE_FILENAME), 'w') as f:
+            f.write('{broken')
+        analyzed, _ = scan(root)
+        assert analyzed == ['draft_a', 'draft_b']
+
+        analyzed, _ = scan(root, use_cache=False)
+        assert analyzed == ['draft_a', 'draft_b']
+        analyzed, _ = scan(root)
+        assert analyzed == []
+        print("✅ 缓存损坏或禁用时重新分析所有草稿")
+    finally:
+        shutil.rmtree(root)
+
+
+def test_parallel_scan_matches_serial():
+    """测试并行扫描的输出顺序和失败汇总与逐个扫描一致"""
+    print("=== 测试并行扫描 ===")
+
+    root = tempfile.mkdtemp()
+    try:
+        for i in reversed(range(20)):
+            write_draft(root, f"draft_{i:02d}", 1000 * (i + 1))
+        # 不是草稿的文件夹被跳过，损坏的草稿计入失败
+        os.makedirs(os.path.join(root, 'not_a_draft'))
+        broken_dir = write_draft(root, 'draft_broken', 1000)
+
+        class BrokenManager(DraftMetaManager):
+            def _calculate_assets_size(self, draft_folder_path):
+                if draft_folder_path == broken_dir:
+                    raise OSError("磁盘错误")
+                return super()._calculate_assets_size(draft_folder_path)
+
+        results = []
+        for workers in (1, 8):
+            manager = BrokenManager(max_workers=workers)
+            result = manager.scan_and_generate_meta_info(root, use_cache=False)
+            results.append(result)
+
+        serial, parallel = results
+        names = [d['draft_name'] for d in parallel['all_draft_store']]
+        assert names == [f"draft_{i:02d}" for i in range(20)]
+        assert names == [d['draft_name'] for d in serial['all_draft_store']]
+        assert [d['tm_duration'] for d in parallel['all_draft_store']] == \
+            [d['tm_duration'] for d in serial['all_draft_store']]
+        assert serial['draft_ids'] == parallel['draft_ids'] == 20
+        print("✅ 并行扫描结果按文件夹名排序且与逐个扫描一致")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    test_incremental_scan()
+    test_cache_fallbacks()
+    test_parallel_scan_matches_serial()
+    print("\n✅ 所有增量扫描测试通过!")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+测试 draft_meta_watcher 的增量更新和文件监视
+验证只有受影响的草稿被重新分析、未变化草稿的 draft_id 保持不变，
+以及 inotify 和轮询两种后端都能在草稿变化后自动更新 root_meta_info.json，
+强制刷新时忽略缓存、能发现指纹检测不到的素材变化
+"""
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from utils.draft_meta_manager import DraftMetaManager, META_CACHE_FILENAME, folder_lock
+from utils.draft_meta_watcher import DraftMetaWatcher, ROOT_META_INFO_FILENAME
+
+
+def write_draft(root, name, end_ms):
+    """创建一个最小的草稿文件夹"""
+    draft_dir = os.path.join(root, name)
+    os.makedirs(draft_dir, exist_ok=True)
+    with open(os.path.join(draft_dir, 'draft_content.json'), 'w') as f:
+        json.dump({'tracks': [{'segments': [{'time_range': {'start': 0, 'end': end_ms}}]}]}, f)
+    with open(os.path.join(draft_dir, 'draft_meta_info.json'), 'w') as f:
+        f.write('encrypted')
+    return draft_dir
+
+
+class CountingManager(DraftMetaManager):
+    """记录重新分析过的草稿"""
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.analyzed = []
+
+    def _calculate_draft_duration(self, draft_content_path):
+        self.analyzed.append(os.path.basename(os.path.dirname(draft_content_path)))
+        return super()._calculate_draft_duration(draft_content_path)
+
+
+def read_meta_info(root):
+    with open(os.path.join(root, ROOT_META_INFO_FILENAME), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def draft_ids(meta_info):
+    return {d['draft_name']: d['draft_id'] for d in meta_info['all_draft_store']}
+
+
+def test_refresh_updates_only_changed_drafts():
+    """测试 refresh 只重新分析变化的草稿，并保留其余条目"""
+    print("=== 测试增量刷新 ===")
+
+    root = tempfile.mkdtemp()
+    try:
+        for i in range(3):
+            write_draft(root, f"draft_{i}", 1000 * (i + 1))
+
+        manager = CountingManager()
+        watcher = DraftMetaWatcher(root, manager=manager)
+        assert watcher.refresh() == ['draft_0', 'draft_1', 'draft_2']
+        first = read_meta_info(root)
+        assert first['draft_ids'] == 3
+
+        # 没有变化：不重新分析，不重写文件
+        manager.analyzed.clear()
+        mtime = os.stat(os.path.join(root, ROOT_META_INFO_FILENAME)).st_mtime_ns
+        assert watcher.refresh() == []
+        assert manager.analyzed == []
+        assert os.stat(os.path.join(root, ROOT_META_INFO_FILENAME)).st_mtime_ns == mtime
+
+        # 修改一个、新增一个、删除一个
+        time.sleep(0.01)
+        write_draft(root, 'draft_1', 20000)
+        write_draft(root, 'draft_3', 4000)
+        shutil.rmtree(os.path.join(root, 'draft_2'))
+        assert watcher.refresh({'draft_1', 'draft_2', 'draft_3'}) == ['draft_1', 'draft_2', 'draft_3']
+        assert sorted(manager.analyzed) == ['draft_1', 'draft_3']
+
+        second = read_meta_info(root)
+        names = [d['draft_name'] for d in second['all_draft_store']]
+        assert names == ['draft_0', 'draft_1', 'draft_3']
+        assert second['draft_ids'] == 3
+        durations = {d['draft_name']: d['tm_duration'] for d in second['all_draft_store']}
+        assert durations['draft_1'] == 20000000
+        # 已有草稿的 ID 不变
+        assert draft_ids(second)['draft_0'] == draft_ids(first)['draft_0']
+        assert draft_ids(second)['draft_1'] == draft_ids(first)['draft_1']
+
+        # 没有遗留临时文件
+        assert not [name for name in os.listdir(root) if name.endswith('.tmp')]
+
+        # 新的监视器从分析缓存恢复，不需要重新分析
+        manager = CountingManager()
+        DraftMetaWatcher(root, manager=manager).refresh()
+        assert manager.analyzed == []
+        print("✅ 增量刷新测试通过")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_force_refresh_ignores_cache():
+    """测试 refresh(force=True) 重新分析，纠正素材子文件夹中的原地修改"""
+    print("=== 测试强制刷新 ===")
+
+    root = tempfile.mkdtemp()
+    try:
+        draft_dir = write_draft(root, 'draft_0', 1000)
+        nested = os.path.join(draft_dir, 'Assets', 'audio')
+        os.makedirs(nested)
+        asset = os.path.join(nested, 'a.mp3')
+        with open(asset, 'wb') as f:
+            f.write(b'x' * 100)
+
+        manager = CountingManager()
+        watcher = DraftMetaWatcher(root, manager=manager)
+        watcher.refresh()
+        first = read_meta_info(root)
+        assert first['all_draft_store'][0]['draft_timeline_materials_size'] == 100
+
+        # 子文件夹中的文件原地变大：指纹不变，普通刷新沿用缓存的大小
+        with open(asset, 'ab') as f:
+            f.write(b'x' * 50)
+        assert watcher.refresh() == []
+        assert read_meta_info(root)['all_draft_store'][0]['draft_timeline_materials_size'] == 100
+
+        # 强制刷新重新分析，大小更新且 draft_id 保持不变
+        manager.analyzed.clear()
+        assert watcher.refresh(force=True) == ['draft_0']
+        assert manager.analyzed == ['draft_0']
+        second = read_meta_info(root)
+        assert second['all_draft_store'][0]['draft_timeline_materials_size'] == 150
+        assert draft_ids(second) == draft_ids(first)
+
+        # 再次强制刷新：重新分析但结果相同，不算变化
+        manager.analyzed.clear()
+        assert watcher.refresh(force=True) == []
+        assert manager.analyzed == ['draft_0']
+        print("✅ 强制刷新测试通过")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def run_watcher(use_inotify):
+    root = tempfile.mkdtemp()
+    updated = threading.Event()
+    updates = []
+
+    def on_update(changed, meta_info):
+        updates.append(changed)
+        updated.set()
+
+    watcher = DraftMetaWatcher(root, manager=CountingManager(), debounce_seconds=0.2,
+                               poll_interval=0.1, use_inotify=use_inotify, on_update=on_update)
+    try:
+        write_draft(root, 'draft_0', 1000)
+        watcher.start(wait_ready=True)
+        assert watcher.is_running()
+        assert updated.wait(5)
+        assert read_meta_info(root)['draft_ids'] == 1
+
+        # 连续生成两个草稿（回调在写入文件之后调用）
+        updated.clear()
+        updates.clear()
+        write_draft(root, 'draft_1', 2000)
+        write_draft(root, 'draft_2', 3000)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and (read_meta_info(root)['draft_ids'] != 3 or not updates):
+            time.sleep(0.05)
+        meta_info = read_meta_info(root)
+        assert [d['draft_name'] for d in meta_info['all_draft_store']] == ['draft_0', 'draft_1', 'draft_2']
+        assert updates and set(updates[-1]) <= {'draft_1', 'draft_2'}
+
+        # 修改草稿内容
+        write_draft(root, 'draft_1', 5000)
+
+        def draft_1_duration():
+            durations = {d['draft_name']: d['tm_duration'] for d in read_meta_info(root)['all_draft_store']}
+            return durations['draft_1']
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and draft_1_duration() != 5000000:
+            time.sleep(0.05)
+        assert draft_1_duration() == 5000000
+
+        # 删除草稿
+        shutil.rmtree(os.path.join(root, 'draft_0'))
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and read_meta_info(root)['draft_ids'] != 2:
+            time.sleep(0.05)
+        assert read_meta_info(root)['draft_ids'] == 2
+        return watcher.backend_name
+    finally:
+        watcher.stop()
+        assert not watcher.is_running()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_manual_generate_and_watcher_share_lock():
+    """测试手动生成元信息与监视器刷新共用根目录写入锁"""
+    print("=== 测试写入锁 ===")
+
+    root = tempfile.mkdtemp()
+    try:
+        for i in range(3):
+            write_draft(root, f"draft_{i}", 1000 * (i + 1))
+        assert folder_lock(root) is folder_lock(os.path.join(root, '.'))
+
+        watcher = DraftMetaWatcher(root, manager=CountingManager())
+        watcher.refresh()
+
+        # force=True 在没有变化时也重写文件
+        meta_path = os.path.join(root, ROOT_META_INFO_FILENAME)
+        os.remove(meta_path)
+        assert watcher.refresh(force=True) == []
+        assert read_meta_info(root)['draft_ids'] == 3
+
+        # 其他写入者持有锁时，监视器的刷新会等待
+        finished = threading.Event()
+        with folder_lock(root):
+            thread = threading.Thread(target=lambda: (watcher.refresh(force=True), finished.set()))
+            thread.start()
+            assert not finished.wait(0.2)
+        thread.join(5)
+        assert finished.is_set()
+
+        # 手动生成与监视器刷新并发执行，两个文件始终完整
+        errors = []
+
+        def manual():
+            try:
+                manager = DraftMetaManager(max_workers=1)
+                for _ in range(20):
+                    manager.generate_root_meta_info(root)
+            except Exception as e:
+                errors.append(e)
+
+        def watch():
+            try:
+                for _ in range(20):
+                    watcher.refresh(force=True)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=manual), threading.Thread(target=watch)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == [], errors
+        assert read_meta_info(root)['draft_ids'] == 3
+        with open(os.path.join(root, META_CACHE_FILENAME), 'r', encoding='utf-8') as f:
+            assert sorted(json.load(f)['drafts']) == ['draft_0', 'draft_1', 'draft_2']
+        assert not [name for name in os.listdir(root) if name.endswith('.tmp')]
+        print("✅ 写入锁测试通过")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_watch_with_polling():
+    """测试轮询后端"""
+    print("=== 测试轮询监视 ===")
+    assert run_watcher(use_inotify=False) == 'polling'
+    print("✅ 轮询监视测试通过")
+
+
+def test_watch_with_inotify():
+    """测试 inotify 后端（不可用时自动回退到轮询）"""
+    print("=== 测试 inotify 监视 ===")
+    backend = run_watcher(use_inotify=True)
+    assert backend in ('inotify', 'polling')
+    print(f"✅ 监视测试通过（后端: {backend}）")
+
+
+if __name__ == "__main__":
+    test_refresh_updates_only_changed_drafts()
+    test_manual_generate_and_watcher_share_lock()
+    test_force_refresh_ignores_cache()
+    test_watch_with_polling()
+    test_watch_with_inotify()
+    print("\n🎉 所有测试通过")
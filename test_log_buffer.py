@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+测试 GUI 日志缓冲
+验证多线程写入不丢失日志、缓冲区满时丢弃最旧的日志并计数，
+以及相邻同级别日志被合并为一个插入片段；日志面板按块裁剪，保存日志时从日志文件导出
+"""
+import sys
+import os
+import shutil
+import logging
+import tempfile
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.log_buffer import (
+    LogBuffer, build_log_chunks, classify_log_level, flatten_chunks, level_tag, lines_to_trim,
+)
+from src.utils.logger import export_log_file, get_log_file_path
+
+
+def test_concurrent_append_and_drain():
+    """测试多线程写入"""
+    print("=== 测试多线程写入 ===")
+
+    buffer = LogBuffer(capacity=100000)
+
+    def worker(index):
+        for i in range(1000):
+            buffer.append(f"worker {index} line {i}")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    lines, dropped = buffer.drain()
+    assert len(lines) == 8000
+    assert dropped == 0
+    assert len(buffer) == 0
+    assert buffer.drain() == ([], 0)
+    print("✅ 多线程写入测试通过")
+
+
+def test_overflow_drops_oldest():
+    """测试缓冲区满时丢弃最旧的日志"""
+    print("=== 测试缓冲区溢出 ===")
+
+    buffer = LogBuffer(capacity=3)
+    for i in range(5):
+        buffer.append(f"line {i}")
+    lines, dropped = buffer.drain()
+    assert [line for line, _ in lines] == ["line 2", "line 3", "line 4"]
+    assert dropped == 2
+
+    chunks = build_log_chunks(lines, dropped)
+    assert chunks[0][1] == "WARNING" and "2" in chunks[0][0]
+    print("✅ 缓冲区溢出测试通过")
+
+
+def test_chunks():
+    """测试日志合并"""
+    print("=== 测试日志合并 ===")
+
+    lines = [
+        "2025-01-01 00:00:00 - a - INFO - 开始",
+        "2025-01-01 00:00:00 - a - INFO - 处理中",
+        "2025-01-01 00:00:00 - a - ERROR - 失败",
+        "2025-01-01 00:00:00 - a - WARNING - 警告",
+        "2025-01-01 00:00:00 - a - INFO - 结束",
+    ]
+    assert [classify_log_level(line) for line in lines] == ["INFO", "INFO", "ERROR", "WARNING", "INFO"]
+
+    # 级别随消息传入，不从文本中推断（消息中出现 ERROR 字样的 INFO 日志仍是 INFO）
+    buffer = LogBuffer()
+    for line, level in zip(lines, ["INFO", "INFO", "ERROR", "WARNING", "INFO"]):
+        buffer.append(line, level)
+    buffer.append("片段 ERROR_CODE 已处理", "INFO")
+    buffer.append("严重错误", "CRITICAL")
+    entries, _ = buffer.drain()
+    assert [tag for _, tag in entries[-2:]] == ["INFO", "ERROR"]
+    assert level_tag("UNKNOWN") == "INFO"
+
+    chunks = build_log_chunks(entries[:5])
+    assert [tag for _, tag in chunks] == ["INFO", "ERROR", "WARNING", "INFO"]
+    assert "".join(text for text, _ in chunks) == "\n".join(lines) + "\n"
+    assert flatten_chunks(chunks)[:2] == [lines[0] + "\n" + lines[1] + "\n", "INFO"]
+    assert build_log_chunks([]) == []
+    print("✅ 日志合并测试通过")
+
+
+def test_lines_to_trim():
+    """测试日志面板按块裁剪"""
+    print("=== 测试日志裁剪 ===")
+
+    assert lines_to_trim(100, 0) == 0            # 不限制
+    assert lines_to_trim(5000, 5000, 500) == 0
+    assert lines_to_trim(5500, 5000, 500) == 0   # 允许超出一个块
+    assert lines_to_trim(5501, 5000, 500) == 501  # 裁剪回上限
+
+    # 模拟持续写入：行数始终不超过上限加一个块，且只有少数几次裁剪
+    line_count, trims = 0, 0
+    for _ in range(100000):
+        line_count += 1
+        trim = lines_to_trim(line_count, 5000, 500)
+        if trim:
+            line_count -= trim
+            trims += 1
+        assert line_count <= 5500
+    assert trims < 200
+    print("✅ 日志裁剪测试通过")
+
+
+def test_export_log_file():
+    """测试从日志文件导出完整日志"""
+    print("=== 测试日志导出 ===")
+
+    folder = tempfile.mkdtemp()
+    root_logger = logging.getLogger()
+    handler = logging.FileHandler(os.path.join(folder, 'app.log'), encoding='utf-8')
+    original_handlers = root_logger.handlers[:]
+    try:
+        root_logger.handlers = [handler]
+        assert get_log_file_path() is not None
+        root_logger.warning("第一条")
+        root_logger.warning("第二条")
+
+        destination = os.path.join(folder, 'exported.log')
+        assert export_log_file(destination)
+        with open(destination, 'r', encoding='utf-8') as f:
+            assert f.read() == "第一条\n第二条\n"
+
+        # 没有日志文件时返回 False，由调用方保存面板内容
+        root_logger.handlers = []
+        assert get_log_file_path() is None
+        assert not export_log_file(destination)
+        print("✅ 日志导出测试通过")
+    finally:
+        root_logger.handlers = original_handlers
+        handler.close()
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_concurrent_append_and_drain()
+    test_overflow_drops_oldest()
+    test_chunks()
+    test_lines_to_trim()
+    test_export_log_file()
+    print("\n🎉 所有测试通过")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+测试日志队列
+验证 setup_logger 后工作线程只把记录放入队列，控制台、文件和 GUI 输出都在监听线程中完成，
+停止监听器时队列中的日志全部写出，异常堆栈和各处理器的级别保持不变，
+导出日志时包含刚刚记录、仍在队列中的日志
+"""
+import sys
+import os
+import shutil
+import logging
+import tempfile
+import threading
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils import logger as logger_module
+from src.utils.logger import (
+    export_log_file, get_log_file_path, set_gui_log_callback, setup_logger, shutdown_logger,
+)
+
+
+def test_queue_logging():
+    """测试多线程日志经由监听线程写出"""
+    print("=== 测试日志队列 ===")
+
+    folder = tempfile.mkdtemp()
+    root_logger = logging.getLogger()
+    original_handlers = root_logger.handlers[:]
+    original_level = root_logger.level
+    gui_messages = []
+    gui_threads = set()
+
+    def on_gui_log(message, level):
+        gui_messages.append((message, level))
+        gui_threads.add(threading.current_thread().name)
+
+    try:
+        set_gui_log_callback(on_gui_log)
+        log_file = Path(folder) / "app.log"
+        setup_logger(log_file)
+
+        # 根日志记录器上只有队列处理器
+        assert len(root_logger.handlers) == 1
+        assert isinstance(root_logger.handlers[0], logging.handlers.QueueHandler)
+        assert get_log_file_path() == log_file
+
+        def worker(index):
+            log = logging.getLogger(f"worker.{index}")
+            for i in range(200):
+                log.info("线程 %d 第 %d 条", index, i)
+            log.debug("不会输出的调试日志")
+
+        threads = [threading.Thread(target=worker, args=(i,), name=f"producer-{i}") for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        try:
+            raise ValueError("测试异常")
+        except ValueError:
+            logging.getLogger("worker").error("处理失败", exc_info=True)
+
+        shutdown_logger()
+        # 停止后根日志记录器上不再保留队列处理器
+        assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root_logger.handlers)
+
+        with open(log_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert sum(1 for line in lines if " - INFO - 线程 " in line) == 800
+        assert not any("调试日志" in line for line in lines)
+        assert any(" - ERROR - 处理失败" in line for line in lines)
+        assert "ValueError: 测试异常" in lines
+
+        assert sum(1 for message, level in gui_messages if "线程 " in message and level == "INFO") == 800
+        assert any(level == "ERROR" and "处理失败" in message for message, level in gui_messages)
+        assert not any(name.startswith("producer-") for name in gui_threads)
+
+        # 重新设置后可以导出完整日志文件，包括尚在队列中的最新日志
+        setup_logger(log_file)
+        for i in range(2000):
+            logging.getLogger("worker").info("导出前 %d", i)
+        logging.getLogger("worker").error("导出前的最后一条")
+        destination = os.path.join(folder, "exported.log")
+        assert export_log_file(destination)
+        with open(destination, 'r', encoding='utf-8') as f:
+            exported = f.read()
+        assert " - ERROR - 导出前的最后一条" in exported
+        assert exported.count(" - INFO - 导出前 ") == 2000
+        print("✅ 日志队列测试通过")
+    finally:
+        shutdown_logger()
+        set_gui_log_callback(None)
+        root_logger.handlers = original_handlers
+        root_logger.setLevel(original_level)
+        assert logger_module._listener is None
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_queue_logging()
+    print("\n🎉 所有测试通过")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+测试草稿生成进度事件
+验证订阅者收到结构化事件、没有订阅者时 emit 不创建事件，
+回调出错不影响生成，以及状态文本的格式
+"""
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from utils.progress import (
+    ProgressEvent, ProgressReporter, format_progress,
+    STAGE_DRAFT_START, STAGE_SEGMENT, STAGE_SAVE, STAGE_DRAFT_DONE,
+)
+
+
+def test_subscribe_and_emit():
+    """测试订阅和发出事件"""
+    print("=== 测试订阅和发出事件 ===")
+
+    reporter = ProgressReporter()
+    assert not reporter.enabled
+    events = []
+    reporter.subscribe(events.append)
+    assert reporter.enabled
+
+    reporter.emit(STAGE_DRAFT_START, "draft-1", segment_count=3)
+    for i in range(3):
+        reporter.emit(STAGE_SEGMENT, "draft-1", track="video_0", segment_index=i,
+                      segment_count=3, elapsed=0.01, ok=i != 1)
+    reporter.emit(STAGE_SAVE, "draft-1", bytes=2048, elapsed=0.02)
+    reporter.emit(STAGE_DRAFT_DONE, "draft-1", bytes=2048, elapsed=1.5)
+
+    assert [event.stage for event in events] == [
+        STAGE_DRAFT_START, STAGE_SEGMENT, STAGE_SEGMENT, STAGE_SEGMENT, STAGE_SAVE, STAGE_DRAFT_DONE
+    ]
+    segments = [event for event in events if event.stage == STAGE_SEGMENT]
+    assert [event.segment_index for event in segments] == [0, 1, 2]
+    assert [event.ok for event in segments] == [True, False, True]
+    assert events[4].bytes == 2048
+
+    reporter.unsubscribe(events.append)
+    assert not reporter.enabled
+    reporter.emit(STAGE_SEGMENT, "draft-1")
+    assert len(events) == 6
+    print("✅ 订阅和发出事件测试通过")
+
+
+def test_no_subscriber_and_callback_error():
+    """测试没有订阅者时的快速返回和回调出错"""
+    print("=== 测试快速返回和回调出错 ===")
+
+    reporter = ProgressReporter()
+    # 没有订阅者时不构造事件，未知字段也不会报错
+    reporter.emit(STAGE_SEGMENT, "draft-1", unknown_field=1)
+
+    def broken(event):
+        raise RuntimeError("回调出错")
+
+    received = []
+    reporter.subscribe(broken)
+    reporter.subscribe(received.append)
+    reporter.emit(STAGE_SEGMENT, "draft-1", track="text_0", segment_index=0, segment_count=1)
+    assert len(received) == 1
+
+    # 多线程发出事件时订阅和取消订阅是安全的
+    def worker():
+        for i in range(500):
+            reporter.emit(STAGE_SEGMENT, "draft-2", segment_index=i, segment_count=500)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    reporter.unsubscribe(broken)
+    for thread in threads:
+        thread.join()
+    assert len(received) == 1 + 2000
+    print("✅ 快速返回和回调出错测试通过")
+
+
+def test_format_progress():
+    """测试状态文本"""
+    print("=== 测试状态文本 ===")
+
+    assert "3 个片段" in format_progress(ProgressEvent(STAGE_DRAFT_START, "d", segment_count=3))
+    text = format_progress(ProgressEvent(STAGE_SEGMENT, "d", track="video_0", segment_index=1, segment_count=3))
+    assert "video_0" in text and "2/3" in text and "失败" not in text
+    assert "失败" in format_progress(
+        ProgressEvent(STAGE_SEGMENT, "d", track="video_0", segment_index=1, segment_count=3, ok=False)
+    )
+    assert "2.0 KB" in format_progress(ProgressEvent(STAGE_SAVE, "d", bytes=2048))
+    assert "1.5 秒" in format_progress(ProgressEvent(STAGE_DRAFT_DONE, "d", elapsed=1.5))
+    print("✅ 状态文本测试通过")
+
+
+if __name__ == "__main__":
+    test_subscribe_and_emit()
+    test_no_subscriber_and_callback_error()
+    test_format_progress()
+    print("\n🎉 所有测试通过")
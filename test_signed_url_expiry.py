@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+测试签名 URL 过期检查
+验证素材下载能按过期时间排序，并识别已经过期的链接
+"""
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.utils.signed_url import get_signed_url_expiry, inspect_signed_url, order_urls_by_expiry
+
+
+def test_expiry_parsing():
+    """测试各种签名格式的过期时间解析"""
+    print("=== 测试过期时间解析 ===")
+
+    tts_url = "https://lf3-appstore-sign.oceancloudapi.com/ocean-cloud-tos/VolcanoUserVoice/speech_1.mp3?lk3s=da27ec82&x-expires=1760000000&x-signature=abc"
+    assert get_signed_url_expiry(tts_url) == 1760000000
+    assert get_signed_url_expiry("https://cdn.example.com/a.mp4?Expires=1700000000&Signature=x") == 1700000000
+    assert get_signed_url_expiry(
+        "https://bucket.s3.amazonaws.com/a.mp4?X-Amz-Date=20240101T000000Z&X-Amz-Expires=3600"
+    ) == 1704067200 + 3600
+    assert get_signed_url_expiry("https://example.com/a.mp4") is None
+    assert get_signed_url_expiry("https://example.com/a.mp4?X-Amz-Date=bad&X-Amz-Expires=3600") is None
+    print("✅ 过期时间解析正确")
+
+
+def test_expired_and_ordering():
+    """测试过期判断和最早过期优先的排序"""
+    print("=== 测试过期判断和排序 ===")
+
+    now = int(time.time())
+    expired = f"https://example.com/expired.mp3?x-expires={now - 10}"
+    soon = f"https://example.com/soon.mp3?x-expires={now + 60}"
+    late = f"https://example.com/late.mp3?x-expires={now + 3600}"
+    plain_a = "https://example.com/a.mp4"
+    plain_b = "https://example.com/b.mp4"
+
+    assert inspect_signed_url(expired).is_expired()
+    assert not inspect_signed_url(soon).is_expired()
+    assert not inspect_signed_url(plain_a).is_expired()
+    assert inspect_signed_url(plain_a).seconds_left() is None
+
+    ordered = order_urls_by_expiry([plain_a, late, plain_b, soon, expired])
+    assert ordered == [expired, soon, late, plain_a, plain_b]
+    print("✅ 最早过期的 URL 排在最前，普通 URL 保持原有顺序")
+
+
+if __name__ == "__main__":
+    test_expiry_parsing()
+    test_expired_and_ordering()
+    print("\n✅ 所有签名 URL 测试通过!")